@@ -0,0 +1,67 @@
+"""add work queue items projection
+
+Revision ID: 20261017_0046
+Revises: 20260515_0045
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20261017_0046"
+down_revision: str | None = "20260515_0045"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "work_queue_items",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("gym_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("source_type", sa.String(length=32), nullable=False),
+        sa.Column("source_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("member_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("lead_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("assigned_to_user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("domain", sa.String(length=32), nullable=False),
+        sa.Column("state", sa.String(length=24), nullable=False),
+        sa.Column("severity", sa.String(length=16), nullable=False),
+        sa.Column("preferred_shift", sa.String(length=16), nullable=True),
+        sa.Column("retention_stage", sa.String(length=40), nullable=True),
+        sa.Column("is_cold_base", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("is_finance", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("trainer_visible", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("visible_from", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("score", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("score_refresh_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["gym_id"], ["gyms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("gym_id", "source_type", "source_id", name="uq_work_queue_items_source"),
+    )
+    op.create_index("ix_work_queue_items_gym_id", "work_queue_items", ["gym_id"], unique=False)
+    op.create_index(
+        "ix_work_queue_items_gym_state_rank",
+        "work_queue_items",
+        ["gym_id", "state", "score", "due_at", "id"],
+        unique=False,
+    )
+    op.create_index("ix_work_queue_items_gym_rank", "work_queue_items", ["gym_id", "score", "due_at", "id"], unique=False)
+    op.create_index("ix_work_queue_items_gym_member", "work_queue_items", ["gym_id", "member_id"], unique=False)
+    op.create_index("ix_work_queue_items_score_refresh", "work_queue_items", ["score_refresh_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_queue_items_score_refresh", table_name="work_queue_items")
+    op.drop_index("ix_work_queue_items_gym_member", table_name="work_queue_items")
+    op.drop_index("ix_work_queue_items_gym_rank", table_name="work_queue_items")
+    op.drop_index("ix_work_queue_items_gym_state_rank", table_name="work_queue_items")
+    op.drop_index("ix_work_queue_items_gym_id", table_name="work_queue_items")
+    op.drop_table("work_queue_items")
@@ -0,0 +1,55 @@
+"""add ai triage sync markers
+
+Revision ID: 20261017_0047
+Revises: 20261017_0046
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20261017_0047"
+down_revision: str | None = "20261017_0046"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_triage_dirty_members",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("gym_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("member_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("reason", sa.String(length=24), nullable=False),
+        sa.Column("marked_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["gym_id"], ["gyms.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["member_id"], ["members.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("gym_id", "member_id", name="uq_ai_triage_dirty_members_gym_member"),
+    )
+    op.create_index("ix_ai_triage_dirty_members_gym_marked", "ai_triage_dirty_members", ["gym_id", "marked_at"], unique=False)
+
+    op.create_table(
+        "ai_triage_sync_states",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("gym_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("synced_through", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_synced_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_duration_ms", sa.Integer(), nullable=True),
+        sa.Column("last_dirty_member_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["gym_id"], ["gyms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("gym_id", name="uq_ai_triage_sync_states_gym_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ai_triage_sync_states")
+    op.drop_index("ix_ai_triage_dirty_members_gym_marked", table_name="ai_triage_dirty_members")
+    op.drop_table("ai_triage_dirty_members")
@@ -0,0 +1,40 @@
+"""add member risk schedules
+
+Revision ID: 20261017_0048
+Revises: 20261017_0047
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20261017_0048"
+down_revision: str | None = "20261017_0047"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "member_risk_schedules",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("gym_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("member_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("reason", sa.String(length=24), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["gym_id"], ["gyms.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["member_id"], ["members.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("member_id", name="uq_member_risk_schedules_member_id"),
+    )
+    op.create_index("ix_member_risk_schedules_gym_due", "member_risk_schedules", ["gym_id", "due_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_member_risk_schedules_gym_due", table_name="member_risk_schedules")
+    op.drop_table("member_risk_schedules")
@@ -0,0 +1,52 @@
+"""add member search columns and trigram index
+
+Revision ID: 20261017_0050
+Revises: 20261017_0049
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0050"
+down_revision: str | None = "20261017_0049"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+EXTERNAL_ID_SQL = "NULLIF(btrim(extra_data ->> 'external_id'), '')"
+SEARCH_TEXT_SQL = (
+    "lower(translate(coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(extra_data ->> 'external_id', ''), "
+    "'áàâãäåéèêëíìîïóòôõöúùûüçñýÿÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝ', "
+    "'aaaaaaeeeeiiiiooooouuuucnyyaaaaaaeeeeiiiiooooouuuucny'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "members",
+        sa.Column("external_id", sa.Text(), sa.Computed(EXTERNAL_ID_SQL, persisted=True), nullable=True),
+    )
+    op.add_column(
+        "members",
+        sa.Column("search_text", sa.Text(), sa.Computed(SEARCH_TEXT_SQL, persisted=True), nullable=False),
+    )
+    op.create_index("ix_members_gym_external_id", "members", ["gym_id", "external_id"], unique=False)
+    op.create_index(
+        "ix_members_search_text_trgm",
+        "members",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_members_search_text_trgm", table_name="members")
+    op.drop_index("ix_members_gym_external_id", table_name="members")
+    op.drop_column("members", "search_text")
+    op.drop_column("members", "external_id")
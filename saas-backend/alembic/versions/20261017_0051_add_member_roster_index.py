@@ -0,0 +1,23 @@
+"""add member roster keyset index
+
+Revision ID: 20261017_0051
+Revises: 20261017_0050
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "20261017_0051"
+down_revision: str | None = "20261017_0050"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_members_gym_updated_at_id", "members", ["gym_id", "updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_members_gym_updated_at_id", table_name="members")
@@ -0,0 +1,27 @@
+"""add member timeline indexes
+
+Revision ID: 20261017_0052
+Revises: 20261017_0051
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "20261017_0052"
+down_revision: str | None = "20261017_0051"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_nps_member_created", "nps_responses", ["member_id", "created_at"], unique=False)
+    op.create_index("ix_tasks_member_created", "tasks", ["member_id", "created_at"], unique=False)
+    op.create_index("ix_audit_logs_member_created", "audit_logs", ["member_id", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_member_created", table_name="audit_logs")
+    op.drop_index("ix_tasks_member_created", table_name="tasks")
+    op.drop_index("ix_nps_member_created", table_name="nps_responses")
@@ -0,0 +1,34 @@
+"""add outbound queue columns to message logs
+
+Revision ID: 20261017_0053
+Revises: 20261017_0052
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0053"
+down_revision: str | None = "20261017_0052"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("message_logs", sa.Column("attempt_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("message_logs", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_message_logs_queued_next_attempt",
+        "message_logs",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_message_logs_queued_next_attempt", table_name="message_logs")
+    op.drop_column("message_logs", "next_attempt_at")
+    op.drop_column("message_logs", "attempt_count")
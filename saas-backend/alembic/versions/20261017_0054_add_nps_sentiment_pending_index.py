@@ -0,0 +1,30 @@
+"""add partial index for nps responses awaiting batched sentiment
+
+Revision ID: 20261017_0054
+Revises: 20261017_0053
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "20261017_0054"
+down_revision: str | None = "20261017_0053"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_nps_sentiment_pending_created",
+        "nps_responses",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("extra_data->>'sentiment_status' = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_nps_sentiment_pending_created", table_name="nps_responses")
@@ -0,0 +1,51 @@
+"""key manually dispatched monthly report artifacts by their job
+
+Revision ID: 20261017_0055
+Revises: 20261017_0054
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "20261017_0055"
+down_revision: str | None = "20261017_0054"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "monthly_report_artifacts",
+        sa.Column("dispatch_job_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.drop_constraint("uq_monthly_report_artifacts_gym_period", "monthly_report_artifacts", type_="unique")
+    op.create_index(
+        "uq_monthly_report_artifacts_gym_period",
+        "monthly_report_artifacts",
+        ["gym_id", "period"],
+        unique=True,
+        postgresql_where=sa.text("dispatch_job_id IS NULL"),
+    )
+    op.create_index(
+        "uq_monthly_report_artifacts_dispatch_job",
+        "monthly_report_artifacts",
+        ["dispatch_job_id"],
+        unique=True,
+        postgresql_where=sa.text("dispatch_job_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_monthly_report_artifacts_dispatch_job", table_name="monthly_report_artifacts")
+    op.drop_index("uq_monthly_report_artifacts_gym_period", table_name="monthly_report_artifacts")
+    op.execute("DELETE FROM monthly_report_artifacts WHERE dispatch_job_id IS NOT NULL")
+    op.create_unique_constraint(
+        "uq_monthly_report_artifacts_gym_period",
+        "monthly_report_artifacts",
+        ["gym_id", "period"],
+    )
+    op.drop_column("monthly_report_artifacts", "dispatch_job_id")
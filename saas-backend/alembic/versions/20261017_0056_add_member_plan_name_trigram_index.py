@@ -0,0 +1,32 @@
+"""add trigram index on the folded member plan name
+
+Revision ID: 20261017_0056
+Revises: 20261017_0055
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "20261017_0056"
+down_revision: str | None = "20261017_0055"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+PLAN_NAME_FOLD_SQL = (
+    "lower(translate(plan_name, "
+    "'áàâãäåéèêëíìîïóòôõöúùûüçñýÿÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝ', "
+    "'aaaaaaeeeeiiiiooooouuuucnyyaaaaaaeeeeiiiiooooouuuucny'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        f"CREATE INDEX ix_members_plan_name_fold_trgm ON members USING gin (({PLAN_NAME_FOLD_SQL}) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_members_plan_name_fold_trgm", table_name="members")
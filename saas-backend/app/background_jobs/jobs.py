@@ -1,16 +1,20 @@
 import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from time import perf_counter
 from typing import Any
 
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.core.config import settings
-from app.core.distributed_lock import with_distributed_lock
+from app.core.distributed_lock import gym_belongs_to_shard, gym_lease_name, hold_distributed_lock, with_distributed_lock
 from app.database import SessionLocal, clear_current_gym_id, set_current_gym_id, unscoped_tenant_access
 from app.models import Gym
 from app.models.member import Member
 from app.models.enums import MemberStatus
+from app.services.ai_triage_sync_service import process_ai_triage_sync_for_gym, record_ai_triage_sync_failure
 from app.services.analytics_view_service import refresh_member_kpis_materialized_view
 from app.services.automation_engine import run_automation_rules
 from app.services.autopilot_action_service import execute_autopilot_action, pending_actions_due, pending_events, timed_out_actions
@@ -25,14 +29,21 @@ from app.services.core_async_job_service import (
     process_pending_core_async_jobs,
 )
 from app.services.crm_service import run_followup_automation
+from app.services.dashboard_service import prewarm_dashboard_cache
 from app.services.delinquency_service import materialize_delinquency_tasks_for_gym
+from app.services.monthly_report_dispatch_service import process_due_monthly_report_deliveries
+from app.services.nps_sentiment_batch_service import process_pending_nps_sentiment
 from app.services.nurturing_service import run_nurturing_followup
 from app.services.onboarding_score_service import run_daily_onboarding_score
 from app.services.preferred_shift_service import sync_preferred_shifts_from_checkins
 from app.services.retention_intelligence_service import run_daily_retention_intelligence
 from app.services.risk import run_daily_risk_processing
 from app.services.risk_recalculation_service import process_pending_risk_recalculation_requests
+from app.services.risk_schedule_service import RISK_REASON_MEMBER, mark_risk_inputs_changed
 from app.services.weekly_briefing_service import generate_and_send_weekly_briefing
+from app.services.whatsapp_outbound_service import process_due_whatsapp_messages
+from app.services.work_queue_index_service import rebuild_work_queue_index, refresh_due_work_queue_scores
+from app.utils.batching import BatchScanStats, iter_keyset_batches
 
 logger = logging.getLogger(__name__)
 
@@ -84,89 +95,134 @@ def _log_job_failure(job_name: str, *, gym_id: Any = None) -> None:
     logger.exception("Scheduler job iteration failed.", extra={"extra_fields": extra_fields})
 
 
-def _iter_active_members_for_loyalty(db, gym_id, *, batch_size: int):
-    offset = 0
-    while True:
-        members = db.scalars(
-            select(Member).where(
-                Member.gym_id == gym_id,
-                Member.deleted_at.is_(None),
-                Member.status == MemberStatus.ACTIVE,
-            ).order_by(Member.id.asc()).offset(offset).limit(batch_size)
-        ).all()
-        if not members:
-            break
-        yield members
-        offset += len(members)
-        if len(members) < batch_size:
-            break
-
-
-@with_distributed_lock("daily_risk", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
-def daily_risk_job() -> None:
-    job_name = "daily_risk"
+GymHandler = Callable[[Any, Any], dict[str, Any] | None]
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((perf_counter() - started) * 1000)
+
+
+def _run_gym_iteration(
+    job_name: str,
+    gym_id: Any,
+    handler: GymHandler,
+    *,
+    fanout_started: float,
+    lease_ttl_seconds: int,
+    fail_open: bool | Callable[[], bool],
+) -> None:
+    queue_lag_ms = _elapsed_ms(fanout_started)
+    with hold_distributed_lock(gym_lease_name(job_name, gym_id), lease_ttl_seconds, fail_open) as acquired:
+        if not acquired:
+            return
+        db = SessionLocal()
+        started = perf_counter()
+        try:
+            set_current_gym_id(gym_id)
+            metrics = handler(db, gym_id) or {}
+            _log_job_metrics(
+                job_name,
+                gym_id=gym_id,
+                duration_ms=_elapsed_ms(started),
+                queue_lag_ms=queue_lag_ms,
+                **metrics,
+            )
+        except Exception:
+            _log_job_failure(job_name, gym_id=gym_id)
+            db.rollback()
+        finally:
+            clear_current_gym_id()
+            db.close()
+
+
+def _run_for_each_gym(
+    job_name: str,
+    handler: GymHandler,
+    *,
+    lease_ttl_seconds: int,
+    fail_open: bool | Callable[[], bool] = _critical_lock_fail_open,
+) -> None:
+    """Fan-out por academia: uma Session e um lease por academia, em pool limitado e restrito ao shard do worker."""
     db = SessionLocal()
     try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                result = run_daily_risk_processing(db)
-                _log_job_metrics(job_name, gym_id=gym.id, result=result)
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
+        gym_ids = [gym.id for gym in _active_gyms(db) if gym_belongs_to_shard(gym.id)]
     finally:
-        clear_current_gym_id()
         db.close()
 
+    fanout_started = perf_counter()
+    concurrency = min(max(int(settings.scheduler_gym_concurrency), 1), max(len(gym_ids), 1))
+    iteration_kwargs = {
+        "fanout_started": fanout_started,
+        "lease_ttl_seconds": lease_ttl_seconds,
+        "fail_open": fail_open,
+    }
+    if concurrency <= 1:
+        for gym_id in gym_ids:
+            _run_gym_iteration(job_name, gym_id, handler, **iteration_kwargs)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"{job_name}-gym") as pool:
+            futures = [
+                pool.submit(_run_gym_iteration, job_name, gym_id, handler, **iteration_kwargs)
+                for gym_id in gym_ids
+            ]
+            for future in futures:
+                future.result()
+    _log_job_metrics(
+        job_name,
+        gym_count=len(gym_ids),
+        concurrency=concurrency,
+        duration_ms=_elapsed_ms(fanout_started),
+    )
+
+
+def _iter_active_members_for_loyalty(db, gym_id, *, batch_size: int, stats: BatchScanStats | None = None):
+    # Only the columns the loyalty calculation reads; changed rows are written back in bulk by primary key.
+    stmt = select(Member.id, Member.join_date, Member.loyalty_months).where(
+        Member.gym_id == gym_id,
+        Member.deleted_at.is_(None),
+        Member.status == MemberStatus.ACTIVE,
+    )
+    yield from iter_keyset_batches(db, stmt, Member.id, batch_size=batch_size, stats=stats)
+
+
+def _daily_risk_for_gym(db, gym_id) -> dict[str, Any]:
+    return _extract_safe_metrics(run_daily_risk_processing(db))
+
+
+@with_distributed_lock("daily_risk", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
+def daily_risk_job() -> None:
+    _run_for_each_gym("daily_risk", _daily_risk_for_gym, lease_ttl_seconds=1800)
+
+
+def _daily_nps_dispatch_for_gym(db, gym_id) -> dict[str, Any]:
+    job, created = enqueue_nps_dispatch_job(
+        db,
+        gym_id=gym_id,
+        requested_by_user_id=None,
+    )
+    db.commit()
+    return {
+        "queued_job_id": str(job.id),
+        "created": int(created),
+        "enqueued_count": 1 if created else 0,
+        "deduped_count": 0 if created else 1,
+    }
+
 
-@with_distributed_lock("daily_nps_dispatch", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+@with_distributed_lock("daily_nps_dispatch", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_nps_dispatch_job() -> None:
-    job_name = "daily_nps_dispatch"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                job, created = enqueue_nps_dispatch_job(
-                    db,
-                    gym_id=gym.id,
-                    requested_by_user_id=None,
-                )
-                db.commit()
-                _log_job_metrics(
-                    job_name,
-                    gym_id=gym.id,
-                    queued_job_id=str(job.id),
-                    created=int(created),
-                    enqueued_count=1 if created else 0,
-                    deduped_count=0 if created else 1,
-                )
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_nps_dispatch", _daily_nps_dispatch_for_gym, lease_ttl_seconds=1800)
 
 
-@with_distributed_lock("daily_crm_followup", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+def _daily_crm_followup_for_gym(db, gym_id) -> dict[str, Any]:
+    processed_count = run_followup_automation(db)
+    db.commit()
+    return {"processed_count": processed_count}
+
+
+@with_distributed_lock("daily_crm_followup", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_crm_followup_job() -> None:
-    job_name = "daily_crm_followup"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                processed_count = run_followup_automation(db)
-                db.commit()
-                _log_job_metrics(job_name, gym_id=gym.id, processed_count=processed_count)
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_crm_followup", _daily_crm_followup_for_gym, lease_ttl_seconds=1800)
 
 
 @with_distributed_lock("monthly_reports", ttl_seconds=3600, fail_open=_critical_lock_fail_open)
@@ -216,24 +272,16 @@ def refresh_dashboard_views_job() -> None:
         db.close()
 
 
-@with_distributed_lock("daily_automations", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+def _daily_automations_for_gym(db, gym_id) -> dict[str, Any]:
+    results = run_automation_rules(db)
+    db.commit()
+    return _extract_rule_metrics(results)
+
+
+@with_distributed_lock("daily_automations", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_automations_job() -> None:
     """Executa todas as regras de automacao ativas para cada academia. Roda apos daily_risk_job."""
-    job_name = "daily_automations"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                results = run_automation_rules(db)
-                db.commit()
-                _log_job_metrics(job_name, gym_id=gym.id, **_extract_rule_metrics(results))
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_automations", _daily_automations_for_gym, lease_ttl_seconds=1800)
 
 
 @with_distributed_lock("automation_journeys", ttl_seconds=900, fail_open=_critical_lock_fail_open)
@@ -255,44 +303,105 @@ def automation_journeys_job() -> None:
         db.close()
 
 
-@with_distributed_lock("daily_loyalty_update", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+@with_distributed_lock("daily_loyalty_update", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_loyalty_update_job() -> None:
     """Recalcula loyalty_months para todos os membros ativos de todas as academias."""
-    job_name = "daily_loyalty_update"
     today = date.today()
     batch_size = max(int(settings.loyalty_update_batch_size), 1)
+
+    def _update_gym(db, gym_id) -> dict[str, Any]:
+        processed_count = 0
+        updated_count = 0
+        scan_stats = BatchScanStats()
+        for rows in _iter_active_members_for_loyalty(db, gym_id, batch_size=batch_size, stats=scan_stats):
+            changes = []
+            for row in rows:
+                delta = relativedelta(today, row.join_date)
+                loyalty_months = max(0, delta.years * 12 + delta.months)
+                if loyalty_months != row.loyalty_months:
+                    changes.append({"id": row.id, "loyalty_months": loyalty_months})
+            if changes:
+                db.execute(update(Member), changes)
+                if settings.risk_incremental_enabled:
+                    # Bulk UPDATEs skip the flush listener, so the risk schedule is marked here.
+                    mark_risk_inputs_changed(
+                        db.connection(),
+                        {(gym_id, change["id"]): RISK_REASON_MEMBER for change in changes},
+                    )
+                updated_count += len(changes)
+            processed_count += len(rows)
+        db.commit()
+        return {"processed_count": processed_count, "updated_count": updated_count, **scan_stats.as_metrics()}
+
+    _run_for_each_gym("daily_loyalty_update", _update_gym, lease_ttl_seconds=1800)
+
+
+def _daily_preferred_shift_sync_for_gym(db, gym_id) -> dict[str, Any]:
+    updated_count = sync_preferred_shifts_from_checkins(db, gym_id=gym_id, commit=False, flush=False)
+    db.commit()
+    return {"updated_count": updated_count}
+
+
+@with_distributed_lock("daily_preferred_shift_sync", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
+def daily_preferred_shift_sync_job() -> None:
+    """Recalcula preferred_shift dos membros com base no horario dominante dos check-ins recentes."""
+    _run_for_each_gym("daily_preferred_shift_sync", _daily_preferred_shift_sync_for_gym, lease_ttl_seconds=1800)
+
+
+@with_distributed_lock("ai_triage_sync_queue", ttl_seconds=600, fail_open=_critical_lock_fail_open)
+def ai_triage_sync_queue_job() -> None:
+    """Sincroniza a triagem IA das academias com membros marcados como alterados (check-in, risco, tasks)."""
+    job_name = "ai_triage_sync_queue"
+    if not settings.ai_triage_background_sync_enabled:
+        logger.info(
+            "AI triage background sync disabled by configuration.",
+            extra={"extra_fields": {"event": "job_skipped_disabled", "job_name": job_name, "status": "disabled"}},
+        )
+        return
     db = SessionLocal()
     try:
         for gym in _active_gyms(db):
             try:
                 set_current_gym_id(gym.id)
-                processed_count = 0
-                for members in _iter_active_members_for_loyalty(db, gym.id, batch_size=batch_size):
-                    for member in members:
-                        delta = relativedelta(today, member.join_date)
-                        member.loyalty_months = max(0, delta.years * 12 + delta.months)
-                    processed_count += len(members)
-                    db.flush()
+                result = process_ai_triage_sync_for_gym(db, gym_id=gym.id)
                 db.commit()
-                _log_job_metrics(job_name, gym_id=gym.id, processed_count=processed_count)
-            except Exception:
+                if result["synced"]:
+                    _log_job_metrics(job_name, gym_id=gym.id, **result)
+            except Exception as exc:
                 _log_job_failure(job_name, gym_id=gym.id)
                 db.rollback()
+                try:
+                    record_ai_triage_sync_failure(db, gym_id=gym.id, error=exc)
+                    db.commit()
+                except Exception:
+                    db.rollback()
     finally:
         clear_current_gym_id()
         db.close()
 
 
-@with_distributed_lock("daily_preferred_shift_sync", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
-def daily_preferred_shift_sync_job() -> None:
-    """Recalcula preferred_shift dos membros com base no horario dominante dos check-ins recentes."""
-    job_name = "daily_preferred_shift_sync"
+def _work_queue_index_disabled(job_name: str) -> bool:
+    if settings.work_queue_index_enabled:
+        return False
+    logger.info(
+        "Work queue index disabled by configuration.",
+        extra={"extra_fields": {"event": "job_skipped_disabled", "job_name": job_name, "status": "disabled"}},
+    )
+    return True
+
+
+@with_distributed_lock("work_queue_index_scores", ttl_seconds=600, fail_open=_critical_lock_fail_open)
+def work_queue_index_scores_job() -> None:
+    """Recalcula o score dos itens da fila de trabalho cujo prazo mudou de faixa."""
+    job_name = "work_queue_index_scores"
+    if _work_queue_index_disabled(job_name):
+        return
     db = SessionLocal()
     try:
         for gym in _active_gyms(db):
             try:
                 set_current_gym_id(gym.id)
-                updated_count = sync_preferred_shifts_from_checkins(db, gym_id=gym.id, commit=False, flush=False)
+                updated_count = refresh_due_work_queue_scores(db, gym_id=gym.id)
                 db.commit()
                 _log_job_metrics(job_name, gym_id=gym.id, updated_count=updated_count)
             except Exception:
@@ -303,31 +412,41 @@ def daily_preferred_shift_sync_job() -> None:
         db.close()
 
 
-@with_distributed_lock("daily_delinquency_ladder", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+def _daily_work_queue_index_rebuild_for_gym(db, gym_id) -> dict[str, Any]:
+    result = rebuild_work_queue_index(db, gym_id=gym_id)
+    db.commit()
+    return result
+
+
+@with_distributed_lock(
+    "daily_work_queue_index_rebuild",
+    ttl_seconds=3600,
+    fail_open=_critical_lock_fail_open,
+    sharded=True,
+)
+def daily_work_queue_index_rebuild_job() -> None:
+    """Reconcilia a projecao work_queue_items com as tabelas de origem (tasks, IA, fila de avaliacoes)."""
+    job_name = "daily_work_queue_index_rebuild"
+    if _work_queue_index_disabled(job_name):
+        return
+    _run_for_each_gym(job_name, _daily_work_queue_index_rebuild_for_gym, lease_ttl_seconds=3600)
+
+
+def _daily_delinquency_ladder_for_gym(db, gym_id) -> dict[str, Any]:
+    result = materialize_delinquency_tasks_for_gym(db, gym_id=gym_id, commit=True)
+    return {
+        "created_count": result.created_count,
+        "updated_count": result.updated_count,
+        "skipped_count": result.skipped_count,
+        "normalized_entries_count": result.normalized_entries_count,
+        "items_count": result.items_count,
+    }
+
+
+@with_distributed_lock("daily_delinquency_ladder", ttl_seconds=1800, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_delinquency_ladder_job() -> None:
     """Materializa recebiveis vencidos como tasks operacionais de inadimplencia."""
-    job_name = "daily_delinquency_ladder"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                result = materialize_delinquency_tasks_for_gym(db, gym_id=gym.id, commit=True)
-                _log_job_metrics(
-                    job_name,
-                    gym_id=gym.id,
-                    created_count=result.created_count,
-                    updated_count=result.updated_count,
-                    skipped_count=result.skipped_count,
-                    normalized_entries_count=result.normalized_entries_count,
-                    items_count=result.items_count,
-                )
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_delinquency_ladder", _daily_delinquency_ladder_for_gym, lease_ttl_seconds=1800)
 
 
 @with_distributed_lock("sunday_briefing", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
@@ -415,10 +534,126 @@ def risk_recalculation_queue_job() -> None:
 @with_distributed_lock("core_async_jobs_queue", ttl_seconds=300, fail_open=_critical_lock_fail_open)
 def core_async_jobs_queue_job() -> None:
     job_name = "core_async_jobs_queue"
-    processed_count = process_pending_core_async_jobs(batch_size=5)
+    processed_count = process_pending_core_async_jobs(batch_size=settings.core_async_jobs_batch_size)
     _log_job_metrics(job_name, processed_count=processed_count)
 
 
+# Leaves headroom under the lock TTL; deliveries still due are picked up by the next run.
+_MONTHLY_REPORT_DELIVERIES_TIME_BUDGET_SECONDS = 240
+
+
+@with_distributed_lock("monthly_report_deliveries", ttl_seconds=300, fail_open=_critical_lock_fail_open)
+def monthly_report_deliveries_job() -> None:
+    """Envia as copias do relatorio mensal que estao na fila, com tentativas independentes por destinatario."""
+    job_name = "monthly_report_deliveries"
+    if not settings.monthly_reports_pipeline_enabled:
+        logger.info(
+            "Monthly report deliveries disabled by configuration.",
+            extra={"extra_fields": {"event": "job_skipped_disabled", "job_name": job_name, "status": "disabled"}},
+        )
+        return
+    started = perf_counter()
+    batch_size = max(settings.monthly_reports_delivery_batch_size, 1)
+    db = SessionLocal()
+    try:
+        while perf_counter() - started < _MONTHLY_REPORT_DELIVERIES_TIME_BUDGET_SECONDS:
+            try:
+                result = process_due_monthly_report_deliveries(
+                    db,
+                    batch_size=batch_size,
+                    concurrency=settings.monthly_reports_send_concurrency,
+                )
+                db.commit()
+            except Exception:
+                _log_job_failure(job_name)
+                db.rollback()
+                return
+            if result["claimed"]:
+                _log_job_metrics(job_name, **result)
+            if result["claimed"] < batch_size:
+                return
+    finally:
+        db.close()
+
+
+# Leaves headroom under the lock TTL; messages still due are picked up by the next run.
+_WHATSAPP_OUTBOUND_TIME_BUDGET_SECONDS = 45
+
+
+@with_distributed_lock("whatsapp_outbound", ttl_seconds=90, fail_open=_critical_lock_fail_open)
+def whatsapp_outbound_job() -> None:
+    """Envia as mensagens de WhatsApp enfileiradas pelas automacoes, com novas tentativas por mensagem."""
+    job_name = "whatsapp_outbound"
+    if not settings.whatsapp_outbound_queue_enabled:
+        logger.info(
+            "WhatsApp outbound queue disabled by configuration.",
+            extra={"extra_fields": {"event": "job_skipped_disabled", "job_name": job_name, "status": "disabled"}},
+        )
+        return
+    started = perf_counter()
+    batch_size = max(settings.whatsapp_outbound_batch_size, 1)
+    db = SessionLocal()
+    try:
+        while perf_counter() - started < _WHATSAPP_OUTBOUND_TIME_BUDGET_SECONDS:
+            try:
+                result = process_due_whatsapp_messages(
+                    db,
+                    batch_size=batch_size,
+                    concurrency_per_instance=settings.whatsapp_outbound_concurrency_per_instance,
+                )
+                db.commit()
+            except Exception:
+                _log_job_failure(job_name)
+                db.rollback()
+                return
+            if result["claimed"]:
+                _log_job_metrics(job_name, **result)
+            if result["claimed"] < batch_size:
+                return
+    finally:
+        db.close()
+
+
+# Same headroom under the lock TTL as the WhatsApp sender; pending responses are picked up by the next run.
+_NPS_SENTIMENT_TIME_BUDGET_SECONDS = 45
+
+
+@with_distributed_lock("nps_sentiment_batch", ttl_seconds=90, fail_open=True)
+def nps_sentiment_batch_job() -> None:
+    """Classifica em lote o sentimento das respostas NPS deixadas pendentes por ``create_response``."""
+    job_name = "nps_sentiment_batch"
+    if not settings.nps_sentiment_batch_enabled:
+        logger.info(
+            "NPS sentiment batch disabled by configuration.",
+            extra={"extra_fields": {"event": "job_skipped_disabled", "job_name": job_name, "status": "disabled"}},
+        )
+        return
+    started = perf_counter()
+    claim_size = max(settings.nps_sentiment_batch_claim_size, 1)
+    db = SessionLocal()
+    try:
+        while perf_counter() - started < _NPS_SENTIMENT_TIME_BUDGET_SECONDS:
+            try:
+                result = process_pending_nps_sentiment(
+                    db,
+                    claim_size=claim_size,
+                    batch_size=settings.nps_sentiment_batch_size,
+                    concurrency=settings.nps_sentiment_batch_concurrency,
+                )
+                db.commit()
+            except Exception:
+                _log_job_failure(job_name)
+                db.rollback()
+                return
+            if result["claimed"]:
+                _log_job_metrics(job_name, **result)
+            # Deferred rows stay pending; looping again would only hit the refusing provider once more.
+            if result["claimed"] < claim_size or result["deferred"]:
+                return
+    finally:
+        db.close()
+
+
 @with_distributed_lock("autopilot_events_queue", ttl_seconds=120, fail_open=True)
 def autopilot_events_queue_job() -> None:
     job_name = "autopilot_events_queue"
@@ -485,42 +720,63 @@ def autopilot_timeouts_queue_job() -> None:
         db.close()
 
 
-@with_distributed_lock("daily_onboarding_score", ttl_seconds=900, fail_open=_critical_lock_fail_open)
+def _daily_onboarding_score_for_gym(db, gym_id) -> dict[str, Any]:
+    return _extract_safe_metrics(run_daily_onboarding_score(db))
+
+
+@with_distributed_lock("daily_onboarding_score", ttl_seconds=900, fail_open=_critical_lock_fail_open, sharded=True)
 def daily_onboarding_score_job() -> None:
     """Recalcula onboarding score para membros nos primeiros 30 dias."""
-    job_name = "daily_onboarding_score"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                result = run_daily_onboarding_score(db)
-                _log_job_metrics(job_name, gym_id=gym.id, result=result)
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_onboarding_score", _daily_onboarding_score_for_gym, lease_ttl_seconds=900)
+
+
+def _daily_retention_intelligence_for_gym(db, gym_id) -> dict[str, Any]:
+    return _extract_safe_metrics(run_daily_retention_intelligence(db))
 
 
-@with_distributed_lock("daily_retention_intelligence", ttl_seconds=1800, fail_open=_critical_lock_fail_open)
+@with_distributed_lock(
+    "daily_retention_intelligence",
+    ttl_seconds=1800,
+    fail_open=_critical_lock_fail_open,
+    sharded=True,
+)
 def daily_retention_intelligence_job() -> None:
     """Classifica churn e materializa playbooks de retencao. Roda apos daily_risk_job."""
-    job_name = "daily_retention_intelligence"
-    db = SessionLocal()
-    try:
-        for gym in _active_gyms(db):
-            try:
-                set_current_gym_id(gym.id)
-                result = run_daily_retention_intelligence(db)
-                _log_job_metrics(job_name, gym_id=gym.id, result=result)
-            except Exception:
-                _log_job_failure(job_name, gym_id=gym.id)
-                db.rollback()
-    finally:
-        clear_current_gym_id()
-        db.close()
+    _run_for_each_gym("daily_retention_intelligence", _daily_retention_intelligence_for_gym, lease_ttl_seconds=1800)
+
+
+# Ordem de dependencia por academia: risco -> inteligencia de retencao -> automacoes.
+_NIGHTLY_RETENTION_PIPELINE: tuple[tuple[str, GymHandler], ...] = (
+    ("daily_risk", _daily_risk_for_gym),
+    ("daily_retention_intelligence", _daily_retention_intelligence_for_gym),
+    ("daily_automations", _daily_automations_for_gym),
+)
+
+
+def _nightly_retention_pipeline_for_gym(db, gym_id) -> dict[str, Any]:
+    failed_steps = 0
+    for step_name, step in _NIGHTLY_RETENTION_PIPELINE:
+        started = perf_counter()
+        try:
+            metrics = step(db, gym_id) or {}
+            _log_job_metrics(step_name, gym_id=gym_id, duration_ms=_elapsed_ms(started), **metrics)
+        except Exception:
+            # Como nos jobs isolados, uma etapa com falha nao impede as seguintes.
+            _log_job_failure(step_name, gym_id=gym_id)
+            db.rollback()
+            failed_steps += 1
+    if settings.dashboard_cache_prewarm_enabled:
+        # Os dados do dia acabaram de mudar: recalcula os dashboards antes do primeiro acesso da manha.
+        started = perf_counter()
+        metrics = prewarm_dashboard_cache(db)
+        _log_job_metrics("dashboard_prewarm", gym_id=gym_id, duration_ms=_elapsed_ms(started), **metrics)
+    return {"failed_steps": failed_steps}
+
+
+@with_distributed_lock("nightly_retention_pipeline", ttl_seconds=5400, fail_open=_critical_lock_fail_open, sharded=True)
+def nightly_retention_pipeline_job() -> None:
+    """Executa risco, inteligencia de retencao e automacoes em sequencia dentro de cada academia."""
+    _run_for_each_gym("nightly_retention_pipeline", _nightly_retention_pipeline_for_gym, lease_ttl_seconds=5400)
 
 
 def _active_gyms(db) -> list[Gym]:
@@ -7,6 +7,7 @@ from time import perf_counter
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from app.background_jobs.jobs import (
+    ai_triage_sync_queue_job,
     actuar_sync_queue_job,
     autopilot_actions_queue_job,
     autopilot_events_queue_job,
@@ -14,21 +15,24 @@ from app.background_jobs.jobs import (
     automation_journeys_job,
     booking_reminder_job,
     core_async_jobs_queue_job,
-    daily_automations_job,
     daily_crm_followup_job,
     daily_delinquency_ladder_job,
     daily_loyalty_update_job,
     daily_nps_dispatch_job,
     daily_onboarding_score_job,
     daily_preferred_shift_sync_job,
-    daily_retention_intelligence_job,
-    daily_risk_job,
+    daily_work_queue_index_rebuild_job,
+    monthly_report_deliveries_job,
     monthly_reports_job,
+    nightly_retention_pipeline_job,
+    nps_sentiment_batch_job,
     nurturing_followup_job,
     proposal_followup_job,
     refresh_dashboard_views_job,
     risk_recalculation_queue_job,
     sunday_briefing_job,
+    whatsapp_outbound_job,
+    work_queue_index_scores_job,
 )
 from app.core.config import settings
 
@@ -100,30 +104,14 @@ def build_scheduler() -> BackgroundScheduler:
     # coalesce=True: if a job was missed (e.g. container restart), run it ONCE instead of catching up
     # misfire_grace_time=3600: ignore misfires older than 1h (prevents stale duplicate runs)
     _CRON_DEFAULTS = {"coalesce": True, "misfire_grace_time": 3600}
+    # Risk -> retention intelligence -> automations run back to back inside each gym,
+    # so automations see fresh risk levels without relying on clock offsets.
     scheduler.add_job(
-        instrument_scheduler_job("daily_risk", daily_risk_job),
+        instrument_scheduler_job("nightly_retention_pipeline", nightly_retention_pipeline_job),
         trigger="cron",
         hour=2,
         minute=0,
-        id="risk_daily",
-        **_CRON_DEFAULTS,
-    )
-    # Retention intelligence runs after risk, before automations
-    scheduler.add_job(
-        instrument_scheduler_job("daily_retention_intelligence", daily_retention_intelligence_job),
-        trigger="cron",
-        hour=2,
-        minute=15,
-        id="retention_intelligence_daily",
-        **_CRON_DEFAULTS,
-    )
-    # Automations run after risk scoring so rules using risk_level have fresh data
-    scheduler.add_job(
-        instrument_scheduler_job("daily_automations", daily_automations_job),
-        trigger="cron",
-        hour=2,
-        minute=30,
-        id="automations_daily",
+        id="nightly_retention_pipeline",
         **_CRON_DEFAULTS,
     )
     scheduler.add_job(
@@ -238,6 +226,30 @@ def build_scheduler() -> BackgroundScheduler:
         coalesce=True,
         misfire_grace_time=60,
     )
+    scheduler.add_job(
+        instrument_scheduler_job("monthly_report_deliveries", monthly_report_deliveries_job),
+        trigger="cron",
+        minute="*/1",
+        id="monthly_report_deliveries",
+        coalesce=True,
+        misfire_grace_time=60,
+    )
+    scheduler.add_job(
+        instrument_scheduler_job("whatsapp_outbound", whatsapp_outbound_job),
+        trigger="cron",
+        minute="*/1",
+        id="whatsapp_outbound",
+        coalesce=True,
+        misfire_grace_time=60,
+    )
+    scheduler.add_job(
+        instrument_scheduler_job("nps_sentiment_batch", nps_sentiment_batch_job),
+        trigger="cron",
+        minute="*/1",
+        id="nps_sentiment_batch",
+        coalesce=True,
+        misfire_grace_time=60,
+    )
     scheduler.add_job(
         instrument_scheduler_job("autopilot_events_queue", autopilot_events_queue_job),
         trigger="cron",
@@ -276,6 +288,31 @@ def build_scheduler() -> BackgroundScheduler:
         id="proposal_followup_hourly",
         **_CRON_DEFAULTS,
     )
+    scheduler.add_job(
+        instrument_scheduler_job("ai_triage_sync_queue", ai_triage_sync_queue_job),
+        trigger="cron",
+        minute="*/2",
+        id="ai_triage_sync_queue",
+        coalesce=True,
+        misfire_grace_time=120,
+    )
+    scheduler.add_job(
+        instrument_scheduler_job("work_queue_index_scores", work_queue_index_scores_job),
+        trigger="cron",
+        minute="*/15",
+        id="work_queue_index_scores",
+        coalesce=True,
+        misfire_grace_time=300,
+    )
+    # Reconcile runs after the nightly risk/retention/automation batch has rewritten tasks
+    scheduler.add_job(
+        instrument_scheduler_job("daily_work_queue_index_rebuild", daily_work_queue_index_rebuild_job),
+        trigger="cron",
+        hour=4,
+        minute=0,
+        id="work_queue_index_rebuild_daily",
+        **_CRON_DEFAULTS,
+    )
     return scheduler
 
 
@@ -0,0 +1,354 @@
+"""Process-wide gateway for LLM provider calls (Claude, OpenAI).
+
+``call_model`` runs one SDK call with:
+
+- pooled clients: one SDK client per provider, key and timeout, reused by every request in the process;
+- a response cache (``AI_GATEWAY_CACHE_ENABLED``) keyed on a hash of provider, model, prompt key and the canonical
+  JSON of the request, with TTL and size eviction, so an identical prompt (same NPS comment, same specialist payload,
+  same image bytes) is paid for once;
+- in-flight coalescing: concurrent identical requests wait for the first one instead of calling the provider again;
+- a per-tenant concurrency cap (``AI_GATEWAY_TENANT_CONCURRENCY``) so one gym cannot hold every provider slot;
+- the provider's circuit breaker and bulkhead (``app.core.circuit_breaker``), so an outage fails fast;
+- latency and token metrics per provider, model and prompt key (``ai_gateway_stats``).
+
+``FakeLLMClient`` answers the three SDK call shapes used here locally, for tests and benchmarks
+(``install_provider_client``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.core.circuit_breaker import get_breaker
+from app.core.config import settings
+from app.database import get_current_gym_id
+
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_CLAUDE = "claude"
+PROVIDER_OPENAI = "openai"
+_LATENCY_SAMPLES = 512
+_GLOBAL_TENANT = "global"
+
+
+class AIGatewayBusyError(RuntimeError):
+    """Raised when a tenant has no free provider slot within ``AI_GATEWAY_TENANT_WAIT_SECONDS``."""
+
+
+@dataclass
+class _CallMetrics:
+    calls: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=_LATENCY_SAMPLES))
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+
+        def _percentile(fraction: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 1)
+
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "p50_ms": _percentile(0.50),
+            "p95_ms": _percentile(0.95),
+        }
+
+
+_lock = Lock()
+_clients: dict[tuple, Any] = {}
+_client_overrides: dict[str, Any] = {}
+_in_flight: dict[str, Future] = {}
+_tenant_slots: dict[str, BoundedSemaphore] = {}
+_metrics: dict[tuple[str, str, str], _CallMetrics] = {}
+_response_cache: TTLCache | None = None
+
+
+def _build_client(provider: str, timeout_seconds: float | None) -> Any:
+    if provider == PROVIDER_CLAUDE:
+        import anthropic
+
+        kwargs: dict[str, Any] = {"api_key": settings.claude_api_key}
+        if timeout_seconds:
+            kwargs["timeout"] = timeout_seconds
+        return anthropic.Anthropic(**kwargs)
+    if provider == PROVIDER_OPENAI:
+        from openai import OpenAI
+
+        return OpenAI(api_key=settings.openai_api_key, timeout=timeout_seconds or settings.openai_timeout_seconds)
+    raise ValueError(f"Provedor de IA desconhecido: {provider}")
+
+
+def get_client(provider: str, *, timeout_seconds: float | None = None) -> Any:
+    """Pooled SDK client for ``provider``; SDK clients are thread-safe and keep their HTTP connections alive."""
+    with _lock:
+        override = _client_overrides.get(provider)
+        if override is not None:
+            return override
+        api_key = settings.claude_api_key if provider == PROVIDER_CLAUDE else settings.openai_api_key
+        key = (provider, api_key, timeout_seconds)
+        client = _clients.get(key)
+        if client is None:
+            client = _build_client(provider, timeout_seconds)
+            _clients[key] = client
+        return client
+
+
+def install_provider_client(provider: str, client: Any | None) -> None:
+    """Routes every call for ``provider`` to ``client`` (e.g. ``FakeLLMClient``); ``None`` restores the SDK client."""
+    with _lock:
+        if client is None:
+            _client_overrides.pop(provider, None)
+        else:
+            _client_overrides[provider] = client
+
+
+def reset_ai_gateway() -> None:
+    global _response_cache
+    with _lock:
+        _clients.clear()
+        _client_overrides.clear()
+        _in_flight.clear()
+        _tenant_slots.clear()
+        _metrics.clear()
+        _response_cache = None
+
+
+def _get_response_cache() -> TTLCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = TTLCache(
+            maxsize=max(int(settings.ai_gateway_cache_maxsize), 1),
+            ttl=max(int(settings.ai_gateway_cache_ttl_seconds), 1),
+        )
+    return _response_cache
+
+
+def _metrics_for(provider: str, model: str, prompt_key: str) -> _CallMetrics:
+    key = (provider, model, prompt_key)
+    metrics = _metrics.get(key)
+    if metrics is None:
+        metrics = _metrics.setdefault(key, _CallMetrics())
+    return metrics
+
+
+def request_fingerprint(provider: str, operation: str, prompt_key: str, request: dict[str, Any]) -> str:
+    """Content hash of a request; dict keys are sorted so equal requests always hash the same."""
+    canonical = json.dumps(
+        {"provider": provider, "operation": operation, "prompt_key": prompt_key, "request": request},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _tenant_slot(gym_id: UUID | str | None) -> BoundedSemaphore:
+    tenant = str(gym_id) if gym_id else _GLOBAL_TENANT
+    with _lock:
+        slot = _tenant_slots.get(tenant)
+        if slot is None:
+            slot = BoundedSemaphore(max(int(settings.ai_gateway_tenant_concurrency), 1))
+            _tenant_slots[tenant] = slot
+        return slot
+
+
+def _usage_tokens(response: Any) -> tuple[int, int]:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    # Anthropic and OpenAI Responses use input/output; OpenAI Chat Completions uses prompt/completion.
+    input_tokens = getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", None) or 0
+    output_tokens = getattr(usage, "output_tokens", None) or getattr(usage, "completion_tokens", None) or 0
+    return int(input_tokens), int(output_tokens)
+
+
+def _invoke(
+    provider: str,
+    operation: str,
+    request: dict[str, Any],
+    *,
+    metrics: _CallMetrics,
+    timeout_seconds: float | None,
+    gym_id: UUID | str | None,
+    client: Any | None,
+) -> Any:
+    slot = _tenant_slot(gym_id)
+    if not slot.acquire(timeout=max(float(settings.ai_gateway_tenant_wait_seconds), 0.0)):
+        with _lock:
+            metrics.errors += 1
+        raise AIGatewayBusyError(f"Limite de chamadas de IA simultaneas atingido para o tenant {gym_id or 'global'}")
+    try:
+        target = client if client is not None else get_client(provider, timeout_seconds=timeout_seconds)
+        method: Callable[..., Any] = target
+        for attribute in operation.split("."):
+            method = getattr(method, attribute)
+        started = perf_counter()
+        try:
+            with get_breaker(provider).guard():
+                response = method(**request)
+        except Exception:
+            with _lock:
+                metrics.errors += 1
+                metrics.latencies_ms.append((perf_counter() - started) * 1000)
+            raise
+        input_tokens, output_tokens = _usage_tokens(response)
+        with _lock:
+            metrics.calls += 1
+            metrics.input_tokens += input_tokens
+            metrics.output_tokens += output_tokens
+            metrics.latencies_ms.append((perf_counter() - started) * 1000)
+        return response
+    finally:
+        slot.release()
+
+
+def call_model(
+    provider: str,
+    operation: str,
+    *,
+    model: str,
+    prompt_key: str,
+    params: dict[str, Any],
+    timeout_seconds: float | None = None,
+    gym_id: UUID | str | None = None,
+    cache: bool = True,
+    client: Any | None = None,
+) -> Any:
+    """Calls ``client.<operation>(model=model, **params)`` through the gateway and returns the SDK response.
+
+    ``operation`` is the SDK attribute path (``messages.create``, ``responses.create``,
+    ``chat.completions.create``). Pass ``cache=False`` for prompts whose answer must not be reused.
+    """
+    request = {"model": model, **params}
+    fingerprint = request_fingerprint(provider, operation, prompt_key, request)
+    metrics = _metrics_for(provider, model, prompt_key)
+    use_cache = cache and settings.ai_gateway_cache_enabled
+
+    with _lock:
+        if use_cache:
+            cached = _get_response_cache().get(fingerprint)
+            if cached is not None:
+                metrics.cache_hits += 1
+                return cached
+        future = _in_flight.get(fingerprint)
+        leader = future is None
+        if leader:
+            future = Future()
+            _in_flight[fingerprint] = future
+        else:
+            metrics.coalesced += 1
+    if not leader:
+        return future.result()
+
+    try:
+        response = _invoke(
+            provider,
+            operation,
+            request,
+            metrics=metrics,
+            timeout_seconds=timeout_seconds,
+            gym_id=gym_id or get_current_gym_id(),
+            client=client,
+        )
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(response)
+        if use_cache:
+            with _lock:
+                _get_response_cache()[fingerprint] = response
+        return response
+    finally:
+        with _lock:
+            _in_flight.pop(fingerprint, None)
+
+
+def ai_gateway_stats() -> dict[str, Any]:
+    with _lock:
+        cache = _response_cache
+        return {
+            "clients": len(_clients),
+            "cache": {
+                "enabled": bool(settings.ai_gateway_cache_enabled),
+                "size": len(cache) if cache is not None else 0,
+                "maxsize": int(cache.maxsize) if cache is not None else int(settings.ai_gateway_cache_maxsize),
+            },
+            "in_flight": len(_in_flight),
+            "calls": {":".join(key): metrics.snapshot() for key, metrics in sorted(_metrics.items())},
+        }
+
+
+class FakeLLMClient:
+    """Local stand-in for the Anthropic and OpenAI SDK clients.
+
+    ``reply`` receives the call keyword arguments and returns the text answer; every call sleeps ``latency_seconds``
+    and is counted in ``calls``. Token usage is estimated from whitespace-separated words.
+    """
+
+    def __init__(self, reply: str | Callable[[dict[str, Any]], str] = "{}", *, latency_seconds: float = 0.0) -> None:
+        self._reply = reply
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._calls_lock = Lock()
+        self.messages = SimpleNamespace(create=self._messages_create)
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+
+    def _answer(self, kwargs: dict[str, Any]) -> tuple[str, int, int]:
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        text = self._reply(kwargs) if callable(self._reply) else self._reply
+        prompt_words = len(re.findall(r"\S+", json.dumps(kwargs, default=str)))
+        return text, prompt_words, len(text.split())
+
+    def _messages_create(self, **kwargs: Any) -> SimpleNamespace:
+        text, input_tokens, output_tokens = self._answer(kwargs)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+        )
+
+    def _responses_create(self, **kwargs: Any) -> SimpleNamespace:
+        text, input_tokens, output_tokens = self._answer(kwargs)
+        return SimpleNamespace(
+            output_text=text,
+            usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+        )
+
+    def _chat_create(self, **kwargs: Any) -> SimpleNamespace:
+        text, input_tokens, output_tokens = self._answer(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(prompt_tokens=input_tokens, completion_tokens=output_tokens),
+        )
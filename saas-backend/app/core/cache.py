@@ -1,12 +1,16 @@
 import json
 import logging
-from collections import defaultdict
-from collections.abc import Iterable
+import math
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable
 from threading import RLock
-from uuid import UUID
+from typing import NamedTuple
+from uuid import UUID, uuid4
 
 from cachetools import TTLCache
 
+from app.core.cache_codec import decode_payload, encode_payload, is_framed, resolve_codec
 from app.core.config import settings
 from app.database import get_current_gym_id
 
@@ -85,6 +89,44 @@ DASHBOARD_NAMESPACES_BY_DOMAIN: dict[str, set[str]] = {
 }
 
 
+# Marks payloads written with freshness metadata; older raw payloads are read as fresh values.
+_ENVELOPE_MARKER = "__dashboard_cache_entry__"
+# Invalidation markers must outlive any entry they may be compared against.
+_INVALIDATION_MARKER_TTL_SECONDS = 86400
+_RELEASE_REFRESH_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+class _CacheEntry(NamedTuple):
+    value: object
+    stored_at: float
+    fresh_until: float
+
+
+class _LocalCacheStore(TTLCache):
+    """TTLCache that reports the keys it drops by itself (TTL expiry or LRU eviction) to ``on_evict``."""
+
+    def __init__(self, *, maxsize: int, ttl: int, on_evict: Callable[[str, str], None]) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, _value in expired:
+            self._on_evict(key, "expired")
+        return expired
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict(key, "evicted")
+        return key, value
+
+
 class DashboardCache:
     def __init__(
         self,
@@ -93,11 +135,32 @@ class DashboardCache:
         default_ttl: int,
         redis_url: str = "",
         key_prefix: str = "aigymos:dashboard-cache",
+        stale_ttl: int = 0,
+        codec: str = "json",
+        compress_min_bytes: int = 0,
     ) -> None:
         self._default_ttl = max(1, int(default_ttl))
+        self._codec = resolve_codec(codec)
+        self._compress_min_bytes = max(0, int(compress_min_bytes))
+        # With stale_ttl > 0 entries outlive their TTL by that much and invalidation only marks them stale,
+        # so readers can serve the old value while a single refresh runs (see get_stale).
+        self._stale_ttl = max(0, int(stale_ttl))
         self._key_prefix = key_prefix
-        self._local_cache: TTLCache[str, object] = TTLCache(maxsize=maxsize, ttl=self._default_ttl)
+        # Local tier: entries plus a namespace index (index key -> cache keys) and its reverse map, kept
+        # consistent through the store's eviction callback so every operation touches only the keys involved.
+        self._local_cache: _LocalCacheStore = _LocalCacheStore(
+            maxsize=maxsize,
+            ttl=self._default_ttl + self._stale_ttl,
+            on_evict=self._on_local_evict,
+        )
         self._local_index: dict[str, set[str]] = defaultdict(set)
+        self._local_index_by_key: dict[str, str] = {}
+        self._local_lookups: dict[str, Counter[str]] = defaultdict(Counter)
+        self._local_evictions: Counter[str] = Counter()
+        # Invalidation marker per index key, kept only while the index has local entries: bounded by the entries
+        # themselves, so a busy cache can never evict a marker and serve an invalidated entry as fresh.
+        self._local_invalidated_at: dict[str, float] = {}
+        self._local_refresh_locks: dict[str, float] = {}
         self._lock = RLock()
         self._redis: Redis | None = None
         self._redis_configured = bool(redis_url)
@@ -126,6 +189,16 @@ class DashboardCache:
     def _index_key(self, tenant_scope: str, namespace: str) -> str:
         return f"{self._key_prefix}:index:{tenant_scope}:{namespace}"
 
+    def _invalidated_key(self, tenant_scope: str, namespace: str) -> str:
+        return f"{self._key_prefix}:invalidated:{tenant_scope}:{namespace}"
+
+    def _refresh_lock_key(self, cache_key: str) -> str:
+        return f"{self._key_prefix}:refresh:{cache_key}"
+
+    @property
+    def serves_stale(self) -> bool:
+        return self._stale_ttl > 0
+
     @staticmethod
     def _split_cache_key(cache_key: str) -> tuple[str, str] | None:
         first, sep, rest = cache_key.partition(":")
@@ -139,41 +212,97 @@ class DashboardCache:
         return first, namespace
 
     def _register_local_key(self, cache_key: str) -> None:
+        if cache_key in self._local_index_by_key:
+            return
         split = self._split_cache_key(cache_key)
         if not split:
             return
-        tenant_scope, namespace = split
-        idx_key = self._index_key(tenant_scope, namespace)
+        idx_key = self._index_key(*split)
         self._local_index[idx_key].add(cache_key)
+        self._local_index_by_key[cache_key] = idx_key
 
-    def _remove_local_key(self, cache_key: str) -> None:
-        self._local_cache.pop(cache_key, None)
-        dead_index_keys: list[str] = []
-        for idx_key, keys in self._local_index.items():
+    def _unregister_local_key(self, cache_key: str) -> None:
+        idx_key = self._local_index_by_key.pop(cache_key, None)
+        if idx_key is None:
+            return
+        keys = self._local_index.get(idx_key)
+        if keys is not None:
             keys.discard(cache_key)
             if not keys:
-                dead_index_keys.append(idx_key)
-        for idx_key in dead_index_keys:
-            self._local_index.pop(idx_key, None)
+                self._local_index.pop(idx_key, None)
+                self._local_invalidated_at.pop(idx_key, None)
+
+    def _remove_local_key(self, cache_key: str) -> None:
+        self._local_cache.pop(cache_key, None)
+        self._unregister_local_key(cache_key)
+
+    def _on_local_evict(self, cache_key: str, reason: str) -> None:
+        # Called by the store from inside set/pop, which always run under self._lock.
+        self._local_evictions[reason] += 1
+        self._unregister_local_key(cache_key)
+
+    def _record_lookup(self, cache_key: str, outcome: str) -> None:
+        split = self._split_cache_key(cache_key)
+        with self._lock:
+            self._local_lookups[split[1] if split else "_unscoped"][outcome] += 1
+
+    def local_stats(self) -> dict[str, object]:
+        """Size of the local tier, its namespace index, evictions and lookups per namespace since start."""
+        with self._lock:
+            return {
+                "size": len(self._local_cache),
+                "maxsize": self._local_cache.maxsize,
+                "indexed_keys": len(self._local_index_by_key),
+                "indexed_namespaces": len(self._local_index),
+                "evictions": dict(self._local_evictions),
+                "lookups": {namespace: dict(counts) for namespace, counts in self._local_lookups.items()},
+            }
 
     def _mark_redis_down(self, exc: Exception) -> None:
         if self._redis_enabled:
             logger.warning("Redis indisponivel durante operacao de cache. Fallback para memoria: %s", exc)
         self._redis_enabled = False
 
-    def get(self, cache_key: str) -> object | None:
+    def _encode_entry(self, entry: _CacheEntry) -> bytes:
+        return encode_payload(
+            [entry.value, entry.stored_at, entry.fresh_until],
+            codec=self._codec,
+            compress_min_bytes=self._compress_min_bytes,
+        )
+
+    @staticmethod
+    def _decode_entry(payload: bytes | str) -> _CacheEntry:
+        if is_framed(payload):
+            value, stored_at, fresh_until = decode_payload(payload)
+            return _CacheEntry(value, float(stored_at), float(fresh_until))
+        # Plain JSON written before the binary codec: the freshness envelope or, older still, the bare value.
+        data = json.loads(payload)
+        if isinstance(data, dict) and data.get(_ENVELOPE_MARKER) == 1:
+            return _CacheEntry(data["value"], float(data["stored_at"]), float(data["fresh_until"]))
+        return _CacheEntry(data, 0.0, math.inf)
+
+    def _read_entry(self, cache_key: str) -> tuple[_CacheEntry, float] | None:
+        """Returns the entry and the time its namespace was last invalidated (0 when never)."""
+        split = self._split_cache_key(cache_key)
         if self._redis_enabled and self._redis is not None:
             try:
-                payload = self._redis.get(self._data_key(cache_key))
+                pipe = self._redis.pipeline()
+                pipe.get(self._data_key(cache_key))
+                if self.serves_stale and split:
+                    pipe.get(self._invalidated_key(*split))
+                payload, *marker = pipe.execute()
                 if payload is not None:
-                    value = json.loads(payload)
+                    entry = self._decode_entry(payload)
+                    invalidated_at = float(marker[0]) if marker and marker[0] is not None else 0.0
                     with self._lock:
-                        self._local_cache[cache_key] = value
+                        self._local_cache[cache_key] = entry
                         self._register_local_key(cache_key)
-                    return value
+                        if invalidated_at and split:
+                            self._note_local_invalidation(self._index_key(*split), invalidated_at)
+                    return entry, invalidated_at
             except RedisError as exc:
                 self._mark_redis_down(exc)
-            except (json.JSONDecodeError, ValueError, TypeError) as exc:
+            except (json.JSONDecodeError, ValueError, TypeError, KeyError) as exc:
                 logger.warning("Payload de cache invalido para chave %s: %s", cache_key, exc)
                 try:
                     self._redis.delete(self._data_key(cache_key))
@@ -181,30 +310,89 @@ class DashboardCache:
                     self._mark_redis_down(exc if isinstance(exc, Exception) else Exception("cache_error"))
 
         with self._lock:
-            return self._local_cache.get(cache_key)
+            entry = self._local_cache.get(cache_key)
+            if entry is None:
+                return None
+            invalidated_at = self._local_invalidated_at.get(self._index_key(*split), 0.0) if split else 0.0
+            return entry, invalidated_at
+
+    def get(self, cache_key: str) -> object | None:
+        """Returns the value only while it is fresh: within its TTL and not invalidated since it was stored."""
+        found = self._read_entry(cache_key)
+        if found is None:
+            self._record_lookup(cache_key, "miss")
+            return None
+        entry, invalidated_at = found
+        if entry.fresh_until <= time.time() or entry.stored_at <= invalidated_at:
+            self._record_lookup(cache_key, "expired")
+            return None
+        self._record_lookup(cache_key, "hit")
+        return entry.value
+
+    def get_stale(self, cache_key: str) -> object | None:
+        """Returns the value even past its TTL or after invalidation, until the stale window runs out."""
+        found = self._read_entry(cache_key)
+        if found is None:
+            return None
+        self._record_lookup(cache_key, "stale_hit")
+        return found[0].value
 
     def set(self, cache_key: str, value: object, *, ttl: int | None = None) -> None:
         ttl_seconds = max(1, int(ttl or self._default_ttl))
+        now = time.time()
+        entry = _CacheEntry(value, now, now + ttl_seconds)
         with self._lock:
-            self._local_cache[cache_key] = value
+            self._local_cache[cache_key] = entry
             self._register_local_key(cache_key)
 
         if self._redis_enabled and self._redis is not None:
             try:
-                payload = json.dumps(value, ensure_ascii=False, default=str)
+                payload = self._encode_entry(entry)
+                hard_ttl_seconds = ttl_seconds + self._stale_ttl
                 split = self._split_cache_key(cache_key)
                 pipe = self._redis.pipeline()
-                pipe.set(self._data_key(cache_key), payload, ex=ttl_seconds)
+                pipe.set(self._data_key(cache_key), payload, ex=hard_ttl_seconds)
                 if split:
                     tenant_scope, namespace = split
                     idx_key = self._index_key(tenant_scope, namespace)
                     pipe.sadd(idx_key, self._data_key(cache_key))
-                    pipe.expire(idx_key, max(ttl_seconds * 2, ttl_seconds + 60))
+                    pipe.expire(idx_key, max(hard_ttl_seconds * 2, hard_ttl_seconds + 60))
                 pipe.execute()
             except RedisError as exc:
                 self._mark_redis_down(exc)
             except (TypeError, ValueError) as exc:
-                logger.warning("Falha ao serializar cache para chave %s. Mantendo somente cache local: %s", cache_key, exc)
+                logger.warning(
+                    "Falha ao serializar cache para chave %s. Mantendo somente cache local: %s", cache_key, exc
+                )
+
+    def acquire_refresh_lock(self, cache_key: str, *, ttl_seconds: int) -> str | None:
+        """Single-flight guard: returns a token when this caller should recompute ``cache_key``."""
+        ttl_seconds = max(1, int(ttl_seconds))
+        now = time.monotonic()
+        with self._lock:
+            if self._local_refresh_locks.get(cache_key, 0.0) > now:
+                return None
+            self._local_refresh_locks[cache_key] = now + ttl_seconds
+        token = uuid4().hex
+        if self._redis_enabled and self._redis is not None:
+            try:
+                if not self._redis.set(self._refresh_lock_key(cache_key), token, nx=True, ex=ttl_seconds):
+                    with self._lock:
+                        self._local_refresh_locks.pop(cache_key, None)
+                    return None
+            except RedisError as exc:
+                # Without Redis the in-process guard still keeps this worker to one recompute.
+                self._mark_redis_down(exc)
+        return token
+
+    def release_refresh_lock(self, cache_key: str, token: str) -> None:
+        with self._lock:
+            self._local_refresh_locks.pop(cache_key, None)
+        if self._redis_enabled and self._redis is not None:
+            try:
+                self._redis.eval(_RELEASE_REFRESH_LOCK_SCRIPT, 1, self._refresh_lock_key(cache_key), token)
+            except RedisError as exc:
+                self._mark_redis_down(exc)
 
     def delete(self, cache_key: str) -> None:
         with self._lock:
@@ -226,11 +414,15 @@ class DashboardCache:
     def invalidate_namespace(self, namespace: str, *, gym_id: UUID | None = None) -> None:
         tenant_scope = str(gym_id or get_current_gym_id() or "all")
         idx_key = self._index_key(tenant_scope, namespace)
+        if self.serves_stale:
+            self._mark_namespace_stale(tenant_scope, namespace)
+            return
 
         with self._lock:
             local_keys = self._local_index.pop(idx_key, set())
             for key in local_keys:
                 self._local_cache.pop(key, None)
+                self._local_index_by_key.pop(key, None)
 
         if self._redis_enabled and self._redis is not None:
             try:
@@ -243,6 +435,25 @@ class DashboardCache:
             except RedisError as exc:
                 self._mark_redis_down(exc)
 
+    def _note_local_invalidation(self, idx_key: str, invalidated_at: float) -> None:
+        # Entries stored later are newer than the marker, so an index without local entries needs none.
+        if idx_key in self._local_index:
+            self._local_invalidated_at[idx_key] = max(self._local_invalidated_at.get(idx_key, 0.0), invalidated_at)
+
+    def _mark_namespace_stale(self, tenant_scope: str, namespace: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._note_local_invalidation(self._index_key(tenant_scope, namespace), now)
+        if self._redis_enabled and self._redis is not None:
+            try:
+                self._redis.set(
+                    self._invalidated_key(tenant_scope, namespace),
+                    repr(now),
+                    ex=_INVALIDATION_MARKER_TTL_SECONDS,
+                )
+            except RedisError as exc:
+                self._mark_redis_down(exc)
+
     def invalidate_namespaces(self, namespaces: Iterable[str], *, gym_id: UUID | None = None) -> None:
         for namespace in set(namespaces):
             self.invalidate_namespace(namespace, gym_id=gym_id)
@@ -305,6 +516,9 @@ dashboard_cache = DashboardCache(
     maxsize=settings.dashboard_cache_maxsize,
     default_ttl=settings.dashboard_cache_ttl_seconds,
     redis_url=settings.redis_url,
+    stale_ttl=settings.dashboard_cache_stale_ttl_seconds if settings.dashboard_cache_swr_enabled else 0,
+    codec=settings.dashboard_cache_codec,
+    compress_min_bytes=settings.dashboard_cache_compress_min_bytes,
 )
 
 
@@ -0,0 +1,132 @@
+"""Wire format of dashboard cache entries stored in Redis.
+
+Every payload starts with a 4-byte header: magic byte, format version, codec id and compression id. The body is
+the codec-encoded ``[value, stored_at, fresh_until]`` triple, compressed when it is larger than the configured
+threshold. Payloads without the magic byte were written as plain JSON by older releases and are still readable.
+"""
+
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - zstd is optional, zlib is always available
+    zstandard = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xDC
+FORMAT_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+# zlib level 1 keeps compression well under a millisecond for dashboard-sized payloads.
+_ZLIB_LEVEL = 1
+_ZSTD_LEVEL = 3
+
+
+class CacheCodecError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CacheCodec:
+    codec_id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+
+_CODECS: dict[int, CacheCodec] = {1: CacheCodec(1, "json", _json_dumps, json.loads)}
+if orjson is not None:
+    # Datetimes and dataclasses go through default=str, as with the json codec, so both decode to the same values.
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _orjson_dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS)
+
+    _CODECS[2] = CacheCodec(2, "orjson", _orjson_dumps, orjson.loads)
+
+
+def available_codecs() -> dict[str, CacheCodec]:
+    return {codec.name: codec for codec in _CODECS.values()}
+
+
+def resolve_codec(name: str) -> CacheCodec:
+    codecs = available_codecs()
+    codec = codecs.get(name)
+    if codec is None:
+        fallback = codecs.get("orjson") or codecs["json"]
+        logger.warning("Codec de cache %s indisponivel. Usando %s.", name, fallback.name)
+        return fallback
+    return codec
+
+
+def default_compression() -> int:
+    return COMPRESSION_ZSTD if zstandard is not None else COMPRESSION_ZLIB
+
+
+def _compress(body: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(body)
+    return zlib.compress(body, _ZLIB_LEVEL)
+
+
+def _decompress(body: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return body
+    try:
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        if compression == COMPRESSION_ZSTD and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompress(body)
+    except Exception as exc:
+        raise CacheCodecError(f"payload de cache corrompido: {exc}") from exc
+    raise CacheCodecError(f"compressao de cache nao suportada: {compression}")
+
+
+def is_framed(payload: bytes | str) -> bool:
+    return isinstance(payload, (bytes, bytearray)) and len(payload) >= 4 and payload[0] == MAGIC
+
+
+def encode_payload(
+    value: Any,
+    *,
+    codec: CacheCodec,
+    compress_min_bytes: int,
+    compression: int | None = None,
+) -> bytes:
+    """Encodes ``value``; bodies of at least ``compress_min_bytes`` are compressed (0 disables compression)."""
+    body = codec.dumps(value)
+    used_compression = COMPRESSION_NONE
+    if compress_min_bytes > 0 and len(body) >= compress_min_bytes:
+        used_compression = default_compression() if compression is None else compression
+        body = _compress(body, used_compression)
+    return bytes((MAGIC, FORMAT_VERSION, codec.codec_id, used_compression)) + body
+
+
+def decode_payload(payload: bytes) -> Any:
+    if not is_framed(payload):
+        raise CacheCodecError("payload sem cabecalho de codec")
+    version, codec_id, compression = payload[1], payload[2], payload[3]
+    if version != FORMAT_VERSION:
+        raise CacheCodecError(f"versao de formato de cache desconhecida: {version}")
+    codec = _CODECS.get(codec_id)
+    if codec is None:
+        raise CacheCodecError(f"codec de cache desconhecido: {codec_id}")
+    return codec.loads(_decompress(payload[4:], compression))
@@ -1,53 +1,522 @@
-"""Circuit breaker for external API calls.
+"""Circuit breakers and bulkheads for external providers (Claude, OpenAI, WhatsApp, Kommo, Actuar).
 
-Protects AI services from cascading failures when Claude API is unavailable.
+Each provider has one named breaker (``get_breaker``). With REDIS_URL its state lives in Redis and is updated
+atomically by Lua scripts, so every API replica and the worker open, probe and close together; without Redis (or
+when it fails) the state is kept in this process only.
+
+- Closed: calls go through; successes and failures are counted in a sliding window of ``window_seconds`` (ten
+  buckets). Once the window holds ``minimum_calls`` calls and the failure rate reaches ``failure_rate_threshold``
+  the breaker opens.
+- Open: calls fail immediately with ``CircuitOpenError`` for ``recovery_timeout_seconds``.
+- Half-open: at most ``half_open_probes`` probe calls are let through across all processes; a successful probe
+  closes the breaker, a failed one opens it again. A probe that never reports back frees its token after another
+  ``recovery_timeout_seconds``.
+
+``guard`` also applies the provider's bulkhead: at most ``max_concurrent_calls`` calls in flight per process, so a
+slow provider cannot hold every worker thread. Callers over the cap wait ``CIRCUIT_BREAKER_BULKHEAD_WAIT_SECONDS``
+and then get ``BulkheadFullError``.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
 import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
+from threading import BoundedSemaphore, Lock
+from typing import Any
+
+from app.core.config import settings
+from app.core.redis_client import LazyRedis
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - fallback when redis is not installed
+    Redis = None  # type: ignore[assignment,misc]
+
+    class RedisError(Exception):
+        pass
+
 
 logger = logging.getLogger(__name__)
 
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+PROVIDERS = ("claude", "openai", "whatsapp", "kommo", "actuar")
+_KEY_PREFIX = "aigymos:circuit"
+_WINDOW_BUCKETS = 10
+_STATE_TTL_SECONDS = 86400
+_FAILURE_STATUS_CODES = frozenset({408, 425, 429})
+
+# Returns {state, allowed}. With ARGV[1] == "1" a half-open probe token is taken; otherwise nothing is written.
+_ALLOW_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local consume = ARGV[1] == "1"
+local max_probes = tonumber(ARGV[2])
+local probe_timeout = tonumber(ARGV[3])
+local fields = redis.call("HMGET", KEYS[1], "state", "opened_until", "probes", "probe_deadline")
+local state = fields[1] or "closed"
+if state == "closed" then
+    return {"closed", 1}
+end
+if state == "open" and now < (tonumber(fields[2]) or 0) then
+    return {"open", 0}
+end
+local probes = tonumber(fields[3]) or 0
+if state == "open" or now >= (tonumber(fields[4]) or 0) then
+    probes = 0
+    if consume then
+        redis.call("HSET", KEYS[1], "state", "half_open", "probes", 0, "probe_deadline", tostring(now + probe_timeout))
+    end
+end
+if probes >= max_probes then
+    return {"half_open", 0}
+end
+if consume then
+    redis.call("HSET", KEYS[1], "probes", probes + 1)
+    redis.call("EXPIRE", KEYS[1], tonumber(ARGV[4]))
+end
+return {"half_open", 1}
+"""
+
+# Returns {state, changed, calls, failures} after counting one outcome (ARGV[1] == "1" for a failure).
+_RECORD_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local failed = ARGV[1] == "1"
+local failure_rate = tonumber(ARGV[2])
+local minimum_calls = tonumber(ARGV[3])
+local window_seconds = tonumber(ARGV[4])
+local bucket_seconds = tonumber(ARGV[5])
+local recovery_seconds = tonumber(ARGV[6])
+local ttl = tonumber(ARGV[7])
+local fields = redis.call("HMGET", KEYS[1], "state", "opened_until")
+local state = fields[1] or "closed"
+if state == "open" and now < (tonumber(fields[2]) or 0) then
+    return {"open", 0, 0, 0}
+end
+if state ~= "closed" then
+    redis.call("DEL", KEYS[2])
+    if failed then
+        redis.call("HSET", KEYS[1], "state", "open", "opened_until", tostring(now + recovery_seconds), "probes", 0)
+        redis.call("EXPIRE", KEYS[1], ttl)
+        return {"open", 1, 0, 0}
+    end
+    redis.call("DEL", KEYS[1])
+    return {"closed", 1, 0, 0}
+end
+local bucket = math.floor(now / bucket_seconds)
+redis.call("HINCRBY", KEYS[2], "c:" .. bucket, 1)
+if failed then
+    redis.call("HINCRBY", KEYS[2], "f:" .. bucket, 1)
+end
+redis.call("EXPIRE", KEYS[2], math.ceil(window_seconds + bucket_seconds))
+local oldest = bucket - math.ceil(window_seconds / bucket_seconds) + 1
+local entries = redis.call("HGETALL", KEYS[2])
+local calls = 0
+local failures = 0
+for i = 1, #entries, 2 do
+    local name = entries[i]
+    if tonumber(string.sub(name, 3)) < oldest then
+        redis.call("HDEL", KEYS[2], name)
+    elseif string.sub(name, 1, 1) == "c" then
+        calls = calls + tonumber(entries[i + 1])
+    else
+        failures = failures + tonumber(entries[i + 1])
+    end
+end
+if failed and calls >= minimum_calls and failures >= calls * failure_rate then
+    redis.call("DEL", KEYS[2])
+    redis.call("HSET", KEYS[1], "state", "open", "opened_until", tostring(now + recovery_seconds), "probes", 0)
+    redis.call("EXPIRE", KEYS[1], ttl)
+    return {"open", 1, calls, failures}
+end
+return {"closed", 0, calls, failures}
+"""
+
+_lazy_redis = LazyRedis("Circuit breaker: falha ao conectar no Redis; usando estado local do processo.")
+
+
+def _get_redis() -> "Redis | None":
+    return _lazy_redis.get()
+
+
+def _now() -> float:
+    return time.time()
+
+
+class ProviderUnavailableError(RuntimeError):
+    """The call was refused before reaching the provider."""
+
+    def __init__(self, provider: str, message: str) -> None:
+        super().__init__(message)
+        self.provider = provider
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    def __init__(self, provider: str) -> None:
+        super().__init__(provider, f"Circuit breaker '{provider}' aberto; provedor indisponivel no momento.")
+
+
+class BulkheadFullError(ProviderUnavailableError):
+    def __init__(self, provider: str) -> None:
+        super().__init__(provider, f"Limite de chamadas simultaneas para '{provider}' atingido.")
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the provider is unhealthy; client errors (4xx other than timeouts/429) do not count."""
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500 or status_code in _FAILURE_STATUS_CODES
+    return True
+
 
 @dataclass
+class _LocalState:
+    state: str = STATE_CLOSED
+    opened_until: float = 0.0
+    probes: int = 0
+    probe_deadline: float = 0.0
+    buckets: dict[int, list[int]] = field(default_factory=dict)
+
+
+class _GuardedCall:
+    """Handle yielded by ``CircuitBreaker.guard``; ``fail()`` counts a call that returned an error response."""
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
 class CircuitBreaker:
-    """Circuit breaker simples para proteger chamadas a APIs externas."""
-    name: str
-    failure_threshold: int = 5
-    recovery_timeout_seconds: int = 60
-    _failure_count: int = field(default=0, init=False)
-    _last_failure_time: float = field(default=0.0, init=False)
-    _state: str = field(default="closed", init=False)  # closed, open, half_open
+    """Sliding-window circuit breaker shared through Redis, with a per-process bulkhead."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate_threshold: float | None = None,
+        minimum_calls: int | None = None,
+        window_seconds: float | None = None,
+        recovery_timeout_seconds: float | None = None,
+        half_open_probes: int | None = None,
+        max_concurrent_calls: int | None = None,
+        redis_client: "Redis | None" = None,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = min(
+            max(float(failure_rate_threshold or settings.circuit_breaker_failure_rate_threshold), 0.01), 1.0
+        )
+        self.minimum_calls = max(int(minimum_calls or settings.circuit_breaker_minimum_calls), 1)
+        self.window_seconds = max(float(window_seconds or settings.circuit_breaker_window_seconds), 1.0)
+        self.bucket_seconds = max(self.window_seconds / _WINDOW_BUCKETS, 1.0)
+        self.recovery_timeout_seconds = max(
+            float(recovery_timeout_seconds or settings.circuit_breaker_recovery_seconds), 1.0
+        )
+        self.half_open_probes = max(int(half_open_probes or settings.circuit_breaker_half_open_probes), 1)
+        self.max_concurrent_calls = max(int(max_concurrent_calls or 0), 0)
+        self._bulkhead = BoundedSemaphore(self.max_concurrent_calls) if self.max_concurrent_calls else None
+        self._redis = redis_client
+        self._lock = Lock()
+        self._local = _LocalState()
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def _state_key(self) -> str:
+        return f"{_KEY_PREFIX}:{self.name}"
+
+    @property
+    def _window_key(self) -> str:
+        return f"{_KEY_PREFIX}:{self.name}:window"
+
+    def _client(self) -> "Redis | None":
+        return self._redis if self._redis is not None else _get_redis()
 
     def is_open(self) -> bool:
-        if self._state == "open":
-            if time.time() - self._last_failure_time >= self.recovery_timeout_seconds:
-                self._state = "half_open"
-                return False
-            return True
-        return False
+        """True while calls would be refused; never takes a half-open probe token."""
+        return not self._allow(consume=False)[1]
+
+    def allow_request(self) -> bool:
+        """True if a call may go out now; in half-open this takes one of the shared probe tokens."""
+        return self._allow(consume=True)[1]
+
+    def state(self) -> str:
+        return self._allow(consume=False)[0]
 
     def record_success(self) -> None:
-        self._failure_count = 0
-        self._state = "closed"
+        self._record(failed=False)
 
     def record_failure(self) -> None:
-        self._failure_count += 1
-        self._last_failure_time = time.time()
-        if self._failure_count >= self.failure_threshold:
-            self._state = "open"
+        self._record(failed=True)
+
+    @contextmanager
+    def guard(self, *, is_failure: Callable[[BaseException], bool] = is_provider_failure) -> Iterator[_GuardedCall]:
+        """Runs one provider call under the bulkhead and the breaker, recording how it ended.
+
+        Raises ``BulkheadFullError`` or ``CircuitOpenError`` without calling the provider. Exceptions for which
+        ``is_failure`` is false (e.g. a 400 reply) count as successes: the provider answered.
+        """
+        call = self._begin(wait_seconds=max(float(settings.circuit_breaker_bulkhead_wait_seconds), 0.0))
+        try:
+            yield call
+        except BaseException as exc:
+            call.failed = call.failed or is_failure(exc)
+            raise
+        finally:
+            self._finish(call)
+
+    @asynccontextmanager
+    async def guard_async(
+        self, *, is_failure: Callable[[BaseException], bool] = is_provider_failure
+    ) -> AsyncIterator[_GuardedCall]:
+        """``guard`` for coroutines; a full bulkhead is refused at once.
+
+        The breaker's Redis round trips run in a worker thread, never on the event loop. If the caller is cancelled
+        while the slot is being taken, the slot is handed back once the thread finishes.
+        """
+        begin = asyncio.ensure_future(asyncio.to_thread(self._begin, wait_seconds=0.0))
+        try:
+            call = await asyncio.shield(begin)
+        except asyncio.CancelledError:
+            begin.add_done_callback(self._release_abandoned)
+            raise
+        try:
+            yield call
+        except BaseException as exc:
+            call.failed = call.failed or is_failure(exc)
+            raise
+        finally:
+            await asyncio.to_thread(self._finish, call)
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self.guard():
+            return func(*args, **kwargs)
+
+    def snapshot(self) -> dict[str, Any]:
+        calls, failures, backend = self._window_totals()
+        with self._lock:
+            in_flight, rejected = self._in_flight, self._rejected
+        return {
+            "state": self.state(),
+            "backend": backend,
+            "window_calls": calls,
+            "window_failures": failures,
+            "failure_rate": round(failures / calls, 3) if calls else 0.0,
+            "in_flight": in_flight,
+            "max_concurrent_calls": self.max_concurrent_calls or None,
+            "rejected": rejected,
+        }
+
+    def _count_rejection(self) -> None:
+        with self._lock:
+            self._rejected += 1
+
+    def _begin(self, *, wait_seconds: float) -> _GuardedCall:
+        if self._bulkhead is not None and not self._bulkhead.acquire(timeout=wait_seconds):
+            self._count_rejection()
+            raise BulkheadFullError(self.name)
+        if not self.allow_request():
+            if self._bulkhead is not None:
+                self._bulkhead.release()
+            self._count_rejection()
+            raise CircuitOpenError(self.name)
+        with self._lock:
+            self._in_flight += 1
+        return _GuardedCall()
+
+    def _release_abandoned(self, begin: "asyncio.Future[_GuardedCall]") -> None:
+        if begin.cancelled() or begin.exception() is not None:
+            return
+        with self._lock:
+            self._in_flight -= 1
+        if self._bulkhead is not None:
+            self._bulkhead.release()
+
+    def _finish(self, call: _GuardedCall) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        if self._bulkhead is not None:
+            self._bulkhead.release()
+        self._record(failed=call.failed)
+
+    def _allow(self, *, consume: bool) -> tuple[str, bool]:
+        client = self._client()
+        if client is not None:
+            try:
+                state, allowed = client.eval(
+                    _ALLOW_SCRIPT,
+                    1,
+                    self._state_key,
+                    "1" if consume else "0",
+                    self.half_open_probes,
+                    self.recovery_timeout_seconds,
+                    _STATE_TTL_SECONDS,
+                )
+                return str(state), bool(int(allowed))
+            except RedisError:
+                self._log_redis_unavailable()
+        return self._allow_local(consume=consume)
+
+    def _allow_local(self, *, consume: bool) -> tuple[str, bool]:
+        now = _now()
+        with self._lock:
+            local = self._local
+            if local.state == STATE_CLOSED:
+                return STATE_CLOSED, True
+            if local.state == STATE_OPEN and now < local.opened_until:
+                return STATE_OPEN, False
+            probes = local.probes
+            if local.state == STATE_OPEN or now >= local.probe_deadline:
+                probes = 0
+                if consume:
+                    local.state = STATE_HALF_OPEN
+                    local.probe_deadline = now + self.recovery_timeout_seconds
+            if probes >= self.half_open_probes:
+                return STATE_HALF_OPEN, False
+            if consume:
+                local.probes = probes + 1
+            return STATE_HALF_OPEN, True
+
+    def _record(self, *, failed: bool) -> None:
+        client = self._client()
+        if client is not None:
+            try:
+                state, changed, calls, failures = client.eval(
+                    _RECORD_SCRIPT,
+                    2,
+                    self._state_key,
+                    self._window_key,
+                    "1" if failed else "0",
+                    self.failure_rate_threshold,
+                    self.minimum_calls,
+                    self.window_seconds,
+                    self.bucket_seconds,
+                    self.recovery_timeout_seconds,
+                    _STATE_TTL_SECONDS,
+                )
+                self._log_transition(str(state), bool(int(changed)), int(calls), int(failures))
+                return
+            except RedisError:
+                self._log_redis_unavailable()
+        self._log_transition(*self._record_local(failed=failed))
+
+    def _record_local(self, *, failed: bool) -> tuple[str, bool, int, int]:
+        now = _now()
+        with self._lock:
+            local = self._local
+            if local.state == STATE_OPEN and now < local.opened_until:
+                return STATE_OPEN, False, 0, 0
+            if local.state != STATE_CLOSED:
+                if failed:
+                    self._local = _LocalState(state=STATE_OPEN, opened_until=now + self.recovery_timeout_seconds)
+                    return STATE_OPEN, True, 0, 0
+                self._local = _LocalState()
+                return STATE_CLOSED, True, 0, 0
+            bucket = math.floor(now / self.bucket_seconds)
+            counts = local.buckets.setdefault(bucket, [0, 0])
+            counts[0] += 1
+            counts[1] += int(failed)
+            calls, failures = self._prune_local(bucket)
+            if failed and calls >= self.minimum_calls and failures >= calls * self.failure_rate_threshold:
+                self._local = _LocalState(state=STATE_OPEN, opened_until=now + self.recovery_timeout_seconds)
+                return STATE_OPEN, True, calls, failures
+            return STATE_CLOSED, False, calls, failures
+
+    def _oldest_bucket(self, bucket: int) -> int:
+        return bucket - math.ceil(self.window_seconds / self.bucket_seconds) + 1
+
+    def _prune_local(self, bucket: int) -> tuple[int, int]:
+        oldest = self._oldest_bucket(bucket)
+        buckets = self._local.buckets
+        for stale in [key for key in buckets if key < oldest]:
+            del buckets[stale]
+        return sum(counts[0] for counts in buckets.values()), sum(counts[1] for counts in buckets.values())
+
+    def _window_totals(self) -> tuple[int, int, str]:
+        client = self._client()
+        if client is not None:
+            try:
+                seconds, _micros = client.time()
+                oldest = self._oldest_bucket(math.floor(int(seconds) / self.bucket_seconds))
+                calls = failures = 0
+                for name, value in client.hgetall(self._window_key).items():
+                    if int(name[2:]) < oldest:
+                        continue
+                    if name.startswith("c:"):
+                        calls += int(value)
+                    else:
+                        failures += int(value)
+                return calls, failures, "redis"
+            except RedisError:
+                self._log_redis_unavailable()
+        with self._lock:
+            calls, failures = self._prune_local(math.floor(_now() / self.bucket_seconds))
+        return calls, failures, "local"
+
+    def _log_redis_unavailable(self) -> None:
+        logger.warning("Circuit breaker '%s': Redis indisponivel, usando estado local.", self.name, exc_info=True)
+
+    def _log_transition(self, state: str, changed: bool, calls: int, failures: int) -> None:
+        if not changed:
+            return
+        if state == STATE_OPEN:
             logger.warning(
-                "Circuit breaker '%s' ABERTO apos %d falhas",
+                "Circuit breaker '%s' ABERTO por %ss (%d de %d chamadas falharam na janela)",
                 self.name,
-                self._failure_count,
+                int(self.recovery_timeout_seconds),
+                failures,
+                calls,
             )
+        else:
+            logger.info("Circuit breaker '%s' FECHADO apos chamada de teste bem-sucedida", self.name)
+
+
+_registry: dict[str, CircuitBreaker] = {}
+_registry_lock = Lock()
+
+
+def _bulkhead_limits() -> dict[str, int]:
+    limits: dict[str, int] = {}
+    for item in (settings.circuit_breaker_bulkhead_limits or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value.strip())
+    return limits
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for provider ``name``, created with the settings on first use."""
+    with _registry_lock:
+        breaker = _registry.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, max_concurrent_calls=_bulkhead_limits().get(name))
+            _registry[name] = breaker
+        return breaker
+
+
+def circuit_breaker_states() -> dict[str, dict[str, Any]]:
+    names = sorted(set(PROVIDERS) | set(_registry))
+    return {name: get_breaker(name).snapshot() for name in names}
+
+
+def reset_circuit_breakers() -> None:
+    """Clears the local state of every breaker (tests); Redis state is left alone."""
+    with _registry_lock:
+        for breaker in _registry.values():
+            with breaker._lock:
+                breaker._local = _LocalState()
+                breaker._rejected = 0
 
 
 # Instancia global para Claude API
-claude_circuit_breaker = CircuitBreaker(
-    name="claude_api",
-    failure_threshold=5,
-    recovery_timeout_seconds=120,
-)
+claude_circuit_breaker = get_breaker("claude")
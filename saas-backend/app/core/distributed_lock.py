@@ -4,12 +4,17 @@ Prevents duplicate job execution when multiple backend instances are running
 (e.g. Railway auto-scaling). When REDIS_URL is configured, Redis is treated as
 mandatory for scheduler safety: lock acquisition failures skip the job instead
 of running duplicate side effects.
+
+Per-gym fan-out jobs also take one lease per gym and may be hash-sharded across
+several worker replicas (SCHEDULER_SHARD_COUNT / SCHEDULER_SHARD_INDEX).
 """
 
 import functools
+import hashlib
 import logging
 import uuid
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from typing import Any
 
 from app.core.config import settings
@@ -22,6 +27,13 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 _KEY_PREFIX = "aigymos:scheduler-lock"
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
 
 _redis_client: "Redis | None" = None
 _redis_checked = False
@@ -73,10 +85,139 @@ def _redis_lock_required() -> bool:
     return bool(settings.redis_url)
 
 
+def scheduler_shard_lock_name(lock_name: str) -> str:
+    """Suffixes the lock with this replica's shard so each shard runs its own slice of gyms."""
+    shard_count = max(int(settings.scheduler_shard_count), 1)
+    if shard_count <= 1:
+        return lock_name
+    return f"{lock_name}:shard-{int(settings.scheduler_shard_index) % shard_count}-of-{shard_count}"
+
+
+def gym_belongs_to_shard(gym_id: Any) -> bool:
+    """Stable hash-sharding of gyms across worker replicas (SCHEDULER_SHARD_COUNT/INDEX)."""
+    shard_count = max(int(settings.scheduler_shard_count), 1)
+    if shard_count <= 1:
+        return True
+    digest = hashlib.sha1(str(gym_id).encode("utf-8"), usedforsecurity=False).hexdigest()
+    return int(digest, 16) % shard_count == int(settings.scheduler_shard_index) % shard_count
+
+
+def gym_lease_name(lock_name: str, gym_id: Any) -> str:
+    return f"{lock_name}:gym:{gym_id}"
+
+
+@contextmanager
+def hold_distributed_lock(
+    lock_name: str,
+    ttl_seconds: int = 1800,
+    fail_open: bool | Callable[[], bool] = True,
+) -> Iterator[bool]:
+    """Context manager form of the scheduler lock; yields whether the guarded work may run."""
+    resolved_fail_open = fail_open() if callable(fail_open) else fail_open
+    redis = _get_redis()
+    if redis is None:
+        if not resolved_fail_open:
+            _log_lock_event(
+                logging.WARNING,
+                "Distributed lock unavailable; skipping execution.",
+                event="job_skipped_lock_unavailable",
+                lock_name=lock_name,
+                ttl_seconds=ttl_seconds,
+                status="skipped_lock_unavailable",
+                fail_open=resolved_fail_open,
+            )
+            yield False
+            return
+        _log_lock_event(
+            logging.WARNING,
+            "Distributed lock unavailable; running without lock.",
+            event="lock_unavailable",
+            lock_name=lock_name,
+            ttl_seconds=ttl_seconds,
+            status="unavailable",
+            fail_open=resolved_fail_open,
+        )
+        yield True
+        return
+
+    lock_key = f"{_KEY_PREFIX}:{lock_name}"
+    lock_value = str(uuid.uuid4())
+
+    try:
+        acquired = redis.set(lock_key, lock_value, nx=True, ex=ttl_seconds)
+    except Exception:
+        _log_lock_event(
+            logging.ERROR,
+            "Distributed lock acquire failed; running without lock.",
+            event="lock_acquire_failed",
+            lock_name=lock_name,
+            ttl_seconds=ttl_seconds,
+            status="degraded",
+            fail_open=resolved_fail_open,
+            exc_info=True,
+        )
+        if not resolved_fail_open:
+            _log_lock_event(
+                logging.WARNING,
+                "Distributed lock acquire failed; skipping execution.",
+                event="job_skipped_lock_unavailable",
+                lock_name=lock_name,
+                ttl_seconds=ttl_seconds,
+                status="skipped_lock_unavailable",
+                fail_open=resolved_fail_open,
+            )
+            yield False
+            return
+        yield True
+        return
+
+    if not acquired:
+        _log_lock_event(
+            logging.INFO,
+            "Distributed lock already held; skipping execution.",
+            event="job_skipped_lock",
+            lock_name=lock_name,
+            ttl_seconds=ttl_seconds,
+            status="skipped_lock",
+            fail_open=resolved_fail_open,
+        )
+        yield False
+        return
+
+    _log_lock_event(
+        logging.INFO,
+        "Distributed lock acquired.",
+        event="lock_acquired",
+        lock_name=lock_name,
+        ttl_seconds=ttl_seconds,
+        status="acquired",
+        fail_open=resolved_fail_open,
+    )
+    try:
+        yield True
+    finally:
+        try:
+            # Only release if we still own the lock (compare-and-delete via Lua)
+            redis.eval(_RELEASE_SCRIPT, 1, lock_key, lock_value)
+        except Exception:
+            _log_lock_event(
+                logging.ERROR,
+                "Distributed lock release failed; lock will auto-expire.",
+                event="lock_release_failed",
+                lock_name=lock_name,
+                ttl_seconds=ttl_seconds,
+                status="release_failed",
+                fail_open=resolved_fail_open,
+                exc_info=True,
+            )
+
+
 def with_distributed_lock(
     lock_name: str,
     ttl_seconds: int = 1800,
     fail_open: bool | Callable[[], bool] = True,
+    *,
+    sharded: bool = False,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """Decorator that acquires a Redis lock before running a job.
 
@@ -84,110 +225,17 @@ def with_distributed_lock(
         lock_name: Unique identifier for this job's lock.
         ttl_seconds: Max time the lock is held (auto-expires as safety net).
                      Default 30 minutes — long enough for most jobs.
+        sharded: Lock per scheduler shard, for jobs that only touch this replica's gyms.
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            resolved_fail_open = fail_open() if callable(fail_open) else fail_open
-            redis = _get_redis()
-            if redis is None:
-                if not resolved_fail_open:
-                    _log_lock_event(
-                        logging.WARNING,
-                        "Distributed lock unavailable; skipping execution.",
-                        event="job_skipped_lock_unavailable",
-                        lock_name=lock_name,
-                        ttl_seconds=ttl_seconds,
-                        status="skipped_lock_unavailable",
-                        fail_open=resolved_fail_open,
-                    )
+            resolved_lock_name = scheduler_shard_lock_name(lock_name) if sharded else lock_name
+            with hold_distributed_lock(resolved_lock_name, ttl_seconds, fail_open) as acquired:
+                if not acquired:
                     return None
-                _log_lock_event(
-                    logging.WARNING,
-                    "Distributed lock unavailable; running without lock.",
-                    event="lock_unavailable",
-                    lock_name=lock_name,
-                    ttl_seconds=ttl_seconds,
-                    status="unavailable",
-                    fail_open=resolved_fail_open,
-                )
-                return func(*args, **kwargs)
-
-            lock_key = f"{_KEY_PREFIX}:{lock_name}"
-            lock_value = str(uuid.uuid4())
-
-            try:
-                acquired = redis.set(lock_key, lock_value, nx=True, ex=ttl_seconds)
-            except Exception:
-                _log_lock_event(
-                    logging.ERROR,
-                    "Distributed lock acquire failed; running without lock.",
-                    event="lock_acquire_failed",
-                    lock_name=lock_name,
-                    ttl_seconds=ttl_seconds,
-                    status="degraded",
-                    fail_open=resolved_fail_open,
-                    exc_info=True,
-                )
-                if not resolved_fail_open:
-                    _log_lock_event(
-                        logging.WARNING,
-                        "Distributed lock acquire failed; skipping execution.",
-                        event="job_skipped_lock_unavailable",
-                        lock_name=lock_name,
-                        ttl_seconds=ttl_seconds,
-                        status="skipped_lock_unavailable",
-                        fail_open=resolved_fail_open,
-                    )
-                    return None
-                return func(*args, **kwargs)
-
-            if not acquired:
-                _log_lock_event(
-                    logging.INFO,
-                    "Distributed lock already held; skipping execution.",
-                    event="job_skipped_lock",
-                    lock_name=lock_name,
-                    ttl_seconds=ttl_seconds,
-                    status="skipped_lock",
-                    fail_open=resolved_fail_open,
-                )
-                return None
-
-            _log_lock_event(
-                logging.INFO,
-                "Distributed lock acquired.",
-                event="lock_acquired",
-                lock_name=lock_name,
-                ttl_seconds=ttl_seconds,
-                status="acquired",
-                fail_open=resolved_fail_open,
-            )
-            try:
                 return func(*args, **kwargs)
-            finally:
-                try:
-                    # Only release if we still own the lock (compare-and-delete via Lua)
-                    _release_script = """
-                    if redis.call("get", KEYS[1]) == ARGV[1] then
-                        return redis.call("del", KEYS[1])
-                    else
-                        return 0
-                    end
-                    """
-                    redis.eval(_release_script, 1, lock_key, lock_value)
-                except Exception:
-                    _log_lock_event(
-                        logging.ERROR,
-                        "Distributed lock release failed; lock will auto-expire.",
-                        event="lock_release_failed",
-                        lock_name=lock_name,
-                        ttl_seconds=ttl_seconds,
-                        status="release_failed",
-                        fail_open=resolved_fail_open,
-                        exc_info=True,
-                    )
 
         return wrapper
 
@@ -0,0 +1,65 @@
+"""Lazily connected Redis client for hot-path modules that fall back to process-local state.
+
+``LazyRedis`` connects on first use with short socket timeouts. While REDIS_URL is set and no client exists it tries
+again at most every ``retry_seconds``, so a Redis outage at start-up does not pin the process to local state until
+restart, and a Redis that stays down does not add a connect attempt to every call.
+"""
+
+import logging
+import time
+from threading import Lock
+
+from app.core.config import settings
+
+try:
+    from redis import Redis
+except Exception:  # pragma: no cover - fallback when redis is not installed
+    Redis = None  # type: ignore[assignment,misc]
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+REDIS_RETRY_SECONDS = 30.0
+
+
+class LazyRedis:
+    def __init__(self, failure_message: str, *, retry_seconds: float = REDIS_RETRY_SECONDS) -> None:
+        self.failure_message = failure_message
+        self.retry_seconds = retry_seconds
+        self._client: "Redis | None" = None
+        self._checked = False
+        self._retry_at = 0.0
+        self._lock = Lock()
+
+    def get(self) -> "Redis | None":
+        if self._checked and (self._client is not None or not settings.redis_url):
+            return self._client
+        with self._lock:
+            if self._client is not None:
+                return self._client
+            if self._checked and time.monotonic() < self._retry_at:
+                return None
+            self._checked = True
+            if not settings.redis_url or Redis is None:
+                return None
+            try:
+                client = Redis.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+                )
+                client.ping()
+                self._client = client
+            except Exception:
+                logger.exception(self.failure_message)
+                self._retry_at = time.monotonic() + self.retry_seconds
+            return self._client
+
+    def reset(self) -> None:
+        """Forgets the client so the next ``get`` connects again (tests)."""
+        with self._lock:
+            self._client = None
+            self._checked = False
+            self._retry_at = 0.0
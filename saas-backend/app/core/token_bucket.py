@@ -0,0 +1,96 @@
+"""Token-bucket rate limiter shared through Redis, with an in-process fallback.
+
+Each key holds up to ``capacity`` tokens, refilled continuously at ``capacity / period_seconds`` per second; a call
+takes one token or is refused. With REDIS_URL the bucket state is updated atomically by a Lua script, so every worker
+replica sees the same budget; without Redis (or when it fails) the bucket lives in this process only.
+"""
+
+import logging
+import time
+from threading import Lock
+
+from cachetools import TTLCache
+
+from app.core.redis_client import LazyRedis
+
+try:
+    from redis import Redis
+    from redis.exceptions import RedisError
+except Exception:  # pragma: no cover - fallback when redis is not installed
+    Redis = None  # type: ignore[assignment,misc]
+
+    class RedisError(Exception):
+        pass
+
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "aigymos:token-bucket"
+_LOCAL_MAXSIZE = 50_000
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_second = tonumber(ARGV[2])
+local ttl_seconds = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("EXPIRE", KEYS[1], ttl_seconds)
+return allowed
+"""
+
+_lazy_redis = LazyRedis("Token bucket: falha ao conectar no Redis; usando limite local do processo.")
+
+
+def _get_redis() -> "Redis | None":
+    return _lazy_redis.get()
+
+
+class TokenBucket:
+    """Allows ``capacity`` takes per key every ``period_seconds``, with bursts up to ``capacity``."""
+
+    def __init__(self, name: str, *, capacity: int, period_seconds: float, redis_client: "Redis | None" = None) -> None:
+        self.name = name
+        self.capacity = max(int(capacity), 1)
+        self.period_seconds = max(float(period_seconds), 1.0)
+        self.refill_per_second = self.capacity / self.period_seconds
+        self._redis = redis_client
+        self._lock = Lock()
+        # A full bucket needs no state, so entries can expire once they would have refilled completely.
+        self._local: TTLCache = TTLCache(maxsize=_LOCAL_MAXSIZE, ttl=self.period_seconds)
+
+    def try_acquire(self, key: str) -> bool:
+        client = self._redis if self._redis is not None else _get_redis()
+        if client is not None:
+            try:
+                allowed = client.eval(
+                    _TAKE_SCRIPT,
+                    1,
+                    f"{_KEY_PREFIX}:{self.name}:{key}",
+                    self.capacity,
+                    self.refill_per_second,
+                    int(self.period_seconds) + 1,
+                )
+                return bool(int(allowed))
+            except RedisError:
+                logger.warning("Token bucket '%s': Redis indisponivel, usando limite local.", self.name, exc_info=True)
+        return self._try_acquire_local(key)
+
+    def _try_acquire_local(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._local.get(key, (float(self.capacity), now))
+            tokens = min(float(self.capacity), tokens + max(now - last, 0.0) * self.refill_per_second)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._local[key] = (tokens, now)
+        return allowed
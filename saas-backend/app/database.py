@@ -2,15 +2,20 @@ import logging
 from collections.abc import Generator
 from contextlib import contextmanager
 from contextvars import ContextVar
+from threading import Lock
 from uuid import UUID
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import bindparam, create_engine, event
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Session, sessionmaker, with_loader_criteria
+from sqlalchemy.sql import visitors
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 from app.models import (
+    AITriageDirtyMember,
+    AITriageSyncState,
     ActuarBridgeDevice,
     ActuarMemberLink,
     ActuarSyncAttempt,
@@ -46,7 +51,10 @@ from app.models import (
     MemberConstraints,
     MemberGoal,
     MemberRiskHistory,
+    MemberRiskSchedule,
     MessageLog,
+    MonthlyReportArtifact,
+    MonthlyReportDelivery,
     MovementVideoReview,
     NPSResponse,
     NurturingSequence,
@@ -55,6 +63,7 @@ from app.models import (
     RiskRecalculationRequest,
     Task,
     TrainingPlan,
+    WorkQueueIndexItem,
     User,
 )
 from app.models.base import Base as Base
@@ -83,14 +92,19 @@ ALLOWED_INCLUDE_ALL_TENANTS_REASON_PREFIXES = (
     "auth.",
     "core_async_jobs.",
     "dependencies.",
+    "exports.",
     "kommo.",
     "kommo_settings.",
     "member_intelligence.",
+    "member_search.",
     "member_service.",
+    "monthly_reports.",
+    "nps_sentiment.",
     "nurturing.",
     "public_reports.",
     "risk_recalculation.",
     "tenant_guard.",
+    "whatsapp_outbound.",
 )
 
 ALLOWED_UNSCOPED_TENANT_REASONS = frozenset(
@@ -146,7 +160,6 @@ TENANT_SCOPED_MODELS = (
     AutomationJourneyEnrollment,
     AutomationJourneyEvent,
     AutomationRule,
-    AutomationExecutionLog,
     BodyCompositionEvaluation,
     MessageLog,
     MovementVideoReview,
@@ -162,11 +175,16 @@ TENANT_SCOPED_MODELS = (
     FinancialEntry,
     CoreAsyncJob,
     TrainingPlan,
-    BodyCompositionEvaluation,
     BodyCompositionSyncAttempt,
-    ObjectionResponse,
+    WorkQueueIndexItem,
+    AITriageDirtyMember,
+    AITriageSyncState,
+    MemberRiskSchedule,
+    MonthlyReportArtifact,
+    MonthlyReportDelivery,
 )
 _TENANT_SCOPED_TABLE_NAMES = frozenset(m.__tablename__ for m in TENANT_SCOPED_MODELS)
+_TENANT_WILDCARD_PATH = "*"
 
 
 def set_current_gym_id(gym_id: UUID | None) -> None:
@@ -221,6 +239,98 @@ def include_all_tenants(statement, *, reason: str):
     return statement.execution_options(include_all_tenants=True, tenant_bypass_reason=normalized_reason)
 
 
+def _tenant_criteria_gym_id() -> UUID:
+    # Resolved when parameters are built for execution, so one compiled
+    # statement serves every gym (and the default-deny case) from the cache.
+    return get_current_gym_id() or _DENY_GYM_ID
+
+
+_TENANT_GYM_ID_PARAM = bindparam("tenant_scope_gym_id", type_=PGUUID(as_uuid=True), callable_=_tenant_criteria_gym_id)
+
+
+def _build_tenant_criterion(model):  # type: ignore[no-untyped-def]
+    return with_loader_criteria(
+        model,
+        lambda cls: cls.gym_id == _TENANT_GYM_ID_PARAM,
+        include_aliases=True,
+    )
+
+
+_TENANT_CRITERIA_BY_TABLE = {model.__tablename__: _build_tenant_criterion(model) for model in TENANT_SCOPED_MODELS}
+_tenant_criteria_cache: dict[frozenset[str], tuple] = {}
+_tenant_criteria_stats = {"hits": 0, "misses": 0}
+_tenant_criteria_lock = Lock()
+
+
+def _collect_loader_option_tables(statement, table_names: set[str]) -> None:  # type: ignore[no-untyped-def]
+    """Add tables reached through eager loader options (joinedload, selectinload...).
+
+    Eager joins are only added at compile time, so they never show up while
+    walking the statement itself. ``relationship:*`` wildcards fall back to
+    every tenant-scoped table.
+    """
+    for option in getattr(statement, "_with_options", ()):
+        if not getattr(option, "_is_strategy_option", False):
+            continue
+        load_elements = getattr(option, "context", None)
+        paths = [element.path.path for element in load_elements] if load_elements is not None else [option.path]
+        for path in paths:
+            for entry in path:
+                if isinstance(entry, str):
+                    if entry.startswith("relationship:"):
+                        table_names.add(_TENANT_WILDCARD_PATH)
+                    continue
+                local_table = getattr(getattr(entry, "mapper", None), "local_table", None)
+                if local_table is not None:
+                    table_names.add(local_table.name)
+
+
+def _referenced_tenant_tables(statement) -> frozenset[str]:  # type: ignore[no-untyped-def]
+    table_names: set[str] = set()
+    for element in visitors.iterate(statement):
+        visit_name = getattr(element, "__visit_name__", None)
+        if visit_name == "table":
+            table_names.add(element.name)
+        elif visit_name == "column":
+            # Relationship joins (``join(Member.tasks)``) only expose the target
+            # table through the columns of the generated ON clause.
+            table = getattr(element, "table", None)
+            if getattr(table, "__visit_name__", None) == "table":
+                table_names.add(table.name)
+    _collect_loader_option_tables(statement, table_names)
+    if _TENANT_WILDCARD_PATH in table_names:
+        return _TENANT_SCOPED_TABLE_NAMES
+    return frozenset(table_names & _TENANT_SCOPED_TABLE_NAMES)
+
+
+def _tenant_criteria_for(statement) -> tuple:  # type: ignore[no-untyped-def]
+    tables = _referenced_tenant_tables(statement)
+    criteria = _tenant_criteria_cache.get(tables)
+    with _tenant_criteria_lock:
+        if criteria is not None:
+            _tenant_criteria_stats["hits"] += 1
+            return criteria
+        _tenant_criteria_stats["misses"] += 1
+    criteria = tuple(_TENANT_CRITERIA_BY_TABLE[name] for name in sorted(tables))
+    _tenant_criteria_cache[tables] = criteria
+    return criteria
+
+
+def get_tenant_filter_stats() -> dict[str, int]:
+    with _tenant_criteria_lock:
+        return {
+            "hits": _tenant_criteria_stats["hits"],
+            "misses": _tenant_criteria_stats["misses"],
+            "cached_shapes": len(_tenant_criteria_cache),
+        }
+
+
+def reset_tenant_filter_stats() -> None:
+    with _tenant_criteria_lock:
+        _tenant_criteria_stats["hits"] = 0
+        _tenant_criteria_stats["misses"] = 0
+
+
 @event.listens_for(Session, "do_orm_execute")
 def _apply_tenant_filter(execute_state) -> None:  # type: ignore[no-untyped-def]
     if not execute_state.is_select:
@@ -237,22 +347,15 @@ def _apply_tenant_filter(execute_state) -> None:  # type: ignore[no-untyped-def]
             if not _unscoped_access_reason.get():
                 raise RuntimeError("unscoped tenant access enabled without explicit reason")
             return
-        # Default-deny: apply impossible gym_id so no tenant rows leak.
-        # Legitimate non-scoped queries (auth login, Gym table) don't touch
-        # TENANT_SCOPED_MODELS so with_loader_criteria is a no-op for them.
-        gym_id = _DENY_GYM_ID
+        # Default-deny: _tenant_criteria_gym_id binds an impossible gym_id so no
+        # tenant rows leak. Legitimate non-scoped queries (auth login, Gym table)
+        # don't touch TENANT_SCOPED_MODELS, so no criteria are attached to them.
         logger.debug("No gym_id context — applying deny filter to prevent data leak.")
 
     statement = execute_state.statement
-    for model in TENANT_SCOPED_MODELS:
-        statement = statement.options(
-            with_loader_criteria(
-                model,
-                lambda cls: cls.gym_id == gym_id,
-                include_aliases=True,
-            )
-        )
-    execute_state.statement = statement
+    criteria = _tenant_criteria_for(statement)
+    if criteria:
+        execute_state.statement = statement.options(*criteria)
 
 
 def _infer_gym_id_from_relations(session: Session, obj: object) -> UUID | None:
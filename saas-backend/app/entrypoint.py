@@ -15,6 +15,11 @@ def main() -> None:
     import uvicorn
 
     port = int(os.getenv("PORT", "8000"))
+    if process_type == "pdf_renderer":
+        # One process owns the browser pool; PDF_RENDERER_POOL_SIZE sets how many renders run at once.
+        uvicorn.run("app.pdf_renderer:app", host="0.0.0.0", port=port, workers=1)  # nosec B104
+        return
+
     workers = int(os.getenv("WEB_CONCURRENCY", "2"))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, workers=workers)  # nosec B104
 
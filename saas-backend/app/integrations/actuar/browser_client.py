@@ -9,12 +9,21 @@ from typing import Any
 from urllib.parse import urlsplit, urlunsplit
 
 from app.core.branding import PRODUCT_NAME
+from app.core.circuit_breaker import get_breaker
 from app.core.config import settings
 from app.integrations.actuar.selectors import ACTUAR_FIELD_SELECTORS, ACTUAR_SELECTORS
 from app.services.actuar_member_link_service import normalize_document
 
 logger = logging.getLogger(__name__)
 
+ACTUAR_PROVIDER = "actuar"
+# Coded errors mean Actuar answered (wrong credentials, changed form, unknown member); they do not trip the breaker.
+_ACTUAR_ANSWERED_PREFIXES = ("actuar_", "member_context_missing", "playwright_unavailable")
+
+
+def _is_actuar_outage(exc: BaseException) -> bool:
+    return not str(exc).startswith(_ACTUAR_ANSWERED_PREFIXES)
+
 
 class ActuarBrowserClient:
     def __init__(
@@ -1498,7 +1507,8 @@ class ActuarPlaywrightProvider:
         )
 
     def login(self) -> None:
-        self.client.login(self._credentials)
+        with get_breaker(ACTUAR_PROVIDER).guard(is_failure=_is_actuar_outage):
+            self.client.login(self._credentials)
 
     def test_connection(self) -> dict[str, Any]:
         self.login()
@@ -1530,20 +1540,21 @@ class ActuarPlaywrightProvider:
                 }
             },
         )
-        self.client.open_body_composition_form(member_context)
-        logger.info(
-            "Actuar body composition form opened.",
-            extra={"extra_fields": {"event": "actuar_sync_form_opened", "page_url": self.client.page.url, "page_hash": self.client._page_hash()}},
-        )
-        action_log = self.client.fill_body_composition_form(mapped_payload)
-        logger.info(
-            "Actuar body composition form filled.",
-            extra={"extra_fields": {"event": "actuar_sync_form_filled", "filled_count": len(action_log), "page_url": self.client.page.url, "page_hash": self.client._page_hash()}},
-        )
-        self.client.save_form()
-        evidence = {"screenshot_path": None, "page_html_path": None}
-        if capture_success:
-            evidence = self.client.capture_evidence(evidence_prefix)
+        with get_breaker(ACTUAR_PROVIDER).guard(is_failure=_is_actuar_outage):
+            self.client.open_body_composition_form(member_context)
+            logger.info(
+                "Actuar body composition form opened.",
+                extra={"extra_fields": {"event": "actuar_sync_form_opened", "page_url": self.client.page.url, "page_hash": self.client._page_hash()}},
+            )
+            action_log = self.client.fill_body_composition_form(mapped_payload)
+            logger.info(
+                "Actuar body composition form filled.",
+                extra={"extra_fields": {"event": "actuar_sync_form_filled", "filled_count": len(action_log), "page_url": self.client.page.url, "page_hash": self.client._page_hash()}},
+            )
+            self.client.save_form()
+            evidence = {"screenshot_path": None, "page_html_path": None}
+            if capture_success:
+                evidence = self.client.capture_evidence(evidence_prefix)
         return {
             "actuar_external_id": member_context.get("external_id"),
             "action_log": action_log,
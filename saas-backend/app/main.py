@@ -13,7 +13,9 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
 from app.background_jobs.scheduler import build_scheduler, should_start_scheduler_in_api
+from app.core.ai_gateway import ai_gateway_stats
 from app.core.cache import dashboard_cache
+from app.core.circuit_breaker import circuit_breaker_states
 from app.core.config import settings
 from app.core.logging_config import configure_logging, request_id_ctx
 from app.core.security import decode_token
@@ -275,11 +277,18 @@ def readiness_check() -> JSONResponse:
     cache_healthy = (not cache_required) or bool(cache_info.get("available"))
     cache_status = "ok" if cache_healthy else ("not_configured" if not cache_required else "error")
     healthy = db_status == "ok" and cache_healthy
-    payload = {"status": "ok" if healthy else "degraded"}
+    breakers = circuit_breaker_states()
+    # Only the open/closed state per provider is exposed in production; counters stay out of the public payload.
+    payload = {
+        "status": "ok" if healthy else "degraded",
+        "circuit_breakers": {name: snapshot["state"] for name, snapshot in breakers.items()},
+    }
     if settings.environment.lower() != "production":
         payload["checks"] = {
             "database": {"status": db_status},
-            "cache": {"status": cache_status},
+            "cache": {"status": cache_status, "local": dashboard_cache.local_stats()},
+            "ai_gateway": ai_gateway_stats(),
+            "circuit_breakers": breakers,
         }
     status_code = 200 if healthy else 503
     return JSONResponse(status_code=status_code, content=payload)
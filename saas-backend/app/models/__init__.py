@@ -1,5 +1,6 @@
 from app.models.actuar_sync import ActuarBridgeDevice, ActuarMemberLink, ActuarSyncAttempt, ActuarSyncJob
 from app.models.ai_triage_recommendation import AITriageRecommendation
+from app.models.ai_triage_sync import AITriageDirtyMember, AITriageSyncState
 from app.models.audit_log import AuditLog
 from app.models.assessment import Assessment, MemberConstraints, MemberGoal, TrainingPlan
 from app.models.assessment_appointment import AssessmentAppointment
@@ -42,7 +43,9 @@ from app.models.member import Member
 from app.models.member_consent_record import MemberConsentRecord
 from app.models.member_note import MemberNote
 from app.models.member_risk_history import MemberRiskHistory
+from app.models.member_risk_schedule import MemberRiskSchedule
 from app.models.message_log import MessageLog
+from app.models.monthly_report import MonthlyReportArtifact, MonthlyReportDelivery
 from app.models.movement_video import MovementVideoReview
 from app.models.nps_response import NPSResponse
 from app.models.nurturing_sequence import NurturingSequence
@@ -52,10 +55,13 @@ from app.models.risk_recalculation_request import RiskRecalculationRequest
 from app.models.task import Task
 from app.models.task_event import TaskEvent
 from app.models.user import User
+from app.models.work_queue_item import WorkQueueIndexItem
 
 __all__ = [
     "AuditLog",
+    "AITriageDirtyMember",
     "AITriageRecommendation",
+    "AITriageSyncState",
     "ActuarBridgeDevice",
     "ActuarMemberLink",
     "ActuarSyncAttempt",
@@ -96,8 +102,11 @@ __all__ = [
     "MemberConstraints",
     "MemberGoal",
     "MemberRiskHistory",
+    "MemberRiskSchedule",
     "MemberStatus",
     "MessageLog",
+    "MonthlyReportArtifact",
+    "MonthlyReportDelivery",
     "MovementVideoReview",
     "NPSResponse",
     "NurturingSequence",
@@ -115,4 +124,5 @@ __all__ = [
     "TaskStatus",
     "TrainingPlan",
     "User",
+    "WorkQueueIndexItem",
 ]
@@ -14,6 +14,7 @@ class AuditLog(Base):
         Index("ix_audit_logs_gym_created", "gym_id", "created_at"),
         Index("ix_audit_action_entity_date", "action", "entity", "created_at"),
         Index("ix_audit_user_date", "user_id", "created_at"),
+        Index("ix_audit_logs_member_created", "member_id", "created_at"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
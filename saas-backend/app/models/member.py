@@ -2,13 +2,21 @@ import uuid
 from datetime import date, datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import Boolean, CheckConstraint, Date, DateTime, Enum, ForeignKey, Index, Integer, Numeric, SmallInteger, String, Text
+from sqlalchemy import Boolean, CheckConstraint, Computed, Date, DateTime, Enum, ForeignKey, Index, Integer, Numeric, SmallInteger, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship
 
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin
 from app.models.enums import MemberStatus, RiskLevel
 from app.utils.encryption import EncryptedString
+from app.utils.search_text import fold_expression, fold_sql
+
+
+MEMBER_EXTERNAL_ID_SQL = "NULLIF(btrim(extra_data ->> 'external_id'), '')"
+MEMBER_SEARCH_TEXT_SQL = fold_sql(
+    "coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(extra_data ->> 'external_id', '')"
+)
+MEMBER_PLAN_NAME_FOLD_SQL = fold_sql("plan_name")
 
 
 class Member(Base, TimestampMixin, SoftDeleteMixin):
@@ -19,6 +27,14 @@ class Member(Base, TimestampMixin, SoftDeleteMixin):
         Index("ix_members_gym_status", "gym_id", "status"),
         Index("ix_members_risk_level_score", "risk_level", "risk_score"),
         Index("ix_members_status_last_checkin", "status", "last_checkin_at"),
+        Index("ix_members_gym_external_id", "gym_id", "external_id"),
+        Index("ix_members_gym_updated_at_id", "gym_id", "updated_at", "id"),
+        Index(
+            "ix_members_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -65,6 +81,14 @@ class Member(Base, TimestampMixin, SoftDeleteMixin):
     churn_type: Mapped[str | None] = mapped_column(String(40), nullable=True)
     is_vip: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     retention_stage: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    external_id: Mapped[str | None] = mapped_column(
+        Text,
+        Computed(MEMBER_EXTERNAL_ID_SQL, persisted=True),
+        nullable=True,
+    )
+    search_text: Mapped[str] = deferred(
+        mapped_column(Text, Computed(MEMBER_SEARCH_TEXT_SQL, persisted=True), nullable=False)
+    )
 
     gym = relationship("Gym", back_populates="members")
     assigned_user = relationship("User", back_populates="assigned_members")
@@ -163,3 +187,13 @@ class Member(Base, TimestampMixin, SoftDeleteMixin):
         from app.services.member_lifecycle_service import member_lifecycle_field
 
         return member_lifecycle_field(self, "next_focus")
+
+
+# Retention queue search matches the folded plan name as well; the expression must stay identical to
+# ``fold_expression(Member.plan_name)`` in ``member_plan_search_condition`` for the planner to use the index.
+Index(
+    "ix_members_plan_name_fold_trgm",
+    fold_expression(Member.plan_name).label("plan_name_fold"),
+    postgresql_using="gin",
+    postgresql_ops={"plan_name_fold": "gin_trgm_ops"},
+)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -15,6 +15,11 @@ class MessageLog(Base):
         Index("ix_message_logs_member_channel", "member_id", "channel"),
         Index("ix_message_logs_lead_channel", "lead_id", "channel"),
         Index("ix_message_logs_status_created", "status", "created_at"),
+        Index(
+            "ix_message_logs_queued_next_attempt",
+            "next_attempt_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -52,6 +57,9 @@ class MessageLog(Base):
     provider_message_id: Mapped[str | None] = mapped_column(String(120), nullable=True, default=None)
     error_detail: Mapped[str | None] = mapped_column(Text, nullable=True)
     extra_data: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    # Outbound queue (status "queued"): the sender retries failed sends with backoff until max attempts.
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     member = relationship("Member")
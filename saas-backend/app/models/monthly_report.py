@@ -0,0 +1,81 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, LargeBinary, String, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, deferred, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+
+class MonthlyReportArtifact(Base, TimestampMixin):
+    """Consolidated monthly report PDF attached to every delivery.
+
+    The scheduled dispatch renders one per gym and period; a manual dispatch renders its own, keyed by
+    ``dispatch_job_id``.
+    """
+
+    __tablename__ = "monthly_report_artifacts"
+    __table_args__ = (
+        Index(
+            "uq_monthly_report_artifacts_gym_period",
+            "gym_id",
+            "period",
+            unique=True,
+            postgresql_where=text("dispatch_job_id IS NULL"),
+        ),
+        Index(
+            "uq_monthly_report_artifacts_dispatch_job",
+            "dispatch_job_id",
+            unique=True,
+            postgresql_where=text("dispatch_job_id IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    gym_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("gyms.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    period: Mapped[date] = mapped_column(Date, nullable=False)
+    dispatch_job_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    filename: Mapped[str] = mapped_column(String(160), nullable=False)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    content: Mapped[bytes] = deferred(mapped_column(LargeBinary, nullable=False))
+
+
+class MonthlyReportDelivery(Base, TimestampMixin):
+    """One leader's copy of a monthly report artifact, with its own send attempts and retry schedule."""
+
+    __tablename__ = "monthly_report_deliveries"
+    __table_args__ = (
+        UniqueConstraint("artifact_id", "user_id", name="uq_monthly_report_deliveries_artifact_user"),
+        Index("ix_monthly_report_deliveries_status_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    gym_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("gyms.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    artifact_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("monthly_report_artifacts.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    email: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error_code: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import CheckConstraint, DateTime, Enum, ForeignKey, Index, SmallInteger, Text, func
+from sqlalchemy import CheckConstraint, DateTime, Enum, ForeignKey, Index, SmallInteger, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,12 @@ class NPSResponse(Base):
         Index("ix_nps_gym_response_date", "gym_id", "response_date"),
         Index("ix_nps_member_date", "member_id", "response_date"),
         Index("ix_nps_score", "score"),
+        Index("ix_nps_member_created", "member_id", "created_at"),
+        Index(
+            "ix_nps_sentiment_pending_created",
+            "created_at",
+            postgresql_where=text("extra_data->>'sentiment_status' = 'pending'"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
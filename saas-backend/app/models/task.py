@@ -16,6 +16,7 @@ class Task(Base, TimestampMixin, SoftDeleteMixin):
         Index("ix_tasks_status_assigned", "status", "assigned_to_user_id"),
         Index("ix_tasks_due_status", "due_date", "status"),
         Index("ix_tasks_kanban_column", "kanban_column"),
+        Index("ix_tasks_member_created", "member_id", "created_at"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin
+
+
+class WorkQueueIndexItem(Base, TimestampMixin):
+    """Materialized work-queue row, one per (source_type, source_id).
+
+    Maintained by ``work_queue_index_service`` from Task, AITriageRecommendation
+    and AutopilotAction writes; ``payload`` holds the rendered WorkQueueItemOut.
+    """
+
+    __tablename__ = "work_queue_items"
+    __table_args__ = (
+        UniqueConstraint("gym_id", "source_type", "source_id", name="uq_work_queue_items_source"),
+        Index("ix_work_queue_items_gym_state_rank", "gym_id", "state", "score", "due_at", "id"),
+        Index("ix_work_queue_items_gym_rank", "gym_id", "score", "due_at", "id"),
+        Index("ix_work_queue_items_gym_member", "gym_id", "member_id"),
+        Index("ix_work_queue_items_score_refresh", "score_refresh_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    gym_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("gyms.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    source_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    source_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    member_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    lead_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    assigned_to_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    domain: Mapped[str] = mapped_column(String(32), nullable=False)
+    state: Mapped[str] = mapped_column(String(24), nullable=False)
+    severity: Mapped[str] = mapped_column(String(16), nullable=False)
+    preferred_shift: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    retention_stage: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    is_cold_base: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    is_finance: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    trainer_visible: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    due_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    visible_from: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_refresh_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
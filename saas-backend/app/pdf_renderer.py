@@ -0,0 +1,82 @@
+"""Dedicated PDF renderer process (``PROCESS_TYPE=pdf_renderer``).
+
+Keeps the warm browser pool out of the API and scheduler processes: they post HTML to ``/render`` when
+``PDF_RENDERER_URL`` points here. Run it with a single uvicorn worker; the pool size sets the concurrency.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.services.pdf_renderer_service import (
+    DEFAULT_MARGIN,
+    DEFAULT_VIEWPORT,
+    PdfRenderRequest,
+    get_renderer_pool,
+    renderer_token_matches,
+)
+
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+class RenderPdfPayload(BaseModel):
+    html: str = Field(min_length=1)
+    viewport: dict[str, int] = Field(default_factory=lambda: dict(DEFAULT_VIEWPORT))
+    media: str = "screen"
+    margin: dict[str, str] = Field(default_factory=lambda: dict(DEFAULT_MARGIN))
+    scale: float = Field(default=1.0, gt=0, le=2)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    if not settings.pdf_renderer_token:
+        # The process listens on 0.0.0.0; without a token anyone could make Chromium fetch and render arbitrary pages.
+        raise RuntimeError("PDF_RENDERER_TOKEN e obrigatorio para PROCESS_TYPE=pdf_renderer")
+    pool = get_renderer_pool()
+    logger.info(
+        "PDF renderer process started.",
+        extra={"extra_fields": {"event": "pdf_renderer_started", "slots": pool.size}},
+    )
+    try:
+        yield
+    finally:
+        pool.shutdown(wait=True)
+
+
+app = FastAPI(
+    title=f"{settings.app_name} PDF renderer",
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    lifespan=lifespan,
+)
+
+
+@app.post("/render")
+async def render(
+    payload: RenderPdfPayload,
+    x_renderer_token: str | None = Header(default=None),
+) -> Response:
+    if not renderer_token_matches(x_renderer_token):
+        raise HTTPException(status_code=401, detail="Token do renderizador invalido")
+    request = PdfRenderRequest(**payload.model_dump())
+    try:
+        pdf = await run_in_threadpool(
+            get_renderer_pool().render, request, timeout=settings.pdf_renderer_timeout_seconds
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return Response(content=pdf, media_type="application/pdf")
+
+
+@app.get("/health")
+def health() -> dict:
+    return get_renderer_pool().health()
@@ -4,6 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.dependencies import get_request_context, require_roles
 from app.database import get_db
 from app.models import RoleEnum, User
@@ -14,6 +15,7 @@ from app.schemas import (
     AITriageRecommendationRead,
     AITriageSafeActionPrepareInput,
     AITriageSafeActionPreparedRead,
+    AITriageSyncStatusRead,
     PaginatedResponse,
 )
 from app.services.ai_triage_service import (
@@ -26,6 +28,7 @@ from app.services.ai_triage_service import (
     update_ai_triage_recommendation_approval,
     update_ai_triage_recommendation_outcome,
 )
+from app.services.ai_triage_sync_service import get_ai_triage_sync_status
 from app.services.audit_service import log_audit_event
 
 
@@ -37,11 +40,21 @@ def get_ai_triage_metrics_summary_endpoint(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST))],
 ) -> AITriageMetricsSummaryRead:
-    sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
+    if not settings.ai_triage_background_sync_enabled:
+        sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
     db.commit()
     return get_ai_triage_metrics_summary(db, gym_id=current_user.gym_id)
 
 
+@router.get("/sync-status", response_model=AITriageSyncStatusRead)
+def get_ai_triage_sync_status_endpoint(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
+) -> AITriageSyncStatusRead:
+    status_payload = get_ai_triage_sync_status(db, gym_id=current_user.gym_id)
+    return AITriageSyncStatusRead(background_sync_enabled=settings.ai_triage_background_sync_enabled, **status_payload)
+
+
 @router.get("/items", response_model=PaginatedResponse[AITriageRecommendationRead])
 def list_ai_triage_items(
     request: Request,
@@ -50,7 +63,8 @@ def list_ai_triage_items(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
 ) -> PaginatedResponse[AITriageRecommendationRead]:
-    sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
+    if not settings.ai_triage_background_sync_enabled:
+        sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
     context = get_request_context(request)
     log_audit_event(
         db,
@@ -73,7 +87,8 @@ def get_ai_triage_item(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST))],
 ) -> AITriageRecommendationRead:
-    sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
+    if not settings.ai_triage_background_sync_enabled:
+        sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
     recommendation = get_ai_triage_recommendation_or_404(
         db,
         recommendation_id=recommendation_id,
@@ -150,6 +150,7 @@ def retention_queue(
     plan_cycle: Literal["monthly", "semiannual", "annual"] | None = Query(None),
     preferred_shift: Literal["overnight", "morning", "afternoon", "evening"] | None = Query(None),
     retention_stage: Literal["monitoring", "attention", "recovery", "reactivation", "manager_escalation", "cold_base"] | None = Query(None),
+    cursor: str | None = Query(None),
 ) -> RetentionQueueResponse:
     return get_retention_queue(
         db,
@@ -161,6 +162,7 @@ def retention_queue(
         plan_cycle=plan_cycle,
         preferred_shift=preferred_shift,
         retention_stage=retention_stage,
+        cursor=cursor,
     )
 
 
@@ -1,20 +1,26 @@
+from collections.abc import Callable, Iterator
 from datetime import date
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.dependencies import get_request_context, require_roles
 from app.core.limiter import limiter
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models import RoleEnum, User
 from app.services.audit_service import log_audit_event
 from app.services.export_service import (
-    export_checkins_csv,
+    checkins_export_filename,
     export_checkins_template_csv,
-    export_members_csv,
     export_members_template_csv,
+    iter_checkins_csv,
+    iter_members_csv,
+    members_export_filename,
+    resolve_checkin_export_resume_key,
+    resolve_member_export_resume_key,
 )
 
 
@@ -27,20 +33,31 @@ def export_members_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
+    resume_after: UUID | None = None,
+    gzip: bool = False,
 ) -> StreamingResponse:
-    buffer, filename = export_members_csv(db)
+    resume_key = None
+    if resume_after is not None:
+        resume_key = resolve_member_export_resume_key(db, resume_after)
+        if resume_key is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Linha de retomada nao encontrada")
+    filename = members_export_filename(compress=gzip)
     context = get_request_context(request)
     log_audit_event(
         db,
         action="members_csv_exported",
         entity="members",
         user=current_user,
-        details={"filename": filename},
+        details={"filename": filename, "resume_after": str(resume_after or "")},
         ip_address=context["ip_address"],
         user_agent=context["user_agent"],
     )
     db.commit()
-    return _csv_download_response(buffer, filename)
+    gym_id = current_user.gym_id
+    chunks = _stream_export(
+        lambda export_db: iter_members_csv(export_db, gym_id=gym_id, resume_after=resume_key, compress=gzip),
+    )
+    return _csv_download_response(chunks, filename, compressed=gzip)
 
 
 @router.get("/checkins.csv")
@@ -51,20 +68,43 @@ def export_checkins_endpoint(
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
     date_from: date | None = None,
     date_to: date | None = None,
+    resume_after: UUID | None = None,
+    gzip: bool = False,
 ) -> StreamingResponse:
-    buffer, filename = export_checkins_csv(db, date_from=date_from, date_to=date_to)
+    resume_key = None
+    if resume_after is not None:
+        resume_key = resolve_checkin_export_resume_key(db, resume_after)
+        if resume_key is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Linha de retomada nao encontrada")
+    filename = checkins_export_filename(date_from=date_from, date_to=date_to, compress=gzip)
     context = get_request_context(request)
     log_audit_event(
         db,
         action="checkins_csv_exported",
         entity="checkins",
         user=current_user,
-        details={"filename": filename, "date_from": str(date_from or ""), "date_to": str(date_to or "")},
+        details={
+            "filename": filename,
+            "date_from": str(date_from or ""),
+            "date_to": str(date_to or ""),
+            "resume_after": str(resume_after or ""),
+        },
         ip_address=context["ip_address"],
         user_agent=context["user_agent"],
     )
     db.commit()
-    return _csv_download_response(buffer, filename)
+    gym_id = current_user.gym_id
+    chunks = _stream_export(
+        lambda export_db: iter_checkins_csv(
+            export_db,
+            gym_id=gym_id,
+            date_from=date_from,
+            date_to=date_to,
+            resume_after=resume_key,
+            compress=gzip,
+        ),
+    )
+    return _csv_download_response(chunks, filename, compressed=gzip)
 
 
 @router.get("/templates/members.csv")
@@ -85,10 +125,21 @@ def export_checkins_template_endpoint(
     return _csv_download_response(buffer, filename)
 
 
-def _csv_download_response(buffer, filename: str) -> StreamingResponse:
-    buffer.seek(0)
+def _stream_export(build: Callable[[Session], Iterator[bytes]]) -> Iterator[bytes]:
+    # The request session is closed before the body is sent, so the stream owns its session (and cursor). Each chunk
+    # is pulled in the threadpool with a copied context, so the export queries filter on the gym themselves.
+    export_db = SessionLocal()
+    try:
+        yield from build(export_db)
+    finally:
+        export_db.close()
+
+
+def _csv_download_response(content, filename: str, *, compressed: bool = False) -> StreamingResponse:
+    if hasattr(content, "seek"):
+        content.seek(0)
     return StreamingResponse(
-        buffer,
-        media_type="text/csv; charset=utf-8",
+        content,
+        media_type="application/gzip" if compressed else "text/csv; charset=utf-8",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
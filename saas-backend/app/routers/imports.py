@@ -1,5 +1,6 @@
 import json
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
 from sqlalchemy.orm import Session
@@ -7,9 +8,17 @@ from sqlalchemy.orm import Session
 from app.core.dependencies import get_request_context, require_roles
 from app.core.limiter import limiter
 from app.database import get_db, set_current_gym_id
-from app.models import RoleEnum, User
-from app.schemas import ImportPreview, ImportSummary
+from app.models import CoreAsyncJob, RoleEnum, User
+from app.schemas import CoreAsyncJobAcceptedResponse, CoreAsyncJobStatusRead, ImportPreview, ImportSummary
 from app.services.audit_service import log_audit_event
+from app.services.core_async_job_service import (
+    CORE_ASYNC_IMPORT_JOB_TYPES,
+    CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT,
+    CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT,
+    enqueue_import_job,
+    get_core_async_job,
+    serialize_core_async_job,
+)
 from app.services.import_service import (
     import_assessment_appointments_csv,
     import_assessments_csv,
@@ -51,9 +60,39 @@ def _parse_ignored_columns(raw_value: str | None) -> list[str]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ignored_columns deve ser uma lista JSON")
     return [str(item) for item in parsed]
 
+
+def _accept_import_job(
+    request: Request,
+    db: Session,
+    current_user: User,
+    job: CoreAsyncJob,
+    *,
+    created: bool,
+    entity: str,
+) -> CoreAsyncJobAcceptedResponse:
+    context = get_request_context(request)
+    log_audit_event(
+        db,
+        action=f"import_{entity}_queued",
+        entity=entity,
+        user=current_user,
+        entity_id=job.id,
+        details={"job_id": str(job.id), "status": job.status, "created": created},
+        ip_address=context["ip_address"],
+        user_agent=context["user_agent"],
+    )
+    db.commit()
+    return CoreAsyncJobAcceptedResponse(
+        message="Importacao enfileirada." if created else "Importacao deste arquivo ja esta na fila.",
+        job_id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+    )
+
+
 @router.post("/members", response_model=ImportSummary)
 @limiter.limit("5/minute")
-async def import_members_endpoint(
+def import_members_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -65,7 +104,7 @@ async def import_members_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -92,9 +131,41 @@ async def import_members_endpoint(
     return summary
 
 
+@router.post("/members/jobs", response_model=CoreAsyncJobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+def enqueue_members_import_endpoint(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
+    file: UploadFile = File(...),
+    column_mappings: str | None = Form(None),
+    ignored_columns: str | None = Form(None),
+) -> CoreAsyncJobAcceptedResponse:
+    lower_filename = (file.filename or "").lower()
+    if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
+    set_current_gym_id(current_user.gym_id)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
+    if len(content) > _MAX_CSV_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
+    job, created = enqueue_import_job(
+        db,
+        gym_id=current_user.gym_id,
+        requested_by_user_id=current_user.id,
+        job_type=CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT,
+        content=content,
+        filename=file.filename,
+        options={
+            "column_mappings": _parse_mapping_dict(column_mappings),
+            "ignored_columns": _parse_ignored_columns(ignored_columns),
+        },
+    )
+    return _accept_import_job(request, db, current_user, job, created=created, entity="members")
+
+
 @router.post("/members/preview", response_model=ImportPreview)
 @limiter.limit("10/minute")
-async def preview_members_endpoint(
+def preview_members_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -107,7 +178,7 @@ async def preview_members_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -124,7 +195,7 @@ async def preview_members_endpoint(
 
 @router.post("/checkins", response_model=ImportSummary)
 @limiter.limit("5/minute")
-async def import_checkins_endpoint(
+def import_checkins_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -137,7 +208,7 @@ async def import_checkins_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -171,9 +242,55 @@ async def import_checkins_endpoint(
     return summary
 
 
+@router.post("/checkins/jobs", response_model=CoreAsyncJobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+def enqueue_checkins_import_endpoint(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
+    file: UploadFile = File(...),
+    auto_create_missing_members: bool = Form(False),
+    column_mappings: str | None = Form(None),
+    ignored_columns: str | None = Form(None),
+) -> CoreAsyncJobAcceptedResponse:
+    lower_filename = (file.filename or "").lower()
+    if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
+    set_current_gym_id(current_user.gym_id)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
+    if len(content) > _MAX_CSV_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
+    job, created = enqueue_import_job(
+        db,
+        gym_id=current_user.gym_id,
+        requested_by_user_id=current_user.id,
+        job_type=CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT,
+        content=content,
+        filename=file.filename,
+        options={
+            "auto_create_missing_members": auto_create_missing_members,
+            "column_mappings": _parse_mapping_dict(column_mappings),
+            "ignored_columns": _parse_ignored_columns(ignored_columns),
+        },
+    )
+    return _accept_import_job(request, db, current_user, job, created=created, entity="checkins")
+
+
+@router.get("/jobs/{job_id}", response_model=CoreAsyncJobStatusRead)
+def get_import_job_status(
+    job_id: UUID,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
+) -> CoreAsyncJobStatusRead:
+    job = get_core_async_job(db, job_id=job_id, gym_id=current_user.gym_id)
+    if job is None or job.job_type not in CORE_ASYNC_IMPORT_JOB_TYPES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Importacao nao encontrada")
+    return CoreAsyncJobStatusRead(**serialize_core_async_job(job))
+
+
 @router.post("/checkins/preview", response_model=ImportPreview)
 @limiter.limit("10/minute")
-async def preview_checkins_endpoint(
+def preview_checkins_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -187,7 +304,7 @@ async def preview_checkins_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -205,7 +322,7 @@ async def preview_checkins_endpoint(
 
 @router.post("/assessments", response_model=ImportSummary)
 @limiter.limit("5/minute")
-async def import_assessments_endpoint(
+def import_assessments_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -217,7 +334,7 @@ async def import_assessments_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -251,7 +368,7 @@ async def import_assessments_endpoint(
 
 @router.post("/assessments/preview", response_model=ImportPreview)
 @limiter.limit("10/minute")
-async def preview_assessments_endpoint(
+def preview_assessments_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -264,7 +381,7 @@ async def preview_assessments_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -281,7 +398,7 @@ async def preview_assessments_endpoint(
 
 @router.post("/assessment-appointments/apply", response_model=ImportSummary)
 @limiter.limit("5/minute")
-async def import_assessment_appointments_endpoint(
+def import_assessment_appointments_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -293,7 +410,7 @@ async def import_assessment_appointments_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
@@ -326,7 +443,7 @@ async def import_assessment_appointments_endpoint(
 
 @router.post("/assessment-appointments/preview", response_model=ImportPreview)
 @limiter.limit("10/minute")
-async def preview_assessment_appointments_endpoint(
+def preview_assessment_appointments_endpoint(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER))],
@@ -339,7 +456,7 @@ async def preview_assessment_appointments_endpoint(
     if not lower_filename.endswith(_ALLOWED_EXTENSIONS):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo deve ser CSV ou XLSX")
     set_current_gym_id(current_user.gym_id)
-    content = await file.read(_MAX_CSV_SIZE + 1)
+    content = file.file.read(_MAX_CSV_SIZE + 1)
     if len(content) > _MAX_CSV_SIZE:
         raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Arquivo excede o limite de 10 MB")
     try:
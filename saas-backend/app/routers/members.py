@@ -1,3 +1,4 @@
+import hashlib
 import logging
 from datetime import datetime
 from typing import Annotated, Literal
@@ -21,6 +22,8 @@ from app.schemas import (
     MemberNoteCreate,
     MemberNoteOut,
     MemberOperationalProfileOut,
+    MemberRosterPage,
+    MemberTypeaheadOut,
     OnboardingScoreSnapshotOut,
     OnboardingScoreOut,
     PaginatedResponse,
@@ -72,14 +75,26 @@ from app.services.body_composition_service import (
 )
 from app.services.ai_assistant_service import build_onboarding_assistant
 from app.services.kommo_service import KommoSalesbotDispatchError, KommoServiceError
-from app.services.member_service import create_member, get_member_or_404, list_member_index, list_members, soft_delete_member, update_member
+from app.services.member_service import (
+    MEMBER_ROSTER_DEFAULT_LIMIT,
+    MEMBER_ROSTER_MAX_LIMIT,
+    create_member,
+    get_member_or_404,
+    get_member_roster_version,
+    list_member_index,
+    list_member_roster,
+    list_members,
+    soft_delete_member,
+    update_member,
+)
 from app.services.member_intelligence_service import get_member_intelligence_context
+from app.services.member_search_service import TYPEAHEAD_DEFAULT_LIMIT, TYPEAHEAD_MAX_LIMIT, search_member_typeahead
 from app.services.member_operational_profile_service import (
     build_member_operational_profile,
     create_member_note,
     list_member_notes,
 )
-from app.services.member_timeline_service import get_member_timeline
+from app.services.member_timeline_service import TimelineEventType, get_member_timeline
 from app.services.onboarding_score_service import calculate_onboarding_score
 from app.services.preferred_shift_service import sync_preferred_shifts_from_checkins
 from app.services.risk_recalculation_service import (
@@ -157,7 +172,7 @@ def list_members_endpoint(
     )
 
 
-@router.get("/index", response_model=list[MemberOut])
+@router.get("/index", response_model=list[MemberOut], deprecated=True)
 def list_members_index_endpoint(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[
@@ -185,6 +200,57 @@ def list_members_index_endpoint(
     )
 
 
+def _member_roster_etag(gym_id: UUID, watermark: datetime | None, total: int, *parts: object) -> str:
+    raw = "|".join(str(part) for part in (gym_id, watermark.isoformat() if watermark else "", total, *parts))
+    return f'W/"{hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]}"'
+
+
+@router.get("/roster", response_model=MemberRosterPage)
+def member_roster_endpoint(
+    request: Request,
+    response: Response,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[
+        User,
+        Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST, RoleEnum.SALESPERSON, RoleEnum.TRAINER)),
+    ],
+    cursor: str | None = None,
+    limit: int = Query(MEMBER_ROSTER_DEFAULT_LIMIT, ge=1, le=MEMBER_ROSTER_MAX_LIMIT),
+    updated_since: datetime | None = None,
+) -> MemberRosterPage | Response:
+    watermark, total = get_member_roster_version(db, gym_id=current_user.gym_id)
+    etag = _member_roster_etag(current_user.gym_id, watermark, total, cursor, limit, updated_since)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = {value.strip() for value in request.headers.get("if-none-match", "").split(",")}
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    page = list_member_roster(
+        db,
+        gym_id=current_user.gym_id,
+        cursor=cursor,
+        limit=limit,
+        updated_since=updated_since,
+        watermark=watermark,
+    )
+    response.headers.update(headers)
+    return page
+
+
+@router.get("/typeahead", response_model=list[MemberTypeaheadOut])
+def member_typeahead_endpoint(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[
+        User,
+        Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST, RoleEnum.SALESPERSON, RoleEnum.TRAINER)),
+    ],
+    q: str = Query(..., min_length=1, max_length=120),
+    limit: int = Query(TYPEAHEAD_DEFAULT_LIMIT, ge=1, le=TYPEAHEAD_MAX_LIMIT),
+) -> list[MemberTypeaheadOut]:
+    rows = search_member_typeahead(db, query=q, gym_id=current_user.gym_id, limit=limit)
+    return [MemberTypeaheadOut.model_validate(row) for row in rows]
+
+
 @router.post("/preferred-shifts/sync", response_model=PreferredShiftSyncResult)
 def sync_preferred_shifts_endpoint(
     request: Request,
@@ -435,11 +501,13 @@ def member_timeline_endpoint(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(require_roles(RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST, RoleEnum.TRAINER))],
     limit: int = Query(50, ge=1, le=200),
+    types: list[TimelineEventType] | None = Query(None),
+    cursor: str | None = None,
 ) -> list[dict]:
     if current_user.role == RoleEnum.TRAINER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permissao insuficiente")
     get_member_or_404(db, member_id, gym_id=current_user.gym_id)
-    return get_member_timeline(db, member_id, limit=limit)
+    return get_member_timeline(db, member_id, limit=limit, types=types, cursor=cursor, gym_id=current_user.gym_id)
 
 
 @router.get("/{member_id}/body-composition", response_model=list[BodyCompositionEvaluationRead])
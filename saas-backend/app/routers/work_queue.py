@@ -8,7 +8,7 @@ from app.core.dependencies import get_request_context, require_roles
 from app.database import get_db
 from app.models import RoleEnum, User
 from app.schemas import (
-    PaginatedResponse,
+    CursorPaginatedResponse,
     WorkQueueActionResultOut,
     WorkQueueExecuteInput,
     WorkQueueItemOut,
@@ -33,7 +33,7 @@ DomainFilter = Literal["all", "operations", "retention", "onboarding", "assessme
 SourceFilter = Literal["all", "task", "ai_triage", "assessment_queue", "ai_service_agent", "student_personal_ai"]
 
 
-@router.get("/items", response_model=PaginatedResponse[WorkQueueItemOut])
+@router.get("/items", response_model=CursorPaginatedResponse[WorkQueueItemOut])
 def list_work_queue_items_endpoint(
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[
@@ -47,7 +47,8 @@ def list_work_queue_items_endpoint(
     source: SourceFilter = Query("all"),
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=100),
-) -> PaginatedResponse[WorkQueueItemOut]:
+    cursor: str | None = Query(None, max_length=512),
+) -> CursorPaginatedResponse[WorkQueueItemOut]:
     payload = list_work_queue_items(
         db,
         current_user=current_user,
@@ -58,6 +59,7 @@ def list_work_queue_items_endpoint(
         source=source,
         page=page,
         page_size=page_size,
+        cursor=cursor,
     )
     db.commit()
     return payload
@@ -6,6 +6,7 @@ from app.schemas.ai_triage import (
     AITriageRecommendedOwner,
     AITriageSafeActionPrepareInput,
     AITriageSafeActionPreparedRead,
+    AITriageSyncStatusRead,
 )
 from app.schemas.acquisition import (
     AcquisitionCaptureInput,
@@ -88,7 +89,7 @@ from app.schemas.assessment_appointment import (
 )
 from app.schemas.checkin import CheckinCreate, CheckinOut
 from app.schemas.coach import CoachWorkspaceItemOut, CoachWorkspaceOut, CoachWorkspaceSummaryOut
-from app.schemas.common import APIMessage, AuditLogOut, PaginatedResponse
+from app.schemas.common import APIMessage, AuditLogOut, CursorPaginatedResponse, PaginatedResponse
 from app.schemas.compliance import (
     MemberConsentCurrentOut,
     MemberConsentRecordCreate,
@@ -155,6 +156,9 @@ from app.schemas.member import (
     MemberCreate,
     MemberOut,
     MemberRiskOut,
+    MemberRosterItemOut,
+    MemberRosterPage,
+    MemberTypeaheadOut,
     MemberUpdate,
     OnboardingScoreOut,
     OnboardingScoreSnapshotOut,
@@ -232,6 +236,7 @@ __all__ = [
     "AITriageRecommendedOwner",
     "AITriageSafeActionPrepareInput",
     "AITriageSafeActionPreparedRead",
+    "AITriageSyncStatusRead",
     "AcquisitionCaptureInput",
     "AcquisitionCaptureResponse",
     "AcquisitionLeadSummaryOut",
@@ -260,6 +265,7 @@ __all__ = [
     "AssessmentMiniOut",
     "AssessmentOut",
     "AuditLogOut",
+    "CursorPaginatedResponse",
     "AutomationExecutionResult",
     "AutopilotActionOut",
     "AutopilotEventOut",
@@ -349,6 +355,9 @@ __all__ = [
     "MemberNoteOut",
     "MemberOperationalProfileOut",
     "MemberRiskOut",
+    "MemberRosterItemOut",
+    "MemberRosterPage",
+    "MemberTypeaheadOut",
     "MemberUpdate",
     "OnboardingScoreOut",
     "OnboardingScoreSnapshotOut",
@@ -81,6 +81,16 @@ class AITriageOutcomeUpdate(BaseModel):
     note: str | None = Field(default=None, max_length=280)
 
 
+class AITriageSyncStatusRead(BaseModel):
+    background_sync_enabled: bool
+    last_synced_at: datetime | None = None
+    synced_through: datetime | None = None
+    pending_member_count: int = 0
+    staleness_seconds: float | None = None
+    last_duration_ms: int | None = None
+    last_error: str | None = None
+
+
 class AITriageMetricsSummaryRead(BaseModel):
     total_active: int
     pending_approval_total: int
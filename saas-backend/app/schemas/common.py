@@ -29,6 +29,10 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page_size: int
 
 
+class CursorPaginatedResponse(PaginatedResponse[T], Generic[T]):
+    next_cursor: str | None = None
+
+
 class AuditLogOut(BaseModel):
     id: UUID
     action: str
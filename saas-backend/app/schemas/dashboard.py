@@ -4,7 +4,7 @@ from pydantic import BaseModel, Field
 
 from app.models import RiskLevel
 from app.schemas.assistant import AIAssistantPayload
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import CursorPaginatedResponse
 
 from app.schemas.lead import LeadOut
 from app.schemas.member import MemberOut
@@ -233,5 +233,5 @@ class RetentionQueueItem(BaseModel):
     assistant: AIAssistantPayload | None = None
 
 
-class RetentionQueueResponse(PaginatedResponse[RetentionQueueItem]):
+class RetentionQueueResponse(CursorPaginatedResponse[RetentionQueueItem]):
     stage_counts: dict[str, int] = {}
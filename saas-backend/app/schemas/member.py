@@ -75,6 +75,31 @@ class MemberOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MemberTypeaheadOut(BaseModel):
+    id: UUID
+    full_name: str
+    external_id: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MemberRosterItemOut(BaseModel):
+    id: UUID
+    full_name: str
+    status: MemberStatus
+    risk_level: RiskLevel
+    risk_score: int
+    preferred_shift: str | None
+    updated_at: datetime
+    deleted: bool = False
+
+
+class MemberRosterPage(BaseModel):
+    items: list[MemberRosterItemOut]
+    next_cursor: str | None = None
+    watermark: datetime | None = None
+
+
 class MemberRiskOut(BaseModel):
     member_id: UUID
     score: int
@@ -1,6 +1,7 @@
 import logging
 import re
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.cache import dashboard_cache, make_cache_key
 from app.core.circuit_breaker import claude_circuit_breaker
 from app.core.config import settings
@@ -33,20 +34,17 @@ def generate_executive_insight(dashboard_data: dict) -> str:
         return insight
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="dashboard_insight_executive",
+            params={"max_tokens": settings.claude_max_tokens, "messages": [{"role": "user", "content": prompt}]},
         )
         insight = response.content[0].text
-        claude_circuit_breaker.record_success()
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
         return insight
     except Exception:
-        claude_circuit_breaker.record_failure()
         logger.exception("Erro ao gerar insight com Claude")
         insight = _fallback_insight(dashboard_data)
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
@@ -88,13 +86,12 @@ def generate_retention_insight(retention_data: dict) -> str:
         return insight
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="dashboard_insight_retention",
+            params={"max_tokens": settings.claude_max_tokens, "messages": [{"role": "user", "content": prompt}]},
         )
         insight = response.content[0].text
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
@@ -191,13 +188,12 @@ def generate_operational_insight(dashboard_data: dict) -> str:
         return insight
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="dashboard_insight_operational",
+            params={"max_tokens": settings.claude_max_tokens, "messages": [{"role": "user", "content": prompt}]},
         )
         insight = response.content[0].text
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
@@ -238,13 +234,12 @@ def generate_commercial_insight(dashboard_data: dict) -> str:
         return insight
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="dashboard_insight_commercial",
+            params={"max_tokens": settings.claude_max_tokens, "messages": [{"role": "user", "content": prompt}]},
         )
         insight = response.content[0].text
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
@@ -289,13 +284,12 @@ def generate_financial_insight(dashboard_data: dict) -> str:
         return insight
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="dashboard_insight_financial",
+            params={"max_tokens": settings.claude_max_tokens, "messages": [{"role": "user", "content": prompt}]},
         )
         insight = response.content[0].text
         dashboard_cache.set(cache_key, insight, ttl=INSIGHT_CACHE_TTL_SECONDS)
@@ -4,8 +4,7 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from openai import OpenAI
-
+from app.core.ai_gateway import PROVIDER_OPENAI, call_model
 from app.core.config import settings
 
 
@@ -185,13 +184,20 @@ def generate_specialist_text(
         )
 
     try:
-        client = OpenAI(api_key=settings.openai_api_key, timeout=settings.openai_timeout_seconds)
-        response = client.responses.create(
+        response = call_model(
+            PROVIDER_OPENAI,
+            "responses.create",
             model=model,
-            input=[
-                {"role": "system", "content": [{"type": "input_text", "text": specialist_system_prompt(prompt_key)}]},
-                {"role": "user", "content": [{"type": "input_text", "text": user_prompt}]},
-            ],
+            prompt_key=prompt_key,
+            params={
+                "input": [
+                    {
+                        "role": "system",
+                        "content": [{"type": "input_text", "text": specialist_system_prompt(prompt_key)}],
+                    },
+                    {"role": "user", "content": [{"type": "input_text", "text": user_prompt}]},
+                ],
+            },
         )
         text = _extract_response_text(response).strip()
         if not text:
@@ -0,0 +1,188 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from time import perf_counter
+from uuid import UUID
+
+from sqlalchemy import delete, event, func, inspect as sa_inspect, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import AITriageDirtyMember, AITriageSyncState, Checkin, Member, Task
+from app.services.ai_triage_service import sync_ai_triage_recommendations
+
+logger = logging.getLogger(__name__)
+
+DIRTY_REASON_CHECKIN = "checkin"
+DIRTY_REASON_RISK = "risk"
+DIRTY_REASON_TASK = "task"
+
+# Member attributes that feed the retention queue or onboarding snapshots.
+_MEMBER_TRIAGE_ATTRS = (
+    "risk_score",
+    "risk_level",
+    "retention_stage",
+    "onboarding_score",
+    "onboarding_status",
+    "status",
+    "deleted_at",
+    "assigned_user_id",
+    "last_checkin_at",
+)
+_MARKER_DELETE_BATCH_SIZE = 500
+
+
+def _utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def _as_aware(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _member_triage_changed(member: Member) -> bool:
+    state = sa_inspect(member)
+    return any(state.attrs[name].history.has_changes() for name in _MEMBER_TRIAGE_ATTRS)
+
+
+def collect_ai_triage_dirty_members(session: Session) -> dict[tuple[UUID, UUID], str]:
+    markers: dict[tuple[UUID, UUID], str] = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Checkin):
+            if obj in session.new:
+                gym_id, member_id, reason = obj.gym_id, obj.member_id, DIRTY_REASON_CHECKIN
+            else:
+                continue
+        elif isinstance(obj, Task):
+            gym_id, member_id, reason = obj.gym_id, obj.member_id, DIRTY_REASON_TASK
+        elif isinstance(obj, Member):
+            if obj in session.new or obj in session.deleted or not _member_triage_changed(obj):
+                continue
+            gym_id, member_id, reason = obj.gym_id, obj.id, DIRTY_REASON_RISK
+        else:
+            continue
+        if gym_id is None or member_id is None:
+            continue
+        markers.setdefault((gym_id, member_id), reason)
+    return markers
+
+
+def mark_ai_triage_members_dirty(connection, markers: dict[tuple[UUID, UUID], str]) -> None:
+    if not markers:
+        return
+    stmt = pg_insert(AITriageDirtyMember.__table__).values(
+        [
+            {"gym_id": gym_id, "member_id": member_id, "reason": reason}
+            for (gym_id, member_id), reason in markers.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_ai_triage_dirty_members_gym_member",
+        set_={"reason": stmt.excluded.reason, "marked_at": func.now()},
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_ai_triage_dirty_members(session: Session, _flush_context) -> None:  # type: ignore[no-untyped-def]
+    if not settings.ai_triage_background_sync_enabled:
+        return
+    markers = collect_ai_triage_dirty_members(session)
+    if markers:
+        # Written on the flush connection so markers commit or roll back with the change itself.
+        mark_ai_triage_members_dirty(session.connection(), markers)
+
+
+def _get_or_create_sync_state(db: Session, *, gym_id: UUID) -> AITriageSyncState:
+    state = db.scalar(select(AITriageSyncState).where(AITriageSyncState.gym_id == gym_id))
+    if state is None:
+        state = AITriageSyncState(gym_id=gym_id, last_dirty_member_count=0)
+        db.add(state)
+        db.flush()
+    return state
+
+
+def _pending_markers(db: Session, *, gym_id: UUID) -> list[tuple[UUID, datetime]]:
+    return [
+        (row.id, row.marked_at)
+        for row in db.execute(
+            select(AITriageDirtyMember.id, AITriageDirtyMember.marked_at).where(AITriageDirtyMember.gym_id == gym_id)
+        ).all()
+    ]
+
+
+def _delete_processed_markers(db: Session, markers: list[tuple[UUID, datetime]]) -> None:
+    # Matching on (id, marked_at) keeps markers that were re-marked while the sync was running.
+    for start in range(0, len(markers), _MARKER_DELETE_BATCH_SIZE):
+        batch = markers[start : start + _MARKER_DELETE_BATCH_SIZE]
+        db.execute(
+            delete(AITriageDirtyMember)
+            .where(tuple_(AITriageDirtyMember.id, AITriageDirtyMember.marked_at).in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def get_ai_triage_sync_status(db: Session, *, gym_id: UUID, now: datetime | None = None) -> dict:
+    now = now or _utcnow()
+    pending_count, oldest_marked_at = db.execute(
+        select(func.count(AITriageDirtyMember.id), func.min(AITriageDirtyMember.marked_at)).where(
+            AITriageDirtyMember.gym_id == gym_id
+        )
+    ).one()
+    state = db.scalar(select(AITriageSyncState).where(AITriageSyncState.gym_id == gym_id))
+    last_synced_at = _as_aware(state.last_synced_at) if state else None
+    oldest_marked_at = _as_aware(oldest_marked_at)
+    if oldest_marked_at is not None:
+        staleness_seconds = max((now - oldest_marked_at).total_seconds(), 0.0)
+    elif last_synced_at is None:
+        staleness_seconds = None
+    else:
+        staleness_seconds = 0.0
+    return {
+        "last_synced_at": last_synced_at,
+        "synced_through": _as_aware(state.synced_through) if state else None,
+        "pending_member_count": int(pending_count or 0),
+        "staleness_seconds": staleness_seconds,
+        "last_duration_ms": state.last_duration_ms if state else None,
+        "last_error": state.last_error if state else None,
+    }
+
+
+def process_ai_triage_sync_for_gym(db: Session, *, gym_id: UUID, now: datetime | None = None) -> dict:
+    """Re-syncs one gym's AI triage when it has dirty members or its last sync is older than the max age."""
+    now = now or _utcnow()
+    state = _get_or_create_sync_state(db, gym_id=gym_id)
+    markers = _pending_markers(db, gym_id=gym_id)
+    last_synced_at = _as_aware(state.last_synced_at)
+    max_age = timedelta(minutes=max(int(settings.ai_triage_sync_max_age_minutes), 1))
+    expired = last_synced_at is None or last_synced_at <= now - max_age
+    if not markers and not expired:
+        return {"synced": False, "dirty_member_count": 0, "staleness_seconds": 0.0}
+
+    oldest_marked_at = min((_as_aware(marked_at) for _, marked_at in markers), default=None)
+    started = perf_counter()
+    sync_ai_triage_recommendations(db, gym_id=gym_id)
+    _delete_processed_markers(db, markers)
+    state.synced_through = max((_as_aware(marked_at) for _, marked_at in markers), default=state.synced_through)
+    state.last_synced_at = now
+    state.last_duration_ms = int((perf_counter() - started) * 1000)
+    state.last_dirty_member_count = len(markers)
+    state.last_error = None
+    db.add(state)
+    db.flush()
+    return {
+        "synced": True,
+        "dirty_member_count": len(markers),
+        "staleness_seconds": max((now - oldest_marked_at).total_seconds(), 0.0) if oldest_marked_at else 0.0,
+        "duration_ms": state.last_duration_ms,
+    }
+
+
+def record_ai_triage_sync_failure(db: Session, *, gym_id: UUID, error: Exception) -> None:
+    state = _get_or_create_sync_state(db, gym_id=gym_id)
+    state.last_error = str(error)[:500]
+    db.add(state)
+    db.flush()
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import logging
 
-import anthropic
-from openai import OpenAI
 from pydantic import BaseModel
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, PROVIDER_OPENAI, call_model
 from app.core.circuit_breaker import claude_circuit_breaker
 from app.core.config import settings
 from app.models import Member
@@ -57,15 +56,15 @@ def build_narratives(
             f"Benchmark: {benchmark['position_label']} ({benchmark['percentile']} percentil)\n"
             "Responda em portugues do Brasil."
         )
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=350,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="assessment_coach_v1",
+            params={"max_tokens": 350, "temperature": 0, "messages": [{"role": "user", "content": prompt}]},
+            gym_id=member.gym_id,
         )
         parsed = _parse_claude_json(response.content[0].text.strip())
-        claude_circuit_breaker.record_success()
         return {
             "coach_summary": str(parsed.get("coach_summary") or "")[:280],
             "member_summary": str(parsed.get("member_summary") or "")[:280],
@@ -74,7 +73,6 @@ def build_narratives(
             "student_prompt_metadata": prompt_metadata("assessment_student_v1", model=settings.claude_model),
         }
     except Exception:
-        claude_circuit_breaker.record_failure()
         logger.exception("Falha ao gerar narrativas de avaliacao com Claude. Usando fallback.")
         return _fallback_narratives(member, diagnosis=diagnosis, forecast=forecast, benchmark=benchmark)
 
@@ -92,23 +90,29 @@ def _openai_narratives(member: Member, *, diagnosis: dict, forecast: dict, bench
         "coach_summary deve ser tecnico para professor. member_summary deve ser simples para aluno. "
         "retention_summary deve explicar risco operacional sem exagero."
     )
-    client = OpenAI(api_key=settings.openai_api_key, timeout=settings.openai_timeout_seconds)
-    response = client.responses.parse(
+    response = call_model(
+        PROVIDER_OPENAI,
+        "responses.parse",
         model=specialist_model(),
-        input=[
-            {
-                "role": "system",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": specialist_system_prompt("assessment_coach_v1")
-                        + "\nPara member_summary, aplique tambem o prompt assessment_student_v1.",
-                    }
-                ],
-            },
-            {"role": "user", "content": [{"type": "input_text", "text": prompt}]},
-        ],
-        text_format=_OpenAIAssessmentNarratives,
+        prompt_key="assessment_coach_v1",
+        timeout_seconds=settings.openai_timeout_seconds,
+        gym_id=member.gym_id,
+        params=dict(
+            input=[
+                {
+                    "role": "system",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": specialist_system_prompt("assessment_coach_v1")
+                            + "\nPara member_summary, aplique tambem o prompt assessment_student_v1.",
+                        }
+                    ],
+                },
+                {"role": "user", "content": [{"type": "input_text", "text": prompt}]},
+            ],
+            text_format=_OpenAIAssessmentNarratives,
+        ),
     )
     parsed = response.output_parsed
     if parsed is None:
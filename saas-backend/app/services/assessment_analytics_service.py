@@ -1,11 +1,14 @@
 import logging
+from collections.abc import Collection
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Literal
+from uuid import UUID
 
 from sqlalchemy import and_, case, desc, distinct, func, literal, or_, select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.circuit_breaker import claude_circuit_breaker
 from app.core.config import settings
 from app.database import get_current_gym_id, include_all_tenants
@@ -314,6 +317,7 @@ def get_assessments_queue(
     bucket: AssessmentQueueBucket = "all",
     preferred_shift: str | None = None,
     gym_id=None,
+    member_ids: Collection[UUID] | None = None,
 ) -> PaginatedResponse[AssessmentQueueItemOut]:
     now = datetime.now(tz=timezone.utc)
     cutoff_90 = (now - timedelta(days=90)).date()
@@ -392,6 +396,8 @@ def get_assessments_queue(
     preferred_shift_filter = _preferred_shift_condition(preferred_shift or "")
     if preferred_shift_filter is not None:
         filters.append(preferred_shift_filter)
+    if member_ids is not None:
+        filters.append(Member.id.in_(list(member_ids)))
 
     resolution_priority_expr = case((unresolved_queue_expr, 0), else_=1)
 
@@ -742,22 +748,16 @@ def generate_ai_insights(db: Session, current: Assessment, *, commit: bool = Tru
                 db.flush()
             return
 
-        import anthropic
         from app.utils.claude import _parse_claude_json
 
         prompt = _build_comprehensive_assessment_prompt(current, previous_assessments, goals, constraints)
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        try:
-            response = client.messages.create(
-                model=settings.claude_model,
-                max_tokens=800,
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            claude_circuit_breaker.record_success()
-        except Exception:
-            claude_circuit_breaker.record_failure()
-            raise
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
+            model=settings.claude_model,
+            prompt_key="assessment_analysis",
+            params={"max_tokens": 800, "temperature": 0, "messages": [{"role": "user", "content": prompt}]},
+        )
         text = response.content[0].text.strip()
         parsed = _parse_claude_json(text)
         current.ai_analysis = (parsed.get("analysis") or "")[:2000]
@@ -1,7 +1,7 @@
 import logging
 import re
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy import Integer, func, select
 from sqlalchemy.orm import Session
@@ -15,6 +15,7 @@ from app.models.lead import Lead
 from app.models.message_log import MessageLog
 from app.services.kommo_service import handoff_member_to_kommo
 from app.services.notification_service import create_notification
+from app.services.whatsapp_outbound_service import enqueue_whatsapp_message
 from app.services.whatsapp_service import get_gym_instance, render_template, send_whatsapp_sync
 from app.utils.birthday import birthday_label_matches_today
 from app.utils.email import send_email
@@ -72,6 +73,8 @@ def execute_rule_for_member(
     db: Session,
     rule: AutomationRule,
     member: Member,
+    *,
+    gym_instances: dict | None = None,
 ) -> dict:
     now = datetime.now(tz=timezone.utc)
     action_type = rule.action_type
@@ -85,24 +88,30 @@ def execute_rule_for_member(
             result["status"] = "skipped"
             result["reason"] = "no_phone"
             return result
-        template_name = action_config.get("template") or action_config.get("template_name") or "custom"
-        extra_vars = action_config.get("extra_vars", {})
-        if not isinstance(extra_vars, dict):
-            extra_vars = {}
-        # Backward compatibility for older rules saved with {"message": "..."}.
-        if "mensagem" not in extra_vars and action_config.get("message"):
-            extra_vars["mensagem"] = str(action_config.get("message"))
-        message = render_template(template_name, {**template_vars, **extra_vars})
-        instance = get_gym_instance(db, member.gym_id)
-        log = send_whatsapp_sync(
-            db,
-            phone=member.phone,
-            message=message,
-            instance=instance,
-            member_id=member.id,
-            automation_rule_id=rule.id,
-            template_name=template_name,
-        )
+        template_name, message = _whatsapp_content(action_config, template_vars)
+        instance = _resolve_gym_instance(db, member.gym_id, gym_instances)
+        if settings.whatsapp_outbound_queue_enabled:
+            # Only enqueue: whatsapp_outbound_job delivers outside this transaction.
+            log = enqueue_whatsapp_message(
+                db,
+                phone=member.phone,
+                message=message,
+                instance=instance,
+                gym_id=member.gym_id,
+                member_id=member.id,
+                automation_rule_id=rule.id,
+                template_name=template_name,
+            )
+        else:
+            log = send_whatsapp_sync(
+                db,
+                phone=member.phone,
+                message=message,
+                instance=instance,
+                member_id=member.id,
+                automation_rule_id=rule.id,
+                template_name=template_name,
+            )
         result["status"] = log.status
         result["message_log_id"] = str(log.id)
 
@@ -119,19 +128,11 @@ def execute_rule_for_member(
         _log_message(db, member.id, rule.id, "email", member.email, body, "sent" if sent else "failed")
 
     elif action_type == AutomationAction.CREATE_TASK:
-        title_template = action_config.get("title", "Acao automatica para {nome}")
-        title = _render(title_template, template_vars)
-        description = action_config.get("description", "Tarefa criada por automacao.")
-        priority_str = action_config.get("priority", "high")
-        try:
-            priority = TaskPriority(priority_str)
-        except ValueError:
-            priority = TaskPriority.HIGH
-
+        task = _build_task(action_config, member, template_vars)
         existing = db.scalar(
             select(Task).where(
                 Task.member_id == member.id,
-                Task.title == title,
+                Task.title == task.title,
                 Task.status.in_([TaskStatus.TODO, TaskStatus.DOING]),
                 Task.deleted_at.is_(None),
             )
@@ -141,41 +142,20 @@ def execute_rule_for_member(
             result["reason"] = "task_already_exists"
             return result
 
-        suggested_msg = action_config.get("suggested_message", "")
-        if suggested_msg:
-            suggested_msg = _render(suggested_msg, template_vars)
-        task_extra = action_config.get("extra_data")
-        extra_data = dict(task_extra) if isinstance(task_extra, dict) else {}
-        source = action_config.get("source")
-        if isinstance(source, str) and source.strip():
-            extra_data["source"] = source.strip()
-
-        task = Task(
-            member_id=member.id,
-            assigned_to_user_id=member.assigned_user_id,
-            title=title,
-            description=description,
-            priority=priority,
-            status=TaskStatus.TODO,
-            kanban_column=TaskStatus.TODO.value,
-            suggested_message=suggested_msg or None,
-            extra_data=extra_data,
-        )
         db.add(task)
         db.flush()
         result["status"] = "created"
         result["task_id"] = str(task.id)
 
     elif action_type == AutomationAction.NOTIFY:
-        title = _render(action_config.get("title", "Alerta automatico"), template_vars)
-        message = _render(action_config.get("message", "Acao necessaria para {nome}"), template_vars)
+        title, message, category = _notification_content(action_config, template_vars)
         notification = create_notification(
             db,
             member_id=member.id,
             user_id=member.assigned_user_id,
             title=title,
             message=message,
-            category=action_config.get("category", "retention"),
+            category=category,
         )
         result["status"] = "notified"
         result["notification_id"] = str(notification.id)
@@ -212,9 +192,219 @@ def execute_rule_for_member(
     return result
 
 
+def _whatsapp_content(action_config: dict, template_vars: dict) -> tuple[str, str]:
+    template_name = action_config.get("template") or action_config.get("template_name") or "custom"
+    extra_vars = action_config.get("extra_vars", {})
+    if not isinstance(extra_vars, dict):
+        extra_vars = {}
+    # Backward compatibility for older rules saved with {"message": "..."}.
+    if "mensagem" not in extra_vars and action_config.get("message"):
+        extra_vars["mensagem"] = str(action_config.get("message"))
+    return template_name, render_template(template_name, {**template_vars, **extra_vars})
+
+
+def _resolve_gym_instance(db: Session, gym_id: UUID, gym_instances: dict | None) -> str | None:
+    if gym_instances is None:
+        return get_gym_instance(db, gym_id)
+    if gym_id not in gym_instances:
+        gym_instances[gym_id] = get_gym_instance(db, gym_id)
+    return gym_instances[gym_id]
+
+
+def _build_task(action_config: dict, member: Member, template_vars: dict) -> Task:
+    title = _render(action_config.get("title", "Acao automatica para {nome}"), template_vars)
+    description = action_config.get("description", "Tarefa criada por automacao.")
+    priority_str = action_config.get("priority", "high")
+    try:
+        priority = TaskPriority(priority_str)
+    except ValueError:
+        priority = TaskPriority.HIGH
+
+    suggested_msg = action_config.get("suggested_message", "")
+    if suggested_msg:
+        suggested_msg = _render(suggested_msg, template_vars)
+    task_extra = action_config.get("extra_data")
+    extra_data = dict(task_extra) if isinstance(task_extra, dict) else {}
+    source = action_config.get("source")
+    if isinstance(source, str) and source.strip():
+        extra_data["source"] = source.strip()
+
+    return Task(
+        member_id=member.id,
+        assigned_to_user_id=member.assigned_user_id,
+        title=title,
+        description=description,
+        priority=priority,
+        status=TaskStatus.TODO,
+        kanban_column=TaskStatus.TODO.value,
+        suggested_message=suggested_msg or None,
+        extra_data=extra_data,
+    )
+
+
+def _notification_content(action_config: dict, template_vars: dict) -> tuple[str, str, str]:
+    title = _render(action_config.get("title", "Alerta automatico"), template_vars)
+    message = _render(action_config.get("message", "Acao necessaria para {nome}"), template_vars)
+    return title, message, action_config.get("category", "retention")
+
+
+def _supports_batch_execution(rule: AutomationRule) -> bool:
+    if not settings.automation_batch_execution_enabled:
+        return False
+    if rule.action_type in (AutomationAction.CREATE_TASK, AutomationAction.NOTIFY):
+        return True
+    # Inline WhatsApp sends do HTTP per member; only the queued path can be batched.
+    return rule.action_type == AutomationAction.SEND_WHATSAPP and settings.whatsapp_outbound_queue_enabled
+
+
+def _open_task_keys(db: Session, tasks: list[Task]) -> set[tuple[UUID, str]]:
+    if not tasks:
+        return set()
+    rows = db.execute(
+        select(Task.member_id, Task.title).where(
+            Task.member_id.in_({task.member_id for task in tasks}),
+            Task.title.in_({task.title for task in tasks}),
+            Task.status.in_([TaskStatus.TODO, TaskStatus.DOING]),
+            Task.deleted_at.is_(None),
+        )
+    ).all()
+    return {(row.member_id, row.title) for row in rows}
+
+
+def execute_rule_for_members(
+    db: Session,
+    rule: AutomationRule,
+    members: list[Member],
+    *,
+    gym_instances: dict | None = None,
+) -> list[dict]:
+    """Batch counterpart of ``execute_rule_for_member`` for CREATE_TASK, NOTIFY and queued SEND_WHATSAPP.
+
+    Open tasks of the whole chunk are checked in one query and every row (actions and execution logs) is added
+    without intermediate flushes, so the chunk is written with one batched INSERT per table.
+    """
+    now = datetime.now(tz=timezone.utc)
+    action_type = rule.action_type
+    action_config = rule.action_config
+    results: list[dict] = []
+    rows: list = []
+
+    if action_type == AutomationAction.CREATE_TASK:
+        tasks = [_build_task(action_config, member, _build_template_vars(member)) for member in members]
+        existing = _open_task_keys(db, tasks)
+        for member, task in zip(members, tasks, strict=True):
+            result = {"rule_id": str(rule.id), "member_id": str(member.id), "action": action_type}
+            key = (task.member_id, task.title)
+            if key in existing:
+                result.update(status="skipped", reason="task_already_exists")
+            else:
+                existing.add(key)
+                task.id = uuid4()
+                task.gym_id = member.gym_id
+                rows.append(task)
+                result.update(status="created", task_id=str(task.id))
+            results.append(result)
+
+    elif action_type == AutomationAction.NOTIFY:
+        for member in members:
+            title, message, category = _notification_content(action_config, _build_template_vars(member))
+            notification = create_notification(
+                db,
+                member_id=member.id,
+                user_id=member.assigned_user_id,
+                title=title,
+                message=message,
+                category=category,
+                flush=False,
+            )
+            notification.gym_id = member.gym_id
+            results.append(
+                {
+                    "rule_id": str(rule.id),
+                    "member_id": str(member.id),
+                    "action": action_type,
+                    "status": "notified",
+                    "notification_id": str(notification.id),
+                }
+            )
+
+    elif action_type == AutomationAction.SEND_WHATSAPP:
+        for member in members:
+            result = {"rule_id": str(rule.id), "member_id": str(member.id), "action": action_type}
+            if not member.phone:
+                result.update(status="skipped", reason="no_phone")
+                results.append(result)
+                continue
+            template_name, message = _whatsapp_content(action_config, _build_template_vars(member))
+            log = enqueue_whatsapp_message(
+                db,
+                phone=member.phone,
+                message=message,
+                instance=_resolve_gym_instance(db, member.gym_id, gym_instances),
+                gym_id=member.gym_id,
+                member_id=member.id,
+                automation_rule_id=rule.id,
+                template_name=template_name,
+            )
+            result.update(status=log.status, message_log_id=str(log.id))
+            results.append(result)
+
+    rows.extend(_execution_log(rule, member, result) for member, result in zip(members, results, strict=True))
+    db.add_all(rows)
+    db.flush()
+
+    # Members skipped before acting (no phone, task already open) do not count as executions, as in the per-row path.
+    executed = sum(1 for result in results if "reason" not in result)
+    if executed:
+        rule.executions_count = (rule.executions_count or 0) + executed
+        rule.last_executed_at = now
+        db.add(rule)
+    return results
+
+
+def _execution_log(rule: AutomationRule, member: Member, result: dict) -> AutomationExecutionLog:
+    return AutomationExecutionLog(
+        id=uuid4(),
+        gym_id=rule.gym_id,
+        rule_id=rule.id,
+        member_id=member.id,
+        action_type=rule.action_type,
+        status=result.get("status", "unknown"),
+        details=result,
+    )
+
+
+def _run_rule_in_chunks(
+    db: Session,
+    rule: AutomationRule,
+    members: list[Member],
+    *,
+    gym_instances: dict,
+) -> list[dict]:
+    """Runs the batch path one SAVEPOINT per chunk; a failing chunk is rolled back and logged as errors."""
+    chunk_size = max(int(settings.automation_batch_chunk_size), 1)
+    results: list[dict] = []
+    for start in range(0, len(members), chunk_size):
+        chunk = members[start : start + chunk_size]
+        try:
+            with db.begin_nested():
+                results.extend(execute_rule_for_members(db, rule, chunk, gym_instances=gym_instances))
+        except Exception:
+            logger.exception("Erro ao executar regra %s em lote de %d membros", rule.id, len(chunk))
+            errors = [{"rule_id": str(rule.id), "member_id": str(member.id), "status": "error"} for member in chunk]
+            try:
+                db.add_all([_execution_log(rule, member, error) for member, error in zip(chunk, errors, strict=True)])
+                db.flush()
+            except Exception:
+                logger.exception("Erro ao registrar falha da regra %s em lote de %d membros", rule.id, len(chunk))
+            results.extend(errors)
+    return results
+
+
 def run_automation_rules(db: Session, *, commit: bool = True) -> list[dict]:
     rules = list_automation_rules(db, active_only=True)
     all_results: list[dict] = []
+    gym_instances: dict = {}
 
     for rule in rules:
         if rule.trigger_type == AutomationTrigger.LEAD_STALE:
@@ -239,10 +429,13 @@ def run_automation_rules(db: Session, *, commit: bool = True) -> list[dict]:
                 }
             )
             continue
+        if _supports_batch_execution(rule):
+            all_results.extend(_run_rule_in_chunks(db, rule, members, gym_instances=gym_instances))
+            continue
         for member in members:
             try:
                 with db.begin_nested():  # SAVEPOINT: isolates each member so a failure doesn't corrupt the session
-                    result = execute_rule_for_member(db, rule, member)
+                    result = execute_rule_for_member(db, rule, member, gym_instances=gym_instances)
                     log_entry = AutomationExecutionLog(
                         gym_id=rule.gym_id,
                         rule_id=rule.id,
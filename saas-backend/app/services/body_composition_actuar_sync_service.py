@@ -11,6 +11,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import desc, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.core.circuit_breaker import ProviderUnavailableError
 from app.core.config import settings
 from app.core.distributed_lock import with_distributed_lock
 from app.database import SessionLocal, clear_current_gym_id, include_all_tenants, set_current_gym_id
@@ -1074,6 +1075,12 @@ def _provider_debug_state(provider: object | None) -> dict | None:
 
 
 def _map_unexpected_error(exc: Exception) -> ActuarSyncServiceError:
+    if isinstance(exc, ProviderUnavailableError):
+        return ActuarSyncServiceError(
+            "external_unavailable",
+            f"Sync Actuar adiado: {exc}",
+            retryable=True,
+        )
     raw_code = str(exc).strip()
     if raw_code.startswith("actuar_missing_tab:"):
         tab_name = raw_code.split(":", 1)[1] or "unknown"
@@ -5,12 +5,12 @@ import re
 from datetime import datetime, timezone
 from typing import Any
 
-import anthropic
 from openai import OpenAI
 from pydantic import BaseModel, Field
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, PROVIDER_OPENAI, call_model, get_client
 from app.core.circuit_breaker import claude_circuit_breaker
 from app.core.config import settings
 from app.models import Member
@@ -136,12 +136,8 @@ def generate_body_composition_ai(
                     constraints=constraints,
                     goals=goals,
                 )
-            if provider == "claude":
-                claude_circuit_breaker.record_success()
             return result
         except Exception:
-            if provider == "claude":
-                claude_circuit_breaker.record_failure()
             logger.exception(
                 "Falha ao gerar interpretacao de bioimpedancia com provedor %s. Usando fallback.",
                 provider,
@@ -165,10 +161,7 @@ def _resolve_body_composition_ai_provider() -> str | None:
 
 
 def _create_openai_client() -> OpenAI:
-    return OpenAI(
-        api_key=settings.openai_api_key,
-        timeout=settings.openai_timeout_seconds,
-    )
+    return get_client(PROVIDER_OPENAI, timeout_seconds=settings.openai_timeout_seconds)
 
 
 def _generate_with_openai(
@@ -213,26 +206,31 @@ def _generate_with_openai(
         f"Faixas: {range_summary}\n"
         f"Classificacao objetiva: {classification_summary}\n"
     )
-    client = _create_openai_client()
-    response = client.responses.parse(
+    response = call_model(
+        PROVIDER_OPENAI,
+        "responses.parse",
         model=specialist_model(),
-        input=[
-            {
-                "role": "system",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": specialist_system_prompt("body_composition_coach_v1")
-                        + "\nTambem gere um campo member_friendly_summary obedecendo ao prompt body_composition_student_v1.",
-                    }
-                ],
-            },
-            {
-                "role": "user",
-                "content": [{"type": "input_text", "text": prompt}],
-            },
-        ],
-        text_format=_OpenAIBodyCompositionNarrative,
+        prompt_key="body_composition_coach_v1",
+        client=_create_openai_client(),
+        params=dict(
+            input=[
+                {
+                    "role": "system",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": specialist_system_prompt("body_composition_coach_v1")
+                            + "\nTambem gere um campo member_friendly_summary obedecendo ao prompt body_composition_student_v1.",
+                        }
+                    ],
+                },
+                {
+                    "role": "user",
+                    "content": [{"type": "input_text", "text": prompt}],
+                },
+            ],
+            text_format=_OpenAIBodyCompositionNarrative,
+        ),
     )
     parsed = response.output_parsed
     if parsed is None:
@@ -294,12 +292,16 @@ def _generate_with_claude(
         f"Faixas: {range_summary}\n"
         f"Classificacao objetiva: {classification_summary}\n"
     )
-    client = anthropic.Anthropic(api_key=settings.claude_api_key)
-    response = client.messages.create(
+    response = call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
         model=settings.claude_model,
-        max_tokens=min(max(settings.claude_max_tokens, 600), 700),
-        temperature=0,
-        messages=[{"role": "user", "content": prompt}],
+        prompt_key="body_composition_coach_v1",
+        params={
+            "max_tokens": min(max(settings.claude_max_tokens, 600), 700),
+            "temperature": 0,
+            "messages": [{"role": "user", "content": prompt}],
+        },
     )
     parsed = _parse_claude_json(response.content[0].text.strip())
     normalized = _normalize_ai_payload(parsed)
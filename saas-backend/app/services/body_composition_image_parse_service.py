@@ -6,11 +6,11 @@ import logging
 from datetime import datetime
 from typing import Any
 
-import anthropic
 from fastapi import HTTPException, status
 from openai import OpenAI
 from pydantic import BaseModel, Field
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, PROVIDER_OPENAI, call_model, get_client
 from app.core.circuit_breaker import claude_circuit_breaker
 from app.core.config import settings
 from app.schemas.body_composition import (
@@ -34,6 +34,7 @@ SUPPORTED_MEDIA_TYPES = {
     "image/webp": "image/webp",
 }
 MAX_IMAGE_SIZE_BYTES = 8 * 1024 * 1024
+_VISION_PROMPT_KEY = "body_composition_image_parse"
 KEY_FIELDS = ("weight_kg", "body_fat_kg", "body_fat_percent", "waist_hip_ratio")
 INT_FIELDS = {"physical_age", "health_score"}
 NUMERIC_FIELDS = (
@@ -207,11 +208,7 @@ def parse_body_composition_image(
                 device_profile=normalized_device_profile,
                 local_ocr_result=local_payload,
             )
-        if provider == "claude":
-            claude_circuit_breaker.record_success()
     except Exception:
-        if provider == "claude":
-            claude_circuit_breaker.record_failure()
         logger.exception(
             "Falha na leitura assistida de bioimpedancia com provedor %s. Mantendo OCR local quando possivel.",
             provider or "indisponivel",
@@ -234,10 +231,7 @@ def _resolve_image_ai_provider() -> str | None:
 
 
 def _create_openai_client(*, timeout_seconds: int | None = None) -> OpenAI:
-    return OpenAI(
-        api_key=settings.openai_api_key,
-        timeout=timeout_seconds or settings.openai_timeout_seconds,
-    )
+    return get_client(PROVIDER_OPENAI, timeout_seconds=timeout_seconds or settings.openai_timeout_seconds)
 
 
 def _parse_with_openai_vision(
@@ -254,28 +248,34 @@ def _parse_with_openai_vision(
     )
 
     client = _create_openai_client(timeout_seconds=settings.body_composition_image_ai_timeout_seconds)
-    response = client.chat.completions.create(
+    response = call_model(
+        PROVIDER_OPENAI,
+        "chat.completions.create",
         model=settings.openai_vision_model,
-        temperature=0,
-        response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": "Extraia os dados estruturados de bioimpedancia com alta precisao e sem inventar valores. Responda somente JSON valido.",
-            },
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{media_type};base64,{base64.b64encode(image_bytes).decode('ascii')}",
+        prompt_key=_VISION_PROMPT_KEY,
+        client=client,
+        params=dict(
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Extraia os dados estruturados de bioimpedancia com alta precisao e sem inventar valores. Responda somente JSON valido.",
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{media_type};base64,{base64.b64encode(image_bytes).decode('ascii')}",
+                            },
                         },
-                    },
-                ],
-            },
-        ],
+                    ],
+                },
+            ],
+        ),
     )
     content = response.choices[0].message.content if response.choices else None
     if not content:
@@ -309,30 +309,32 @@ def _parse_with_claude_vision(
         "}\n"
     )
 
-    client = anthropic.Anthropic(
-        api_key=settings.claude_api_key,
-        timeout=settings.body_composition_image_ai_timeout_seconds,
-    )
-    response = client.messages.create(
+    response = call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
         model=settings.claude_vision_model or settings.claude_model,
-        max_tokens=max(settings.claude_max_tokens, 900),
-        temperature=0,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": base64.b64encode(image_bytes).decode("ascii"),
+        prompt_key=_VISION_PROMPT_KEY,
+        timeout_seconds=settings.body_composition_image_ai_timeout_seconds,
+        params=dict(
+            max_tokens=max(settings.claude_max_tokens, 900),
+            temperature=0,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": media_type,
+                                "data": base64.b64encode(image_bytes).decode("ascii"),
+                            },
                         },
-                    },
-                ],
-            }
-        ],
+                    ],
+                }
+            ],
+        ),
     )
     response_text = "\n".join(
         block.text for block in response.content if getattr(block, "type", None) == "text" and getattr(block, "text", None)
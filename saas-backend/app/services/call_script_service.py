@@ -9,6 +9,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.cache import dashboard_cache, make_cache_key
 from app.core.config import settings
 from app.database import SessionLocal, clear_current_gym_id, set_current_gym_id
@@ -44,9 +45,6 @@ def get_call_script(db: Session, lead_id: UUID) -> dict[str, Any]:
         return fallback
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
         prompt = (
             "Voce e um closer de SaaS B2B para academias. "
             "Retorne JSON com opening, qualification_questions, presentation_points, objections, closing e quick_responses. "
@@ -54,11 +52,16 @@ def get_call_script(db: Session, lead_id: UUID) -> dict[str, Any]:
             "quick_responses precisa ter chaves preco, sistema, tempo.\n"
             f"Briefing consolidado: {brief}\n"
         )
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="call_script",
+            params={
+                "max_tokens": settings.claude_max_tokens,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+            },
         )
         parsed = _parse_ai_json(response.content[0].text.strip())
         result = {
@@ -1,4 +1,6 @@
 import base64
+import hashlib
+import json
 import logging
 import socket
 from datetime import datetime, timedelta, timezone
@@ -19,6 +21,9 @@ CORE_ASYNC_JOB_TYPE_LEAD_PROPOSAL_DISPATCH = "lead_proposal_dispatch"
 CORE_ASYNC_JOB_TYPE_NPS_DISPATCH = "nps_dispatch"
 CORE_ASYNC_JOB_TYPE_MONTHLY_REPORTS_DISPATCH = "monthly_reports_dispatch"
 CORE_ASYNC_JOB_TYPE_WHATSAPP_WEBHOOK_SETUP = "whatsapp_webhook_setup"
+CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT = "member_import"
+CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT = "checkin_import"
+CORE_ASYNC_IMPORT_JOB_TYPES = (CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT, CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT)
 _RETRY_DELAYS_MINUTES = (1, 5, 15, 60)
 _STALE_LOCK_AFTER = timedelta(minutes=15)
 
@@ -272,6 +277,55 @@ def enqueue_whatsapp_webhook_setup_job(
     return job, True
 
 
+def enqueue_import_job(
+    db: Session,
+    *,
+    gym_id: UUID,
+    requested_by_user_id: UUID | None,
+    job_type: str,
+    content: bytes,
+    filename: str | None,
+    options: dict[str, Any],
+) -> tuple[CoreAsyncJob, bool]:
+    if job_type not in CORE_ASYNC_IMPORT_JOB_TYPES:
+        raise ValueError(f"Tipo de importacao nao suportado: {job_type}")
+    # The same file sent twice with the same options while the first upload is still queued or running reuses that
+    # job; corrected mappings or flags make a new one.
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content)
+    idempotency_key = f"{job_type}:{digest.hexdigest()}"
+    existing = db.scalar(
+        select(CoreAsyncJob)
+        .where(
+            CoreAsyncJob.gym_id == gym_id,
+            CoreAsyncJob.job_type == job_type,
+            CoreAsyncJob.idempotency_key == idempotency_key,
+            CoreAsyncJob.status.in_(("pending", "processing", "retry_scheduled")),
+        )
+        .order_by(CoreAsyncJob.created_at.asc())
+        .limit(1)
+    )
+    if existing:
+        return existing, False
+
+    job = CoreAsyncJob(
+        gym_id=gym_id,
+        requested_by_user_id=requested_by_user_id,
+        related_entity_type="gym",
+        related_entity_id=gym_id,
+        job_type=job_type,
+        status="pending",
+        payload_json={"filename": filename, **options},
+        payload_blob=base64.b64encode(content).decode("ascii"),
+        idempotency_key=idempotency_key,
+        max_attempts=len(_RETRY_DELAYS_MINUTES) + 1,
+    )
+    db.add(job)
+    db.flush()
+    return job, True
+
+
 def get_core_async_job(db: Session, *, job_id: UUID, gym_id: UUID) -> CoreAsyncJob | None:
     return db.scalar(
         select(CoreAsyncJob).where(
@@ -451,6 +505,8 @@ def _dispatch_core_async_job(db: Session, job: CoreAsyncJob) -> dict[str, Any]:
         return _execute_monthly_reports_dispatch_job(db, job)
     if job.job_type == CORE_ASYNC_JOB_TYPE_WHATSAPP_WEBHOOK_SETUP:
         return _execute_whatsapp_webhook_setup_job(db, job)
+    if job.job_type in CORE_ASYNC_IMPORT_JOB_TYPES:
+        return _execute_import_job(db, job)
     raise CoreAsyncJobNonRetryableError("unsupported_job_type", f"Tipo de job nao suportado: {job.job_type}")
 
 
@@ -542,6 +598,22 @@ def _execute_whatsapp_webhook_setup_job(db: Session, job: CoreAsyncJob) -> dict[
     }
 
 
+def _execute_import_job(db: Session, job: CoreAsyncJob) -> dict[str, Any]:
+    from app.services.import_job_service import execute_import_job
+
+    if not job.payload_blob:
+        raise CoreAsyncJobNonRetryableError("missing_import_payload", "Job de importacao sem arquivo persistido")
+    try:
+        content = base64.b64decode(job.payload_blob.encode("ascii"))
+    except Exception as exc:
+        raise CoreAsyncJobNonRetryableError("invalid_import_payload", "Arquivo da importacao esta corrompido") from exc
+    try:
+        return execute_import_job(db, job, content)
+    except ValueError as exc:
+        # Header, size and mapping problems are in the file itself: retrying would fail the same way.
+        raise CoreAsyncJobNonRetryableError("invalid_import_file", str(exc)) from exc
+
+
 def _record_public_diagnosis_terminal_failure(db: Session, job: CoreAsyncJob, *, error_message: str) -> None:
     from app.services.diagnosis_service import record_public_diagnosis_failure
 
@@ -1,13 +1,22 @@
+import logging
+import time as time_module
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
 from typing import Any
+from uuid import UUID
 
 from pydantic import TypeAdapter
-from sqlalchemy import DateTime, and_, case, func, not_, or_, select
+from sqlalchemy import DateTime, and_, case, func, not_, or_, select, true
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.cache import dashboard_cache, make_cache_key
-from app.database import get_current_gym_id
+from app.core.config import settings
+from app.database import SessionLocal, clear_current_gym_id, get_current_gym_id, set_current_gym_id
 from app.models import (
     AITriageRecommendation,
     Assessment,
@@ -58,10 +67,16 @@ from app.services.analytics_view_service import get_monthly_member_kpis
 from app.services.assessment_intelligence_service import get_assessment_forecast
 from app.services.crm_service import calculate_cac
 from app.services.finance_service import get_finance_foundation_summary, get_monthly_financial_entry_revenue
+from app.services.member_search_service import member_plan_search_condition
 from app.services.nps_service import nps_evolution
 from app.services.preferred_shift_service import preferred_shift_filter_condition
-from app.services.risk import _MIN_RELIABLE_BASELINE_AVG_WEEKLY, _determine_level, _inactivity_points
-from app.services.retention_intelligence_service import build_retention_playbook, classify_churn_type
+from app.services.risk import (
+    _INACTIVITY_POINT_STEPS,
+    _MIN_RELIABLE_BASELINE_AVG_WEEKLY,
+    _determine_level,
+    _inactivity_points,
+)
+from app.services.retention_intelligence_service import build_retention_playbook, classify_churn_type, classify_churn_types
 from app.services.retention_stage_service import (
     RETENTION_STAGE_ATTENTION,
     RETENTION_STAGE_COLD_BASE,
@@ -69,13 +84,17 @@ from app.services.retention_stage_service import (
     RETENTION_STAGE_MONITORING,
     RETENTION_STAGE_REACTIVATION,
     RETENTION_STAGE_RECOVERY,
+    RETENTION_STAGE_META,
     RETENTION_STAGE_ORDER,
     calculate_retention_stage,
     retention_stage_payload,
 )
 from app.utils.birthday import birthday_label_matches_today
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.schemas.member import MemberOut
 
+logger = logging.getLogger(__name__)
+
 
 def _cache_dashboard_payload(cache_key: str, schema: Any, payload: object) -> None:
     adapter = TypeAdapter(schema)
@@ -83,12 +102,121 @@ def _cache_dashboard_payload(cache_key: str, schema: Any, payload: object) -> No
     dashboard_cache.set(cache_key, normalized_payload)
 
 
-def get_executive_dashboard(db: Session) -> ExecutiveDashboard:
-    cache_key = make_cache_key("dashboard_executive")
+DashboardCompute = Callable[[Session], Any]
+
+# Recomputes of stale dashboards run off the request path; two workers keep a burst of
+# expirations from competing with the request pool for database connections.
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard-refresh")
+_PREWARMING: ContextVar[bool] = ContextVar("dashboard_cache_prewarming", default=False)
+_SINGLE_FLIGHT_POLL_SECONDS = 0.05
+
+
+def _read_through_dashboard(db: Session, cache_key: str, schema: Any, compute: DashboardCompute) -> Any:
     cached = dashboard_cache.get(cache_key)
     if cached is not None:
         return cached
+    if settings.dashboard_cache_swr_enabled and not _PREWARMING.get():
+        stale = dashboard_cache.get_stale(cache_key)
+        if stale is not None:
+            _schedule_dashboard_refresh(cache_key, schema, compute)
+            return stale
+        return _compute_dashboard_single_flight(db, cache_key, schema, compute)
+
+    payload = compute(db)
+    _cache_dashboard_payload(cache_key, schema, payload)
+    return payload
+
+
+def _compute_dashboard_single_flight(db: Session, cache_key: str, schema: Any, compute: DashboardCompute) -> Any:
+    """Cold miss: one caller computes while concurrent callers wait briefly for its result."""
+    token = dashboard_cache.acquire_refresh_lock(cache_key, ttl_seconds=settings.dashboard_cache_refresh_lock_seconds)
+    if token is None:
+        deadline = time_module.monotonic() + settings.dashboard_cache_single_flight_wait_ms / 1000
+        while time_module.monotonic() < deadline:
+            time_module.sleep(_SINGLE_FLIGHT_POLL_SECONDS)
+            cached = dashboard_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        # The holder is taking too long (or died); computing here is better than failing the request.
+    try:
+        payload = compute(db)
+        _cache_dashboard_payload(cache_key, schema, payload)
+        return payload
+    finally:
+        if token is not None:
+            dashboard_cache.release_refresh_lock(cache_key, token)
+
+
+def _schedule_dashboard_refresh(cache_key: str, schema: Any, compute: DashboardCompute) -> None:
+    token = dashboard_cache.acquire_refresh_lock(cache_key, ttl_seconds=settings.dashboard_cache_refresh_lock_seconds)
+    if token is None:
+        return
+    try:
+        _refresh_executor.submit(_refresh_dashboard_payload, cache_key, schema, compute, get_current_gym_id(), token)
+    except RuntimeError:
+        dashboard_cache.release_refresh_lock(cache_key, token)
+
+
+def _refresh_dashboard_payload(
+    cache_key: str,
+    schema: Any,
+    compute: DashboardCompute,
+    gym_id: UUID | None,
+    token: str,
+) -> None:
+    db = SessionLocal()
+    try:
+        set_current_gym_id(gym_id)
+        _cache_dashboard_payload(cache_key, schema, compute(db))
+    except Exception:
+        logger.exception("Falha ao recalcular dashboard em segundo plano (%s)", cache_key)
+        db.rollback()
+    finally:
+        clear_current_gym_id()
+        db.close()
+        dashboard_cache.release_refresh_lock(cache_key, token)
+
+
+@contextmanager
+def _prewarming() -> Iterator[None]:
+    marker = _PREWARMING.set(True)
+    try:
+        yield
+    finally:
+        _PREWARMING.reset(marker)
+
+
+def prewarm_dashboard_cache(db: Session) -> dict[str, int]:
+    """Recomputes the default views of the main dashboards for the current gym, so the first
+    request after the nightly pipeline reads a fresh payload instead of paying for the recompute."""
+    warmers: tuple[Callable[[Session], Any], ...] = (
+        get_executive_dashboard,
+        get_operational_dashboard,
+        get_retention_dashboard,
+        get_commercial_dashboard,
+        get_financial_dashboard,
+        get_weekly_summary,
+        get_bi_foundation_dashboard,
+    )
+    warmed = failed = 0
+    with _prewarming():
+        for warm in warmers:
+            try:
+                warm(db)
+                warmed += 1
+            except Exception:
+                logger.exception("Falha ao pre-aquecer dashboard %s", warm.__name__)
+                db.rollback()
+                failed += 1
+    return {"dashboards_warmed": warmed, "dashboards_failed": failed}
 
+
+def get_executive_dashboard(db: Session) -> ExecutiveDashboard:
+    cache_key = make_cache_key("dashboard_executive")
+    return _read_through_dashboard(db, cache_key, ExecutiveDashboard, _compute_executive_dashboard)
+
+
+def _compute_executive_dashboard(db: Session) -> ExecutiveDashboard:
     total_members = db.scalar(select(func.count()).select_from(Member).where(Member.deleted_at.is_(None))) or 0
     active_members = db.scalar(
         select(func.count()).select_from(Member).where(
@@ -123,36 +251,27 @@ def get_executive_dashboard(db: Session) -> ExecutiveDashboard:
         nps_avg=float(nps_avg),
         risk_distribution=risk_distribution,
     )
-    _cache_dashboard_payload(cache_key, ExecutiveDashboard, payload)
     return payload
 
 
 def get_mrr_dashboard(db: Session, months: int = 12) -> list[RevenuePoint]:
     cache_key = make_cache_key("dashboard_mrr", months)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
-    payload = _revenue_series(db, months)
-    _cache_dashboard_payload(cache_key, list[RevenuePoint], payload)
-    return payload
+    return _read_through_dashboard(db, cache_key, list[RevenuePoint], lambda session: _revenue_series(session, months))
 
 
 def get_churn_dashboard(db: Session, months: int = 12) -> list[ChurnPoint]:
     cache_key = make_cache_key("dashboard_churn", months)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
-    payload = _churn_series(db, months)
-    _cache_dashboard_payload(cache_key, list[ChurnPoint], payload)
-    return payload
+    return _read_through_dashboard(db, cache_key, list[ChurnPoint], lambda session: _churn_series(session, months))
 
 
 def get_ltv_dashboard(db: Session, months: int = 12) -> list[LTVPoint]:
     cache_key = make_cache_key("dashboard_ltv", months)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(
+        db, cache_key, list[LTVPoint], lambda session: _compute_ltv_dashboard(session, months)
+    )
 
+
+def _compute_ltv_dashboard(db: Session, months: int = 12) -> list[LTVPoint]:
     materialized = _monthly_member_kpis_rows(db, months)
     if materialized:
         points = []
@@ -161,7 +280,6 @@ def get_ltv_dashboard(db: Session, months: int = 12) -> list[LTVPoint]:
             churn_ratio = max(churn_rate / 100, 0.0001)
             ltv = (row["mrr"] / max(1, row["active"])) / churn_ratio
             points.append(LTVPoint(month=row["month"], ltv=round(ltv, 2)))
-        _cache_dashboard_payload(cache_key, list[LTVPoint], points)
         return points
 
     churn_series = _churn_series(db, months)
@@ -172,16 +290,17 @@ def get_ltv_dashboard(db: Session, months: int = 12) -> list[LTVPoint]:
         ltv = (revenue.value / max(1, _active_members_by_month(db, churn.month))) / churn_rate
         points.append(LTVPoint(month=churn.month, ltv=round(ltv, 2)))
 
-    _cache_dashboard_payload(cache_key, list[LTVPoint], points)
     return points
 
 
 def get_growth_mom_dashboard(db: Session, months: int = 12) -> list[GrowthPoint]:
     cache_key = make_cache_key("dashboard_growth", months)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(
+        db, cache_key, list[GrowthPoint], lambda session: _compute_growth_mom_dashboard(session, months)
+    )
+
 
+def _compute_growth_mom_dashboard(db: Session, months: int = 12) -> list[GrowthPoint]:
     values: list[GrowthPoint] = []
     month_labels = _month_labels(months)
     cumulative_members = _members_joined_cumulative_by_month(db, month_labels)
@@ -195,16 +314,17 @@ def get_growth_mom_dashboard(db: Session, months: int = 12) -> list[GrowthPoint]
         values.append(GrowthPoint(month=label, growth_mom=round(growth, 2)))
         previous = current_total
 
-    _cache_dashboard_payload(cache_key, list[GrowthPoint], values)
     return values
 
 
 def get_operational_dashboard(db: Session, page: int = 1, page_size: int = 20) -> dict:
     cache_key = make_cache_key("dashboard_operational", page, page_size)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(
+        db, cache_key, OperationalDashboard, lambda session: _compute_operational_dashboard(session, page, page_size)
+    )
 
+
+def _compute_operational_dashboard(db: Session, page: int = 1, page_size: int = 20) -> dict:
     now = _utcnow()
     realtime_checkins = db.scalar(
         select(func.count()).select_from(Checkin).where(Checkin.checkin_at >= now - timedelta(hours=1))
@@ -245,7 +365,6 @@ def get_operational_dashboard(db: Session, page: int = 1, page_size: int = 20) -
         "birthday_today_total": len(birthday_today),
         "birthday_today_items": [_member_out_snapshot(member) for member in birthday_today],
     }
-    _cache_dashboard_payload(cache_key, OperationalDashboard, payload)
     return payload
 
 
@@ -295,10 +414,10 @@ def _get_birthday_today_members(db: Session, today: date) -> list[Member]:
 
 def get_commercial_dashboard(db: Session) -> dict:
     cache_key = make_cache_key("dashboard_commercial")
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(db, cache_key, CommercialDashboard, _compute_commercial_dashboard)
 
+
+def _compute_commercial_dashboard(db: Session) -> dict:
     pipeline_rows = db.execute(
         select(Lead.stage, func.count(Lead.id).label("total"))
         .where(Lead.deleted_at.is_(None))
@@ -346,16 +465,15 @@ def get_commercial_dashboard(db: Session) -> dict:
         "stale_leads_total": stale_leads_total,
         "stale_leads": stale_leads,
     }
-    _cache_dashboard_payload(cache_key, CommercialDashboard, payload)
     return payload
 
 
 def get_financial_dashboard(db: Session) -> dict:
     cache_key = make_cache_key("dashboard_financial")
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(db, cache_key, FinancialDashboard, _compute_financial_dashboard)
 
+
+def _compute_financial_dashboard(db: Session) -> dict:
     resolved_gym_id = _resolve_dashboard_gym_id()
     revenue = _revenue_series(db, 12, gym_id=resolved_gym_id)
     summary = get_finance_foundation_summary(db, gym_id=resolved_gym_id) if resolved_gym_id is not None else None
@@ -392,7 +510,6 @@ def get_financial_dashboard(db: Session) -> dict:
             "dre_basic": {"revenue": 0.0, "expenses": 0.0, "net_result": 0.0, "margin_pct": None},
             "data_quality_flags": ["missing_financial_entry_base"],
         }
-        _cache_dashboard_payload(cache_key, FinancialDashboard, payload)
         return payload
 
     payload = {
@@ -410,16 +527,18 @@ def get_financial_dashboard(db: Session) -> dict:
         "dre_basic": summary.dre_basic.model_dump(),
         "data_quality_flags": summary.data_quality_flags,
     }
-    _cache_dashboard_payload(cache_key, FinancialDashboard, payload)
     return payload
 
 
 def get_bi_foundation_dashboard(db: Session, months: int = 6) -> BIFoundationDashboard:
     cache_key = make_cache_key("dashboard_bi_foundation", months)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return BIFoundationDashboard.model_validate(cached)
+    payload = _read_through_dashboard(
+        db, cache_key, BIFoundationDashboard, lambda session: _compute_bi_foundation_dashboard(session, months)
+    )
+    return payload if isinstance(payload, BIFoundationDashboard) else BIFoundationDashboard.model_validate(payload)
 
+
+def _compute_bi_foundation_dashboard(db: Session, months: int = 6) -> BIFoundationDashboard:
     months = max(3, min(months, 12))
     resolved_gym_id = _resolve_dashboard_gym_id()
     cohort = _cohort_points(db, months, gym_id=resolved_gym_id)
@@ -476,7 +595,6 @@ def get_bi_foundation_dashboard(db: Session, months: int = 6) -> BIFoundationDas
         manager_actions=manager_actions,
         data_quality_flags=data_quality_flags,
     )
-    _cache_dashboard_payload(cache_key, BIFoundationDashboard, payload)
     return payload
 
 
@@ -961,8 +1079,9 @@ def _resolve_retention_context_snapshot(
     *,
     include_forecast: bool,
     assessment_member_ids: set | None = None,
+    churn_types: dict | None = None,
 ) -> tuple[str | None, int | None]:
-    churn_type = member.churn_type
+    churn_type = member.churn_type or (churn_types or {}).get(member.id)
     if not churn_type:
         try:
             churn_type = classify_churn_type(db, member)
@@ -1092,12 +1211,55 @@ def _retention_preferred_shift_filter(preferred_shift: str):
     return preferred_shift_filter_condition(Member.preferred_shift, preferred_shift)
 
 
+_RETENTION_STAGE_MIN_DAYS = (
+    (RETENTION_STAGE_COLD_BASE, 60),
+    (RETENTION_STAGE_MANAGER_ESCALATION, 45),
+    (RETENTION_STAGE_REACTIVATION, 30),
+    (RETENTION_STAGE_RECOVERY, 14),
+    (RETENTION_STAGE_ATTENTION, 7),
+)
+
+
+def _retention_reference_at():
+    return func.coalesce(Member.last_checkin_at, func.cast(Member.join_date, DateTime(timezone=True)))
+
+
+def _retention_stage_case(now: datetime):
+    """Espelha calculate_retention_stage em SQL: dias sem check-in >= N equivale a referencia <= agora - N dias."""
+    reference = _retention_reference_at()
+    return case(
+        *[(reference <= now - timedelta(days=min_days), stage) for stage, min_days in _RETENTION_STAGE_MIN_DAYS],
+        else_=RETENTION_STAGE_MONITORING,
+    )
+
+
+def _retention_stage_priority_case(now: datetime):
+    reference = _retention_reference_at()
+    return case(
+        *[
+            (reference <= now - timedelta(days=min_days), RETENTION_STAGE_META[stage].priority)
+            for stage, min_days in _RETENTION_STAGE_MIN_DAYS
+        ],
+        else_=RETENTION_STAGE_META[RETENTION_STAGE_MONITORING].priority,
+    )
+
+
+def _retention_effective_score_expr(now: datetime):
+    """Mesma regra de _effective_retention_severity, para ordenar e paginar no banco."""
+    reference = _retention_reference_at()
+    inactivity_floor = case(
+        *[(reference <= now - timedelta(days=min_days), points) for min_days, points in _INACTIVITY_POINT_STEPS],
+        else_=0,
+    )
+    return func.greatest(func.coalesce(RiskAlert.score, 0), func.coalesce(Member.risk_score, 0), inactivity_floor)
+
+
 def _retention_stage_filter_condition(retention_stage: str | None):
     if not retention_stage:
         return None
 
     now = _utcnow()
-    reference = func.coalesce(Member.last_checkin_at, func.cast(Member.join_date, DateTime(timezone=True)))
+    reference = _retention_reference_at()
     stage_windows = {
         RETENTION_STAGE_MONITORING: (None, 6),
         RETENTION_STAGE_ATTENTION: (7, 13),
@@ -1118,6 +1280,40 @@ def _retention_stage_filter_condition(retention_stage: str | None):
     return and_(*conditions) if conditions else None
 
 
+def _retention_queue_keyset_condition(cursor: str, *, stage_priority, effective_score, sort_name):
+    # Mirrors ORDER BY stage priority DESC, effective score DESC, lower(full_name) ASC, alert id ASC.
+    values = decode_cursor(cursor)
+    try:
+        cursor_priority = int(values["p"])
+        cursor_score = int(values["s"])
+        cursor_name = str(values["n"])
+        cursor_alert_id = UUID(str(values["i"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Cursor invalido") from exc
+    return or_(
+        stage_priority < cursor_priority,
+        and_(stage_priority == cursor_priority, effective_score < cursor_score),
+        and_(stage_priority == cursor_priority, effective_score == cursor_score, sort_name > cursor_name),
+        and_(
+            stage_priority == cursor_priority,
+            effective_score == cursor_score,
+            sort_name == cursor_name,
+            RiskAlert.id > cursor_alert_id,
+        ),
+    )
+
+
+def _encode_retention_queue_cursor(item: RetentionQueueItem) -> str:
+    return encode_cursor(
+        {
+            "p": int(item.retention_stage_priority or 0),
+            "s": int(item.risk_score),
+            "n": item.full_name.lower(),
+            "i": item.alert_id,
+        }
+    )
+
+
 def _extract_retention_cooldown_until(extra_data: dict | None) -> datetime | None:
     if not isinstance(extra_data, dict):
         return None
@@ -1144,15 +1340,15 @@ def get_retention_queue(
     plan_cycle: str | None = None,
     preferred_shift: str | None = None,
     retention_stage: str | None = None,
+    cursor: str | None = None,
     gym_id=None,
 ) -> RetentionQueueResponse:
     resolved_gym_id = _resolve_dashboard_gym_id(gym_id)
     latest_alert_subquery = _latest_open_retention_alert_subquery()
-    level_priority = case(
-        (RiskAlert.level == RiskLevel.RED, 0),
-        (RiskAlert.level == RiskLevel.YELLOW, 1),
-        else_=2,
-    )
+    now = _utcnow()
+    stage_priority = _retention_stage_priority_case(now)
+    effective_score = _retention_effective_score_expr(now)
+    sort_name = func.lower(Member.full_name)
 
     filters = [Member.deleted_at.is_(None)]
     if resolved_gym_id is not None:
@@ -1167,65 +1363,78 @@ def get_retention_queue(
     if preferred_shift_filter is not None:
         filters.append(preferred_shift_filter)
     stage_count_filters = list(filters)
+    selection_filters = []
     retention_stage_filter = _retention_stage_filter_condition(retention_stage)
     if retention_stage_filter is not None:
-        filters.append(retention_stage_filter)
-    if search and search.strip():
-        search_value = f"%{search.strip()}%"
-        filters.append(
-            or_(
-                Member.full_name.ilike(search_value),
-                Member.email.ilike(search_value),
-                Member.plan_name.ilike(search_value),
-            )
+        selection_filters.append(retention_stage_filter)
+    search_filter = member_plan_search_condition(search)
+    if search_filter is not None:
+        selection_filters.append(search_filter)
+    filters.extend(selection_filters)
+
+    # Stage counts ignore search and stage filters; total honours them. One pass yields both.
+    histogram_source = (
+        select(
+            _retention_stage_case(now).label("retention_stage"),
+            (and_(*selection_filters) if selection_filters else true()).label("selected"),
         )
+        .select_from(RiskAlert)
+        .join(latest_alert_subquery, latest_alert_subquery.c.alert_id == RiskAlert.id)
+        .join(Member, Member.id == RiskAlert.member_id)
+        .where(and_(*stage_count_filters))
+        .subquery()
+    )
+    histogram_rows = db.execute(
+        select(
+            histogram_source.c.retention_stage,
+            func.count().label("stage_total"),
+            func.count().filter(histogram_source.c.selected).label("selected_total"),
+        ).group_by(histogram_source.c.retention_stage)
+    ).all()
+    stage_counts = {stage: 0 for stage in RETENTION_STAGE_ORDER}
+    total = 0
+    for row in histogram_rows:
+        if row.retention_stage in stage_counts:
+            stage_counts[row.retention_stage] = int(row.stage_total or 0)
+        total += int(row.selected_total or 0)
 
-    base_stmt = (
+    stmt = (
         select(RiskAlert, Member)
         .join(latest_alert_subquery, latest_alert_subquery.c.alert_id == RiskAlert.id)
         .join(Member, Member.id == RiskAlert.member_id)
         .where(and_(*filters))
+        .order_by(stage_priority.desc(), effective_score.desc(), sort_name.asc(), RiskAlert.id.asc())
     )
-
-    total = int(
-        db.scalar(
-            select(func.count())
-            .select_from(RiskAlert)
-            .join(latest_alert_subquery, latest_alert_subquery.c.alert_id == RiskAlert.id)
-            .join(Member, Member.id == RiskAlert.member_id)
-            .where(and_(*filters))
-        )
-        or 0
-    )
-
-    stage_counts = {stage: 0 for stage in RETENTION_STAGE_ORDER}
-    for stage in RETENTION_STAGE_ORDER:
-        stage_filter = _retention_stage_filter_condition(stage)
-        stage_filters = list(stage_count_filters)
-        if stage_filter is not None:
-            stage_filters.append(stage_filter)
-        stage_counts[stage] = int(
-            db.scalar(
-                select(func.count())
-                .select_from(RiskAlert)
-                .join(latest_alert_subquery, latest_alert_subquery.c.alert_id == RiskAlert.id)
-                .join(Member, Member.id == RiskAlert.member_id)
-                .where(and_(*stage_filters))
+    if cursor:
+        stmt = stmt.where(
+            _retention_queue_keyset_condition(
+                cursor,
+                stage_priority=stage_priority,
+                effective_score=effective_score,
+                sort_name=sort_name,
             )
-            or 0
-        )
-
-    rows = db.execute(
-        base_stmt
-        .order_by(level_priority, RiskAlert.score.desc(), RiskAlert.created_at.asc(), Member.full_name.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-    ).all()
+        ).limit(page_size + 1)
+    else:
+        stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+    rows = db.execute(stmt).all()
+    if cursor:
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+    else:
+        has_more = (page - 1) * page_size + len(rows) < total
 
-    member_ids = [member.id for _, member in rows]
+    members = [member for _, member in rows]
+    member_ids = [member.id for member in members]
     assessment_member_ids = _prefetch_member_ids_with_assessments(db, member_ids)
     last_contact_map = _retention_last_contact_map(db, member_ids)
+    try:
+        churn_types = classify_churn_types(db, [member for member in members if not member.churn_type])
+    except (SQLAlchemyError, LookupError, TypeError, ValueError):
+        # Each item still gets classify_churn_type (or UNKNOWN) in _resolve_retention_context_snapshot.
+        logger.exception("Falha ao classificar churn em lote na fila de retencao (%s membros)", len(members))
+        churn_types = {}
 
+    playbook_cache: dict[tuple[str, str], list[RetentionPlaybookStep]] = {}
     items: list[RetentionQueueItem] = []
     for alert, member in rows:
         churn_type, forecast_60d = _resolve_retention_context_snapshot(
@@ -1233,6 +1442,7 @@ def get_retention_queue(
             member,
             include_forecast=True,
             assessment_member_ids=assessment_member_ids,
+            churn_types=churn_types,
         )
         days_without_checkin = _days_without_checkin(member)
         calculated_retention_stage = calculate_retention_stage(days_without_checkin)
@@ -1244,16 +1454,21 @@ def get_retention_queue(
             days_without_checkin=days_without_checkin,
         )
         normalized_reasons = _normalize_retention_reasons(alert.reasons)
-        playbook = [
-            RetentionPlaybookStep.model_validate(step)
-            for step in build_retention_playbook(
-                db,
-                member,
-                churn_type or ChurnType.UNKNOWN.value,
-                retention_stage=calculated_retention_stage,
-                days_without_checkin=days_without_checkin,
-            )
-        ]
+        # Stage playbooks only vary by stage and churn type, so each pair is built once per page.
+        playbook_key = (calculated_retention_stage, churn_type or ChurnType.UNKNOWN.value)
+        playbook = playbook_cache.get(playbook_key)
+        if playbook is None:
+            playbook = [
+                RetentionPlaybookStep.model_validate(step)
+                for step in build_retention_playbook(
+                    db,
+                    member,
+                    playbook_key[1],
+                    retention_stage=calculated_retention_stage,
+                    days_without_checkin=days_without_checkin,
+                )
+            ]
+            playbook_cache[playbook_key] = playbook
         queue_item = RetentionQueueItem(
             alert_id=str(alert.id),
             member_id=str(member.id),
@@ -1283,29 +1498,29 @@ def get_retention_queue(
             next_action=playbook[0].title if playbook else None,
             reasons=normalized_reasons,
             action_history=alert.action_history or [],
-            playbook_steps=playbook,
+            playbook_steps=list(playbook),
         )
         queue_item.assistant = build_retention_assistant(queue_item)
         items.append(queue_item)
 
-    items.sort(
-        key=lambda item: (
-            -int(item.retention_stage_priority or 0),
-            0 if item.risk_level == RiskLevel.RED else 1 if item.risk_level == RiskLevel.YELLOW else 2,
-            -item.risk_score,
-            item.full_name.lower(),
-        )
+    return RetentionQueueResponse(
+        items=items,
+        total=total,
+        page=page,
+        page_size=page_size,
+        next_cursor=_encode_retention_queue_cursor(items[-1]) if has_more and items else None,
+        stage_counts=stage_counts,
     )
 
-    return RetentionQueueResponse(items=items, total=total, page=page, page_size=page_size, stage_counts=stage_counts)
-
 
 def get_retention_dashboard(db: Session, red_page: int = 1, yellow_page: int = 1, page_size: int = 20) -> dict:
     cache_key = make_cache_key("dashboard_retention", red_page, yellow_page, page_size)
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(
+        db, cache_key, RetentionDashboard, lambda session: _compute_retention_dashboard(session, red_page, yellow_page, page_size)
+    )
+
 
+def _compute_retention_dashboard(db: Session, red_page: int = 1, yellow_page: int = 1, page_size: int = 20) -> dict:
     base_red = (Member.deleted_at.is_(None), Member.risk_level == RiskLevel.RED)
     base_yellow = (Member.deleted_at.is_(None), Member.risk_level == RiskLevel.YELLOW)
 
@@ -1389,16 +1604,15 @@ def get_retention_dashboard(db: Session, red_page: int = 1, yellow_page: int = 1
         "churn_distribution": churn_distribution,
         "last_contact_map": last_contact_map,
     }
-    _cache_dashboard_payload(cache_key, RetentionDashboard, payload)
     return payload
 
 
 def get_weekly_summary(db: Session) -> WeeklySummary:
     cache_key = make_cache_key("dashboard_weekly_summary")
-    cached = dashboard_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    return _read_through_dashboard(db, cache_key, WeeklySummary, _compute_weekly_summary)
+
 
+def _compute_weekly_summary(db: Session) -> WeeklySummary:
     now = _utcnow()
     week_ago = now - timedelta(days=7)
     two_weeks_ago = now - timedelta(days=14)
@@ -1460,7 +1674,6 @@ def get_weekly_summary(db: Session) -> WeeklySummary:
         mrr_at_risk=float(mrr_at_risk),
         total_active=total_active,
     )
-    _cache_dashboard_payload(cache_key, WeeklySummary, payload)
     return payload
 
 
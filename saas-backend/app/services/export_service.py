@@ -1,145 +1,217 @@
 import csv
+import zlib
+from collections.abc import Iterable, Iterator
 from datetime import date, datetime, time, timezone
 from io import BytesIO, StringIO
+from typing import Any
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
+from app.database import include_all_tenants
 from app.models import Checkin, Member
+from app.utils.batching import iter_streamed_batches
 
 _CSV_FORMULA_PREFIXES = ("=", "+", "-", "@")
+_EXPORT_BATCH_SIZE = 1000
+# gzip container (wbits 16 + 15) at a fast level: exports are compressed while they stream.
+_GZIP_WBITS = 31
+_GZIP_LEVEL = 6
 
+MEMBER_EXPORT_HEADERS = [
+    "id",
+    "full_name",
+    "email",
+    "phone",
+    "plan_name",
+    "monthly_fee",
+    "join_date",
+    "status",
+    "preferred_shift",
+    "nps_last_score",
+    "loyalty_months",
+    "risk_score",
+    "risk_level",
+    "last_checkin_at",
+    "external_id",
+]
+CHECKIN_EXPORT_HEADERS = [
+    "id",
+    "member_id",
+    "member_name",
+    "member_email",
+    "member_external_id",
+    "checkin_at",
+    "source",
+    "hour_bucket",
+    "weekday",
+    "nome",
+    "email",
+    "matricula",
+    "data_checkin",
+    "hora",
+    "origem",
+]
 
-def export_members_csv(db: Session) -> tuple[BytesIO, str]:
-    members = list(
-        db.scalars(
-            select(Member)
-            .where(Member.deleted_at.is_(None))
-            .order_by(Member.full_name.asc())
-        ).all()
-    )
+# Position of the last exported row: (sort value, id). Exports resume strictly after it.
+ExportResumeKey = tuple[Any, UUID]
 
-    headers = [
-        "id",
-        "full_name",
-        "email",
-        "phone",
-        "plan_name",
-        "monthly_fee",
-        "join_date",
-        "status",
-        "preferred_shift",
-        "nps_last_score",
-        "loyalty_months",
-        "risk_score",
-        "risk_level",
-        "last_checkin_at",
-        "external_id",
-    ]
 
-    rows: list[dict[str, str]] = []
-    for member in members:
-        extra_data = member.extra_data or {}
-        rows.append(
-            {
-                "id": str(member.id),
-                "full_name": member.full_name,
-                "email": member.email or "",
-                "phone": member.phone or "",
-                "plan_name": member.plan_name,
-                "monthly_fee": f"{member.monthly_fee:.2f}",
-                "join_date": member.join_date.isoformat(),
-                "status": member.status.value,
-                "preferred_shift": member.preferred_shift or "",
-                "nps_last_score": str(member.nps_last_score),
-                "loyalty_months": str(member.loyalty_months),
-                "risk_score": str(member.risk_score),
-                "risk_level": member.risk_level.value,
-                "last_checkin_at": member.last_checkin_at.isoformat() if member.last_checkin_at else "",
-                "external_id": str(extra_data.get("external_id") or ""),
-            }
+def members_export_filename(*, compress: bool = False) -> str:
+    return _with_extension(f"members_export_{date.today().isoformat()}", compress)
+
+
+def checkins_export_filename(
+    *,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    compress: bool = False,
+) -> str:
+    suffix = date.today().isoformat()
+    if date_from or date_to:
+        from_part = date_from.isoformat() if date_from else "start"
+        to_part = date_to.isoformat() if date_to else "today"
+        suffix = f"{from_part}_to_{to_part}"
+    return _with_extension(f"checkins_export_{suffix}", compress)
+
+
+def resolve_member_export_resume_key(db: Session, member_id: UUID) -> ExportResumeKey | None:
+    """Sort position of an exported member row, or None when the member is no longer exported."""
+    full_name = db.scalar(select(Member.full_name).where(Member.id == member_id, Member.deleted_at.is_(None)))
+    return (full_name, member_id) if full_name is not None else None
+
+
+def resolve_checkin_export_resume_key(db: Session, checkin_id: UUID) -> ExportResumeKey | None:
+    checkin_at = db.scalar(select(Checkin.checkin_at).where(Checkin.id == checkin_id))
+    return (checkin_at, checkin_id) if checkin_at is not None else None
+
+
+def iter_members_csv(
+    db: Session,
+    *,
+    gym_id: UUID,
+    resume_after: ExportResumeKey | None = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Streams the members export as encoded CSV chunks, ``_EXPORT_BATCH_SIZE`` rows at a time.
+
+    Rows come from one server-side cursor over a column projection, in ``(full_name, id)`` order. A resumed
+    export (``resume_after``) starts after that row and has no header, so it can be appended to the partial file.
+    The query is filtered on ``gym_id`` itself: the response body is produced chunk by chunk in the threadpool, where
+    the request's tenant ContextVar is not guaranteed to be set.
+    """
+    stmt = (
+        select(
+            Member.id,
+            Member.full_name,
+            Member.email,
+            Member.phone,
+            Member.plan_name,
+            Member.monthly_fee,
+            Member.join_date,
+            Member.status,
+            Member.preferred_shift,
+            Member.nps_last_score,
+            Member.loyalty_months,
+            Member.risk_score,
+            Member.risk_level,
+            Member.last_checkin_at,
+            Member.extra_data["external_id"].astext.label("external_id"),
         )
+        .where(Member.gym_id == gym_id, Member.deleted_at.is_(None))
+        .order_by(Member.full_name.asc(), Member.id.asc())
+    )
+    if resume_after is not None:
+        stmt = stmt.where(tuple_(Member.full_name, Member.id) > tuple_(*resume_after))
+    stmt = include_all_tenants(stmt, reason="exports.members_csv")
+
+    def _row(member) -> list[str]:
+        return [
+            str(member.id),
+            member.full_name,
+            member.email or "",
+            member.phone or "",
+            member.plan_name,
+            f"{member.monthly_fee:.2f}",
+            member.join_date.isoformat(),
+            member.status.value,
+            member.preferred_shift or "",
+            str(member.nps_last_score),
+            str(member.loyalty_months),
+            str(member.risk_score),
+            member.risk_level.value,
+            member.last_checkin_at.isoformat() if member.last_checkin_at else "",
+            member.external_id or "",
+        ]
 
-    buffer = _dict_rows_to_csv(headers, rows)
-    filename = f"members_export_{date.today().isoformat()}.csv"
-    return buffer, filename
+    batches = iter_streamed_batches(db, stmt, batch_size=_EXPORT_BATCH_SIZE)
+    rows = (_row(member) for batch in batches for member in batch)
+    return _iter_csv_chunks(MEMBER_EXPORT_HEADERS, rows, header=resume_after is None, compress=compress)
 
 
-def export_checkins_csv(
+def iter_checkins_csv(
     db: Session,
     *,
+    gym_id: UUID,
     date_from: date | None = None,
     date_to: date | None = None,
-) -> tuple[BytesIO, str]:
+    resume_after: ExportResumeKey | None = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Streams the check-ins export, newest first in ``(checkin_at, id)`` order; see ``iter_members_csv``."""
     stmt = (
-        select(Checkin, Member)
+        select(
+            Checkin.id,
+            Checkin.checkin_at,
+            Checkin.source,
+            Checkin.hour_bucket,
+            Checkin.weekday,
+            Member.id.label("member_id"),
+            Member.full_name,
+            Member.email,
+            Member.extra_data["external_id"].astext.label("external_id"),
+        )
         .join(Member, Member.id == Checkin.member_id)
-        .where(Member.deleted_at.is_(None))
+        .where(Checkin.gym_id == gym_id, Member.gym_id == gym_id, Member.deleted_at.is_(None))
+        .order_by(Checkin.checkin_at.desc(), Checkin.id.desc())
     )
-
     if date_from:
-        start_dt = datetime.combine(date_from, time.min, tzinfo=timezone.utc)
-        stmt = stmt.where(Checkin.checkin_at >= start_dt)
+        stmt = stmt.where(Checkin.checkin_at >= datetime.combine(date_from, time.min, tzinfo=timezone.utc))
     if date_to:
-        end_dt = datetime.combine(date_to, time.max, tzinfo=timezone.utc)
-        stmt = stmt.where(Checkin.checkin_at <= end_dt)
-
-    rows_db = list(db.execute(stmt.order_by(Checkin.checkin_at.desc())).all())
-
-    headers = [
-        "id",
-        "member_id",
-        "member_name",
-        "member_email",
-        "member_external_id",
-        "checkin_at",
-        "source",
-        "hour_bucket",
-        "weekday",
-        "nome",
-        "email",
-        "matricula",
-        "data_checkin",
-        "hora",
-        "origem",
-    ]
+        stmt = stmt.where(Checkin.checkin_at <= datetime.combine(date_to, time.max, tzinfo=timezone.utc))
+    if resume_after is not None:
+        stmt = stmt.where(tuple_(Checkin.checkin_at, Checkin.id) < tuple_(*resume_after))
+    stmt = include_all_tenants(stmt, reason="exports.checkins_csv")
 
-    rows: list[dict[str, str]] = []
-    for checkin, member in rows_db:
-        extra_data = member.extra_data or {}
+    def _row(checkin) -> list[str]:
         checkin_at = checkin.checkin_at
         if checkin_at.tzinfo is None:
             checkin_at = checkin_at.replace(tzinfo=timezone.utc)
         source = checkin.source.value
-        origem = "catraca" if source == "turnstile" else source
-        rows.append(
-            {
-                "id": str(checkin.id),
-                "member_id": str(member.id),
-                "member_name": member.full_name,
-                "member_email": member.email or "",
-                "member_external_id": str(extra_data.get("external_id") or ""),
-                "checkin_at": checkin_at.isoformat(),
-                "source": source,
-                "hour_bucket": str(checkin.hour_bucket),
-                "weekday": str(checkin.weekday),
-                # Compatibility aliases used by turnstile spreadsheets/imports.
-                "nome": member.full_name,
-                "email": member.email or "",
-                "matricula": str(extra_data.get("external_id") or ""),
-                "data_checkin": checkin_at.date().isoformat(),
-                "hora": checkin_at.strftime("%H:%M:%S"),
-                "origem": origem,
-            }
-        )
+        external_id = checkin.external_id or ""
+        return [
+            str(checkin.id),
+            str(checkin.member_id),
+            checkin.full_name,
+            checkin.email or "",
+            external_id,
+            checkin_at.isoformat(),
+            source,
+            str(checkin.hour_bucket),
+            str(checkin.weekday),
+            # Compatibility aliases used by turnstile spreadsheets/imports.
+            checkin.full_name,
+            checkin.email or "",
+            external_id,
+            checkin_at.date().isoformat(),
+            checkin_at.strftime("%H:%M:%S"),
+            "catraca" if source == "turnstile" else source,
+        ]
 
-    suffix = date.today().isoformat()
-    if date_from or date_to:
-        from_part = date_from.isoformat() if date_from else "start"
-        to_part = date_to.isoformat() if date_to else "today"
-        suffix = f"{from_part}_to_{to_part}"
-    filename = f"checkins_export_{suffix}.csv"
-    return _dict_rows_to_csv(headers, rows), filename
+    batches = iter_streamed_batches(db, stmt, batch_size=_EXPORT_BATCH_SIZE)
+    rows = (_row(checkin) for batch in batches for checkin in batch)
+    return _iter_csv_chunks(CHECKIN_EXPORT_HEADERS, rows, header=resume_after is None, compress=compress)
 
 
 def export_members_template_csv() -> tuple[BytesIO, str]:
@@ -176,6 +248,51 @@ def export_checkins_template_csv() -> tuple[BytesIO, str]:
     return _dict_rows_to_csv(headers, rows), "template_checkins.csv"
 
 
+def _iter_csv_chunks(
+    headers: list[str],
+    rows: Iterable[list[str]],
+    *,
+    header: bool,
+    compress: bool,
+) -> Iterator[bytes]:
+    """Encodes ``rows`` into CSV chunks of ``_EXPORT_BATCH_SIZE`` rows; only one chunk is held in memory.
+
+    The header (with the UTF-8 BOM spreadsheets expect) is yielded before the first row is fetched. With
+    ``compress`` the chunks form one gzip stream, sync-flushed per chunk so the download never stalls.
+    """
+    stream = StringIO(newline="")
+    writer = csv.writer(stream)
+    compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS) if compress else None
+
+    def _drain(prefix: str = "") -> bytes:
+        payload = (prefix + stream.getvalue()).encode("utf-8")
+        stream.seek(0)
+        stream.truncate()
+        if compressor is None:
+            return payload
+        return compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if header:
+        writer.writerow(headers)
+        yield _drain("\ufeff")
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_safe_text(value) for value in row])
+        pending += 1
+        if pending >= _EXPORT_BATCH_SIZE:
+            yield _drain()
+            pending = 0
+    if pending:
+        yield _drain()
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def _with_extension(stem: str, compress: bool) -> str:
+    return f"{stem}.csv.gz" if compress else f"{stem}.csv"
+
+
 def _dict_rows_to_csv(headers: list[str], rows: list[dict[str, str]]) -> BytesIO:
     stream = StringIO(newline="")
     writer = csv.DictWriter(stream, fieldnames=headers)
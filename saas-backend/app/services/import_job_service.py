@@ -0,0 +1,128 @@
+"""Background execution of member and check-in imports queued as ``CoreAsyncJob``s.
+
+The file is processed in chunks of ``settings.import_job_chunk_size`` rows, each committed in its own transaction
+together with the job's progress. A retried or reclaimed job resumes after the last committed row.
+"""
+
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import CoreAsyncJob
+from app.schemas import ImportSummary
+from app.services.audit_service import log_audit_event
+from app.services.core_async_job_service import CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT, CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT
+from app.services.import_service import count_import_rows, import_checkins_in_chunks, import_members_in_chunks
+
+
+# Keeps result_json small for files with many bad rows; the total is still reported.
+_MAX_STORED_ERRORS = 200
+_MAX_STORED_PROVISIONAL_MEMBERS = 200
+
+_SUMMARY_COUNTERS = (
+    "imported",
+    "updated_existing",
+    "skipped_duplicates",
+    "ignored_rows",
+    "provisional_members_created",
+)
+
+
+def _empty_progress(total_rows: int) -> dict[str, Any]:
+    return {
+        "total_rows": total_rows,
+        "rows_processed": 0,
+        "checkpoint_row": 0,
+        "chunks_committed": 0,
+        "errors_total": 0,
+        "summary": ImportSummary(imported=0, skipped_duplicates=0).model_dump(mode="json"),
+    }
+
+
+def merge_import_summary(total: dict[str, Any], chunk: ImportSummary) -> dict[str, Any]:
+    """Adds one chunk's summary to the accumulated (JSON) summary of the job."""
+    merged = dict(total)
+    for counter in _SUMMARY_COUNTERS:
+        merged[counter] = int(merged.get(counter) or 0) + getattr(chunk, counter)
+
+    provisional = list(merged.get("provisional_members") or [])
+    merged["provisional_members"] = (provisional + chunk.provisional_members)[:_MAX_STORED_PROVISIONAL_MEMBERS]
+
+    errors = list(merged.get("errors") or [])
+    room = max(_MAX_STORED_ERRORS - len(errors), 0)
+    merged["errors"] = errors + [entry.model_dump(mode="json") for entry in chunk.errors[:room]]
+
+    missing = {entry["name"]: dict(entry) for entry in merged.get("missing_members") or []}
+    for entry in chunk.missing_members:
+        current = missing.setdefault(
+            entry.name,
+            {"name": entry.name, "occurrences": 0, "sample_plan": entry.sample_plan},
+        )
+        current["occurrences"] += entry.occurrences
+    merged["missing_members"] = sorted(missing.values(), key=lambda item: (-item["occurrences"], item["name"]))
+    return merged
+
+
+def execute_import_job(db: Session, job: CoreAsyncJob, content: bytes) -> dict[str, Any]:
+    options = dict(job.payload_json or {})
+    filename = options.get("filename")
+    progress = dict(job.result_json or {})
+    if "checkpoint_row" not in progress:
+        progress = _empty_progress(count_import_rows(content, filename=filename))
+
+    def _checkpoint(last_row_number: int, rows_in_chunk: int, chunk_summary: ImportSummary) -> None:
+        progress["checkpoint_row"] = last_row_number
+        progress["rows_processed"] += rows_in_chunk
+        progress["chunks_committed"] += 1
+        progress["errors_total"] += len(chunk_summary.errors)
+        progress["summary"] = merge_import_summary(progress["summary"], chunk_summary)
+        job.result_json = dict(progress)
+        # Each chunk doubles as a heartbeat so long imports are not reclaimed as stale.
+        job.locked_at = datetime.now(tz=timezone.utc)
+        db.add(job)
+
+    common = {
+        "filename": filename,
+        "column_mappings": options.get("column_mappings") or {},
+        "ignored_columns": options.get("ignored_columns") or [],
+        "resume_after_row": int(progress["checkpoint_row"]),
+        "chunk_size": settings.import_job_chunk_size,
+        "checkpoint": _checkpoint,
+    }
+    if job.job_type == CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT:
+        import_members_in_chunks(db, content, **common)
+        action, entity = "import_members_csv", "members"
+    elif job.job_type == CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT:
+        import_checkins_in_chunks(
+            db,
+            content,
+            auto_create_missing_members=bool(options.get("auto_create_missing_members")),
+            **common,
+        )
+        action, entity = "import_checkins_csv", "checkins"
+    else:
+        raise ValueError(f"Tipo de importacao nao suportado: {job.job_type}")
+
+    summary = progress["summary"]
+    log_audit_event(
+        db,
+        action=action,
+        entity=entity,
+        gym_id=job.gym_id,
+        entity_id=job.id,
+        details={
+            "job_id": str(job.id),
+            "requested_by_user_id": str(job.requested_by_user_id) if job.requested_by_user_id else None,
+            "imported": summary["imported"],
+            "updated_existing": summary["updated_existing"],
+            "duplicates": summary["skipped_duplicates"],
+            "ignored_rows": summary["ignored_rows"],
+            "provisional_members_created": summary["provisional_members_created"],
+            "errors": progress["errors_total"],
+        },
+    )
+    # The upload is only needed to resume; drop it once every row is committed.
+    job.payload_blob = None
+    return progress
@@ -4,18 +4,38 @@ import re
 import unicodedata
 import zipfile
 from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from datetime import date, datetime, time, timedelta, timezone
 from difflib import get_close_matches
+from typing import NamedTuple
 
 from dateutil.relativedelta import relativedelta
 from defusedxml import ElementTree as ET
 from decimal import Decimal, InvalidOperation
-from uuid import UUID
-
-from sqlalchemy import select, tuple_
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    MetaData,
+    SmallInteger,
+    Table,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID, insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
 
 from app.core.cache import invalidate_dashboard_cache
+from app.core.config import settings
 from app.models import Assessment, AssessmentAppointment, Checkin, CheckinSource, Member, MemberStatus, RoleEnum, User
 from app.schemas import (
     ImportErrorEntry,
@@ -25,6 +45,7 @@ from app.schemas import (
     ImportSummary,
     MissingMemberEntry,
 )
+from app.services.ai_triage_sync_service import DIRTY_REASON_CHECKIN, mark_ai_triage_members_dirty
 from app.services.onboarding_service import create_import_playbook_tasks_for_member
 from app.services.assessment_appointment_service import (
     apply_assessment_appointment_operational_effects,
@@ -33,6 +54,8 @@ from app.services.assessment_appointment_service import (
 )
 from app.services.preferred_shift_service import normalize_preferred_shift, sync_preferred_shifts_from_checkins
 from app.services.risk import refresh_member_risk_snapshot
+from app.services.risk_schedule_service import RISK_REASON_CHECKIN, mark_risk_inputs_changed
+from app.utils.batching import iter_keyset_batches
 from app.utils.encryption import decrypt_cpf, encrypt_cpf
 
 
@@ -175,6 +198,8 @@ _PLAN_CYCLE_CLEANUP_PATTERN = re.compile(
 
 
 _IMPORT_BATCH_SIZE = 500
+# checkpoint(last_row_number, rows_in_chunk, chunk_summary): runs inside each chunk's transaction, before the commit.
+ImportCheckpoint = Callable[[int, int, ImportSummary], None]
 _IMPORT_PREVIEW_SAMPLE_LIMIT = 5
 _IMPORT_ONBOARDING_WINDOW_DAYS = 30
 _MAX_IMPORT_ROWS = 25_000
@@ -1202,99 +1227,154 @@ def preview_assessment_appointments_csv(
     )
 
 
-def import_members_csv(
+@dataclass
+class _MemberImportState:
+    mappings: dict[str, str]
+    ignored: set[str]
+    lookup: dict[str, dict]
+    seen_emails: set[str] = field(default_factory=set)
+    seen_external_ids: set[str] = field(default_factory=set)
+    seen_cpfs: set[str] = field(default_factory=set)
+    errors: list[ImportErrorEntry] = field(default_factory=list)
+    imported: int = 0
+    updated_existing: int = 0
+    duplicates: int = 0
+    touched_members: list[Member] = field(default_factory=list)
+    indexed: bool = False
+    chunk_matches: dict[int, "Member | _MemberIndexEntry"] = field(default_factory=dict)
+    loaded_members: dict[UUID, Member] = field(default_factory=dict)
+
+    def start_chunk(self) -> None:
+        """Resets the per-chunk counters; lookups and in-file dedupe keys carry over between chunks."""
+        self.errors, self.touched_members = [], []
+        self.imported = self.updated_existing = self.duplicates = 0
+
+    def summary(self) -> ImportSummary:
+        return ImportSummary(
+            imported=self.imported,
+            updated_existing=self.updated_existing,
+            skipped_duplicates=self.duplicates,
+            ignored_rows=0,
+            errors=self.errors,
+        )
+
+
+def _start_member_import(
     db: Session,
-    csv_content: bytes,
-    filename: str | None = None,
-    *,
-    column_mappings: dict[str, str] | None = None,
-    ignored_columns: list[str] | None = None,
-) -> ImportSummary:
-    errors: list[ImportErrorEntry] = []
-    duplicates = 0
-    imported = 0
-    updated_existing = 0
-    pending_count = 0
-    touched_members: list[Member] = []
+    column_mappings: dict[str, str] | None,
+    ignored_columns: list[str] | None,
+) -> _MemberImportState:
     normalized_mappings, normalized_ignored = _normalize_mapping_inputs(
         column_mappings,
         ignored_columns,
         _MEMBER_MAPPING_TARGETS,
     )
     _validate_mapping_commit(normalized_mappings)
-
+    if settings.import_bulk_upsert_enabled:
+        return _MemberImportState(
+            mappings=normalized_mappings,
+            ignored=normalized_ignored,
+            lookup=_load_member_index(db),
+            indexed=True,
+        )
     existing_members = list(db.scalars(select(Member).where(Member.deleted_at.is_(None))).all())
-    lookup = _build_member_lookups(existing_members)
-    seen_emails: set[str] = set()
-    seen_external_ids: set[str] = set()
-    seen_cpfs: set[str] = set()
+    return _MemberImportState(
+        mappings=normalized_mappings,
+        ignored=normalized_ignored,
+        lookup=_build_member_lookups(existing_members),
+    )
 
-    for row_number, row in _iter_rows(csv_content, filename=filename):
-        mapped_row = _apply_column_mapping(row, normalized_mappings, normalized_ignored)
-        full_name = _extract_member_name(mapped_row)
-        if not full_name:
-            errors.append(ImportErrorEntry(row_number=row_number, reason="Nome ausente", payload=mapped_row))
+
+def _prefetch_chunk_members(db: Session, state: _MemberImportState, rows: list[tuple[int, dict[str, str]]]) -> None:
+    """Resolves a chunk against the member index and loads every matched member with one query."""
+    if not state.indexed:
+        return
+    matches: dict[int, Member | _MemberIndexEntry] = {}
+    for row_number, row in rows:
+        mapped_row = _apply_column_mapping(row, state.mappings, state.ignored)
+        if not _extract_member_name(mapped_row):
             continue
+        match = _resolve_member_from_row(mapped_row, state.lookup)
+        if match is not None:
+            matches[row_number] = match
+    member_ids = {match.id for match in matches.values() if isinstance(match, _MemberIndexEntry)}
+    state.chunk_matches = matches
+    state.loaded_members = (
+        {member.id: member for member in db.scalars(select(Member).where(Member.id.in_(member_ids))).all()}
+        if member_ids
+        else {}
+    )
 
-        email = _truncate(((_pick_first(mapped_row, EMAIL_KEYS) or "").lower() or None), _MAX_MEMBER_EMAIL)
-        external_id = _normalize_external_id(_pick_first(mapped_row, EXTERNAL_ID_KEYS))
-        cpf_digits = _digits(_pick_first(mapped_row, CPF_KEYS))
 
-        if email and email in seen_emails:
-            duplicates += 1
-            continue
-        if external_id and external_id in seen_external_ids:
-            duplicates += 1
-            continue
-        if cpf_digits and cpf_digits in seen_cpfs:
-            duplicates += 1
-            continue
+def _resolve_import_member(
+    db: Session,
+    state: _MemberImportState,
+    row_number: int,
+    mapped_row: dict[str, str],
+) -> Member | None:
+    # Rows left unmatched by the prefetch are resolved again: an earlier row of the chunk may have created the member.
+    match = state.chunk_matches.pop(row_number, None) or _resolve_member_from_row(mapped_row, state.lookup)
+    if match is None or isinstance(match, Member):
+        return match
+    return state.loaded_members.get(match.id) or db.get(Member, match.id)
+
+
+def _import_member_row(db: Session, state: _MemberImportState, row_number: int, row: dict[str, str]) -> bool:
+    """Applies one import row; returns True when it staged a member write in the session."""
+    mapped_row = _apply_column_mapping(row, state.mappings, state.ignored)
+    full_name = _extract_member_name(mapped_row)
+    if not full_name:
+        state.errors.append(ImportErrorEntry(row_number=row_number, reason="Nome ausente", payload=mapped_row))
+        return False
 
-        monthly_fee_raw = _pick_first(mapped_row, MONTHLY_FEE_KEYS)
-        join_date_raw = _pick_first(mapped_row, JOIN_DATE_KEYS)
-        try:
-            monthly_fee = _parse_decimal(monthly_fee_raw)
-            canonical_join_date = _parse_date(join_date_raw)
-            join_date = canonical_join_date or datetime.now(tz=timezone.utc).date()
-            last_checkin_at = _parse_datetime(_pick_first(mapped_row, LAST_ACCESS_KEYS))
-        except ValueError:
-            errors.append(
-                ImportErrorEntry(
-                    row_number=row_number,
-                    reason="Formato invalido de valor/data",
-                    payload=mapped_row,
-                )
-            )
-            continue
+    email = _truncate(((_pick_first(mapped_row, EMAIL_KEYS) or "").lower() or None), _MAX_MEMBER_EMAIL)
+    external_id = _normalize_external_id(_pick_first(mapped_row, EXTERNAL_ID_KEYS))
+    cpf_digits = _digits(_pick_first(mapped_row, CPF_KEYS))
 
-        existing_member = _resolve_member_from_row(mapped_row, lookup)
-        if existing_member:
-            if _refresh_existing_member_from_import_row(
-                existing_member,
-                mapped_row,
-                email=email,
-                external_id=external_id,
-                cpf_digits=cpf_digits,
-                monthly_fee=monthly_fee,
-                join_date=join_date,
-                last_checkin_at=last_checkin_at,
-            ):
-                db.add(existing_member)
-                pending_count += 1
-                touched_members.append(existing_member)
-            _add_member_to_lookups(existing_member, lookup)
-            updated_existing += 1
-            if email:
-                seen_emails.add(email)
-            if external_id:
-                seen_external_ids.add(external_id)
-            if cpf_digits:
-                seen_cpfs.add(cpf_digits)
-            if pending_count >= _IMPORT_BATCH_SIZE:
-                db.commit()
-                pending_count = 0
-            continue
+    if (
+        (email and email in state.seen_emails)
+        or (external_id and external_id in state.seen_external_ids)
+        or (cpf_digits and cpf_digits in state.seen_cpfs)
+    ):
+        state.duplicates += 1
+        return False
+
+    monthly_fee_raw = _pick_first(mapped_row, MONTHLY_FEE_KEYS)
+    join_date_raw = _pick_first(mapped_row, JOIN_DATE_KEYS)
+    try:
+        monthly_fee = _parse_decimal(monthly_fee_raw)
+        canonical_join_date = _parse_date(join_date_raw)
+        join_date = canonical_join_date or datetime.now(tz=timezone.utc).date()
+        last_checkin_at = _parse_datetime(_pick_first(mapped_row, LAST_ACCESS_KEYS))
+    except ValueError:
+        state.errors.append(
+            ImportErrorEntry(
+                row_number=row_number,
+                reason="Formato invalido de valor/data",
+                payload=mapped_row,
+            )
+        )
+        return False
 
+    staged = False
+    existing_member = _resolve_import_member(db, state, row_number, mapped_row)
+    if existing_member:
+        if _refresh_existing_member_from_import_row(
+            existing_member,
+            mapped_row,
+            email=email,
+            external_id=external_id,
+            cpf_digits=cpf_digits,
+            monthly_fee=monthly_fee,
+            join_date=join_date,
+            last_checkin_at=last_checkin_at,
+        ):
+            db.add(existing_member)
+            state.touched_members.append(existing_member)
+            staged = True
+        _add_member_to_lookups(existing_member, state.lookup)
+        state.updated_existing += 1
+    else:
         plan_name, plan_cycle, plan_cycle_source = _extract_plan_metadata(mapped_row, join_date=join_date)
         extra_data: dict = {"imported": True}
         if external_id:
@@ -1321,125 +1401,187 @@ def import_members_csv(
         if _should_create_import_onboarding(canonical_join_date):
             db.flush()
             create_import_playbook_tasks_for_member(db, member, commit=False)
-        imported += 1
-        pending_count += 1
-        touched_members.append(member)
-        _add_member_to_lookups(member, lookup)
+        state.imported += 1
+        state.touched_members.append(member)
+        _add_member_to_lookups(member, state.lookup)
+        staged = True
 
-        if email:
-            seen_emails.add(email)
-        if external_id:
-            seen_external_ids.add(external_id)
-        if cpf_digits:
-            seen_cpfs.add(cpf_digits)
+    if email:
+        state.seen_emails.add(email)
+    if external_id:
+        state.seen_external_ids.add(external_id)
+    if cpf_digits:
+        state.seen_cpfs.add(cpf_digits)
+    return staged
 
-        if pending_count >= _IMPORT_BATCH_SIZE:
-            db.commit()
-            pending_count = 0
 
-    if pending_count:
-        db.commit()
-    touched_member_ids = [member.id for member in touched_members if member.id]
+def _refresh_imported_members_risk(db: Session, state: _MemberImportState) -> None:
+    touched_member_ids = [member.id for member in state.touched_members if member.id]
     if touched_member_ids:
         refresh_member_risk_snapshot(db, member_ids=touched_member_ids, sync_alerts=True)
-        db.commit()
-    if imported or updated_existing:
-        invalidate_dashboard_cache("members", "risk")
-    return ImportSummary(
-        imported=imported,
-        updated_existing=updated_existing,
-        skipped_duplicates=duplicates,
-        ignored_rows=0,
-        errors=errors,
-    )
 
 
-def import_checkins_csv(
+def import_members_csv(
     db: Session,
     csv_content: bytes,
     filename: str | None = None,
     *,
-    auto_create_missing_members: bool = False,
     column_mappings: dict[str, str] | None = None,
     ignored_columns: list[str] | None = None,
 ) -> ImportSummary:
-    errors: list[ImportErrorEntry] = []
-    duplicates = 0
-    ignored = 0
-    imported = 0
-    provisional_created = 0
-    provisional_members: list[str] = []
-    seen_entries: set[tuple[str, str]] = set()
-    pending_rows: list[tuple[Member, datetime, CheckinSource, dict[str, str]]] = []
-    touched_member_ids: set[UUID] = set()
-    missing_member_counts: Counter[str] = Counter()
-    missing_member_plans: dict[str, str | None] = {}
+    state = _start_member_import(db, column_mappings, ignored_columns)
+    pending_count = 0
+    for _, rows in _iter_row_chunks(csv_content, filename, 0, _IMPORT_BATCH_SIZE):
+        _prefetch_chunk_members(db, state, rows)
+        for row_number, row in rows:
+            if _import_member_row(db, state, row_number, row):
+                pending_count += 1
+                if pending_count >= _IMPORT_BATCH_SIZE:
+                    db.commit()
+                    pending_count = 0
+
+    if pending_count:
+        db.commit()
+    if any(member.id for member in state.touched_members):
+        _refresh_imported_members_risk(db, state)
+        db.commit()
+    if state.imported or state.updated_existing:
+        invalidate_dashboard_cache("members", "risk")
+    return state.summary()
+
+
+@dataclass
+class _CheckinImportState:
+    mappings: dict[str, str]
+    ignored: set[str]
+    lookup: dict[str, dict]
+    auto_create_missing_members: bool
+    bulk: bool = False
+    seen_entries: set[tuple[str, str]] = field(default_factory=set)
+    errors: list[ImportErrorEntry] = field(default_factory=list)
+    imported: int = 0
+    duplicates: int = 0
+    ignored_rows: int = 0
+    provisional_created: int = 0
+    provisional_members: list[str] = field(default_factory=list)
+    missing_member_counts: Counter[str] = field(default_factory=Counter)
+    missing_member_plans: dict[str, str | None] = field(default_factory=dict)
+
+    def start_chunk(self) -> None:
+        """Resets the per-chunk counters; lookups and in-file dedupe keys carry over between chunks."""
+        self.errors, self.provisional_members = [], []
+        self.imported = self.duplicates = self.ignored_rows = self.provisional_created = 0
+        self.missing_member_counts, self.missing_member_plans = Counter(), {}
+
+    def summary(self) -> ImportSummary:
+        return ImportSummary(
+            imported=self.imported,
+            skipped_duplicates=self.duplicates,
+            ignored_rows=self.ignored_rows,
+            provisional_members_created=self.provisional_created,
+            provisional_members=self.provisional_members,
+            missing_members=_build_missing_member_entries(self.missing_member_counts, self.missing_member_plans),
+            errors=self.errors,
+        )
+
+
+_PendingCheckin = tuple["Member | _MemberIndexEntry", datetime, CheckinSource, dict[str, str]]
+
+
+def _start_checkin_import(
+    db: Session,
+    column_mappings: dict[str, str] | None,
+    ignored_columns: list[str] | None,
+    *,
+    auto_create_missing_members: bool,
+) -> _CheckinImportState:
     normalized_mappings, normalized_ignored = _normalize_mapping_inputs(
         column_mappings,
         ignored_columns,
         _CHECKIN_MAPPING_TARGETS,
     )
     _validate_mapping_commit(normalized_mappings)
-
+    if settings.import_bulk_upsert_enabled:
+        return _CheckinImportState(
+            mappings=normalized_mappings,
+            ignored=normalized_ignored,
+            lookup=_load_member_index(db),
+            auto_create_missing_members=auto_create_missing_members,
+            bulk=True,
+        )
     existing_members = list(db.scalars(select(Member).where(Member.deleted_at.is_(None))).all())
-    lookup = _build_member_lookups(existing_members)
+    return _CheckinImportState(
+        mappings=normalized_mappings,
+        ignored=normalized_ignored,
+        lookup=_build_member_lookups(existing_members),
+        auto_create_missing_members=auto_create_missing_members,
+    )
 
-    for row_number, row in _iter_rows(csv_content, filename=filename):
-        mapped_row = _apply_column_mapping(row, normalized_mappings, normalized_ignored)
-        if _is_ignorable_checkin_row(mapped_row):
-            ignored += 1
-            continue
 
-        date_raw = _pick_first(mapped_row, CHECKIN_DATE_KEYS)
-        time_raw = _pick_first(mapped_row, CHECKIN_TIME_KEYS)
-        checkin_raw = _pick_first(mapped_row, CHECKIN_AT_KEYS)
-        parsed = _parse_checkin_datetime(checkin_raw=checkin_raw, date_raw=date_raw, time_raw=time_raw)
-        if not parsed:
-            errors.append(ImportErrorEntry(row_number=row_number, reason="Formato de data invalido", payload=mapped_row))
-            continue
-
-        member = _resolve_member_from_row(mapped_row, lookup)
-        if not member and auto_create_missing_members:
-            member = _create_provisional_member_from_checkin(db, mapped_row, parsed)
-            if member:
-                provisional_created += 1
-                provisional_members.append(member.full_name)
-                _add_member_to_lookups(member, lookup)
+def _stage_checkin_row(
+    db: Session,
+    state: _CheckinImportState,
+    row_number: int,
+    row: dict[str, str],
+) -> _PendingCheckin | None:
+    mapped_row = _apply_column_mapping(row, state.mappings, state.ignored)
+    if _is_ignorable_checkin_row(mapped_row):
+        state.ignored_rows += 1
+        return None
 
-        if not member:
-            missing_name = _extract_member_name(mapped_row)
-            if missing_name:
-                missing_member_counts[missing_name] += 1
-                missing_member_plans.setdefault(missing_name, _extract_plan_name(mapped_row))
-            errors.append(
-                ImportErrorEntry(
-                    row_number=row_number,
-                    reason="Membro nao encontrado na base de alunos importada (use member_id, email, matricula, cpf ou nome)",
-                    payload=mapped_row,
-                )
-            )
-            continue
+    date_raw = _pick_first(mapped_row, CHECKIN_DATE_KEYS)
+    time_raw = _pick_first(mapped_row, CHECKIN_TIME_KEYS)
+    checkin_raw = _pick_first(mapped_row, CHECKIN_AT_KEYS)
+    parsed = _parse_checkin_datetime(checkin_raw=checkin_raw, date_raw=date_raw, time_raw=time_raw)
+    if not parsed:
+        state.errors.append(ImportErrorEntry(row_number=row_number, reason="Formato de data invalido", payload=mapped_row))
+        return None
 
-        unique_key = (str(member.id), parsed.isoformat())
-        if unique_key in seen_entries:
-            duplicates += 1
-            continue
-        seen_entries.add(unique_key)
-        pending_rows.append(
-            (
-                member,
-                parsed,
-                _parse_checkin_source(_pick_first(mapped_row, CHECKIN_SOURCE_KEYS)),
-                mapped_row,
+    member = _resolve_member_from_row(mapped_row, state.lookup)
+    if not member and state.auto_create_missing_members:
+        member = _create_provisional_member_from_checkin(db, mapped_row, parsed)
+        if member:
+            state.provisional_created += 1
+            state.provisional_members.append(member.full_name)
+            _add_member_to_lookups(member, state.lookup)
+
+    if not member:
+        missing_name = _extract_member_name(mapped_row)
+        if missing_name:
+            state.missing_member_counts[missing_name] += 1
+            state.missing_member_plans.setdefault(missing_name, _extract_plan_name(mapped_row))
+        state.errors.append(
+            ImportErrorEntry(
+                row_number=row_number,
+                reason="Membro nao encontrado na base de alunos importada (use member_id, email, matricula, cpf ou nome)",
+                payload=mapped_row,
             )
         )
+        return None
+
+    unique_key = (str(member.id), parsed.isoformat())
+    if unique_key in state.seen_entries:
+        state.duplicates += 1
+        return None
+    state.seen_entries.add(unique_key)
+    return member, parsed, _parse_checkin_source(_pick_first(mapped_row, CHECKIN_SOURCE_KEYS)), mapped_row
 
+
+def _write_staged_checkins(db: Session, state: _CheckinImportState, pending_rows: list[_PendingCheckin]) -> set[UUID]:
+    """Inserts the staged check-ins that are not in the database yet and syncs the members' preferred shift."""
+    if state.bulk:
+        touched_member_ids = _bulk_insert_staged_checkins(db, state, pending_rows)
+        if touched_member_ids:
+            sync_preferred_shifts_from_checkins(db, member_ids=touched_member_ids, commit=False, flush=False)
+        return touched_member_ids
+
+    touched_member_ids: set[UUID] = set()
     existing_keys = _fetch_existing_checkin_keys(db, [(member.id, parsed) for member, parsed, _, _ in pending_rows])
 
     for member, parsed, source, row in pending_rows:
         unique_key = (str(member.id), parsed.isoformat())
         if unique_key in existing_keys:
-            duplicates += 1
+            state.duplicates += 1
             continue
 
         checkin = Checkin(
@@ -1455,28 +1597,234 @@ def import_checkins_csv(
             db.add(member)
         touched_member_ids.add(member.id)
         db.add(checkin)
-        imported += 1
+        state.imported += 1
 
     db.flush()
     if touched_member_ids:
         sync_preferred_shifts_from_checkins(db, member_ids=touched_member_ids, commit=False, flush=False)
+    return touched_member_ids
+
+
+# Per-connection staging table for the bulk check-in path; rows never outlive the transaction.
+_CHECKIN_STAGE = Table(
+    "import_checkin_stage",
+    MetaData(),
+    Column("id", PGUUID(as_uuid=True), nullable=False),
+    Column("member_id", PGUUID(as_uuid=True), nullable=False),
+    Column("checkin_at", DateTime(timezone=True), nullable=False),
+    Column("source", Enum(CheckinSource, name="checkin_source_enum", native_enum=False), nullable=False),
+    Column("hour_bucket", SmallInteger, nullable=False),
+    Column("weekday", SmallInteger, nullable=False),
+    Column("extra_data", JSONB, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+_CHECKIN_INSERT_COLUMNS = ("id", "gym_id", "member_id", "checkin_at", "source", "hour_bucket", "weekday", "extra_data")
+
+
+def _bulk_insert_staged_checkins(
+    db: Session,
+    state: _CheckinImportState,
+    pending_rows: list[_PendingCheckin],
+) -> set[UUID]:
+    """Writes a chunk of check-ins with set-based statements instead of one ORM object per row.
+
+    The chunk is staged with one multi-row insert, copied into ``checkins`` with ``ON CONFLICT DO NOTHING`` on
+    ``uq_checkin_member_datetime`` and folded into ``members.last_checkin_at`` with one aggregate ``UPDATE``.
+    Core statements skip the ORM flush hooks, so the risk and triage markers of the inserted rows are written here.
+    """
+    if not pending_rows:
+        return set()
+
+    db.execute(CreateTable(_CHECKIN_STAGE, if_not_exists=True))
+    db.execute(
+        insert(_CHECKIN_STAGE),
+        [
+            {
+                "id": uuid4(),
+                "member_id": member.id,
+                "checkin_at": parsed,
+                "source": source,
+                "hour_bucket": parsed.hour,
+                "weekday": parsed.weekday(),
+                "extra_data": {"imported": True, "raw": row},
+            }
+            for member, parsed, source, row in pending_rows
+        ],
+    )
+
+    stage = _CHECKIN_STAGE.c
+    checkins = Checkin.__table__
+    members = Member.__table__
+    staged_rows = (
+        select(
+            stage.id,
+            members.c.gym_id,
+            stage.member_id,
+            stage.checkin_at,
+            stage.source,
+            stage.hour_bucket,
+            stage.weekday,
+            stage.extra_data,
+        )
+        .join_from(_CHECKIN_STAGE, members, members.c.id == stage.member_id)
+        .where(members.c.deleted_at.is_(None))
+    )
+    inserted = db.execute(
+        pg_insert(checkins)
+        .from_select(list(_CHECKIN_INSERT_COLUMNS), staged_rows)
+        .on_conflict_do_nothing(constraint="uq_checkin_member_datetime")
+        .returning(checkins.c.gym_id, checkins.c.member_id)
+    ).all()
+
+    latest = (
+        select(stage.member_id, func.max(stage.checkin_at).label("latest_checkin_at"))
+        .group_by(stage.member_id)
+        .subquery("latest_import_checkins")
+    )
+    db.execute(
+        update(members)
+        .where(members.c.id == latest.c.member_id)
+        .where(or_(members.c.last_checkin_at.is_(None), members.c.last_checkin_at < latest.c.latest_checkin_at))
+        .values(last_checkin_at=latest.c.latest_checkin_at)
+    )
+    db.execute(delete(_CHECKIN_STAGE))
+
+    state.imported += len(inserted)
+    state.duplicates += len(pending_rows) - len(inserted)
+    markers = {(gym_id, member_id) for gym_id, member_id in inserted}
+    if markers and settings.risk_incremental_enabled:
+        mark_risk_inputs_changed(db.connection(), dict.fromkeys(markers, RISK_REASON_CHECKIN))
+    if markers and settings.ai_triage_background_sync_enabled:
+        mark_ai_triage_members_dirty(db.connection(), dict.fromkeys(markers, DIRTY_REASON_CHECKIN))
+    # Provisional members created by this chunk are in the session; reload the column the UPDATE just changed.
+    for member in {id(member): member for member, *_ in pending_rows if isinstance(member, Member)}.values():
+        db.expire(member, ["last_checkin_at"])
+    return {member_id for _, member_id in markers}
+
+
+def import_checkins_csv(
+    db: Session,
+    csv_content: bytes,
+    filename: str | None = None,
+    *,
+    auto_create_missing_members: bool = False,
+    column_mappings: dict[str, str] | None = None,
+    ignored_columns: list[str] | None = None,
+) -> ImportSummary:
+    state = _start_checkin_import(
+        db,
+        column_mappings,
+        ignored_columns,
+        auto_create_missing_members=auto_create_missing_members,
+    )
+    touched_member_ids: set[UUID] = set()
+    for _, rows in _iter_row_chunks(csv_content, filename, 0, _IMPORT_BATCH_SIZE):
+        pending_rows: list[_PendingCheckin] = []
+        for row_number, row in rows:
+            staged = _stage_checkin_row(db, state, row_number, row)
+            if staged is not None:
+                pending_rows.append(staged)
+        touched_member_ids |= _write_staged_checkins(db, state, pending_rows)
     db.commit()
     if touched_member_ids:
         refresh_member_risk_snapshot(db, member_ids=touched_member_ids, sync_alerts=True)
         db.commit()
     if touched_member_ids:
         invalidate_dashboard_cache("checkins", "risk")
-    if provisional_created:
+    if state.provisional_created:
         invalidate_dashboard_cache("members")
-    return ImportSummary(
-        imported=imported,
-        skipped_duplicates=duplicates,
-        ignored_rows=ignored,
-        provisional_members_created=provisional_created,
-        provisional_members=provisional_members,
-        missing_members=_build_missing_member_entries(missing_member_counts, missing_member_plans),
-        errors=errors,
+    return state.summary()
+
+
+def import_members_in_chunks(
+    db: Session,
+    csv_content: bytes,
+    filename: str | None = None,
+    *,
+    column_mappings: dict[str, str] | None = None,
+    ignored_columns: list[str] | None = None,
+    resume_after_row: int = 0,
+    chunk_size: int = _IMPORT_BATCH_SIZE,
+    checkpoint: ImportCheckpoint,
+) -> None:
+    """Imports members ``chunk_size`` rows at a time, one transaction per chunk.
+
+    Rows up to ``resume_after_row`` are skipped. ``checkpoint`` runs inside each chunk's transaction, right before
+    the commit, so a stored checkpoint always matches the rows that were committed.
+    """
+    state = _start_member_import(db, column_mappings, ignored_columns)
+    for last_row_number, rows in _iter_row_chunks(csv_content, filename, resume_after_row, chunk_size):
+        state.start_chunk()
+        _prefetch_chunk_members(db, state, rows)
+        for row_number, row in rows:
+            _import_member_row(db, state, row_number, row)
+        db.flush()
+        _refresh_imported_members_risk(db, state)
+        checkpoint(last_row_number, len(rows), state.summary())
+        db.commit()
+        if state.imported or state.updated_existing:
+            invalidate_dashboard_cache("members", "risk")
+
+
+def import_checkins_in_chunks(
+    db: Session,
+    csv_content: bytes,
+    filename: str | None = None,
+    *,
+    auto_create_missing_members: bool = False,
+    column_mappings: dict[str, str] | None = None,
+    ignored_columns: list[str] | None = None,
+    resume_after_row: int = 0,
+    chunk_size: int = _IMPORT_BATCH_SIZE,
+    checkpoint: ImportCheckpoint,
+) -> None:
+    """Check-in counterpart of ``import_members_in_chunks``; each chunk also refreshes its members' risk."""
+    state = _start_checkin_import(
+        db,
+        column_mappings,
+        ignored_columns,
+        auto_create_missing_members=auto_create_missing_members,
     )
+    for last_row_number, rows in _iter_row_chunks(csv_content, filename, resume_after_row, chunk_size):
+        state.start_chunk()
+        pending_rows: list[_PendingCheckin] = []
+        for row_number, row in rows:
+            staged = _stage_checkin_row(db, state, row_number, row)
+            if staged is not None:
+                pending_rows.append(staged)
+        touched_member_ids = _write_staged_checkins(db, state, pending_rows)
+        if touched_member_ids:
+            refresh_member_risk_snapshot(db, member_ids=touched_member_ids, sync_alerts=True)
+        checkpoint(last_row_number, len(rows), state.summary())
+        db.commit()
+        if touched_member_ids:
+            invalidate_dashboard_cache("checkins", "risk")
+        if state.provisional_created:
+            invalidate_dashboard_cache("members")
+
+
+def count_import_rows(csv_content: bytes, filename: str | None = None) -> int:
+    return sum(1 for _ in _iter_rows(csv_content, filename=filename))
+
+
+def _iter_row_chunks(
+    csv_content: bytes,
+    filename: str | None,
+    resume_after_row: int,
+    chunk_size: int,
+) -> Iterator[tuple[int, list[tuple[int, dict[str, str]]]]]:
+    chunk_size = max(int(chunk_size), 1)
+    chunk: list[tuple[int, dict[str, str]]] = []
+    for row_number, row in _iter_rows(csv_content, filename=filename):
+        if row_number <= resume_after_row:
+            continue
+        chunk.append((row_number, row))
+        if len(chunk) >= chunk_size:
+            yield row_number, chunk
+            chunk = []
+    if chunk:
+        yield chunk[-1][0], chunk
 
 
 def import_assessments_csv(
@@ -2436,6 +2784,65 @@ def _parse_checkin_source(raw_value: str | None) -> CheckinSource:
     return mapping.get(key, CheckinSource.IMPORT)
 
 
+class _MemberIndexEntry(NamedTuple):
+    """Read-only view of a member with just the fields import matching and ranking look at."""
+
+    id: UUID
+    full_name: str
+    email: str | None
+    phone: bool
+    cpf_encrypted: str | None
+    status: MemberStatus
+    plan_name: str
+    join_date: date | None
+    last_checkin_at: datetime | None
+    updated_at: datetime | None
+    extra_data: dict
+
+
+_MEMBER_INDEX_EXTRA_KEYS = ("external_id", "raw_plan_name", "raw_plan_conditions")
+_MEMBER_INDEX_BATCH_SIZE = 2000
+
+
+def _load_member_index(db: Session) -> dict[str, dict]:
+    """Builds the import lookups from a narrow column projection instead of full ``Member`` objects.
+
+    Phones are never decrypted and only the ``extra_data`` keys used for matching are read; rows are
+    fetched in keyset batches, so the index costs a few small tuples per member.
+    """
+    stmt = select(
+        Member.id,
+        Member.full_name,
+        Member.email,
+        Member.phone.is_not(None).label("has_phone"),
+        Member.cpf_encrypted,
+        Member.status,
+        Member.plan_name,
+        Member.join_date,
+        Member.last_checkin_at,
+        Member.updated_at,
+        *(Member.extra_data[key].astext.label(key) for key in _MEMBER_INDEX_EXTRA_KEYS),
+    ).where(Member.deleted_at.is_(None))
+    lookup = _build_member_lookups([])
+    for batch in iter_keyset_batches(db, stmt, Member.id, batch_size=_MEMBER_INDEX_BATCH_SIZE):
+        for row in batch:
+            entry = _MemberIndexEntry(
+                id=row.id,
+                full_name=row.full_name,
+                email=row.email,
+                phone=bool(row.has_phone),
+                cpf_encrypted=row.cpf_encrypted,
+                status=row.status,
+                plan_name=row.plan_name,
+                join_date=row.join_date,
+                last_checkin_at=row.last_checkin_at,
+                updated_at=row.updated_at,
+                extra_data={key: getattr(row, key) for key in _MEMBER_INDEX_EXTRA_KEYS if getattr(row, key)},
+            )
+            _add_member_to_lookups(entry, lookup)
+    return lookup
+
+
 def _build_member_lookups(members: list[Member]) -> dict[str, dict]:
     by_id: dict[str, Member] = {}
     by_email: dict[str, Member] = {}
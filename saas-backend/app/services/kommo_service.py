@@ -11,6 +11,7 @@ from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.core.branding import PRODUCT_NAME
+from app.core.circuit_breaker import ProviderUnavailableError, get_breaker
 from app.database import include_all_tenants
 from app.models import Gym, KommoDomainRoute, KommoMemberDomainLink, KommoMemberLink, Lead, Member, MessageLog
 from app.services.autopilot_event_service import record_event
@@ -583,9 +584,11 @@ def _kommo_request(
         "Content-Type": "application/json",
     }
     try:
-        with httpx.Client(timeout=20.0) as client:
+        with get_breaker("kommo").guard(), httpx.Client(timeout=20.0) as client:
             response = client.request(method=method, url=url, headers=headers, json=json)
-        response.raise_for_status()
+            response.raise_for_status()
+    except ProviderUnavailableError as exc:
+        raise KommoServiceError(str(exc)) from exc
     except httpx.HTTPStatusError as exc:
         detail = exc.response.text.strip() or f"HTTP {exc.response.status_code}"
         raise KommoServiceError(detail[:500]) from exc
@@ -266,7 +266,7 @@ def _list_member_tasks(db: Session, *, member: Member, include_done: bool, limit
 def _build_timeline_preview(db: Session, *, member: Member, permissions: dict, limit: int) -> list[dict]:
     items: list[dict] = []
     if permissions.get("can_view_clinical") or permissions.get("can_view_internal_notes"):
-        items.extend(get_member_timeline(db, member.id, limit=limit))
+        items.extend(get_member_timeline(db, member.id, limit=limit, gym_id=member.gym_id))
 
     messages = db.scalars(
         select(MessageLog)
@@ -0,0 +1,81 @@
+"""Member search over ``members.search_text``.
+
+``search_text`` is a generated column holding the accent- and case-folded name, e-mail and external id, backed by a
+``pg_trgm`` GIN index, so ``LIKE '%term%'`` filters stay index-assisted as a gym grows instead of scanning
+``members``. ``external_id`` is extracted from ``extra_data`` into its own indexed column for exact lookups. The
+retention queue also matches the folded ``plan_name``, which has its own trigram expression index.
+"""
+
+from uuid import UUID
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.database import get_current_gym_id, include_all_tenants
+from app.models import Member
+from app.utils.search_text import contains_condition, fold_expression, fold_search_text, prefix_condition
+
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+# Trigrams need three characters; shorter terms only match at the start of a word.
+_TRIGRAM_MIN_TERM_LENGTH = 3
+
+
+def member_search_condition(search: str | None):
+    """Substring match on name, e-mail or external id, ignoring case and accents."""
+    folded = fold_search_text(search)
+    if not folded:
+        return None
+    return contains_condition(Member.search_text, folded)
+
+
+def member_plan_search_condition(search: str | None):
+    """Like ``member_search_condition``, also matching the plan name (retention queue search)."""
+    folded = fold_search_text(search)
+    if not folded:
+        return None
+    return or_(
+        contains_condition(Member.search_text, folded),
+        contains_condition(fold_expression(Member.plan_name), folded),
+    )
+
+
+def search_member_typeahead(
+    db: Session,
+    *,
+    query: str,
+    gym_id: UUID | None = None,
+    limit: int = TYPEAHEAD_DEFAULT_LIMIT,
+) -> list:
+    """Top ``limit`` members for a typeahead box, best match first.
+
+    Ranking: exact external id, then name prefix, then any word prefix (surname, e-mail), then other substrings;
+    ties are broken by trigram similarity and name.
+    """
+    raw_term = (query or "").strip()
+    folded = fold_search_text(raw_term)
+    if not folded:
+        return []
+
+    resolved_gym_id = gym_id or get_current_gym_id()
+    exact_external_id = Member.external_id == raw_term
+    name_prefix = prefix_condition(Member.search_text, folded)
+    word_prefix = prefix_condition(Member.search_text, folded, word_start=True)
+    if len(folded) >= _TRIGRAM_MIN_TERM_LENGTH:
+        match = or_(exact_external_id, contains_condition(Member.search_text, folded))
+    else:
+        match = or_(exact_external_id, name_prefix, word_prefix)
+    rank = case((exact_external_id, 0), (name_prefix, 1), (word_prefix, 2), else_=3)
+
+    stmt = (
+        select(Member.id, Member.full_name, Member.external_id)
+        .where(Member.deleted_at.is_(None), match)
+        .order_by(rank, func.similarity(Member.search_text, folded).desc(), Member.full_name.asc(), Member.id.asc())
+        .limit(max(1, min(int(limit), TYPEAHEAD_MAX_LIMIT)))
+    )
+    if resolved_gym_id is not None:
+        stmt = include_all_tenants(
+            stmt.where(Member.gym_id == resolved_gym_id),
+            reason="member_search.explicit_gym_scope",
+        )
+    return list(db.execute(stmt).all())
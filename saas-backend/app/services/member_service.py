@@ -9,10 +9,12 @@ from sqlalchemy.orm import Session
 from app.core.cache import invalidate_dashboard_cache
 from app.database import get_current_gym_id, include_all_tenants
 from app.models import Member, MemberStatus, RiskLevel
-from app.schemas import MemberCreate, MemberUpdate, PaginatedResponse
+from app.schemas import MemberCreate, MemberRosterItemOut, MemberRosterPage, MemberUpdate, PaginatedResponse
+from app.services.member_search_service import member_search_condition
 from app.services.onboarding_service import create_onboarding_tasks_for_member, create_plan_followup_tasks_for_member
 from app.services.preferred_shift_service import hydrate_missing_preferred_shifts_from_checkins, preferred_shift_filter_condition
 from app.services.tenant_guard import ensure_optional_user_in_gym
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.encryption import encrypt_cpf
 
 MemberPlanCycle = Literal["monthly", "semiannual", "annual"]
@@ -47,15 +49,9 @@ def _build_member_filters(
     resolved_gym_id = _resolve_gym_id(gym_id)
     if resolved_gym_id is not None:
         base_filters.append(Member.gym_id == resolved_gym_id)
-    if search:
-        stored_external_id = func.coalesce(Member.extra_data["external_id"].astext, "")
-        base_filters.append(
-            or_(
-                Member.full_name.ilike(f"%{search}%"),
-                Member.email.ilike(f"%{search}%"),
-                stored_external_id.ilike(f"%{search}%"),
-            )
-        )
+    search_filter = member_search_condition(search)
+    if search_filter is not None:
+        base_filters.append(search_filter)
     if risk_level:
         base_filters.append(Member.risk_level == risk_level)
     if status:
@@ -212,6 +208,105 @@ def list_member_index(
     return list(db.scalars(stmt).all())
 
 
+MEMBER_ROSTER_DEFAULT_LIMIT = 500
+MEMBER_ROSTER_MAX_LIMIT = 2000
+# Rows stamped by a transaction that started before the previous sync but committed after it carry an older
+# updated_at; re-reading a short window keeps delta syncs from missing them (clients upsert by id).
+_MEMBER_ROSTER_SYNC_OVERLAP = timedelta(minutes=2)
+
+
+def get_member_roster_version(db: Session, *, gym_id: UUID | None = None) -> tuple[datetime | None, int]:
+    """Latest ``updated_at`` and row count (soft-deleted included) of the gym's members, for ETags and watermarks."""
+    resolved_gym_id = _resolve_gym_id(gym_id)
+    filters = [Member.gym_id == resolved_gym_id] if resolved_gym_id is not None else []
+    row = db.execute(
+        _scoped_statement(
+            select(func.max(Member.updated_at).label("watermark"), func.count().label("total"))
+            .select_from(Member)
+            .where(*filters),
+            resolved_gym_id,
+        )
+    ).one()
+    return row.watermark, int(row.total or 0)
+
+
+def _member_roster_keyset_condition(cursor: str):
+    # Mirrors ORDER BY updated_at ASC, id ASC.
+    values = decode_cursor(cursor)
+    try:
+        cursor_updated_at = datetime.fromisoformat(str(values["u"]))
+        cursor_member_id = UUID(str(values["i"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Cursor invalido") from exc
+    return or_(
+        Member.updated_at > cursor_updated_at,
+        and_(Member.updated_at == cursor_updated_at, Member.id > cursor_member_id),
+    )
+
+
+def list_member_roster(
+    db: Session,
+    *,
+    gym_id: UUID | None = None,
+    cursor: str | None = None,
+    limit: int = MEMBER_ROSTER_DEFAULT_LIMIT,
+    updated_since: datetime | None = None,
+    watermark: datetime | None = None,
+) -> MemberRosterPage:
+    """Projection-only roster page ordered by ``updated_at``, for clients that keep a local copy.
+
+    Without ``updated_since`` it pages through the live roster. With it, only members changed since then are
+    returned, soft-deleted ones included as ``deleted`` tombstones, so a client can apply the delta in place.
+    """
+    resolved_gym_id = _resolve_gym_id(gym_id)
+    filters = []
+    if resolved_gym_id is not None:
+        filters.append(Member.gym_id == resolved_gym_id)
+    if updated_since is None:
+        filters.append(Member.deleted_at.is_(None))
+    else:
+        filters.append(Member.updated_at >= updated_since - _MEMBER_ROSTER_SYNC_OVERLAP)
+    if cursor:
+        filters.append(_member_roster_keyset_condition(cursor))
+    page_size = max(1, min(int(limit), MEMBER_ROSTER_MAX_LIMIT))
+    stmt = _scoped_statement(
+        select(
+            Member.id,
+            Member.full_name,
+            Member.status,
+            Member.risk_level,
+            Member.risk_score,
+            Member.preferred_shift,
+            Member.updated_at,
+            Member.deleted_at,
+        )
+        .where(*filters)
+        .order_by(Member.updated_at.asc(), Member.id.asc())
+        .limit(page_size + 1),
+        resolved_gym_id,
+    )
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    items = [
+        MemberRosterItemOut(
+            id=row.id,
+            full_name=row.full_name,
+            status=row.status,
+            risk_level=row.risk_level,
+            risk_score=row.risk_score,
+            preferred_shift=row.preferred_shift,
+            updated_at=row.updated_at,
+            deleted=row.deleted_at is not None,
+        )
+        for row in rows
+    ]
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor({"u": items[-1].updated_at.isoformat(), "i": str(items[-1].id)})
+    return MemberRosterPage(items=items, next_cursor=next_cursor, watermark=watermark)
+
+
 def get_member_or_404(db: Session, member_id: UUID, gym_id: UUID | None = None) -> Member:
     filters = [Member.id == member_id, Member.deleted_at.is_(None)]
     resolved_gym_id = _resolve_gym_id(gym_id)
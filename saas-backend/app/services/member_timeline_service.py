@@ -1,34 +1,60 @@
-import logging
+"""Member timeline as one ``UNION ALL`` query.
+
+Every source (assessments, check-ins, NPS, tasks, alerts...) contributes rows in a common shape
+``(event_type, event_id, occurred_at, payload)``; each branch is filtered, ordered and limited on its own
+``(member_id, <time>)`` index, and the outer query merges them by ``(occurred_at, event_id)``. Every event carries a
+``cursor`` so the next page starts right after it, which keeps infinite scroll cheap over years of history.
+"""
+
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Literal, get_args
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import DateTime, String, Text, and_, cast, func, literal, literal_column, or_, select, union_all
 from sqlalchemy.orm import Session
 
-from app.models import AssessmentAppointment, AuditLog, Checkin, NPSResponse, RiskAlert, Task
+from app.database import get_current_gym_id
+from app.models import (
+    AssessmentAppointment,
+    AuditLog,
+    Checkin,
+    CheckinSource,
+    NPSResponse,
+    NPSSentiment,
+    RiskAlert,
+    RiskLevel,
+    Task,
+    TaskPriority,
+    TaskStatus,
+)
 from app.models.assessment import Assessment, MemberConstraints, MemberGoal, TrainingPlan
 from app.models.body_composition import BodyCompositionEvaluation
+from app.utils.cursor import decode_cursor, encode_cursor
 
-logger = logging.getLogger(__name__)
-
-
-def _scalars_all(db: Session, statement) -> list:
-    try:
-        result = db.scalars(statement)
-    except StopIteration:
-        return []
-    if result is None:
-        return []
-    try:
-        return list(result.all())
-    except StopIteration:
-        return []
-
-
-def _scalar_or_none(db: Session, statement):
-    try:
-        return db.scalar(statement)
-    except StopIteration:
-        return None
+TimelineEventType = Literal[
+    "assessment",
+    "assessment_appointment",
+    "constraints",
+    "goal",
+    "training_plan",
+    "checkin",
+    "risk_alert",
+    "nps",
+    "task",
+    "automation",
+    "body_composition",
+]
+TIMELINE_EVENT_TYPES: tuple[str, ...] = get_args(TimelineEventType)
+AUTOMATION_AUDIT_ACTIONS = (
+    "whatsapp_sent_manually",
+    "automation_3d",
+    "automation_7d",
+    "automation_10d",
+    "automation_14d",
+    "automation_21d",
+)
 
 
 def _body_composition_source_label(source: str | None) -> str:
@@ -61,286 +87,364 @@ def _body_composition_sync_label(sync_status: str | None) -> str:
     return "rascunho"
 
 
-def get_member_timeline(db: Session, member_id: UUID, limit: int = 50) -> list[dict]:
-    events: list[dict] = []
+def _enum_value(enum_cls: type[Enum], raw: Any) -> Any:
+    # Payload values come straight from the column, stored as either the enum name or its value.
+    if raw is None:
+        return None
+    try:
+        return enum_cls(raw).value
+    except ValueError:
+        member = enum_cls.__members__.get(str(raw))
+        return member.value if member is not None else raw
 
-    assessments = _scalars_all(
-        db,
-        select(Assessment)
-        .where(Assessment.member_id == member_id, Assessment.deleted_at.is_(None))
-        .order_by(Assessment.assessment_date.desc())
-        .limit(10)
-    )
-    for assessment in assessments:
-        parts = []
-        weight_kg = getattr(assessment, "weight_kg", None)
-        body_fat_pct = getattr(assessment, "body_fat_pct", None)
-        strength_score = getattr(assessment, "strength_score", None)
-        if weight_kg is not None:
-            parts.append(f"Peso: {weight_kg} kg")
-        if body_fat_pct is not None:
-            parts.append(f"Gordura: {body_fat_pct}%")
-        if strength_score is not None:
-            parts.append(f"Forca: {strength_score}")
-        events.append({
-            "type": "assessment",
-            "timestamp": assessment.assessment_date.isoformat(),
-            "title": f"Avaliacao #{assessment.assessment_number}",
-            "detail": " | ".join(parts) if parts else "Avaliacao registrada",
-            "icon": "clipboard-list",
-        })
-
-    appointments = _scalars_all(
-        db,
-        select(AssessmentAppointment)
-        .where(AssessmentAppointment.member_id == member_id, AssessmentAppointment.deleted_at.is_(None))
-        .order_by(AssessmentAppointment.scheduled_at.desc())
-        .limit(20)
-    )
-    for appointment in appointments:
-        status_label = {
-            "scheduled": "Avaliação agendada",
-            "confirmed": "Avaliação confirmada",
-            "attended": "Compareceu a avaliacao",
-            "completed": "Avaliação realizada historicamente",
-            "no_show": "Faltou a avaliacao",
-            "cancelled": "Avaliação cancelada",
-            "rescheduled": "Avaliação remarcada",
-        }.get(appointment.status, "Agenda de avaliação")
-        payment_label = {
-            "pending": "pagamento pendente",
-            "paid": "pagamento pago",
-            "waived": "pagamento isento",
-            "not_required": "pagamento nao requerido",
-            "unknown": "pagamento nao informado",
-        }.get(appointment.payment_status, "pagamento nao informado")
-        evaluator = appointment.evaluator_name_raw or "professor nao informado"
-        events.append({
-            "type": "assessment_appointment",
-            "timestamp": appointment.scheduled_at.isoformat(),
-            "title": status_label,
-            "detail": f"Professor/avaliador: {evaluator} | {payment_label} | Origem: {appointment.source}",
-            "icon": "calendar-check",
-        })
-
-    constraints = _scalar_or_none(
-        db,
-        select(MemberConstraints)
-        .where(MemberConstraints.member_id == member_id, MemberConstraints.deleted_at.is_(None))
-        .order_by(MemberConstraints.updated_at.desc())
-        .limit(1)
-    )
-    if constraints:
-        parts = []
-        medical_conditions = getattr(constraints, "medical_conditions", None)
-        injuries = getattr(constraints, "injuries", None)
-        contraindications = getattr(constraints, "contraindications", None)
-        if medical_conditions:
-            parts.append(f"Saude: {medical_conditions}")
-        if injuries:
-            parts.append(f"Lesoes: {injuries}")
-        if contraindications:
-            parts.append(f"Contraindicacoes: {contraindications}")
-        events.append({
-            "type": "constraints",
-            "timestamp": constraints.updated_at.isoformat(),
-            "title": "Restricoes atualizadas",
-            "detail": " | ".join(parts) if parts else "Restricoes registradas",
-            "icon": "shield-alert",
-        })
-
-    goals = _scalars_all(
-        db,
-        select(MemberGoal)
-        .where(MemberGoal.member_id == member_id, MemberGoal.deleted_at.is_(None))
-        .order_by(MemberGoal.updated_at.desc())
-        .limit(10)
-    )
-    for goal in goals:
-        events.append({
-            "type": "goal",
-            "timestamp": goal.updated_at.isoformat(),
-            "title": f"Objetivo: {goal.title}",
-            "detail": f"Status: {goal.status} | Progresso: {goal.progress_pct}%",
-            "icon": "target",
-        })
-
-    training_plans = _scalars_all(
-        db,
-        select(TrainingPlan)
-        .where(TrainingPlan.member_id == member_id, TrainingPlan.deleted_at.is_(None))
-        .order_by(TrainingPlan.updated_at.desc())
-        .limit(10)
-    )
-    for plan in training_plans:
-        parts = []
-        if plan.objective:
-            parts.append(f"Objetivo: {plan.objective}")
-        parts.append(f"{plan.sessions_per_week}x por semana")
-        if plan.split_type:
-            parts.append(f"Divisao: {plan.split_type}")
-        events.append({
-            "type": "training_plan",
-            "timestamp": plan.updated_at.isoformat(),
-            "title": f"Treino: {plan.name}",
-            "detail": " | ".join(parts),
-            "icon": "dumbbell",
-        })
-
-    checkins = _scalars_all(
-        db,
-        select(Checkin)
-        .where(Checkin.member_id == member_id)
-        .order_by(Checkin.checkin_at.desc())
-        .limit(limit)
-    )
-    for checkin in checkins:
-        source = getattr(checkin, "source", None)
-        events.append({
-            "type": "checkin",
-            "timestamp": checkin.checkin_at.isoformat(),
-            "title": "Check-in",
-            "detail": f"Fonte: {source.value if hasattr(source, 'value') else source}",
-            "icon": "activity",
-        })
-
-    risk_alerts = _scalars_all(
-        db,
-        select(RiskAlert)
-        .where(RiskAlert.member_id == member_id)
-        .order_by(RiskAlert.created_at.desc())
-        .limit(20)
-    )
-    for alert in risk_alerts:
-        level = getattr(alert, "level", None)
-        level = level.value if hasattr(level, "value") else level
-        level_label = str(level or "unknown")
-        events.append({
-            "type": "risk_alert",
-            "timestamp": alert.created_at.isoformat(),
-            "title": f"Alerta de risco - {level_label.upper()}",
-            "detail": f"Score: {alert.score}. {'Resolvido' if alert.resolved else 'Ativo'}",
-            "icon": "alert-triangle",
-            "level": level,
-        })
-
-    nps_responses = _scalars_all(
-        db,
-        select(NPSResponse)
-        .where(NPSResponse.member_id == member_id)
-        .order_by(NPSResponse.created_at.desc())
-        .limit(20)
-    )
-    for nps in nps_responses:
-        sentiment = getattr(nps, "sentiment", None)
-        sentiment = sentiment.value if hasattr(sentiment, "value") else sentiment
-        events.append({
-            "type": "nps",
-            "timestamp": nps.created_at.isoformat(),
-            "title": f"NPS: {nps.score}",
-            "detail": f"Sentimento: {sentiment}",
-            "icon": "star",
-        })
-
-    tasks = _scalars_all(
-        db,
-        select(Task)
-        .where(Task.member_id == member_id, Task.deleted_at.is_(None))
-        .order_by(Task.created_at.desc())
-        .limit(20)
-    )
-    for task in tasks:
-        raw_status = getattr(task, "status", None)
-        raw_priority = getattr(task, "priority", None)
-        status = raw_status.value if hasattr(raw_status, "value") else raw_status
-        priority = raw_priority.value if hasattr(raw_priority, "value") else raw_priority
-        source = ""
-        plan_type = ""
-        extra_data = getattr(task, "extra_data", None)
-        if extra_data:
-            raw_source = extra_data.get("source")
-            raw_plan_type = extra_data.get("plan_type")
-            source = str(raw_source).lower() if raw_source else ""
-            plan_type = str(raw_plan_type).lower() if raw_plan_type else ""
-
-        label = ""
-        if source == "onboarding":
-            label = "[Onboarding] "
-        elif source == "plan_followup":
-            label = f"[Plano {plan_type.capitalize()}] " if plan_type else "[Plano] "
-
-        details = [
-            f"Status: {status}",
-            f"Prioridade: {priority}",
-        ]
-        if task.due_date:
-            details.append(f"Vencimento: {task.due_date.strftime('%d/%m/%Y')}")
-
-        events.append({
-            "type": "task",
-            "timestamp": task.created_at.isoformat(),
-            "title": f"{label}{task.title}" if label else task.title,
-            "detail": " | ".join(details),
-            "icon": "clipboard",
-        })
-
-    audit_events = _scalars_all(
-        db,
-        select(AuditLog)
-        .where(
-            AuditLog.member_id == member_id,
-            AuditLog.action.in_([
-                "whatsapp_sent_manually",
-                "automation_3d",
-                "automation_7d",
-                "automation_10d",
-                "automation_14d",
-                "automation_21d",
-            ]),
-        )
-        .order_by(AuditLog.created_at.desc())
-        .limit(20)
-    )
-    for event in audit_events:
-        events.append({
-            "type": "automation",
-            "timestamp": event.created_at.isoformat(),
-            "title": f"Automacao: {event.action}",
-            "detail": str(event.details) if event.details else "",
-            "icon": "zap",
-        })
 
+def _payload(**fields):
+    arguments = []
+    for key, value in fields.items():
+        arguments.extend((literal_column(f"'{key}'"), value))
+    return func.jsonb_build_object(*arguments)
+
+
+def _as_text(column):
+    return cast(column, Text)
+
+
+def _decode_timeline_cursor(cursor: str) -> tuple[datetime, UUID]:
+    values = decode_cursor(cursor)
     try:
-        body_composition_items = _scalars_all(
-            db,
-            select(BodyCompositionEvaluation)
-            .where(BodyCompositionEvaluation.member_id == member_id)
-            .order_by(BodyCompositionEvaluation.evaluation_date.desc())
-            .limit(10)
-        )
-    except Exception:
-        db.rollback()
-        logger.warning("Nao foi possivel carregar eventos de bioimpedancia no timeline.")
-        body_composition_items = []
-    for body_item in body_composition_items:
-        parts = []
-        risk_flags = getattr(body_item, "ai_risk_flags_json", None) or []
-        if isinstance(risk_flags, list):
-            for flag in risk_flags[:2]:
-                if flag:
-                    parts.append(str(flag))
-        health_score = getattr(body_item, "health_score", None)
-        if health_score is not None:
-            parts.append(f"health score {health_score}")
-        parts.append(_body_composition_sync_label(getattr(body_item, "actuar_sync_status", None)))
-        events.append({
-            "type": "body_composition",
-            "timestamp": body_item.evaluation_date.isoformat(),
-            "title": "Bioimpedancia registrada",
-            "subtitle": _body_composition_source_label(getattr(body_item, "source", None)),
-            "detail": " | ".join(parts) if parts else "Avaliacao registrada",
-            "icon": "scan-line",
-        })
-
-    events.sort(key=lambda event: event["timestamp"], reverse=True)
-    return events[:limit]
+        return datetime.fromisoformat(str(values["t"])), UUID(str(values["i"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Cursor invalido") from exc
+
+
+def _timeline_branches() -> dict[str, tuple]:
+    """``event_type -> (model, occurred_at expression, payload, extra conditions)``."""
+    return {
+        "assessment": (
+            Assessment,
+            Assessment.assessment_date,
+            _payload(
+                assessment_number=Assessment.assessment_number,
+                weight_kg=_as_text(Assessment.weight_kg),
+                body_fat_pct=_as_text(Assessment.body_fat_pct),
+                strength_score=Assessment.strength_score,
+            ),
+            (Assessment.deleted_at.is_(None),),
+        ),
+        "assessment_appointment": (
+            AssessmentAppointment,
+            AssessmentAppointment.scheduled_at,
+            _payload(
+                status=AssessmentAppointment.status,
+                payment_status=AssessmentAppointment.payment_status,
+                evaluator_name_raw=AssessmentAppointment.evaluator_name_raw,
+                source=AssessmentAppointment.source,
+            ),
+            (AssessmentAppointment.deleted_at.is_(None),),
+        ),
+        "constraints": (
+            MemberConstraints,
+            MemberConstraints.updated_at,
+            _payload(
+                medical_conditions=MemberConstraints.medical_conditions,
+                injuries=MemberConstraints.injuries,
+                contraindications=MemberConstraints.contraindications,
+            ),
+            (MemberConstraints.deleted_at.is_(None),),
+        ),
+        "goal": (
+            MemberGoal,
+            MemberGoal.updated_at,
+            _payload(title=MemberGoal.title, status=MemberGoal.status, progress_pct=MemberGoal.progress_pct),
+            (MemberGoal.deleted_at.is_(None),),
+        ),
+        "training_plan": (
+            TrainingPlan,
+            TrainingPlan.updated_at,
+            _payload(
+                name=TrainingPlan.name,
+                objective=TrainingPlan.objective,
+                sessions_per_week=TrainingPlan.sessions_per_week,
+                split_type=TrainingPlan.split_type,
+            ),
+            (TrainingPlan.deleted_at.is_(None),),
+        ),
+        "checkin": (
+            Checkin,
+            Checkin.checkin_at,
+            _payload(source=_as_text(Checkin.source)),
+            (),
+        ),
+        "risk_alert": (
+            RiskAlert,
+            RiskAlert.created_at,
+            _payload(level=_as_text(RiskAlert.level), score=RiskAlert.score, resolved=RiskAlert.resolved),
+            (),
+        ),
+        "nps": (
+            NPSResponse,
+            NPSResponse.created_at,
+            _payload(score=NPSResponse.score, sentiment=_as_text(NPSResponse.sentiment)),
+            (),
+        ),
+        "task": (
+            Task,
+            Task.created_at,
+            _payload(
+                title=Task.title,
+                status=_as_text(Task.status),
+                priority=_as_text(Task.priority),
+                due_date=Task.due_date,
+                source=Task.extra_data["source"].astext,
+                plan_type=Task.extra_data["plan_type"].astext,
+            ),
+            (Task.deleted_at.is_(None),),
+        ),
+        "automation": (
+            AuditLog,
+            AuditLog.created_at,
+            _payload(action=AuditLog.action, details=AuditLog.details),
+            (AuditLog.action.in_(AUTOMATION_AUDIT_ACTIONS),),
+        ),
+        "body_composition": (
+            BodyCompositionEvaluation,
+            cast(BodyCompositionEvaluation.evaluation_date, DateTime(timezone=True)),
+            _payload(
+                evaluation_date=BodyCompositionEvaluation.evaluation_date,
+                source=BodyCompositionEvaluation.source,
+                health_score=BodyCompositionEvaluation.health_score,
+                actuar_sync_status=BodyCompositionEvaluation.actuar_sync_status,
+                ai_risk_flags_json=BodyCompositionEvaluation.ai_risk_flags_json,
+            ),
+            (),
+        ),
+    }
+
+
+def build_member_timeline_statement(
+    member_id: UUID,
+    *,
+    limit: int,
+    types: Iterable[str] | None = None,
+    cursor: str | None = None,
+    gym_id: UUID | None = None,
+):
+    wanted = set(types) if types is not None else set(TIMELINE_EVENT_TYPES)
+    selected_types = [event_type for event_type in TIMELINE_EVENT_TYPES if event_type in wanted]
+    if not selected_types:
+        return None
+    keyset = _decode_timeline_cursor(cursor) if cursor else None
+    branches = []
+    for event_type, (model, occurred_at, payload, conditions) in _timeline_branches().items():
+        if event_type not in selected_types:
+            continue
+        branch = select(
+            literal(event_type, String).label("event_type"),
+            model.id.label("event_id"),
+            occurred_at.label("occurred_at"),
+            payload.label("payload"),
+        ).where(model.member_id == member_id, *conditions)
+        if gym_id is not None:
+            branch = branch.where(model.gym_id == gym_id)
+        if keyset is not None:
+            cursor_at, cursor_id = keyset
+            branch = branch.where(or_(occurred_at < cursor_at, and_(occurred_at == cursor_at, model.id < cursor_id)))
+        # Bounding every branch keeps each one a short index range scan, however long the member's history is.
+        branches.append(branch.order_by(occurred_at.desc(), model.id.desc()).limit(limit))
+
+    events = union_all(*branches).subquery("timeline_events")
+    return select(events).order_by(events.c.occurred_at.desc(), events.c.event_id.desc()).limit(limit)
+
+
+def _format_assessment(payload: dict, _occurred_at: datetime) -> dict:
+    parts = []
+    if payload.get("weight_kg") is not None:
+        parts.append(f"Peso: {payload['weight_kg']} kg")
+    if payload.get("body_fat_pct") is not None:
+        parts.append(f"Gordura: {payload['body_fat_pct']}%")
+    if payload.get("strength_score") is not None:
+        parts.append(f"Forca: {payload['strength_score']}")
+    return {
+        "title": f"Avaliacao #{payload.get('assessment_number')}",
+        "detail": " | ".join(parts) if parts else "Avaliacao registrada",
+        "icon": "clipboard-list",
+    }
+
+
+def _format_assessment_appointment(payload: dict, _occurred_at: datetime) -> dict:
+    status_label = {
+        "scheduled": "Avaliação agendada",
+        "confirmed": "Avaliação confirmada",
+        "attended": "Compareceu a avaliacao",
+        "completed": "Avaliação realizada historicamente",
+        "no_show": "Faltou a avaliacao",
+        "cancelled": "Avaliação cancelada",
+        "rescheduled": "Avaliação remarcada",
+    }.get(payload.get("status"), "Agenda de avaliação")
+    payment_label = {
+        "pending": "pagamento pendente",
+        "paid": "pagamento pago",
+        "waived": "pagamento isento",
+        "not_required": "pagamento nao requerido",
+        "unknown": "pagamento nao informado",
+    }.get(payload.get("payment_status"), "pagamento nao informado")
+    evaluator = payload.get("evaluator_name_raw") or "professor nao informado"
+    return {
+        "title": status_label,
+        "detail": f"Professor/avaliador: {evaluator} | {payment_label} | Origem: {payload.get('source')}",
+        "icon": "calendar-check",
+    }
+
+
+def _format_constraints(payload: dict, _occurred_at: datetime) -> dict:
+    parts = []
+    if payload.get("medical_conditions"):
+        parts.append(f"Saude: {payload['medical_conditions']}")
+    if payload.get("injuries"):
+        parts.append(f"Lesoes: {payload['injuries']}")
+    if payload.get("contraindications"):
+        parts.append(f"Contraindicacoes: {payload['contraindications']}")
+    return {
+        "title": "Restricoes atualizadas",
+        "detail": " | ".join(parts) if parts else "Restricoes registradas",
+        "icon": "shield-alert",
+    }
+
+
+def _format_goal(payload: dict, _occurred_at: datetime) -> dict:
+    return {
+        "title": f"Objetivo: {payload.get('title')}",
+        "detail": f"Status: {payload.get('status')} | Progresso: {payload.get('progress_pct')}%",
+        "icon": "target",
+    }
+
+
+def _format_training_plan(payload: dict, _occurred_at: datetime) -> dict:
+    parts = []
+    if payload.get("objective"):
+        parts.append(f"Objetivo: {payload['objective']}")
+    parts.append(f"{payload.get('sessions_per_week')}x por semana")
+    if payload.get("split_type"):
+        parts.append(f"Divisao: {payload['split_type']}")
+    return {"title": f"Treino: {payload.get('name')}", "detail": " | ".join(parts), "icon": "dumbbell"}
+
+
+def _format_checkin(payload: dict, _occurred_at: datetime) -> dict:
+    return {
+        "title": "Check-in",
+        "detail": f"Fonte: {_enum_value(CheckinSource, payload.get('source'))}",
+        "icon": "activity",
+    }
+
+
+def _format_risk_alert(payload: dict, _occurred_at: datetime) -> dict:
+    level = _enum_value(RiskLevel, payload.get("level"))
+    level_label = str(level or "unknown")
+    return {
+        "title": f"Alerta de risco - {level_label.upper()}",
+        "detail": f"Score: {payload.get('score')}. {'Resolvido' if payload.get('resolved') else 'Ativo'}",
+        "icon": "alert-triangle",
+        "level": level,
+    }
+
+
+def _format_nps(payload: dict, _occurred_at: datetime) -> dict:
+    return {
+        "title": f"NPS: {payload.get('score')}",
+        "detail": f"Sentimento: {_enum_value(NPSSentiment, payload.get('sentiment'))}",
+        "icon": "star",
+    }
+
+
+def _format_task(payload: dict, _occurred_at: datetime) -> dict:
+    source = str(payload.get("source") or "").lower()
+    plan_type = str(payload.get("plan_type") or "").lower()
+    label = ""
+    if source == "onboarding":
+        label = "[Onboarding] "
+    elif source == "plan_followup":
+        label = f"[Plano {plan_type.capitalize()}] " if plan_type else "[Plano] "
+
+    details = [
+        f"Status: {_enum_value(TaskStatus, payload.get('status'))}",
+        f"Prioridade: {_enum_value(TaskPriority, payload.get('priority'))}",
+    ]
+    if payload.get("due_date"):
+        details.append(f"Vencimento: {datetime.fromisoformat(payload['due_date']).strftime('%d/%m/%Y')}")
+    title = payload.get("title") or ""
+    return {"title": f"{label}{title}" if label else title, "detail": " | ".join(details), "icon": "clipboard"}
+
+
+def _format_automation(payload: dict, _occurred_at: datetime) -> dict:
+    details = payload.get("details")
+    return {
+        "title": f"Automacao: {payload.get('action')}",
+        "detail": str(details) if details else "",
+        "icon": "zap",
+    }
+
+
+def _format_body_composition(payload: dict, _occurred_at: datetime) -> dict:
+    parts = []
+    risk_flags = payload.get("ai_risk_flags_json") or []
+    if isinstance(risk_flags, list):
+        for flag in risk_flags[:2]:
+            if flag:
+                parts.append(str(flag))
+    if payload.get("health_score") is not None:
+        parts.append(f"health score {payload['health_score']}")
+    parts.append(_body_composition_sync_label(payload.get("actuar_sync_status")))
+    return {
+        # Evaluations are dated, not timed: keep the plain date as the displayed timestamp.
+        "timestamp": date.fromisoformat(str(payload["evaluation_date"])).isoformat(),
+        "title": "Bioimpedancia registrada",
+        "subtitle": _body_composition_source_label(payload.get("source")),
+        "detail": " | ".join(parts) if parts else "Avaliacao registrada",
+        "icon": "scan-line",
+    }
+
+
+_FORMATTERS: dict[str, Callable[[dict, datetime], dict]] = {
+    "assessment": _format_assessment,
+    "assessment_appointment": _format_assessment_appointment,
+    "constraints": _format_constraints,
+    "goal": _format_goal,
+    "training_plan": _format_training_plan,
+    "checkin": _format_checkin,
+    "risk_alert": _format_risk_alert,
+    "nps": _format_nps,
+    "task": _format_task,
+    "automation": _format_automation,
+    "body_composition": _format_body_composition,
+}
+
+
+def get_member_timeline(
+    db: Session,
+    member_id: UUID,
+    limit: int = 50,
+    *,
+    types: Iterable[str] | None = None,
+    cursor: str | None = None,
+    gym_id: UUID | None = None,
+) -> list[dict]:
+    """Newest-first events of a member; pass an event's ``cursor`` to get the page after it."""
+    stmt = build_member_timeline_statement(
+        member_id,
+        limit=limit,
+        types=types,
+        cursor=cursor,
+        gym_id=gym_id or get_current_gym_id(),
+    )
+    if stmt is None:
+        return []
+
+    events: list[dict] = []
+    for row in db.execute(stmt).all():
+        payload = row.payload or {}
+        event = {"type": row.event_type, "timestamp": row.occurred_at.isoformat()}
+        event.update(_FORMATTERS[row.event_type](payload, row.occurred_at))
+        event["id"] = str(row.event_id)
+        event["cursor"] = encode_cursor({"t": row.occurred_at.isoformat(), "i": str(row.event_id)})
+        events.append(event)
+    return events
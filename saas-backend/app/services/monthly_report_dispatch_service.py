@@ -0,0 +1,231 @@
+"""Monthly report dispatch in three steps: render once, queue deliveries, send them.
+
+``prepare_monthly_report_dispatch`` runs inside the per-gym ``monthly_reports_dispatch`` job. The scheduled fan-out
+renders the consolidated PDF once per gym and period (a retried or repeated job reuses the stored artifact) and
+queues one ``MonthlyReportDelivery`` per active leader. A manual dispatch (``POST /reports/monthly-dispatch``)
+renders current data into an artifact of its own job and queues every leader again.
+``process_due_monthly_report_deliveries`` then sends due deliveries of every gym with bounded concurrency. Each
+recipient keeps its own attempts and retry schedule, so a failed email is retried alone and never re-renders the
+report.
+"""
+
+import hashlib
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer
+
+from app.database import include_all_tenants
+from app.models import MonthlyReportArtifact, MonthlyReportDelivery
+from app.services.report_service import (
+    MONTHLY_REPORT_EMAIL_BODY,
+    MONTHLY_REPORT_EMAIL_SUBJECT,
+    generate_dashboard_pdf,
+    list_monthly_report_recipients,
+)
+from app.utils.email import EmailSendResult, send_email_with_attachment_result
+
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_STATUS_PENDING = "pending"
+DELIVERY_STATUS_RETRY_SCHEDULED = "retry_scheduled"
+DELIVERY_STATUS_SENT = "sent"
+DELIVERY_STATUS_FAILED = "failed"
+_DUE_STATUSES = (DELIVERY_STATUS_PENDING, DELIVERY_STATUS_RETRY_SCHEDULED)
+_RETRY_DELAYS_MINUTES = (1, 5, 15, 60)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def monthly_report_period(now: datetime | None = None) -> date:
+    return (now or _utcnow()).date().replace(day=1)
+
+
+def _get_or_render_artifact(
+    db: Session,
+    *,
+    gym_id: UUID,
+    period: date,
+    dispatch_job_id: UUID | None = None,
+) -> tuple[MonthlyReportArtifact, bool]:
+    stmt = select(MonthlyReportArtifact).where(MonthlyReportArtifact.gym_id == gym_id)
+    if dispatch_job_id is not None:
+        stmt = stmt.where(MonthlyReportArtifact.dispatch_job_id == dispatch_job_id)
+    else:
+        stmt = stmt.where(MonthlyReportArtifact.period == period, MonthlyReportArtifact.dispatch_job_id.is_(None))
+    artifact = db.scalar(stmt)
+    if artifact is not None:
+        return artifact, False
+
+    buffer, filename = generate_dashboard_pdf(db, "consolidated", generated_by="Sistema")
+    content = buffer.getvalue()
+    artifact = MonthlyReportArtifact(
+        gym_id=gym_id,
+        period=period,
+        dispatch_job_id=dispatch_job_id,
+        filename=filename,
+        content=content,
+        content_sha256=hashlib.sha256(content).hexdigest(),
+        size_bytes=len(content),
+    )
+    db.add(artifact)
+    db.flush()
+    return artifact, True
+
+
+def prepare_monthly_report_dispatch(
+    db: Session,
+    *,
+    gym_id: UUID,
+    dispatch_job_id: UUID | None = None,
+) -> dict[str, Any]:
+    """Renders (or reuses) the artifact and queues a delivery per leader not yet served.
+
+    Without ``dispatch_job_id`` (scheduled fan-out) the artifact is this period's: leaders whose delivery already
+    failed for good are queued again, so re-running the dispatch after fixing the e-mail setup resends only to them.
+    With it (manual dispatch) the artifact belongs to that job, so the report is rendered from current data and every
+    leader is queued; only a retry of the same job reuses it.
+    """
+    period = monthly_report_period()
+    artifact, rendered = _get_or_render_artifact(db, gym_id=gym_id, period=period, dispatch_job_id=dispatch_job_id)
+    recipients = list_monthly_report_recipients(db)
+    existing = {
+        delivery.user_id: delivery
+        for delivery in db.scalars(
+            select(MonthlyReportDelivery).where(MonthlyReportDelivery.artifact_id == artifact.id)
+        ).all()
+    }
+
+    now = _utcnow()
+    queued = 0
+    requeued = 0
+    for user in recipients:
+        delivery = existing.get(user.id)
+        if delivery is None:
+            db.add(
+                MonthlyReportDelivery(
+                    gym_id=gym_id,
+                    artifact_id=artifact.id,
+                    user_id=user.id,
+                    email=user.email,
+                    status=DELIVERY_STATUS_PENDING,
+                    attempt_count=0,
+                    max_attempts=len(_RETRY_DELAYS_MINUTES) + 1,
+                    next_attempt_at=now,
+                )
+            )
+            queued += 1
+        elif delivery.status == DELIVERY_STATUS_FAILED:
+            delivery.email = user.email
+            delivery.status = DELIVERY_STATUS_PENDING
+            delivery.attempt_count = 0
+            delivery.next_attempt_at = now
+            delivery.last_error_code = None
+            requeued += 1
+    db.flush()
+    return {
+        "period": period.isoformat(),
+        "artifact_id": str(artifact.id),
+        "rendered": rendered,
+        "size_bytes": artifact.size_bytes,
+        "deliveries_queued": queued,
+        "deliveries_requeued": requeued,
+        "total_recipients": len(recipients),
+    }
+
+
+def _send(email: str, filename: str, content: bytes) -> EmailSendResult:
+    try:
+        return send_email_with_attachment_result(
+            email,
+            MONTHLY_REPORT_EMAIL_SUBJECT,
+            MONTHLY_REPORT_EMAIL_BODY,
+            filename=filename,
+            attachment_bytes=content,
+        )
+    except Exception:
+        logger.exception("Falha inesperada ao enviar relatorio mensal.")
+        return EmailSendResult(sent=False, reason="unexpected_error")
+
+
+def _record_delivery_result(delivery: MonthlyReportDelivery, result: EmailSendResult, now: datetime) -> str:
+    delivery.attempt_count += 1
+    if result.sent:
+        delivery.status = DELIVERY_STATUS_SENT
+        delivery.sent_at = now
+        delivery.last_error_code = None
+        return DELIVERY_STATUS_SENT
+
+    delivery.last_error_code = (result.reason or "monthly_report_delivery_failed")[:80]
+    delay_index = delivery.attempt_count - 1
+    # A blocked send is a configuration problem (missing key, unverified sender): retrying cannot succeed.
+    if result.blocked or delivery.attempt_count >= delivery.max_attempts or delay_index >= len(_RETRY_DELAYS_MINUTES):
+        delivery.status = DELIVERY_STATUS_FAILED
+        return DELIVERY_STATUS_FAILED
+    delivery.status = DELIVERY_STATUS_RETRY_SCHEDULED
+    delivery.next_attempt_at = now + timedelta(minutes=_RETRY_DELAYS_MINUTES[delay_index])
+    return DELIVERY_STATUS_RETRY_SCHEDULED
+
+
+def process_due_monthly_report_deliveries(db: Session, *, batch_size: int, concurrency: int) -> dict[str, int]:
+    """Sends up to ``batch_size`` due deliveries of any gym, ``concurrency`` e-mails at a time.
+
+    The claimed rows stay locked (``SKIP LOCKED``) until the caller commits, so concurrent workers never send the
+    same delivery twice.
+    """
+    now = _utcnow()
+    deliveries = list(
+        db.scalars(
+            include_all_tenants(
+                select(MonthlyReportDelivery)
+                .where(
+                    MonthlyReportDelivery.status.in_(_DUE_STATUSES),
+                    MonthlyReportDelivery.next_attempt_at <= now,
+                )
+                .order_by(MonthlyReportDelivery.next_attempt_at.asc())
+                .limit(max(int(batch_size), 1))
+                .with_for_update(skip_locked=True),
+                reason="monthly_reports.claim_due_deliveries",
+            )
+        ).all()
+    )
+    counts: Counter[str] = Counter()
+    if not deliveries:
+        return {"claimed": 0, "sent": 0, "retry_scheduled": 0, "failed": 0}
+
+    artifacts = {
+        artifact.id: artifact
+        for artifact in db.scalars(
+            include_all_tenants(
+                select(MonthlyReportArtifact)
+                .options(undefer(MonthlyReportArtifact.content))
+                .where(MonthlyReportArtifact.id.in_({delivery.artifact_id for delivery in deliveries})),
+                reason="monthly_reports.load_artifacts",
+            )
+        ).all()
+    }
+    # Only plain values cross into the sender threads; ORM state is read and written on this thread.
+    sends = [
+        (delivery.email, artifacts[delivery.artifact_id].filename, artifacts[delivery.artifact_id].content)
+        for delivery in deliveries
+    ]
+    with ThreadPoolExecutor(max_workers=max(min(int(concurrency), len(sends)), 1)) as executor:
+        results = list(executor.map(lambda send: _send(*send), sends))
+
+    for delivery, result in zip(deliveries, results):
+        counts[_record_delivery_result(delivery, result, now)] += 1
+    db.flush()
+    return {
+        "claimed": len(deliveries),
+        "sent": counts[DELIVERY_STATUS_SENT],
+        "retry_scheduled": counts[DELIVERY_STATUS_RETRY_SCHEDULED],
+        "failed": counts[DELIVERY_STATUS_FAILED],
+    }
@@ -0,0 +1,203 @@
+"""Batched NPS sentiment: responses are stored with a provisional sentiment and classified later by the worker.
+
+With ``NPS_SENTIMENT_BATCH_ENABLED`` ``create_response`` no longer waits on Claude: it stores the score-based
+``_fallback_sentiment`` and marks the row ``extra_data["sentiment_status"] = "pending"``.
+``process_pending_nps_sentiment`` claims pending rows of every gym, groups them per gym into prompts of ``batch_size``
+comments and sends up to ``concurrency`` prompts at a time through the AI gateway. Items the answer skips or garbles
+keep the fallback; a batch refused by the provider (open circuit breaker, busy tenant, 5xx/timeouts) stays pending for
+the next run, up to ``_MAX_DEFERRALS`` runs. Any other error (a 4xx, a bug) is logged and the batch keeps the fallback.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from uuid import UUID
+
+import anthropic
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.ai_gateway import AIGatewayBusyError
+from app.core.cache import invalidate_dashboard_cache
+from app.core.circuit_breaker import ProviderUnavailableError, is_provider_failure
+from app.core.config import settings
+from app.database import include_all_tenants
+from app.models import NPSResponse, NPSSentiment
+from app.services.audit_service import log_audit_event
+from app.utils.claude import _fallback_sentiment, analyze_sentiment_batch
+
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_PENDING = "pending"
+SENTIMENT_ANALYZED = "analyzed"
+SENTIMENT_FALLBACK = "fallback"
+SENTIMENT_DEFERRED = "deferred"
+_MAX_DEFERRALS = 5
+# SDK/HTTP errors defer the batch only when ``is_provider_failure`` says so (5xx, 408/425/429, transport errors).
+_PROVIDER_HTTP_ERRORS = (anthropic.APIStatusError, anthropic.APIConnectionError, httpx.HTTPError)
+
+
+@dataclass(frozen=True)
+class _SentimentItem:
+    response_id: UUID
+    score: int
+    comment: str
+
+
+@dataclass
+class _BatchResult:
+    results: list[tuple[NPSSentiment, str] | None] = field(default_factory=list)
+    deferred: bool = False
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def batch_sentiment_enabled() -> bool:
+    """Whether new responses with a comment should be queued for the worker instead of calling Claude inline."""
+    return bool(settings.nps_sentiment_batch_enabled and settings.claude_api_key)
+
+
+def _analyze_batch(gym_id: UUID, items: list[_SentimentItem]) -> _BatchResult:
+    try:
+        results, tokens = analyze_sentiment_batch([(item.score, item.comment) for item in items], gym_id=gym_id)
+    except (ProviderUnavailableError, AIGatewayBusyError) as exc:
+        logger.warning("Analise de sentimento em lote adiada para %s respostas: %s", len(items), exc)
+        return _BatchResult(deferred=True)
+    except _PROVIDER_HTTP_ERRORS as exc:
+        if not is_provider_failure(exc):
+            logger.exception("Claude recusou o lote de sentimento; %s respostas usarao fallback", len(items))
+            return _BatchResult(results=[None] * len(items))
+        logger.warning("Analise de sentimento em lote adiada para %s respostas: %s", len(items), exc)
+        return _BatchResult(deferred=True)
+    except Exception:
+        logger.exception("Falha na analise de sentimento em lote; %s respostas usarao fallback", len(items))
+        return _BatchResult(results=[None] * len(items))
+    return _BatchResult(results=results, **tokens)
+
+
+def _chunks(items: list[_SentimentItem], size: int) -> list[list[_SentimentItem]]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def _apply_result(
+    db: Session,
+    response: NPSResponse,
+    result: tuple[NPSSentiment, str] | None,
+) -> str:
+    extra_data = dict(response.extra_data or {})
+    previous = response.sentiment
+    if result is None:
+        sentiment, summary = _fallback_sentiment(response.score, response.comment)
+        status = SENTIMENT_FALLBACK
+    else:
+        sentiment, summary = result
+        status = SENTIMENT_ANALYZED
+    response.sentiment = sentiment
+    response.sentiment_summary = summary
+    extra_data["sentiment_status"] = status
+    response.extra_data = extra_data
+    # The provisional sentiment already alerted on detractors; only a newly negative answer needs its own alert.
+    if sentiment == NPSSentiment.NEGATIVE and previous != NPSSentiment.NEGATIVE and response.member_id:
+        log_audit_event(
+            db,
+            action="nps_detractor_alert",
+            entity="member",
+            gym_id=response.gym_id,
+            member_id=response.member_id,
+            entity_id=response.member_id,
+            details={"score": response.score, "summary": summary},
+            flush=False,
+        )
+    return status
+
+
+def _defer(response: NPSResponse) -> str:
+    extra_data = dict(response.extra_data or {})
+    deferrals = int(extra_data.get("sentiment_deferrals") or 0) + 1
+    extra_data["sentiment_deferrals"] = deferrals
+    if deferrals >= _MAX_DEFERRALS:
+        extra_data["sentiment_status"] = SENTIMENT_FALLBACK
+        response.extra_data = extra_data
+        return SENTIMENT_FALLBACK
+    response.extra_data = extra_data
+    return SENTIMENT_DEFERRED
+
+
+def process_pending_nps_sentiment(
+    db: Session,
+    *,
+    claim_size: int,
+    batch_size: int,
+    concurrency: int,
+) -> dict[str, int | float]:
+    """Classifies up to ``claim_size`` pending responses of any gym in prompts of ``batch_size`` comments.
+
+    Claimed rows stay locked (``SKIP LOCKED``) until the caller commits. The result carries the counters and the
+    throughput/token figures the job logs, so runs with different ``batch_size`` can be compared.
+    """
+    started = perf_counter()
+    batch_size = max(int(batch_size), 1)
+    responses = list(
+        db.scalars(
+            include_all_tenants(
+                select(NPSResponse)
+                .where(NPSResponse.extra_data["sentiment_status"].astext == SENTIMENT_PENDING)
+                .order_by(NPSResponse.created_at.asc())
+                .limit(max(int(claim_size), 1))
+                .with_for_update(skip_locked=True),
+                reason="nps_sentiment.claim_pending",
+            )
+        ).all()
+    )
+    counts: Counter[str] = Counter()
+    metrics: dict[str, int | float] = {"claimed": len(responses), "batch_size": batch_size, "batches": 0}
+    if not responses:
+        return {**metrics, SENTIMENT_ANALYZED: 0, SENTIMENT_FALLBACK: 0, SENTIMENT_DEFERRED: 0}
+
+    by_id = {response.id: response for response in responses}
+    by_gym: dict[UUID, list[_SentimentItem]] = defaultdict(list)
+    for response in responses:
+        if not settings.claude_api_key or not response.comment:
+            counts[_apply_result(db, response, None)] += 1
+            continue
+        # Only plain values cross into the worker threads; ORM state is read and written on this thread.
+        by_gym[response.gym_id].append(_SentimentItem(response.id, response.score, response.comment))
+
+    batches = [(gym_id, chunk) for gym_id, items in by_gym.items() for chunk in _chunks(items, batch_size)]
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(max(int(concurrency), 1), len(batches))) as executor:
+            outcomes = list(executor.map(lambda batch: _analyze_batch(*batch), batches))
+    else:
+        outcomes = []
+
+    input_tokens = output_tokens = 0
+    for (_gym_id, items), outcome in zip(batches, outcomes):
+        input_tokens += outcome.input_tokens
+        output_tokens += outcome.output_tokens
+        for index, item in enumerate(items):
+            response = by_id[item.response_id]
+            if outcome.deferred:
+                counts[_defer(response)] += 1
+            else:
+                counts[_apply_result(db, response, outcome.results[index])] += 1
+    db.flush()
+    for gym_id in {response.gym_id for response in responses}:
+        invalidate_dashboard_cache("nps", "risk", gym_id=gym_id)
+
+    elapsed = perf_counter() - started
+    classified = counts[SENTIMENT_ANALYZED] + counts[SENTIMENT_FALLBACK]
+    return {
+        **metrics,
+        "batches": len(batches),
+        SENTIMENT_ANALYZED: counts[SENTIMENT_ANALYZED],
+        SENTIMENT_FALLBACK: counts[SENTIMENT_FALLBACK],
+        SENTIMENT_DEFERRED: counts[SENTIMENT_DEFERRED],
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "tokens_per_item": round((input_tokens + output_tokens) / len(responses), 1),
+        "items_per_second": round(classified / elapsed, 1) if elapsed > 0 else float(classified),
+    }
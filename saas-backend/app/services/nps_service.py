@@ -8,12 +8,19 @@ from app.core.cache import invalidate_dashboard_cache
 from app.models import AuditLog, Member, MemberStatus, NPSSentiment, NPSTrigger, NPSResponse, RiskLevel
 from app.schemas import NPSEvolutionPoint, NPSResponseCreate
 from app.services.audit_service import log_audit_event
-from app.utils.claude import analyze_sentiment
+from app.services.nps_sentiment_batch_service import SENTIMENT_PENDING, batch_sentiment_enabled
+from app.utils.claude import _fallback_sentiment, analyze_sentiment
 from app.utils.email import send_email
 
 
 def create_response(db: Session, payload: NPSResponseCreate, *, commit: bool = True) -> NPSResponse:
-    sentiment, summary = analyze_sentiment(payload.score, payload.comment)
+    extra_data: dict = {}
+    if payload.comment and batch_sentiment_enabled():
+        # Provisional score-based sentiment; the worker replaces it in a batched Claude call.
+        sentiment, summary = _fallback_sentiment(payload.score, payload.comment)
+        extra_data["sentiment_status"] = SENTIMENT_PENDING
+    else:
+        sentiment, summary = analyze_sentiment(payload.score, payload.comment)
     response = NPSResponse(
         member_id=payload.member_id,
         score=payload.score,
@@ -21,6 +28,7 @@ def create_response(db: Session, payload: NPSResponseCreate, *, commit: bool = T
         sentiment=sentiment,
         sentiment_summary=summary,
         trigger=payload.trigger,
+        extra_data=extra_data,
     )
     db.add(response)
 
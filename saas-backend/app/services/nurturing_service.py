@@ -6,6 +6,7 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.branding import PRODUCT_NAME
 from app.core.cache import dashboard_cache, make_cache_key
 from app.core.config import settings
@@ -593,14 +594,16 @@ def _claude_or_fallback(*, prompt: str, fallback: str) -> str:
     if not settings.claude_api_key:
         return fallback
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="nurturing_email",
+            params={
+                "max_tokens": settings.claude_max_tokens,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+            },
         )
         text = response.content[0].text.strip()
         return text[:1200] or fallback
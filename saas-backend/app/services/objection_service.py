@@ -8,6 +8,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.config import settings
 from app.models import Lead, LeadStage, NurturingSequence, ObjectionResponse
 from app.schemas.objection import ObjectionResponseUpdate
@@ -79,9 +80,6 @@ def _personalize_with_claude(base_response: str, message_text: str, context: dic
         return base_response
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
         prompt = (
             "Voce e um SDR de SaaS B2B para academias. Personalize a resposta abaixo "
             "de forma curta (max 120 palavras), profissional e objetiva. "
@@ -90,11 +88,16 @@ def _personalize_with_claude(base_response: str, message_text: str, context: dic
             f"Contexto: {context}\n"
             f"Resposta base: {base_response}\n"
         )
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="objection_response",
+            params={
+                "max_tokens": settings.claude_max_tokens,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+            },
         )
         return response.content[0].text.strip()[:1200] or base_response
     except Exception:
@@ -11,9 +11,12 @@ from app.models import AuditLog, AssessmentAppointment, Checkin, Member, MemberS
 from app.models.assessment import Assessment
 from app.models.body_composition import BodyCompositionEvaluation
 from app.services.whatsapp_service import normalize_phone
+from app.utils.batching import BatchScanStats, iter_keyset_batches
 
 logger = logging.getLogger(__name__)
 
+_DAILY_BATCH_SIZE = 200
+
 # Pesos dos fatores (somam 100)
 WEIGHT_CHECKIN_FREQUENCY = 30
 WEIGHT_FIRST_ASSESSMENT = 15
@@ -257,28 +260,30 @@ def run_daily_onboarding_score(db: Session) -> dict:
     now = datetime.now(tz=timezone.utc)
     cutoff_date = (now - timedelta(days=37)).date()
 
-    members = list(db.scalars(
-        select(Member).where(
-            Member.deleted_at.is_(None),
-            Member.status == MemberStatus.ACTIVE,
-            Member.join_date >= cutoff_date,
-        )
-    ).all())
+    stmt = select(Member).where(
+        Member.deleted_at.is_(None),
+        Member.status == MemberStatus.ACTIVE,
+        Member.join_date >= cutoff_date,
+    )
 
+    processed = 0
     updated = 0
-    for member in members:
-        try:
-            result = calculate_onboarding_score(db, member)
-            member.onboarding_score = result["score"]
-            member.onboarding_status = result["status"]
-            db.add(member)
-            _process_d30_handoff(db, member)
-            updated += 1
-        except Exception:
-            logger.exception("Falha ao calcular onboarding score para membro %s", member.id)
-
-    db.commit()
-    return {"members_processed": len(members), "updated": updated}
+    scan_stats = BatchScanStats()
+    for members in iter_keyset_batches(db, stmt, Member.id, batch_size=_DAILY_BATCH_SIZE, stats=scan_stats):
+        for member in members:
+            try:
+                result = calculate_onboarding_score(db, member)
+                member.onboarding_score = result["score"]
+                member.onboarding_status = result["status"]
+                db.add(member)
+                _process_d30_handoff(db, member)
+                updated += 1
+            except Exception:
+                logger.exception("Falha ao calcular onboarding score para membro %s", member.id)
+        processed += len(members)
+        db.commit()
+
+    return {"members_processed": processed, "updated": updated, **scan_stats.as_metrics()}
 
 
 def _process_d30_handoff(db: Session, member: Member) -> None:
@@ -0,0 +1,111 @@
+"""On-disk cache of rendered report PDFs, addressed by the content that produced them.
+
+Entries live under ``PDF_RENDER_CACHE_DIR`` as ``<key[:2]>/<key>.pdf``. Callers derive the key from everything that
+shapes the document (payload and template version), so a changed evaluation, dashboard figure or layout is simply
+a miss and stale entries age out. The directory is bounded by ``PDF_RENDER_CACHE_MAX_MB`` with least-recently-used
+eviction: reads and writes stamp the file mtime, and every write scans the directory and drops the oldest files
+until the whole directory fits, so the bound holds for all processes sharing it, not per process.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from threading import RLock
+from uuid import uuid4
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderCache:
+    def __init__(self, root: Path, *, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(int(max_bytes), 0)
+        self._lock = RLock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pdf"
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # Explicit nanosecond stamps: the filesystem's own mtime clock is too coarse to order back-to-back accesses.
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _scan(self) -> list[tuple[int, Path, int]]:
+        """Cached files as ``(mtime_ns, path, size)``, least recently used first."""
+        entries = []
+        for path in self.root.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, path, stat.st_size))
+        return sorted(entries)
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            content = path.read_bytes()
+            self._touch(path)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Falha ao ler PDF do cache de renderizacao.", exc_info=True)
+            return None
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+            self._touch(path)
+        except OSError:
+            logger.warning("Falha ao gravar PDF no cache de renderizacao.", exc_info=True)
+            temp_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Measured on disk, so files written by other workers count against the same bound.
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.debug("Falha ao remover PDF do cache de renderizacao.", exc_info=True)
+                continue
+            total -= size
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, _, size in self._scan())
+
+
+_cache: PdfRenderCache | None = None
+_cache_lock = RLock()
+
+
+def get_pdf_render_cache() -> PdfRenderCache | None:
+    if not settings.pdf_render_cache_enabled:
+        return None
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfRenderCache(
+                Path(settings.pdf_render_cache_dir),
+                max_bytes=settings.pdf_render_cache_max_mb * 1024 * 1024,
+            )
+        return _cache
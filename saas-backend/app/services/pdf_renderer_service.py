@@ -0,0 +1,312 @@
+"""HTML to PDF rendering through a pool of warm Chromium browsers.
+
+Each pool slot is a thread that owns one Playwright driver, one browser and one recycled page: the sync Playwright
+API is bound to the thread that started it. Renders are queued to the slots, so the pool size is also the
+concurrency limit. A slot checks its browser before every render and relaunches it after ``max_renders`` renders or
+after any failure.
+
+``render_pdf`` picks the backend: the dedicated renderer process (``PDF_RENDERER_URL``), the in-process pool
+(``PDF_RENDERER_POOL_ENABLED``) or, by default, a fresh browser per render.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hmac
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from time import perf_counter
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEWPORT = {"width": 1240, "height": 1754}
+DEFAULT_MARGIN = {"top": "18mm", "right": "12mm", "bottom": "18mm", "left": "12mm"}
+RENDERER_TOKEN_HEADER = "X-Renderer-Token"
+
+# Rolling window used for the p50/p95 reported by ``health()``.
+_LATENCY_WINDOW = 500
+
+
+@dataclass(frozen=True)
+class PdfRenderRequest:
+    html: str
+    viewport: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_VIEWPORT))
+    media: str = "screen"
+    margin: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_MARGIN))
+    scale: float = 1.0
+
+    def to_json(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _start_playwright():
+    try:
+        from playwright.sync_api import sync_playwright
+    except Exception as exc:  # pragma: no cover - exercised in runtime environments
+        raise RuntimeError("playwright_unavailable") from exc
+    return sync_playwright().start()
+
+
+def _print_page(page, request: PdfRenderRequest) -> bytes:
+    page.set_viewport_size(request.viewport)
+    page.set_content(request.html, wait_until="networkidle")
+    page.emulate_media(media=request.media)
+    return page.pdf(format="A4", print_background=True, margin=request.margin, scale=request.scale)
+
+
+def render_pdf_once(request: PdfRenderRequest) -> bytes:
+    """Renders with a browser launched for this call only (the behaviour without a pool)."""
+    playwright = _start_playwright()
+    try:
+        browser = playwright.chromium.launch(headless=True)
+        try:
+            return _print_page(browser.new_page(viewport=request.viewport), request)
+        finally:
+            browser.close()
+    finally:
+        playwright.stop()
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class _RendererSlot(threading.Thread):
+    def __init__(self, pool: PdfRendererPool, index: int) -> None:
+        super().__init__(name=f"pdf-renderer-{index}", daemon=True)
+        self._pool = pool
+        self._playwright = None
+        self._browser = None
+        self._page = None
+        self._renders_on_browser = 0
+        self._launched = False
+
+    @property
+    def browser_alive(self) -> bool:
+        browser = self._browser
+        return browser is not None and browser.is_connected()
+
+    def run(self) -> None:
+        try:
+            while True:
+                item = self._pool._jobs.get()
+                if item is None:
+                    return
+                request, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                started = perf_counter()
+                try:
+                    pdf = self._render(request)
+                except Exception as exc:
+                    self._pool._record_failure()
+                    logger.warning(
+                        "Falha ao renderizar PDF; o navegador sera reiniciado.",
+                        extra={"extra_fields": {"event": "pdf_render_failed", "slot": self.name}},
+                        exc_info=True,
+                    )
+                    self._close_browser()
+                    future.set_exception(exc)
+                else:
+                    self._pool._record_render((perf_counter() - started) * 1000)
+                    future.set_result(pdf)
+        finally:
+            self._close_browser()
+            self._stop_playwright()
+
+    def _render(self, request: PdfRenderRequest) -> bytes:
+        self._ensure_browser()
+        self._renders_on_browser += 1
+        pdf = _print_page(self._page, request)
+        try:
+            # Drops the document so the recycled page does not keep its images and DOM alive between renders.
+            self._page.goto("about:blank")
+        except Exception:
+            logger.debug("Falha ao limpar a pagina do renderizador; o navegador sera reiniciado.", exc_info=True)
+            self._close_browser()
+        return pdf
+
+    def _ensure_browser(self) -> None:
+        if self.browser_alive and self._renders_on_browser < self._pool.max_renders:
+            return
+        self._close_browser()
+        if self._launched:
+            self._pool._record_restart()
+        if self._playwright is None:
+            self._playwright = _start_playwright()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._page = self._browser.new_page(viewport=dict(DEFAULT_VIEWPORT))
+        self._renders_on_browser = 0
+        self._launched = True
+
+    def _close_browser(self) -> None:
+        browser, self._browser, self._page = self._browser, None, None
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception:
+            logger.debug("Navegador do renderizador ja estava encerrado.", exc_info=True)
+
+    def _stop_playwright(self) -> None:
+        playwright, self._playwright = self._playwright, None
+        if playwright is None:
+            return
+        try:
+            playwright.stop()
+        except Exception:
+            logger.debug("Driver do Playwright ja estava encerrado.", exc_info=True)
+
+
+class PdfRendererPool:
+    """Fixed set of warm browsers; ``render`` blocks until a slot has printed the page."""
+
+    def __init__(self, *, size: int, max_renders: int) -> None:
+        self.size = max(int(size), 1)
+        self.max_renders = max(int(max_renders), 1)
+        self._jobs: queue.Queue[tuple[PdfRenderRequest, Future] | None] = queue.Queue()
+        self._slots: list[_RendererSlot] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._renders = 0
+        self._failures = 0
+        self._restarts = 0
+        self._latencies_ms: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("pdf_renderer_closed")
+            if self._slots:
+                return
+            self._slots = [_RendererSlot(self, index) for index in range(self.size)]
+            for slot in self._slots:
+                slot.start()
+
+    def render(self, request: PdfRenderRequest, *, timeout: float | None = None) -> bytes:
+        self._start()
+        future: Future = Future()
+        self._jobs.put((request, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise RuntimeError("pdf_render_timeout") from exc
+        except CancelledError as exc:
+            raise RuntimeError("pdf_renderer_closed") from exc
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            slots = list(self._slots)
+        for _ in slots:
+            self._jobs.put(None)
+        if wait:
+            for slot in slots:
+                slot.join(timeout=30)
+
+    def _record_render(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._renders += 1
+            self._latencies_ms.append(elapsed_ms)
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+    def _record_restart(self) -> None:
+        with self._lock:
+            self._restarts += 1
+
+    def health(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            slots = list(self._slots)
+            stats = {
+                "renders": self._renders,
+                "failures": self._failures,
+                "restarts": self._restarts,
+            }
+        return {
+            "status": "closed" if self._closed else "ok",
+            "slots": self.size,
+            "slots_started": len(slots),
+            "browsers_alive": sum(1 for slot in slots if slot.browser_alive),
+            "queue_depth": self._jobs.qsize(),
+            **stats,
+            "p50_ms": round(_percentile(latencies, 0.50), 1),
+            "p95_ms": round(_percentile(latencies, 0.95), 1),
+        }
+
+
+_pool: PdfRendererPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_renderer_pool() -> PdfRendererPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PdfRendererPool(
+                size=settings.pdf_renderer_pool_size,
+                max_renders=settings.pdf_renderer_max_renders_per_browser,
+            )
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
+
+
+def _render_local(request: PdfRenderRequest) -> bytes:
+    if settings.pdf_renderer_pool_enabled:
+        return get_renderer_pool().render(request, timeout=settings.pdf_renderer_timeout_seconds)
+    return render_pdf_once(request)
+
+
+def _render_remote(request: PdfRenderRequest) -> bytes:
+    headers = {RENDERER_TOKEN_HEADER: settings.pdf_renderer_token} if settings.pdf_renderer_token else {}
+    response = httpx.post(
+        f"{settings.pdf_renderer_url.rstrip('/')}/render",
+        json=request.to_json(),
+        headers=headers,
+        timeout=settings.pdf_renderer_timeout_seconds,
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def render_pdf(request: PdfRenderRequest) -> bytes:
+    if not settings.pdf_renderer_url:
+        return _render_local(request)
+    try:
+        return _render_remote(request)
+    except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+        status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+        if status_code is not None and status_code < 500:
+            raise RuntimeError(f"pdf_renderer_rejected:{status_code}") from exc
+        logger.warning(
+            "Renderizador de PDF indisponivel; renderizando localmente.",
+            extra={"extra_fields": {"event": "pdf_renderer_fallback", "status_code": status_code}},
+        )
+        return _render_local(request)
+
+
+def renderer_token_matches(token: str | None) -> bool:
+    """Without ``PDF_RENDERER_TOKEN`` every request is refused: ``/render`` must never run unauthenticated HTML."""
+    expected = settings.pdf_renderer_token
+    if not expected:
+        return False
+    return hmac.compare_digest((token or "").encode(), expected.encode())
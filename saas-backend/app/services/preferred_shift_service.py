@@ -10,8 +10,10 @@ from sqlalchemy.orm import Session
 
 from app.core.cache import invalidate_dashboard_cache
 from app.models import Checkin, Member
+from app.utils.batching import iter_keyset_batches
 
 PREFERRED_SHIFT_LOOKBACK_DAYS = 120
+_SYNC_BATCH_SIZE = 500
 _SHIFT_KEYS = ("overnight", "morning", "afternoon", "evening")
 
 _SHIFT_ALIASES = {
@@ -81,27 +83,8 @@ def derive_preferred_shift_from_counts(counts: dict[str, int] | None) -> str | N
     return winner
 
 
-def sync_preferred_shifts_from_checkins(
-    db: Session,
-    *,
-    gym_id: UUID | None = None,
-    member_ids: Iterable[UUID] | None = None,
-    commit: bool = True,
-    flush: bool = True,
-) -> int:
-    target_member_ids = {member_id for member_id in (member_ids or []) if member_id is not None}
-    filters = [Member.deleted_at.is_(None)]
-    if gym_id is not None:
-        filters.append(Member.gym_id == gym_id)
-    if target_member_ids:
-        filters.append(Member.id.in_(target_member_ids))
-
-    members = list(db.scalars(select(Member).where(and_(*filters))).all())
-    if not members:
-        return 0
-
+def _sync_preferred_shift_batch(db: Session, members: list[Member], *, recent_cutoff: datetime) -> int:
     member_id_set = {member.id for member in members}
-    recent_cutoff = datetime.now(tz=timezone.utc) - timedelta(days=PREFERRED_SHIFT_LOOKBACK_DAYS)
     shift_expr = checkin_shift_case()
     rows = db.execute(
         select(
@@ -129,6 +112,35 @@ def sync_preferred_shifts_from_checkins(
             member.preferred_shift = resolved_shift
             db.add(member)
             updated += 1
+    return updated
+
+
+def sync_preferred_shifts_from_checkins(
+    db: Session,
+    *,
+    gym_id: UUID | None = None,
+    member_ids: Iterable[UUID] | None = None,
+    commit: bool = True,
+    flush: bool = True,
+) -> int:
+    target_member_ids = {member_id for member_id in (member_ids or []) if member_id is not None}
+    filters = [Member.deleted_at.is_(None)]
+    if gym_id is not None:
+        filters.append(Member.gym_id == gym_id)
+    if target_member_ids:
+        filters.append(Member.id.in_(target_member_ids))
+
+    stmt = select(Member).where(and_(*filters))
+    if target_member_ids:
+        batches = [list(db.scalars(stmt).all())]
+    else:
+        # Gym-wide sync: bound each check-in aggregation to one keyset batch of members.
+        batches = iter_keyset_batches(db, stmt, Member.id, batch_size=_SYNC_BATCH_SIZE)
+
+    recent_cutoff = datetime.now(tz=timezone.utc) - timedelta(days=PREFERRED_SHIFT_LOOKBACK_DAYS)
+    updated = sum(
+        _sync_preferred_shift_batch(db, members, recent_cutoff=recent_cutoff) for members in batches if members
+    )
 
     if updated:
         invalidate_dashboard_cache("members")
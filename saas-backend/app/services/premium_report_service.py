@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
 from base64 import b64encode
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from html import escape
 from pathlib import Path
@@ -23,8 +26,12 @@ from app.services.dashboard_service import (
     get_retention_dashboard,
     get_weekly_summary,
 )
+from app.services.pdf_render_cache_service import get_pdf_render_cache
+from app.services.pdf_renderer_service import DEFAULT_MARGIN, DEFAULT_VIEWPORT, PdfRenderRequest, render_pdf
 
 
+logger = logging.getLogger(__name__)
+
 DashboardReportType = str
 ALLOWED_DASHBOARD_REPORTS = {"executive", "operational", "commercial", "financial", "retention", "consolidated"}
 PROGYM_LOGO_DATA_URI = (
@@ -41,6 +48,11 @@ _CORDEX_REPORT_LOGO_ASSET = Path(__file__).resolve().parents[1] / "assets" / "co
 if _CORDEX_REPORT_LOGO_ASSET.exists():
     CORDEX_REPORT_LOGO_DATA_URI = "data:image/png;base64," + b64encode(_CORDEX_REPORT_LOGO_ASSET.read_bytes()).decode("ascii")
 
+# Changes with the templates, CSS and logos of this module, so cached PDFs of an older layout are never served.
+PREMIUM_REPORT_TEMPLATE_VERSION = hashlib.sha256(
+    Path(__file__).read_bytes() + PROGYM_LOGO_DATA_URI.encode() + CORDEX_REPORT_LOGO_DATA_URI.encode()
+).hexdigest()[:16]
+
 
 @dataclass(slots=True)
 class PremiumReportBranding:
@@ -765,17 +777,43 @@ def render_premium_report_html(payload: PremiumReportPayload) -> str:
 </html>"""
 
 
-def render_premium_report_pdf(payload: PremiumReportPayload) -> bytes:
+def build_premium_report_pdf_request(payload: PremiumReportPayload) -> PdfRenderRequest:
     html = render_premium_report_html(payload)
     if payload.report_kind == "body_composition":
-        return render_html_to_pdf(
-            html,
+        return PdfRenderRequest(
+            html=html,
             viewport={"width": 1120, "height": 1580},
             media="print",
             margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
             scale=1.0,
         )
-    return render_html_to_pdf(html)
+    return PdfRenderRequest(html=html)
+
+
+def premium_report_cache_key(payload: PremiumReportPayload) -> str:
+    """Hashes everything that shapes the PDF; ``generated_at`` enters only as its UTC date.
+
+    The full timestamp differs on every build, while the date keeps the rendered "Gerado em" from outliving its day.
+    """
+    content = asdict(payload)
+    content["generated_at"] = payload.generated_at.astimezone(timezone.utc).date().isoformat()
+    body = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{PREMIUM_REPORT_TEMPLATE_VERSION}:{body}".encode("utf-8")).hexdigest()
+
+
+def render_premium_report_pdf(payload: PremiumReportPayload) -> bytes:
+    cache = get_pdf_render_cache()
+    if cache is None:
+        return render_pdf(build_premium_report_pdf_request(payload))
+
+    cache_key = premium_report_cache_key(payload)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.debug("PDF premium servido do cache de renderizacao: %s/%s", payload.report_kind, payload.report_scope)
+        return cached
+    pdf_bytes = render_pdf(build_premium_report_pdf_request(payload))
+    cache.put(cache_key, pdf_bytes)
+    return pdf_bytes
 
 
 def render_html_to_pdf(
@@ -786,25 +824,15 @@ def render_html_to_pdf(
     margin: dict[str, str] | None = None,
     scale: float = 1.0,
 ) -> bytes:
-    try:
-        from playwright.sync_api import sync_playwright
-    except Exception as exc:  # pragma: no cover - exercised in runtime environments
-        raise RuntimeError("playwright_unavailable") from exc
-
-    with sync_playwright() as playwright:
-        browser = playwright.chromium.launch(headless=True)
-        try:
-            page = browser.new_page(viewport=viewport or {"width": 1240, "height": 1754})
-            page.set_content(html, wait_until="networkidle")
-            page.emulate_media(media=media)
-            return page.pdf(
-                format="A4",
-                print_background=True,
-                margin=margin or {"top": "18mm", "right": "12mm", "bottom": "18mm", "left": "12mm"},
-                scale=scale,
-            )
-        finally:
-            browser.close()
+    return render_pdf(
+        PdfRenderRequest(
+            html=html,
+            viewport=viewport or dict(DEFAULT_VIEWPORT),
+            media=media,
+            margin=margin or dict(DEFAULT_MARGIN),
+            scale=scale,
+        )
+    )
 
 
 def _render_body_composition_report_html(payload: PremiumReportPayload) -> str:
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.branding import PRODUCT_NAME
+from app.core.config import settings
 from app.models import RoleEnum, User
 from app.services.core_async_job_service import CoreAsyncJobNonRetryableError
 from app.services.audit_service import log_audit_event
@@ -19,6 +20,10 @@ from app.services.premium_report_service import (
 from app.utils.email import send_email_with_attachment_result
 
 
+MONTHLY_REPORT_EMAIL_SUBJECT = f"{PRODUCT_NAME} - Relatorio Mensal Consolidado"
+MONTHLY_REPORT_EMAIL_BODY = "Segue em anexo o relatorio mensal consolidado da sua academia."
+
+
 def generate_dashboard_pdf(
     db: Session,
     dashboard: DashboardReportType,
@@ -31,16 +36,22 @@ def generate_dashboard_pdf(
     return BytesIO(pdf_bytes), filename
 
 
+def list_monthly_report_recipients(db: Session) -> list[User]:
+    return list(
+        db.scalars(
+            select(User).where(
+                User.deleted_at.is_(None),
+                User.is_active.is_(True),
+                User.role.in_([RoleEnum.OWNER, RoleEnum.MANAGER]),
+            )
+        ).all()
+    )
+
+
 def send_monthly_reports(db: Session) -> dict[str, object]:
     buffer, filename = generate_dashboard_pdf(db, "consolidated", generated_by="Sistema")
     attachment = buffer.getvalue()
-    leadership = db.scalars(
-        select(User).where(
-            User.deleted_at.is_(None),
-            User.is_active.is_(True),
-            User.role.in_([RoleEnum.OWNER, RoleEnum.MANAGER]),
-        )
-    ).all()
+    leadership = list_monthly_report_recipients(db)
 
     sent = 0
     failed = 0
@@ -49,8 +60,8 @@ def send_monthly_reports(db: Session) -> dict[str, object]:
     for user in leadership:
         result = send_email_with_attachment_result(
             user.email,
-            f"{PRODUCT_NAME} - Relatorio Mensal Consolidado",
-            "Segue em anexo o relatorio mensal consolidado da sua academia.",
+            MONTHLY_REPORT_EMAIL_SUBJECT,
+            MONTHLY_REPORT_EMAIL_BODY,
             filename=filename,
             attachment_bytes=attachment,
         )
@@ -78,13 +89,24 @@ def execute_monthly_reports_dispatch_job(
     job_id,
     requested_by_user_id=None,
 ) -> dict[str, object]:
-    result = send_monthly_reports(db)
-    if result["total_recipients"] > 0 and result["sent"] == 0:
-        primary_reason = next(iter(result.get("blocked_reasons", {}) or {}), "monthly_reports_delivery_failed")
-        raise CoreAsyncJobNonRetryableError(
-            primary_reason,
-            "Disparo mensal nao entregou nenhum email para a lideranca da academia",
+    if settings.monthly_reports_pipeline_enabled:
+        # Render and queue only; monthly_report_deliveries_job sends each recipient's copy with its own retries.
+        from app.services.monthly_report_dispatch_service import prepare_monthly_report_dispatch
+
+        # A dispatch requested by a user re-renders and resends to everyone; the scheduled one reuses the period's.
+        result = prepare_monthly_report_dispatch(
+            db,
+            gym_id=gym_id,
+            dispatch_job_id=job_id if requested_by_user_id else None,
         )
+    else:
+        result = send_monthly_reports(db)
+        if result["total_recipients"] > 0 and result["sent"] == 0:
+            primary_reason = next(iter(result.get("blocked_reasons", {}) or {}), "monthly_reports_delivery_failed")
+            raise CoreAsyncJobNonRetryableError(
+                primary_reason,
+                "Disparo mensal nao entregou nenhum email para a lideranca da academia",
+            )
 
     requested_by = db.get(User, requested_by_user_id) if requested_by_user_id else None
     log_audit_event(
@@ -28,13 +28,54 @@ from app.services.retention_stage_service import (
     retention_stage_meta,
 )
 from app.services.task_event_service import record_task_event
+from app.utils.batching import BatchScanStats, iter_keyset_batches
 
 logger = logging.getLogger(__name__)
 
+_DAILY_BATCH_SIZE = 200
+
 
 def classify_churn_type(db: Session, member: Member) -> str:
     """Classifica o tipo provavel de churn de um membro em risco."""
     now = datetime.now(tz=timezone.utc)
+    churn_type = _classify_churn_type_without_history(member, now)
+    if churn_type is not None:
+        return churn_type
+    seasonal = _detect_seasonal_pattern(db, member.id, now)
+    return _classify_churn_type_with_history(member, seasonal=seasonal)
+
+
+def classify_churn_types(db: Session, members: list[Member]) -> dict[UUID, str]:
+    """Classifica varios membros com uma unica consulta agregada de sazonalidade."""
+    now = datetime.now(tz=timezone.utc)
+    churn_types: dict[UUID, str] = {}
+    pending: list[Member] = []
+    for member in members:
+        churn_type = _classify_churn_type_without_history(member, now)
+        if churn_type is None:
+            pending.append(member)
+        else:
+            churn_types[member.id] = churn_type
+
+    if pending:
+        last_year_start, last_year_end = _seasonal_window(now)
+        rows = db.execute(
+            select(Checkin.member_id, func.count(Checkin.id).label("total"))
+            .where(
+                Checkin.member_id.in_([member.id for member in pending]),
+                Checkin.checkin_at >= last_year_start,
+                Checkin.checkin_at <= last_year_end,
+            )
+            .group_by(Checkin.member_id)
+        ).all()
+        last_year_checkins = {row.member_id: int(row.total or 0) for row in rows}
+        for member in pending:
+            seasonal = last_year_checkins.get(member.id, 0) <= 2
+            churn_types[member.id] = _classify_churn_type_with_history(member, seasonal=seasonal)
+    return churn_types
+
+
+def _classify_churn_type_without_history(member: Member, now: datetime) -> str | None:
     join_days = (now.date() - member.join_date).days
 
     # Early dropout: menos de 30 dias
@@ -44,9 +85,11 @@ def classify_churn_type(db: Session, member: Member) -> str:
     # NPS baixo = insatisfacao
     if member.nps_last_score <= 5:
         return ChurnType.VOLUNTARY_DISSATISFACTION.value
+    return None
+
 
+def _classify_churn_type_with_history(member: Member, *, seasonal: bool) -> str:
     # Checar sazonalidade: comparar com o mesmo periodo do ano anterior via check-ins
-    seasonal = _detect_seasonal_pattern(db, member.id, now)
     if seasonal:
         return ChurnType.INVOLUNTARY_SEASONAL.value
 
@@ -57,10 +100,13 @@ def classify_churn_type(db: Session, member: Member) -> str:
     return ChurnType.UNKNOWN.value
 
 
+def _seasonal_window(now: datetime) -> tuple[datetime, datetime]:
+    return now - timedelta(days=395), now - timedelta(days=335)
+
+
 def _detect_seasonal_pattern(db: Session, member_id: UUID, now: datetime) -> bool:
     """Verifica se o membro teve o mesmo padrao de queda no ano anterior."""
-    last_year_start = now - timedelta(days=395)
-    last_year_end = now - timedelta(days=335)
+    last_year_start, last_year_end = _seasonal_window(now)
     last_year_checkins = db.scalar(
         select(func.count(Checkin.id)).where(
             Checkin.member_id == member_id,
@@ -347,52 +393,64 @@ def materialize_playbook(db: Session, member: Member, playbook: list[dict]) -> l
 
 def run_daily_retention_intelligence(db: Session) -> dict:
     """Job diario que classifica churn e materializa playbooks para membros em risco."""
-    members_at_risk = list(db.scalars(
-        select(Member).where(
-            Member.deleted_at.is_(None),
-            Member.status == MemberStatus.ACTIVE,
-            Member.risk_level.in_([RiskLevel.YELLOW, RiskLevel.RED]),
-        )
-    ).all())
+    stmt = select(Member).where(
+        Member.deleted_at.is_(None),
+        Member.status == MemberStatus.ACTIVE,
+        Member.risk_level.in_([RiskLevel.YELLOW, RiskLevel.RED]),
+    )
 
     classified = 0
     playbooks_created = 0
     stages_updated = 0
+    scan_stats = BatchScanStats()
 
-    for member in members_at_risk:
+    for members_at_risk in iter_keyset_batches(db, stmt, Member.id, batch_size=_DAILY_BATCH_SIZE, stats=scan_stats):
         try:
-            retention_stage, days_without_checkin = calculate_member_retention_stage(member)
-            if member.retention_stage != retention_stage:
-                member.retention_stage = retention_stage
-                stages_updated += 1
-
-            churn_type = classify_churn_type(db, member)
-            member.churn_type = churn_type
+            churn_types = classify_churn_types(db, members_at_risk)
+        except Exception:
+            logger.exception(
+                "Falha ao classificar churn em lote; classificando %s membros individualmente", len(members_at_risk)
+            )
+            churn_types = {}
+        for member in members_at_risk:
+            try:
+                retention_stage, days_without_checkin = calculate_member_retention_stage(member)
+                if member.retention_stage != retention_stage:
+                    member.retention_stage = retention_stage
+                    stages_updated += 1
+
+                churn_type = churn_types.get(member.id) or classify_churn_type(db, member)
+                member.churn_type = churn_type
+
+                # VIP tem tratamento especial: sempre urgente para manager
+                if member.is_vip and member.risk_level == RiskLevel.RED:
+                    create_notification(
+                        db,
+                        member_id=member.id,
+                        user_id=member.assigned_user_id,
+                        title=f"ALERTA VIP: {member.full_name} em risco critico",
+                        message=f"Membro VIP com risco {member.risk_score}. Acionar retencao imediata.",
+                        category="retention_vip",
+                    )
 
-            # VIP tem tratamento especial: sempre urgente para manager
-            if member.is_vip and member.risk_level == RiskLevel.RED:
-                create_notification(
+                playbook = build_retention_playbook(
                     db,
-                    member_id=member.id,
-                    user_id=member.assigned_user_id,
-                    title=f"ALERTA VIP: {member.full_name} em risco critico",
-                    message=f"Membro VIP com risco {member.risk_score}. Acionar retencao imediata.",
-                    category="retention_vip",
+                    member,
+                    churn_type,
+                    retention_stage=retention_stage,
+                    days_without_checkin=days_without_checkin,
                 )
-
-            playbook = build_retention_playbook(
-                db,
-                member,
-                churn_type,
-                retention_stage=retention_stage,
-                days_without_checkin=days_without_checkin,
-            )
-            results = materialize_playbook(db, member, playbook)
-            db.add(member)
-            classified += 1
-            playbooks_created += sum(1 for r in results if r["status"] == "created")
-        except Exception:
-            logger.exception("Falha ao processar retention intelligence para membro %s", member.id)
-
-    db.commit()
-    return {"members_classified": classified, "stages_updated": stages_updated, "playbooks_materialized": playbooks_created}
+                results = materialize_playbook(db, member, playbook)
+                db.add(member)
+                classified += 1
+                playbooks_created += sum(1 for r in results if r["status"] == "created")
+            except Exception:
+                logger.exception("Falha ao processar retention intelligence para membro %s", member.id)
+        db.commit()
+
+    return {
+        "members_classified": classified,
+        "stages_updated": stages_updated,
+        "playbooks_materialized": playbooks_created,
+        **scan_stats.as_metrics(),
+    }
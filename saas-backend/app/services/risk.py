@@ -3,22 +3,30 @@ import uuid
 from collections.abc import Iterable
 from dataclasses import dataclass, replace
 from datetime import datetime, time, timedelta, timezone
+from time import perf_counter
 
-from sqlalchemy import case, func, select, text
+import numpy as np
+from sqlalchemy import case, func, or_, select, text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.cache import invalidate_dashboard_cache
 from app.database import get_current_gym_id
-from app.models import Assessment, AuditLog, Checkin, Member, MemberRiskHistory, MemberStatus, RiskAlert, RiskLevel, RoleEnum, Task, TaskPriority, TaskStatus, User
+from app.models import Assessment, AuditLog, Checkin, Member, MemberRiskHistory, MemberRiskSchedule, MemberStatus, RiskAlert, RiskLevel, RoleEnum, Task, TaskPriority, TaskStatus, User
 from app.services.audit_service import log_audit_event
 from app.services.notification_service import create_notification
+from app.services.risk_schedule_service import schedule_next_risk_evaluations
 from app.services.websocket_manager import websocket_manager
+from app.utils.batching import BatchScanStats, iter_keyset_batches
 from app.utils.email import send_email_result
 
 logger = logging.getLogger(__name__)
 
 _MIN_RELIABLE_BASELINE_AVG_WEEKLY = 1.0
+# Upper bound between two evaluations of a member whose inputs do not change.
+_RISK_SCHEDULE_MAX_INTERVAL = timedelta(days=7)
+# Onboarding discount boundaries (days since join) used by calculate_risk_score.
+_ONBOARDING_DISCOUNT_BOUNDARY_DAYS = (8, 15)
 
 
 @dataclass(frozen=True)
@@ -35,6 +43,8 @@ class PrefetchedCheckinMetrics:
     baseline_total: int = 0
     recent_mode_hour: int | None = None
     previous_mode_hour: int | None = None
+    # Earliest moment a check-in already counted moves into another aggregation window.
+    next_window_change_at: datetime | None = None
 
 
 def _member_join_datetime(member: Member, now: datetime) -> datetime | None:
@@ -113,6 +123,144 @@ def calculate_risk_score(
     return RiskResult(score=score, level=level, reasons=reasons, days_without_checkin=days_without_checkin)
 
 
+@dataclass(frozen=True)
+class RiskScoreBatch:
+    """Columnar output of score_risk_batch; one entry per member, in input order."""
+
+    score: np.ndarray
+    days_without_checkin: np.ndarray
+    inactivity_points: np.ndarray
+    frequency_points: np.ndarray
+    frequency_drop_pct: np.ndarray  # NaN where the baseline is unreliable
+    shift_points: np.ndarray
+    shift_change_hours: np.ndarray
+    nps_points: np.ndarray
+    loyalty_discount: np.ndarray
+    onboarding_discount: np.ndarray
+    baseline_avg_weekly: np.ndarray
+
+    def result(self, index: int) -> RiskResult:
+        score = int(self.score[index])
+        drop_pct = float(self.frequency_drop_pct[index])
+        reasons = {
+            "inactivity_points": int(self.inactivity_points[index]),
+            "frequency_points": int(self.frequency_points[index]),
+            "frequency_drop_pct": None if np.isnan(drop_pct) else drop_pct,
+            "shift_points": int(self.shift_points[index]),
+            "shift_change_hours": int(self.shift_change_hours[index]),
+            "nps_points": int(self.nps_points[index]),
+            "loyalty_discount": int(self.loyalty_discount[index]),
+            "onboarding_discount": int(self.onboarding_discount[index]),
+            "baseline_avg_weekly": round(float(self.baseline_avg_weekly[index]), 2),
+        }
+        return RiskResult(
+            score=score,
+            level=_determine_level(score),
+            reasons=reasons,
+            days_without_checkin=int(self.days_without_checkin[index]),
+        )
+
+
+def score_risk_batch(
+    *,
+    days_without_checkin: np.ndarray,
+    days_since_join: np.ndarray,
+    current_week_count: np.ndarray,
+    baseline_total: np.ndarray,
+    recent_mode_hour: np.ndarray,
+    previous_mode_hour: np.ndarray,
+    nps_last_score: np.ndarray,
+    loyalty_months: np.ndarray,
+) -> RiskScoreBatch:
+    """Vectorized calculate_risk_score. Unknown join dates and mode hours are encoded as -1."""
+    days = np.asarray(days_without_checkin, dtype=np.int64)
+    join_days = np.asarray(days_since_join, dtype=np.int64)
+    week_count = np.asarray(current_week_count, dtype=np.int64)
+    recent_hour = np.asarray(recent_mode_hour, dtype=np.int64)
+    previous_hour = np.asarray(previous_mode_hour, dtype=np.int64)
+    nps = np.asarray(nps_last_score, dtype=np.int64)
+    loyalty = np.asarray(loyalty_months, dtype=np.int64)
+
+    inactivity = np.select(
+        [days >= min_days for min_days, _ in _INACTIVITY_POINT_STEPS],
+        [points for _, points in _INACTIVITY_POINT_STEPS],
+        default=0,
+    )
+
+    baseline_avg = np.asarray(baseline_total, dtype=np.int64) / 9.0
+    reliable = baseline_avg >= _MIN_RELIABLE_BASELINE_AVG_WEEKLY
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drop_pct = np.maximum(0.0, ((baseline_avg - week_count) / baseline_avg) * 100)
+    drop_pct = np.where(reliable, drop_pct, np.nan)
+    frequency = np.select([drop_pct >= 80, drop_pct >= 50, drop_pct >= 25], [20, 12, 6], default=0)
+
+    has_modes = (recent_hour >= 0) & (previous_hour >= 0)
+    shift_change = np.where(has_modes, np.abs(recent_hour - previous_hour), 0)
+    shift = np.select([shift_change >= 4, shift_change >= 2], [10, 5], default=0)
+
+    nps_points = np.select([nps <= 4, nps <= 6, nps <= 8], [18, 10, 4], default=0)
+    loyalty_discount = np.minimum((loyalty // 6) * 3, 15)
+    onboarding_discount = np.select(
+        [(join_days >= 0) & (join_days <= 7), (join_days >= 0) & (join_days <= 14)],
+        [inactivity, inactivity // 2],
+        default=0,
+    )
+
+    raw_score = inactivity + frequency + shift + nps_points - loyalty_discount - onboarding_discount
+    return RiskScoreBatch(
+        score=np.clip(raw_score, 0, 100),
+        days_without_checkin=days,
+        inactivity_points=inactivity,
+        frequency_points=frequency,
+        frequency_drop_pct=drop_pct,
+        shift_points=shift,
+        shift_change_hours=shift_change,
+        nps_points=nps_points,
+        loyalty_discount=loyalty_discount,
+        onboarding_discount=onboarding_discount,
+        baseline_avg_weekly=baseline_avg,
+    )
+
+
+def calculate_risk_scores(
+    members: Iterable[Member],
+    now: datetime,
+    metrics_by_member: dict,
+) -> dict[uuid.UUID, RiskResult]:
+    """Scores a batch of members at once; members without prefetched metrics have no check-ins in the windows."""
+    members = list(members)
+    if not members:
+        return {}
+    columns: dict[str, list[int]] = {
+        "days_without_checkin": [],
+        "days_since_join": [],
+        "current_week_count": [],
+        "baseline_total": [],
+        "recent_mode_hour": [],
+        "previous_mode_hour": [],
+        "nps_last_score": [],
+        "loyalty_months": [],
+    }
+    empty_metrics = PrefetchedCheckinMetrics()
+    for member in members:
+        join_dt = _member_join_datetime(member, now)
+        reference_dt = member.last_checkin_at or join_dt or now
+        if reference_dt.tzinfo is None:
+            reference_dt = reference_dt.replace(tzinfo=timezone.utc)
+        metrics = metrics_by_member.get(member.id) or empty_metrics
+        columns["days_without_checkin"].append(max(0, (now - reference_dt).days))
+        columns["days_since_join"].append(max(0, (now - join_dt).days) if join_dt is not None else -1)
+        columns["current_week_count"].append(metrics.current_week_count)
+        columns["baseline_total"].append(metrics.baseline_total)
+        columns["recent_mode_hour"].append(-1 if metrics.recent_mode_hour is None else metrics.recent_mode_hour)
+        columns["previous_mode_hour"].append(-1 if metrics.previous_mode_hour is None else metrics.previous_mode_hour)
+        columns["nps_last_score"].append(member.nps_last_score)
+        columns["loyalty_months"].append(member.loyalty_months)
+
+    batch = score_risk_batch(**{name: np.asarray(values, dtype=np.int64) for name, values in columns.items()})
+    return {member.id: batch.result(index) for index, member in enumerate(members)}
+
+
 _AUTOMATION_STAGES = ["automation_3d", "automation_7d", "automation_10d", "automation_14d", "automation_21d"]
 
 
@@ -138,17 +286,79 @@ def _iter_active_members_for_risk_processing(
     db: Session,
     *,
     batch_size: int,
+    stats: BatchScanStats | None = None,
 ):
-    offset = 0
-    stmt = select(Member).where(*_active_member_filters()).order_by(Member.id.asc())
-    while True:
-        batch = db.scalars(stmt.offset(offset).limit(batch_size)).all()
-        if not batch:
-            break
-        yield batch
-        offset += len(batch)
-        if len(batch) < batch_size:
-            break
+    stmt = select(Member).where(*_active_member_filters())
+    yield from iter_keyset_batches(db, stmt, Member.id, batch_size=batch_size, stats=stats)
+
+
+def _use_incremental_risk_processing(now: datetime, *, full_sweep: bool) -> bool:
+    if full_sweep or not settings.risk_incremental_enabled:
+        return False
+    return now.weekday() != settings.risk_full_sweep_weekday
+
+
+def _due_member_ids_for_risk_processing(db: Session, now: datetime) -> list[uuid.UUID]:
+    # Members without a schedule row were never processed incrementally, so they are due.
+    return list(
+        db.scalars(
+            select(Member.id)
+            .outerjoin(MemberRiskSchedule, MemberRiskSchedule.member_id == Member.id)
+            .where(
+                *_active_member_filters(),
+                or_(MemberRiskSchedule.id.is_(None), MemberRiskSchedule.due_at <= now),
+            )
+            .order_by(Member.id.asc())
+        ).all()
+    )
+
+
+def _iter_due_members_for_risk_processing(
+    db: Session,
+    member_ids: list[uuid.UUID],
+    *,
+    batch_size: int,
+    stats: BatchScanStats | None = None,
+):
+    for start in range(0, len(member_ids), batch_size):
+        chunk = member_ids[start : start + batch_size]
+        started = perf_counter()
+        batch = db.scalars(
+            select(Member).where(Member.id.in_(chunk), *_active_member_filters()).order_by(Member.id.asc())
+        ).all()
+        if stats is not None:
+            stats.record(len(batch), int((perf_counter() - started) * 1000))
+        if batch:
+            yield batch
+
+
+def next_risk_evaluation_at(
+    member: Member,
+    now: datetime,
+    metrics: PrefetchedCheckinMetrics | None = None,
+) -> datetime:
+    """Earliest moment the member's score can change without any new input (inactivity step, onboarding or window)."""
+    candidates = [now + _RISK_SCHEDULE_MAX_INTERVAL]
+    join_dt = _member_join_datetime(member, now)
+    reference_dt = member.last_checkin_at or join_dt or now
+    if reference_dt.tzinfo is None:
+        reference_dt = reference_dt.replace(tzinfo=timezone.utc)
+    days_without_checkin = max(0, (now - reference_dt).days)
+    next_step = min(
+        (min_days for min_days, _ in _INACTIVITY_POINT_STEPS if min_days > days_without_checkin),
+        default=None,
+    )
+    if next_step is not None:
+        candidates.append(reference_dt + timedelta(days=next_step))
+    if join_dt is not None:
+        # 14 is where inactivity automations stop skipping onboarding members.
+        for boundary_days in (*_ONBOARDING_DISCOUNT_BOUNDARY_DAYS, 14):
+            boundary_at = join_dt + timedelta(days=boundary_days)
+            if boundary_at > now:
+                candidates.append(boundary_at)
+    if metrics is not None and metrics.next_window_change_at is not None:
+        candidates.append(metrics.next_window_change_at)
+    return max(min(candidates), now)
 
 
 def _prefetch_member_ids_with_assessments(db: Session, member_ids: set[uuid.UUID]) -> set[uuid.UUID]:
@@ -186,10 +396,20 @@ def _clear_invalid_assessment_fallback(member: Member, *, assessment_member_ids:
     return changed
 
 
-def run_daily_risk_processing(db: Session) -> dict[str, int]:
+def run_daily_risk_processing(db: Session, *, full_sweep: bool = False) -> dict[str, int]:
+    """Recomputes member risk.
+
+    With ``risk_incremental_enabled`` only members whose inputs changed or whose next threshold is due are
+    processed; ``full_sweep`` (or the configured weekday) still walks every active member to reconcile.
+    """
     _apply_risk_statement_timeout(db)
     now = datetime.now(tz=timezone.utc)
-    analyzed = _count_active_members_for_risk_processing(db)
+    incremental = _use_incremental_risk_processing(now, full_sweep=full_sweep)
+    if incremental:
+        due_member_ids = _due_member_ids_for_risk_processing(db, now)
+        analyzed = len(due_member_ids)
+    else:
+        analyzed = _count_active_members_for_risk_processing(db)
     if not analyzed:
         return {"members_analyzed": 0, "risk_alerts_processed": 0, "automations_triggered": 0}
 
@@ -221,16 +441,28 @@ def run_daily_risk_processing(db: Session) -> dict[str, int]:
 
     batch_size = max(int(settings.risk_processing_batch_size), 1)
     processed = 0
-    for batch in _iter_active_members_for_risk_processing(db, batch_size=batch_size):
+    scan_stats = BatchScanStats()
+    if incremental:
+        batches = _iter_due_members_for_risk_processing(db, due_member_ids, batch_size=batch_size, stats=scan_stats)
+    else:
+        batches = _iter_active_members_for_risk_processing(db, batch_size=batch_size, stats=scan_stats)
+    for batch in batches:
         batch_member_ids = {member.id for member in batch}
         metrics_by_member = _prefetch_member_checkin_metrics(db, now, member_ids=batch_member_ids)
         assessment_member_ids = _prefetch_member_ids_with_assessments(db, batch_member_ids)
+        next_due_by_member: dict[tuple[uuid.UUID, uuid.UUID], datetime] = {}
         try:
             _apply_risk_statement_timeout(db)
+            results_by_member = calculate_risk_scores(batch, now, metrics_by_member)
             for member in batch:
                 if _clear_invalid_assessment_fallback(member, assessment_member_ids=assessment_member_ids):
                     db.add(member)
-                result = calculate_risk_score(db, member, now, metrics_by_member.get(member.id))
+                member_metrics = metrics_by_member.get(member.id)
+                result = results_by_member[member.id]
+                if settings.risk_incremental_enabled:
+                    next_due_by_member[(member.gym_id, member.id)] = next_risk_evaluation_at(
+                        member, now, member_metrics
+                    )
                 previous_score = member.risk_score
                 previous_level = member.risk_level
 
@@ -290,6 +522,7 @@ def run_daily_risk_processing(db: Session) -> dict[str, int]:
                         reasons=effective_result.reasons,
                     ))
 
+            schedule_next_risk_evaluations(db, next_due_by_member, processed_at=now)
             db.commit()
             processed += len(batch)
         except Exception:
@@ -316,11 +549,12 @@ def run_daily_risk_processing(db: Session) -> dict[str, int]:
         )
 
     # NOTE: run_automation_rules() is intentionally NOT called here.
-    # It is executed by daily_automations_job (jobs.py) at 02:30 UTC to avoid double-firing.
+    # It is executed by nightly_retention_pipeline_job (jobs.py) after risk and retention intelligence.
     return {
         "members_analyzed": analyzed,
         "risk_alerts_processed": alerts_created,
         "automations_triggered": automations_triggered,
+        **scan_stats.as_metrics(),
     }
 
 
@@ -349,12 +583,13 @@ def refresh_member_risk_snapshot(
     metrics_by_member = _prefetch_member_checkin_metrics(db, now, member_ids={member.id for member in members})
     assessment_member_ids = _prefetch_member_ids_with_assessments(db, {member.id for member in members})
     current_alerts_by_member = _prefetch_open_risk_alerts(db, deduplicate=True) if sync_alerts else {}
+    results_by_member = calculate_risk_scores(members, now, metrics_by_member)
     refreshed = 0
     alerts_synced = 0
     for member in members:
         if _clear_invalid_assessment_fallback(member, assessment_member_ids=assessment_member_ids):
             db.add(member)
-        result = calculate_risk_score(db, member, now, metrics_by_member.get(member.id))
+        result = results_by_member[member.id]
         if member.risk_score != result.score or member.risk_level != result.level:
             member.risk_score = result.score
             member.risk_level = result.level
@@ -424,21 +659,22 @@ def _result_from_member_state(member: Member, result: RiskResult) -> RiskResult:
     return replace(result, score=member.risk_score, level=member.risk_level, reasons=reasons)
 
 
+# (dias sem check-in, pontos) em ordem decrescente; compartilhado com a ordenacao SQL da fila de retencao.
+_INACTIVITY_POINT_STEPS: tuple[tuple[int, int], ...] = (
+    (45, 90),
+    (30, 80),
+    (21, 70),
+    (14, 45),
+    (10, 30),
+    (7, 20),
+    (3, 10),
+)
+
+
 def _inactivity_points(days_without_checkin: int) -> int:
-    if days_without_checkin >= 45:
-        return 90
-    if days_without_checkin >= 30:
-        return 80
-    if days_without_checkin >= 21:
-        return 70
-    if days_without_checkin >= 14:
-        return 45
-    if days_without_checkin >= 10:
-        return 30
-    if days_without_checkin >= 7:
-        return 20
-    if days_without_checkin >= 3:
-        return 10
+    for min_days, points in _INACTIVITY_POINT_STEPS:
+        if days_without_checkin >= min_days:
+            return points
     return 0
 
 
@@ -467,6 +703,11 @@ def _prefetch_member_checkin_metrics(
                 Checkin.checkin_at >= prev_start,
                 Checkin.checkin_at < prev_end,
             ).label("previous_mode_hour"),
+            # Oldest check-in inside each window: it is the next one to age across that window's edge.
+            func.min(Checkin.checkin_at).filter(Checkin.checkin_at >= one_week_ago).label("oldest_current_week_at"),
+            func.min(Checkin.checkin_at).filter(Checkin.checkin_at >= recent_start).label("oldest_recent_at"),
+            func.min(Checkin.checkin_at).filter(Checkin.checkin_at >= prev_start).label("oldest_previous_at"),
+            func.min(Checkin.checkin_at).label("oldest_baseline_at"),
         ).where(
             Checkin.checkin_at >= ten_weeks_ago,
             Checkin.checkin_at < now,
@@ -484,10 +725,25 @@ def _prefetch_member_checkin_metrics(
             baseline_total=row.baseline_total or 0,
             recent_mode_hour=int(row.recent_mode_hour) if row.recent_mode_hour is not None else None,
             previous_mode_hour=int(row.previous_mode_hour) if row.previous_mode_hour is not None else None,
+            next_window_change_at=_next_checkin_window_change_at(row),
         )
     return metrics_by_member
 
 
+def _next_checkin_window_change_at(row) -> datetime | None:
+    crossings = [
+        oldest_at + window
+        for oldest_at, window in (
+            (row.oldest_current_week_at, timedelta(weeks=1)),
+            (row.oldest_recent_at, timedelta(days=14)),
+            (row.oldest_previous_at, timedelta(days=60)),
+            (row.oldest_baseline_at, timedelta(weeks=10)),
+        )
+        if oldest_at is not None
+    ]
+    return min(crossings, default=None)
+
+
 def _prefetch_open_risk_alerts(db: Session, *, deduplicate: bool = False) -> dict:
     alerts = db.scalars(
         select(RiskAlert)
@@ -168,7 +168,8 @@ def process_pending_risk_recalculation_requests(*, batch_size: int = 3) -> int:
                 fail_open=lambda: settings.scheduler_critical_lock_fail_open,
             )
             def _run_locked() -> dict[str, int] | None:
-                return run_daily_risk_processing(db)
+                # A manual request asks for every member, not just the ones the incremental schedule marks due.
+                return run_daily_risk_processing(db, full_sweep=True)
 
             result = _run_locked()
             if result is None:
@@ -0,0 +1,114 @@
+from datetime import datetime
+from itertools import chain
+from uuid import UUID
+
+from sqlalchemy import event, func, inspect as sa_inspect, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Checkin, Member, MemberRiskSchedule, NPSResponse
+
+RISK_REASON_CHECKIN = "checkin"
+RISK_REASON_NPS = "nps"
+RISK_REASON_MEMBER = "member"
+RISK_REASON_SCHEDULED = "scheduled"
+
+# Member attributes read by calculate_risk_score or the active-member filter.
+# risk_score/risk_level are outputs and must stay out of this list.
+_MEMBER_RISK_INPUT_ATTRS = (
+    "last_checkin_at",
+    "nps_last_score",
+    "loyalty_months",
+    "join_date",
+    "status",
+    "deleted_at",
+)
+
+
+def _member_risk_inputs_changed(member: Member) -> bool:
+    state = sa_inspect(member)
+    return any(state.attrs[name].history.has_changes() for name in _MEMBER_RISK_INPUT_ATTRS)
+
+
+def collect_risk_input_changes(session: Session) -> dict[tuple[UUID, UUID], str]:
+    markers: dict[tuple[UUID, UUID], str] = {}
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Checkin):
+            if obj not in session.new:
+                continue
+            gym_id, member_id, reason = obj.gym_id, obj.member_id, RISK_REASON_CHECKIN
+        elif isinstance(obj, NPSResponse):
+            gym_id, member_id, reason = obj.gym_id, obj.member_id, RISK_REASON_NPS
+        elif isinstance(obj, Member):
+            # New members have no schedule row yet, which already makes them due.
+            if obj in session.new or not _member_risk_inputs_changed(obj):
+                continue
+            gym_id, member_id, reason = obj.gym_id, obj.id, RISK_REASON_MEMBER
+        else:
+            continue
+        if gym_id is None or member_id is None:
+            continue
+        markers.setdefault((gym_id, member_id), reason)
+    return markers
+
+
+def mark_risk_inputs_changed(connection, markers: dict[tuple[UUID, UUID], str]) -> None:
+    if not markers:
+        return
+    stmt = pg_insert(MemberRiskSchedule.__table__).values(
+        [
+            {"gym_id": gym_id, "member_id": member_id, "reason": reason, "due_at": func.now(), "changed_at": func.now()}
+            for (gym_id, member_id), reason in markers.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["member_id"],
+        set_={"reason": stmt.excluded.reason, "due_at": func.now(), "changed_at": func.now()},
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_risk_inputs_changed(session: Session, _flush_context) -> None:  # type: ignore[no-untyped-def]
+    if not settings.risk_incremental_enabled:
+        return
+    markers = collect_risk_input_changes(session)
+    if markers:
+        # Same flush connection as the change, so the schedule commits or rolls back with it.
+        mark_risk_inputs_changed(session.connection(), markers)
+
+
+def schedule_next_risk_evaluations(
+    db: Session,
+    due_by_member: dict[tuple[UUID, UUID], datetime],
+    *,
+    processed_at: datetime,
+) -> None:
+    """Stores the next due date for members processed in a batch that started at ``processed_at``."""
+    if not due_by_member:
+        return
+    table = MemberRiskSchedule.__table__
+    stmt = pg_insert(table).values(
+        [
+            {
+                "gym_id": gym_id,
+                "member_id": member_id,
+                "reason": RISK_REASON_SCHEDULED,
+                "due_at": due_at,
+                "last_processed_at": processed_at,
+            }
+            for (gym_id, member_id), due_at in due_by_member.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["member_id"],
+        set_={
+            "reason": stmt.excluded.reason,
+            "due_at": stmt.excluded.due_at,
+            "last_processed_at": stmt.excluded.last_processed_at,
+        },
+        # Inputs that changed after the batch read them keep the member due for the next run.
+        where=or_(table.c.changed_at.is_(None), table.c.changed_at < processed_at),
+    )
+    db.execute(stmt)
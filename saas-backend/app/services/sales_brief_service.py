@@ -10,6 +10,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.branding import PRODUCT_NAME
 from app.core.cache import dashboard_cache, make_cache_key
 from app.core.config import settings
@@ -205,9 +206,6 @@ def _generate_cached_sales_ai(lead: Lead, diagnosis: dict[str, Any], history: li
         return fallback
 
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=settings.claude_api_key)
         prompt = (
             "Voce e um closer de SaaS B2B para academias. "
             "Retorne JSON com campos arguments e next_step. "
@@ -219,11 +217,16 @@ def _generate_cached_sales_ai(lead: Lead, diagnosis: dict[str, Any], history: li
             f"Historico recente: {history[-8:]}\n"
             f"Objecoes conhecidas: {objections}\n"
         )
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="sales_brief",
+            params={
+                "max_tokens": settings.claude_max_tokens,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+            },
         )
         parsed = _parse_ai_json(response.content[0].text.strip())
         result = {
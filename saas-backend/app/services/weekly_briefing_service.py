@@ -6,6 +6,7 @@ from uuid import UUID
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.config import settings
 from app.models import Checkin, Member, MemberStatus, RiskLevel, User
 from app.models.enums import RoleEnum
@@ -132,9 +133,6 @@ def _generate_briefing_text(metrics: dict) -> str:
 
 
 def _generate_ai_briefing(metrics: dict) -> str:
-    import anthropic
-
-    client = anthropic.Anthropic(api_key=settings.claude_api_key)
     prompt = (
         "Voce e o assistente de inteligencia de uma academia. "
         "Gere um briefing semanal executivo em portugues brasileiro, tom profissional e direto, "
@@ -146,11 +144,12 @@ def _generate_ai_briefing(metrics: dict) -> str:
         f"- Total de alunos ativos: {metrics['total_active']}\n"
         "Destaque os pontos positivos e negativos. Termine com 1-2 recomendacoes acionaveis."
     )
-    response = client.messages.create(
+    response = call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
         model=settings.claude_model,
-        max_tokens=500,
-        temperature=0,
-        messages=[{"role": "user", "content": prompt}],
+        prompt_key="weekly_briefing",
+        params={"max_tokens": 500, "temperature": 0, "messages": [{"role": "user", "content": prompt}]},
     )
     return response.content[0].text.strip()[:1000]
 
@@ -0,0 +1,320 @@
+"""Outbound WhatsApp queue: automations enqueue ``MessageLog`` rows, a worker delivers them.
+
+``enqueue_whatsapp_message`` only inserts a ``queued`` row with the resolved Evolution instance, so rule evaluation no
+longer holds its transaction across HTTP calls. ``process_due_whatsapp_messages`` claims due rows of every gym and
+sends them through one pooled keep-alive ``httpx.Client`` per instance, at most ``concurrency_per_instance`` requests
+per instance at a time. The per-recipient hourly limit is a token bucket (shared through Redis when configured)
+instead of a ``COUNT`` over ``message_logs``. Transport errors, 429 and 5xx are retried with backoff; other answers
+fail the message. While the ``whatsapp`` circuit breaker is open the batch is rescheduled without calling Evolution.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from queue import Empty, SimpleQueue
+from threading import Lock
+from uuid import UUID, uuid4
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.circuit_breaker import ProviderUnavailableError, get_breaker
+from app.core.config import settings
+from app.core.token_bucket import TokenBucket
+from app.database import include_all_tenants
+from app.models.message_log import MessageLog
+from app.services.whatsapp_service import (
+    WHATSAPP_PROVIDER,
+    _instance_source,
+    _mask_phone_for_log,
+    format_phone,
+    resolve_instance,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_STATUS_QUEUED = "queued"
+MESSAGE_STATUS_SENT = "sent"
+MESSAGE_STATUS_FAILED = "failed"
+MESSAGE_STATUS_SKIPPED = "skipped"
+MESSAGE_STATUS_BLOCKED = "blocked"
+RETRY_SCHEDULED = "retry_scheduled"
+_RETRY_DELAYS_MINUTES = (1, 5, 15, 60)
+_RETRYABLE_STATUS_CODES = frozenset({408, 425, 429})
+# Upper bound on sender threads per batch, whatever the number of instances in it.
+_MAX_SENDER_THREADS = 32
+_REQUEST_TIMEOUT_SECONDS = 15.0
+_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_clients: dict[tuple[str, str, str, int], httpx.Client] = {}
+_clients_lock = Lock()
+_recipient_bucket: TokenBucket | None = None
+_recipient_bucket_lock = Lock()
+
+
+@dataclass(frozen=True)
+class _OutboundSend:
+    log_id: UUID
+    instance: str
+    phone: str
+    text: str
+
+
+@dataclass(frozen=True)
+class _SendOutcome:
+    sent: bool
+    retryable: bool = False
+    status_code: int | None = None
+    error: str | None = None
+    # False when the call was refused locally (open breaker, full bulkhead); no attempt is consumed.
+    attempted: bool = True
+
+
+def _utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def get_instance_client(instance: str, *, pool_size: int) -> httpx.Client:
+    """Pooled keep-alive client for one Evolution instance, reused across batches and job runs."""
+    pool_size = max(int(pool_size), 1)
+    key = (settings.whatsapp_api_url.rstrip("/"), settings.whatsapp_api_token, instance, pool_size)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                base_url=key[0],
+                headers={"apikey": key[1]},
+                timeout=_REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                transport=httpx.HTTPTransport(retries=1),
+            )
+            _clients[key] = client
+        return client
+
+
+def close_instance_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _get_recipient_bucket() -> TokenBucket:
+    global _recipient_bucket
+    limit = max(int(settings.whatsapp_rate_limit_per_hour), 1)
+    with _recipient_bucket_lock:
+        if _recipient_bucket is None or _recipient_bucket.capacity != limit:
+            _recipient_bucket = TokenBucket("whatsapp_recipient", capacity=limit, period_seconds=3600)
+        return _recipient_bucket
+
+
+def enqueue_whatsapp_message(
+    db: Session,
+    *,
+    phone: str,
+    message: str,
+    instance: str | None = None,
+    gym_id: UUID | None = None,
+    member_id: UUID | None = None,
+    lead_id: UUID | None = None,
+    automation_rule_id: UUID | None = None,
+    template_name: str | None = None,
+    event_type: str | None = None,
+) -> MessageLog:
+    """Queues a text message for the sender. Without a connected instance the row is stored as ``skipped``."""
+    resolved = resolve_instance(instance)
+    log_entry = MessageLog(
+        id=uuid4(),
+        gym_id=gym_id,
+        member_id=member_id,
+        lead_id=lead_id,
+        automation_rule_id=automation_rule_id,
+        channel="whatsapp",
+        recipient=format_phone(phone),
+        template_name=template_name,
+        content=message,
+        status=MESSAGE_STATUS_QUEUED,
+        direction="outbound",
+        event_type=event_type,
+        attempt_count=0,
+        next_attempt_at=_utcnow(),
+        extra_data={"instance_used": resolved, "instance_source": _instance_source(instance) if resolved else "none"},
+    )
+    if not resolved:
+        log_entry.status = MESSAGE_STATUS_SKIPPED
+        log_entry.next_attempt_at = None
+        log_entry.error_detail = (
+            "WhatsApp instance not configured or not connected for this gym. Go to Settings -> WhatsApp to connect."
+        )
+    db.add(log_entry)
+    return log_entry
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code in _RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def _post_text(send: _OutboundSend, *, pool_size: int) -> _SendOutcome:
+    try:
+        with get_breaker(WHATSAPP_PROVIDER).guard() as call:
+            response = get_instance_client(send.instance, pool_size=pool_size).post(
+                f"/message/sendText/{send.instance}",
+                json={"number": send.phone, "text": send.text},
+            )
+            if _is_retryable_status(response.status_code):
+                call.fail()
+    except ProviderUnavailableError as exc:
+        return _SendOutcome(sent=False, retryable=True, error=str(exc), attempted=False)
+    except httpx.HTTPError as exc:
+        return _SendOutcome(sent=False, retryable=True, error=str(exc)[:500] or exc.__class__.__name__)
+    except Exception:
+        logger.exception("Falha inesperada ao enviar WhatsApp para %s", _mask_phone_for_log(send.phone))
+        return _SendOutcome(sent=False, retryable=True, error="unexpected_error")
+
+    if response.is_success:
+        return _SendOutcome(sent=True, status_code=response.status_code)
+    status_code = response.status_code
+    return _SendOutcome(
+        sent=False,
+        retryable=_is_retryable_status(status_code),
+        status_code=status_code,
+        error=f"HTTP {status_code}: {response.text[:300]}",
+    )
+
+
+def _deliver(sends: Iterable[_OutboundSend], *, concurrency_per_instance: int) -> dict[UUID, _SendOutcome]:
+    """Sends every message, draining each instance's queue with at most ``concurrency_per_instance`` workers."""
+    concurrency = max(int(concurrency_per_instance), 1)
+    by_instance: dict[str, SimpleQueue] = defaultdict(SimpleQueue)
+    sizes: Counter[str] = Counter()
+    for send in sends:
+        by_instance[send.instance].put(send)
+        sizes[send.instance] += 1
+    drainers = [
+        pending
+        for instance, pending in by_instance.items()
+        for _ in range(min(concurrency, sizes[instance]))
+    ]
+    outcomes: dict[UUID, _SendOutcome] = {}
+    if not drainers:
+        return outcomes
+
+    def _drain(pending: SimpleQueue) -> None:
+        while True:
+            try:
+                send = pending.get_nowait()
+            except Empty:
+                return
+            outcomes[send.log_id] = _post_text(send, pool_size=concurrency)
+
+    with ThreadPoolExecutor(max_workers=min(len(drainers), _MAX_SENDER_THREADS)) as executor:
+        list(executor.map(_drain, drainers))
+    return outcomes
+
+
+def _record_outcome(log_entry: MessageLog, outcome: _SendOutcome, *, now: datetime, max_attempts: int) -> str:
+    log_entry.attempt_count = (log_entry.attempt_count or 0) + int(outcome.attempted)
+    extra_data = dict(log_entry.extra_data or {})
+    if outcome.status_code is not None:
+        extra_data["response_status"] = outcome.status_code
+    log_entry.extra_data = extra_data
+    if outcome.sent:
+        log_entry.status = MESSAGE_STATUS_SENT
+        log_entry.error_detail = None
+        log_entry.next_attempt_at = None
+        return MESSAGE_STATUS_SENT
+
+    log_entry.error_detail = outcome.error
+    if not outcome.retryable or log_entry.attempt_count >= max_attempts:
+        log_entry.status = MESSAGE_STATUS_FAILED
+        log_entry.next_attempt_at = None
+        return MESSAGE_STATUS_FAILED
+    delay_minutes = _RETRY_DELAYS_MINUTES[min(max(log_entry.attempt_count, 1) - 1, len(_RETRY_DELAYS_MINUTES) - 1)]
+    log_entry.next_attempt_at = now + timedelta(minutes=delay_minutes)
+    return RETRY_SCHEDULED
+
+
+def _mark_without_send(log_entry: MessageLog, status: str, error: str) -> str:
+    log_entry.status = status
+    log_entry.error_detail = error
+    log_entry.next_attempt_at = None
+    return status
+
+
+def process_due_whatsapp_messages(
+    db: Session,
+    *,
+    batch_size: int,
+    concurrency_per_instance: int,
+    max_attempts: int | None = None,
+) -> dict[str, int]:
+    """Sends up to ``batch_size`` queued messages of any gym that are due.
+
+    Claimed rows stay locked (``SKIP LOCKED``) until the caller commits, so concurrent workers never send the same
+    message twice. A recipient over the hourly limit is ``blocked`` on its first attempt, as in the inline sender.
+    """
+    now = _utcnow()
+    attempts_limit = max(int(max_attempts or settings.whatsapp_outbound_max_attempts), 1)
+    messages = list(
+        db.scalars(
+            include_all_tenants(
+                select(MessageLog)
+                .where(
+                    MessageLog.status == MESSAGE_STATUS_QUEUED,
+                    MessageLog.next_attempt_at <= now,
+                )
+                .order_by(MessageLog.next_attempt_at.asc())
+                .limit(max(int(batch_size), 1))
+                .with_for_update(skip_locked=True),
+                reason="whatsapp_outbound.claim_due_messages",
+            )
+        ).all()
+    )
+    counts: Counter[str] = Counter()
+    if not messages:
+        return {"claimed": 0, "sent": 0, "retry_scheduled": 0, "failed": 0, "blocked": 0, "skipped": 0}
+
+    api_configured = bool(settings.whatsapp_api_url and settings.whatsapp_api_token)
+    bucket = _get_recipient_bucket()
+    to_send: dict[UUID, MessageLog] = {}
+    sends: list[_OutboundSend] = []
+    for log_entry in messages:
+        extra_data = log_entry.extra_data or {}
+        instance = extra_data.get("instance_used")
+        # A message refused by the circuit breaker keeps attempt_count at 0 but already holds its rate-limit token.
+        needs_token = not log_entry.attempt_count and not extra_data.get("rate_limit_token")
+        if not api_configured:
+            counts[_mark_without_send(log_entry, MESSAGE_STATUS_SKIPPED, "WhatsApp API URL/token not configured")] += 1
+        elif not instance:
+            counts[_mark_without_send(log_entry, MESSAGE_STATUS_SKIPPED, "WhatsApp instance not resolved")] += 1
+        elif needs_token and not bucket.try_acquire(log_entry.recipient):
+            counts[_mark_without_send(log_entry, MESSAGE_STATUS_BLOCKED, "Rate limit exceeded for recipient")] += 1
+        else:
+            if needs_token:
+                log_entry.extra_data = {**extra_data, "rate_limit_token": True}
+            to_send[log_entry.id] = log_entry
+            # Only plain values cross into the sender threads; ORM state is read and written on this thread.
+            sends.append(_OutboundSend(log_entry.id, instance, log_entry.recipient, log_entry.content))
+
+    outcomes = _deliver(sends, concurrency_per_instance=concurrency_per_instance)
+    for log_id, log_entry in to_send.items():
+        counts[_record_outcome(log_entry, outcomes[log_id], now=now, max_attempts=attempts_limit)] += 1
+    db.flush()
+    return {
+        "claimed": len(messages),
+        "sent": counts[MESSAGE_STATUS_SENT],
+        "retry_scheduled": counts[RETRY_SCHEDULED],
+        "failed": counts[MESSAGE_STATUS_FAILED],
+        "blocked": counts[MESSAGE_STATUS_BLOCKED],
+        "skipped": counts[MESSAGE_STATUS_SKIPPED],
+    }
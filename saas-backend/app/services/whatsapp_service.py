@@ -7,6 +7,8 @@ import httpx
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
+from app.core.circuit_breaker import get_breaker
 from app.core.config import settings
 from app.models import Member, MemberStatus, RiskLevel
 from app.models.message_log import MessageLog
@@ -14,6 +16,7 @@ from app.models.message_log import MessageLog
 
 logger = logging.getLogger(__name__)
 DEFAULT_RATE_LIMIT_PER_HOUR = 6
+WHATSAPP_PROVIDER = "whatsapp"
 
 WHATSAPP_TEMPLATES: dict[str, str] = {
     "reengagement_3d": (
@@ -240,7 +243,7 @@ def _send_whatsapp_media_payload_sync(
         "media": _data_uri_from_bytes(file_bytes, mime_type),
         "fileName": filename,
     }
-    with httpx.Client(timeout=25.0) as client:
+    with get_breaker(WHATSAPP_PROVIDER).guard(), httpx.Client(timeout=25.0) as client:
         response = client.post(
             f"{settings.whatsapp_api_url}/message/sendMedia/{resolved_instance}",
             headers={"apikey": settings.whatsapp_api_token},
@@ -324,7 +327,7 @@ async def send_whatsapp_message(
         return log_entry
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        async with get_breaker(WHATSAPP_PROVIDER).guard_async(), httpx.AsyncClient(timeout=15.0) as client:
             response = await client.post(
                 f"{settings.whatsapp_api_url}/message/sendText/{resolved}",
                 headers={"apikey": settings.whatsapp_api_token},
@@ -407,9 +410,6 @@ def suggest_whatsapp_template(db: Session, member_id: UUID) -> dict:
 
 
 def _personalize_template_with_ai(member: Member, base_message: str, days_inactive: int | None) -> str:
-    import anthropic
-
-    client = anthropic.Anthropic(api_key=settings.claude_api_key)
     prompt = (
         "Voce e um assistente de retencao de uma academia. "
         "Personalize a mensagem de WhatsApp abaixo mantendo o mesmo tom e objetivo. "
@@ -421,11 +421,13 @@ def _personalize_template_with_ai(member: Member, base_message: str, days_inacti
         f"NPS: {member.nps_last_score}\n\n"
         f"Mensagem base: {base_message}\n"
     )
-    response = client.messages.create(
+    response = call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
         model=settings.claude_model,
-        max_tokens=200,
-        temperature=0.3,
-        messages=[{"role": "user", "content": prompt}],
+        prompt_key="whatsapp_template_personalization",
+        params={"max_tokens": 200, "temperature": 0.3, "messages": [{"role": "user", "content": prompt}]},
+        gym_id=member.gym_id,
     )
     result = response.content[0].text.strip()
     return result[:500] if result else base_message
@@ -498,7 +500,7 @@ def send_whatsapp_sync(
         return log_entry
 
     try:
-        with httpx.Client(timeout=15.0) as client:
+        with get_breaker(WHATSAPP_PROVIDER).guard(), httpx.Client(timeout=15.0) as client:
             response = client.post(
                 f"{settings.whatsapp_api_url}/message/sendText/{resolved}",
                 headers={"apikey": settings.whatsapp_api_token},
@@ -0,0 +1,690 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import and_, bindparam, delete, event, exists, false, func, inspect as sa_inspect, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from app.core.config import settings
+from app.database import get_current_gym_id, set_current_gym_id
+from app.models import (
+    AITriageRecommendation,
+    Assessment,
+    AssessmentAppointment,
+    AutopilotAction,
+    BodyCompositionEvaluation,
+    Member,
+    RoleEnum,
+    Task,
+    User,
+    WorkQueueIndexItem,
+)
+from app.schemas import CursorPaginatedResponse
+from app.schemas.work_queue import WorkQueueItemOut
+from app.services.ai_service_agent_service import AI_SERVICE_AGENT_ACTION_TYPE, AI_SERVICE_AGENT_DRAFT_READY
+from app.services.assessment_analytics_service import get_assessments_queue
+from app.services.preferred_shift_service import normalize_preferred_shift, normalize_preferred_shift_scope
+from app.services.retention_stage_service import is_cold_base_stage
+from app.services.student_personal_ai_service import STUDENT_PERSONAL_AI_ACTION_TYPE, STUDENT_PERSONAL_AI_DRAFT_READY
+from app.services.task_service import is_task_operationally_archived
+from app.services.work_queue_service import (
+    DAILY_QUEUE_STALE_BACKLOG_AFTER,
+    DAILY_QUEUE_STALE_BACKLOG_EXEMPT_DOMAINS,
+    AssigneeFilter,
+    DomainFilter,
+    ShiftFilter,
+    SourceFilter,
+    StateFilter,
+    _ai_service_agent_to_item,
+    _ai_to_item,
+    _assessment_queue_to_item,
+    _effective_shift_filter,
+    _is_finance_task,
+    _is_trainer_task_visible,
+    _student_personal_ai_to_item,
+    _task_to_item,
+    _work_item_score,
+)
+from app.utils.batching import iter_keyset_batches
+from app.utils.cursor import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TASK = "task"
+SOURCE_AI_TRIAGE = "ai_triage"
+SOURCE_ASSESSMENT_QUEUE = "assessment_queue"
+SOURCE_AI_SERVICE_AGENT = "ai_service_agent"
+SOURCE_STUDENT_PERSONAL_AI = "student_personal_ai"
+
+ACTION_SOURCE_TYPES = {
+    AI_SERVICE_AGENT_ACTION_TYPE: SOURCE_AI_SERVICE_AGENT,
+    STUDENT_PERSONAL_AI_ACTION_TYPE: SOURCE_STUDENT_PERSONAL_AI,
+}
+QUEUED_ACTION_STATUSES = {
+    AI_SERVICE_AGENT_ACTION_TYPE: {AI_SERVICE_AGENT_DRAFT_READY, "blocked", "escalated", "awaiting_outcome"},
+    STUDENT_PERSONAL_AI_ACTION_TYPE: {STUDENT_PERSONAL_AI_DRAFT_READY, "blocked", "escalated", "awaiting_outcome"},
+}
+UNKNOWN_SHIFT = "other"
+REBUILD_BATCH_SIZE = 500
+
+_MEMBER_PROFILE_ATTRS = ("full_name", "phone", "preferred_shift", "retention_stage", "status", "deleted_at")
+_MEMBER_ASSESSMENT_ATTRS = ("risk_score", "extra_data")
+_ASSESSMENT_SOURCE_MODELS = (Assessment, BodyCompositionEvaluation, AssessmentAppointment)
+_PENDING_KEY = "work_queue_index_pending"
+_APPLYING_KEY = "work_queue_index_applying"
+_UPSERT_COLUMNS = (
+    "member_id",
+    "lead_id",
+    "assigned_to_user_id",
+    "domain",
+    "state",
+    "severity",
+    "preferred_shift",
+    "retention_stage",
+    "is_cold_base",
+    "is_finance",
+    "trainer_visible",
+    "due_at",
+    "visible_from",
+    "score",
+    "score_refresh_at",
+    "payload",
+)
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def _as_aware(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _index_shift(value: str | None) -> str | None:
+    # Keeps the live-path distinction between "no shift" (NULL) and an unrecognized shift label.
+    if value is None:
+        return None
+    return normalize_preferred_shift(value) or UNKNOWN_SHIFT
+
+
+def next_score_refresh_at(item: WorkQueueItemOut, now: datetime) -> datetime | None:
+    """First instant after ``now`` when ``_work_item_score`` moves to another due bucket."""
+    due_at = _as_aware(item.due_at)
+    if due_at is None or item.state == "done":
+        return None
+    for boundary in (due_at - timedelta(days=7), due_at - timedelta(days=1), due_at):
+        if boundary > now:
+            return boundary
+    return None
+
+
+def build_work_queue_index_row(
+    item: WorkQueueItemOut,
+    *,
+    gym_id: UUID,
+    is_finance: bool = False,
+    trainer_visible: bool = False,
+    now: datetime | None = None,
+) -> dict:
+    now = now or _now()
+    score, _ = _work_item_score(item, now)
+    return {
+        "id": uuid.uuid4(),
+        "gym_id": gym_id,
+        "source_type": item.source_type,
+        "source_id": item.source_id,
+        "member_id": item.member_id,
+        "lead_id": item.lead_id,
+        "assigned_to_user_id": item.assigned_to_user_id,
+        "domain": item.domain,
+        "state": item.state,
+        "severity": item.severity,
+        "preferred_shift": _index_shift(item.preferred_shift),
+        "retention_stage": item.retention_stage,
+        "is_cold_base": is_cold_base_stage(item.retention_stage),
+        "is_finance": is_finance,
+        "trainer_visible": trainer_visible,
+        "due_at": _as_aware(item.due_at),
+        "visible_from": _as_aware(item.visible_from),
+        "score": score,
+        "score_refresh_at": next_score_refresh_at(item, now),
+        "payload": item.model_dump(mode="json"),
+    }
+
+
+def _task_row(task: Task, now: datetime) -> dict | None:
+    if task.deleted_at is not None or is_task_operationally_archived(task):
+        return None
+    return build_work_queue_index_row(
+        _task_to_item(task),
+        gym_id=task.gym_id,
+        is_finance=_is_finance_task(task),
+        trainer_visible=_is_trainer_task_visible(task),
+        now=now,
+    )
+
+
+def _ai_triage_row(recommendation: AITriageRecommendation, now: datetime) -> dict | None:
+    if not recommendation.is_active:
+        return None
+    return build_work_queue_index_row(_ai_to_item(recommendation), gym_id=recommendation.gym_id, now=now)
+
+
+def _action_row(db: Session, action: AutopilotAction, now: datetime) -> dict | None:
+    if action.status not in QUEUED_ACTION_STATUSES.get(action.action_type, ()):
+        return None
+    if action.action_type == AI_SERVICE_AGENT_ACTION_TYPE:
+        item = _ai_service_agent_to_item(db, action)
+    else:
+        item = _student_personal_ai_to_item(db, action)
+    return build_work_queue_index_row(item, gym_id=action.gym_id, now=now)
+
+
+def _assessment_row(queue_item, *, gym_id: UUID, now: datetime) -> dict:
+    return build_work_queue_index_row(_assessment_queue_to_item(queue_item), gym_id=gym_id, now=now)
+
+
+def _upsert_rows(db: Session, rows: list[dict]) -> None:
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        chunk = rows[start : start + REBUILD_BATCH_SIZE]
+        stmt = pg_insert(WorkQueueIndexItem.__table__).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_work_queue_items_source",
+            set_={**{column: stmt.excluded[column] for column in _UPSERT_COLUMNS}, "updated_at": func.now()},
+        )
+        db.execute(stmt)
+
+
+def _delete_rows(db: Session, *, gym_id: UUID, source_type: str, source_ids: Iterable[UUID]) -> None:
+    ids = list(source_ids)
+    if not ids:
+        return
+    table = WorkQueueIndexItem.__table__
+    db.execute(
+        delete(table).where(
+            table.c.gym_id == gym_id,
+            table.c.source_type == source_type,
+            table.c.source_id.in_(ids),
+        )
+    )
+
+
+def _apply_rows(db: Session, *, gym_id: UUID, requested: dict[str, set[UUID]], rows: list[dict]) -> int:
+    _upsert_rows(db, rows)
+    written: dict[str, set[UUID]] = defaultdict(set)
+    for row in rows:
+        written[row["source_type"]].add(row["source_id"])
+    for source_type, source_ids in requested.items():
+        _delete_rows(db, gym_id=gym_id, source_type=source_type, source_ids=source_ids - written[source_type])
+    return len(rows)
+
+
+def refresh_work_queue_index(
+    db: Session,
+    *,
+    gym_id: UUID,
+    task_ids: Iterable[UUID] = (),
+    ai_triage_ids: Iterable[UUID] = (),
+    action_ids: Iterable[UUID] = (),
+    member_ids: Iterable[UUID] = (),
+    assessment_member_ids: Iterable[UUID] = (),
+) -> int:
+    """Re-renders the projection rows for the given sources; missing or ineligible sources are removed."""
+    now = _now()
+    task_ids = set(task_ids)
+    action_ids = set(action_ids)
+    member_ids = set(member_ids)
+    assessment_member_ids = set(assessment_member_ids) | member_ids
+    if member_ids:
+        task_ids.update(db.scalars(select(Task.id).where(Task.gym_id == gym_id, Task.member_id.in_(member_ids))).all())
+        action_ids.update(
+            db.scalars(
+                select(AutopilotAction.id).where(
+                    AutopilotAction.gym_id == gym_id,
+                    AutopilotAction.member_id.in_(member_ids),
+                    AutopilotAction.action_type.in_(tuple(ACTION_SOURCE_TYPES)),
+                )
+            ).all()
+        )
+
+    requested: dict[str, set[UUID]] = defaultdict(set)
+    rows: list[dict] = []
+    if task_ids:
+        requested[SOURCE_TASK] |= task_ids
+        tasks = db.scalars(
+            select(Task)
+            .options(joinedload(Task.member), joinedload(Task.lead))
+            .where(Task.gym_id == gym_id, Task.id.in_(task_ids))
+        ).unique()
+        rows.extend(row for task in tasks if (row := _task_row(task, now)) is not None)
+    ai_triage_ids = set(ai_triage_ids)
+    if ai_triage_ids:
+        requested[SOURCE_AI_TRIAGE] |= ai_triage_ids
+        recommendations = db.scalars(
+            select(AITriageRecommendation).where(
+                AITriageRecommendation.gym_id == gym_id,
+                AITriageRecommendation.id.in_(ai_triage_ids),
+            )
+        )
+        rows.extend(row for recommendation in recommendations if (row := _ai_triage_row(recommendation, now)) is not None)
+    if action_ids:
+        requested[SOURCE_AI_SERVICE_AGENT] |= action_ids
+        requested[SOURCE_STUDENT_PERSONAL_AI] |= action_ids
+        actions = list(
+            db.scalars(
+                select(AutopilotAction).where(AutopilotAction.gym_id == gym_id, AutopilotAction.id.in_(action_ids))
+            ).all()
+        )
+        rows.extend(row for action in actions if (row := _action_row(db, action, now)) is not None)
+    if assessment_member_ids:
+        requested[SOURCE_ASSESSMENT_QUEUE] |= assessment_member_ids
+        queue = get_assessments_queue(
+            db,
+            page=1,
+            page_size=len(assessment_member_ids),
+            bucket="all",
+            gym_id=gym_id,
+            member_ids=assessment_member_ids,
+        )
+        rows.extend(_assessment_row(queue_item, gym_id=gym_id, now=now) for queue_item in queue.items)
+    return _apply_rows(db, gym_id=gym_id, requested=requested, rows=rows)
+
+
+def _existing_source_ids(db: Session, *, gym_id: UUID) -> dict[str, set[UUID]]:
+    existing: dict[str, set[UUID]] = defaultdict(set)
+    rows = db.execute(
+        select(WorkQueueIndexItem.source_type, WorkQueueIndexItem.source_id).where(WorkQueueIndexItem.gym_id == gym_id)
+    )
+    for source_type, source_id in rows:
+        existing[source_type].add(source_id)
+    return existing
+
+
+def rebuild_work_queue_index(db: Session, *, gym_id: UUID) -> dict[str, int]:
+    """Full reconcile of one gym's projection against its source tables."""
+    now = _now()
+    existing = _existing_source_ids(db, gym_id=gym_id)
+    written: dict[str, set[UUID]] = defaultdict(set)
+
+    def _write(rows: list[dict]) -> None:
+        _upsert_rows(db, rows)
+        for row in rows:
+            written[row["source_type"]].add(row["source_id"])
+
+    task_stmt = (
+        select(Task)
+        .options(joinedload(Task.member), joinedload(Task.lead))
+        .where(Task.gym_id == gym_id, Task.deleted_at.is_(None))
+    )
+    for tasks in iter_keyset_batches(db, task_stmt, Task.id, batch_size=REBUILD_BATCH_SIZE):
+        _write([row for task in tasks if (row := _task_row(task, now)) is not None])
+
+    ai_stmt = select(AITriageRecommendation).where(
+        AITriageRecommendation.gym_id == gym_id,
+        AITriageRecommendation.is_active.is_(True),
+    )
+    for recommendations in iter_keyset_batches(
+        db, ai_stmt, AITriageRecommendation.id, batch_size=REBUILD_BATCH_SIZE
+    ):
+        _write([row for recommendation in recommendations if (row := _ai_triage_row(recommendation, now)) is not None])
+
+    action_stmt = select(AutopilotAction).where(
+        AutopilotAction.gym_id == gym_id,
+        or_(
+            *(
+                and_(AutopilotAction.action_type == action_type, AutopilotAction.status.in_(tuple(statuses)))
+                for action_type, statuses in QUEUED_ACTION_STATUSES.items()
+            )
+        ),
+    )
+    for actions in iter_keyset_batches(db, action_stmt, AutopilotAction.id, batch_size=REBUILD_BATCH_SIZE):
+        _write([row for action in actions if (row := _action_row(db, action, now)) is not None])
+
+    page = 1
+    while True:
+        queue = get_assessments_queue(db, page=page, page_size=REBUILD_BATCH_SIZE, bucket="all", gym_id=gym_id)
+        _write([_assessment_row(queue_item, gym_id=gym_id, now=now) for queue_item in queue.items])
+        if page * REBUILD_BATCH_SIZE >= queue.total or not queue.items:
+            break
+        page += 1
+
+    removed = 0
+    for source_type, source_ids in existing.items():
+        stale = source_ids - written[source_type]
+        _delete_rows(db, gym_id=gym_id, source_type=source_type, source_ids=stale)
+        removed += len(stale)
+    return {"indexed_count": sum(len(ids) for ids in written.values()), "removed_count": removed}
+
+
+def refresh_due_work_queue_scores(db: Session, *, gym_id: UUID, now: datetime | None = None) -> int:
+    """Recomputes scores whose due-date bucket changed since the row was written."""
+    now = now or _now()
+    rows = db.execute(
+        select(WorkQueueIndexItem.id, WorkQueueIndexItem.payload).where(
+            WorkQueueIndexItem.gym_id == gym_id,
+            WorkQueueIndexItem.score_refresh_at.is_not(None),
+            WorkQueueIndexItem.score_refresh_at <= now,
+        )
+    ).all()
+    if not rows:
+        return 0
+    params = []
+    for row_id, payload in rows:
+        item = WorkQueueItemOut.model_validate(payload)
+        params.append(
+            {
+                "row_id": row_id,
+                "new_score": _work_item_score(item, now)[0],
+                "new_refresh_at": next_score_refresh_at(item, now),
+            }
+        )
+    table = WorkQueueIndexItem.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values(score=bindparam("new_score"), score_refresh_at=bindparam("new_refresh_at"), updated_at=func.now()),
+        params,
+    )
+    return len(params)
+
+
+# ---------------------------------------------------------------------------
+# Change capture
+# ---------------------------------------------------------------------------
+
+
+def _pending_changes(session: Session) -> dict[UUID, dict[str, set[UUID]]]:
+    return session.info.setdefault(_PENDING_KEY, defaultdict(lambda: defaultdict(set)))
+
+
+def _attribute_changed(obj: object, names: Iterable[str]) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_work_queue_changes(session: Session, _flush_context) -> None:  # type: ignore[no-untyped-def]
+    if not settings.work_queue_index_enabled or session.info.get(_APPLYING_KEY):
+        return
+    pending = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        gym_id = getattr(obj, "gym_id", None)
+        if gym_id is None:
+            continue
+        kind = None
+        key = getattr(obj, "id", None)
+        if isinstance(obj, Task):
+            kind = "task_ids"
+        elif isinstance(obj, AITriageRecommendation):
+            kind = "ai_triage_ids"
+        elif isinstance(obj, AutopilotAction):
+            if obj.action_type in ACTION_SOURCE_TYPES:
+                kind = "action_ids"
+        elif isinstance(obj, Member):
+            if obj in session.new:
+                kind = "assessment_member_ids"
+            elif obj in session.deleted or _attribute_changed(obj, _MEMBER_PROFILE_ATTRS):
+                kind = "member_ids"
+            elif _attribute_changed(obj, _MEMBER_ASSESSMENT_ATTRS):
+                kind = "assessment_member_ids"
+        elif isinstance(obj, _ASSESSMENT_SOURCE_MODELS):
+            kind = "assessment_member_ids"
+            key = getattr(obj, "member_id", None)
+        if kind is None or key is None:
+            continue
+        if pending is None:
+            pending = _pending_changes(session)
+        pending[gym_id][kind].add(key)
+
+
+def flush_work_queue_index(db: Session) -> int:
+    """Flushes the session and applies captured source changes to ``work_queue_items``."""
+    if not settings.work_queue_index_enabled:
+        return 0
+    db.flush()
+    pending = db.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return 0
+    previous_gym_id = get_current_gym_id()
+    db.info[_APPLYING_KEY] = True
+    refreshed = 0
+    try:
+        with db.begin_nested():
+            for gym_id, changes in pending.items():
+                set_current_gym_id(gym_id)
+                refreshed += refresh_work_queue_index(db, gym_id=gym_id, **changes)
+    finally:
+        db.info.pop(_APPLYING_KEY, None)
+        set_current_gym_id(previous_gym_id)
+    return refreshed
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_work_queue_changes_before_commit(session: Session) -> None:
+    if not session.info.get(_PENDING_KEY) or session.info.get(_APPLYING_KEY):
+        return
+    try:
+        flush_work_queue_index(session)
+    except Exception:
+        # The projection is rebuilt nightly; never block the caller's commit on it.
+        logger.exception(
+            "Failed to update work queue index.",
+            extra={"extra_fields": {"event": "work_queue_index_update_failed"}},
+        )
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_work_queue_changes(session: Session, _previous_transaction) -> None:  # type: ignore[no-untyped-def]
+    if not session.in_transaction():
+        session.info.pop(_PENDING_KEY, None)
+
+
+# ---------------------------------------------------------------------------
+# Listing
+# ---------------------------------------------------------------------------
+
+
+def _shift_condition(current_user: User, shift: ShiftFilter):
+    effective_shift = _effective_shift_filter(current_user, shift)
+    if effective_shift == "all":
+        return true()
+    column = WorkQueueIndexItem.preferred_shift
+    if effective_shift == "unassigned":
+        return column.is_(None)
+    if effective_shift == "my_shift":
+        targets = normalize_preferred_shift_scope(
+            getattr(current_user, "work_shift_scope", None),
+            fallback=getattr(current_user, "work_shift", None),
+        )
+    else:
+        target = normalize_preferred_shift(effective_shift)
+        targets = [target] if target else []
+    if not targets:
+        return column.is_(None)
+    return or_(column.is_(None), column.in_(targets))
+
+
+def _task_visibility_condition(current_user: User, table=WorkQueueIndexItem):
+    if current_user.role == RoleEnum.TRAINER:
+        return table.trainer_visible.is_(True)
+    if current_user.role not in {RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST}:
+        return table.is_finance.is_(False)
+    return true()
+
+
+def _source_visibility_condition(current_user: User, *, source: SourceFilter, domain: DomainFilter):
+    role = current_user.role
+    column = WorkQueueIndexItem
+    conditions = []
+    if source in {"all", SOURCE_TASK}:
+        conditions.append(and_(column.source_type == SOURCE_TASK, _task_visibility_condition(current_user)))
+    if (
+        source == "all"
+        and domain in {"all", "operations", "assessment", "trainer"}
+        and role in {RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.TRAINER, RoleEnum.RECEPTIONIST}
+    ):
+        assessment_conditions = [column.source_type == SOURCE_ASSESSMENT_QUEUE]
+        if role == RoleEnum.TRAINER:
+            assessment_conditions.append(column.domain == "trainer")
+        elif role == RoleEnum.RECEPTIONIST:
+            assessment_conditions.append(column.domain != "trainer")
+        # A member with a visible trainer task is already in the queue through that task.
+        trainer_task = aliased(WorkQueueIndexItem)
+        assessment_conditions.append(
+            ~exists().where(
+                trainer_task.gym_id == column.gym_id,
+                trainer_task.source_type == SOURCE_TASK,
+                trainer_task.member_id == column.member_id,
+                trainer_task.domain == "trainer",
+                _task_visibility_condition(current_user, trainer_task),
+            )
+        )
+        conditions.append(and_(*assessment_conditions))
+    if source in {"all", SOURCE_AI_TRIAGE} and role in {RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST}:
+        conditions.append(column.source_type == SOURCE_AI_TRIAGE)
+    if source in {"all", SOURCE_AI_SERVICE_AGENT} and role in {
+        RoleEnum.OWNER,
+        RoleEnum.MANAGER,
+        RoleEnum.RECEPTIONIST,
+        RoleEnum.TRAINER,
+        RoleEnum.SALESPERSON,
+    }:
+        agent_conditions = [column.source_type == SOURCE_AI_SERVICE_AGENT]
+        if role == RoleEnum.TRAINER:
+            agent_conditions.append(column.domain == "assessment")
+        elif role == RoleEnum.SALESPERSON:
+            agent_conditions.append(column.domain == "commercial")
+        conditions.append(and_(*agent_conditions))
+    if source in {"all", SOURCE_STUDENT_PERSONAL_AI} and role in {
+        RoleEnum.OWNER,
+        RoleEnum.MANAGER,
+        RoleEnum.RECEPTIONIST,
+        RoleEnum.TRAINER,
+    }:
+        conditions.append(column.source_type == SOURCE_STUDENT_PERSONAL_AI)
+    return or_(*conditions) if conditions else false()
+
+
+def _list_filters(
+    current_user: User,
+    *,
+    state: StateFilter,
+    shift: ShiftFilter,
+    assignee: AssigneeFilter,
+    domain: DomainFilter,
+    source: SourceFilter,
+    now: datetime,
+) -> list:
+    column = WorkQueueIndexItem
+    filters = [
+        column.gym_id == current_user.gym_id,
+        _source_visibility_condition(current_user, source=source, domain=domain),
+        _shift_condition(current_user, shift),
+    ]
+    if state != "all":
+        filters.append(column.state == state)
+    if domain == "operations":
+        filters.append(column.domain.not_in(("retention", "trainer")))
+    elif domain != "all":
+        filters.append(column.domain == domain)
+    if state == "do_now":
+        filters.append(~and_(column.domain == "retention", column.is_cold_base.is_(True)))
+        filters.append(or_(column.visible_from.is_(None), column.visible_from <= now))
+        filters.append(
+            or_(
+                column.domain.in_(tuple(DAILY_QUEUE_STALE_BACKLOG_EXEMPT_DOMAINS)),
+                column.due_at.is_(None),
+                column.due_at >= now - DAILY_QUEUE_STALE_BACKLOG_AFTER,
+            )
+        )
+    if assignee == "mine":
+        filters.append(column.assigned_to_user_id == current_user.id)
+    elif assignee == "unassigned":
+        filters.append(column.assigned_to_user_id.is_(None))
+    return filters
+
+
+def _keyset_condition(cursor: str):
+    # Mirrors ORDER BY score DESC, due_at DESC NULLS FIRST, id DESC.
+    values = decode_cursor(cursor)
+    try:
+        score = int(values["s"])
+        due_at = _as_aware(datetime.fromisoformat(values["d"])) if values.get("d") else None
+        row_id = UUID(str(values["i"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError("Cursor invalido") from exc
+    column = WorkQueueIndexItem
+    if due_at is None:
+        due_after = column.due_at.is_not(None)
+        due_same = column.due_at.is_(None)
+    else:
+        due_after = column.due_at < due_at
+        due_same = column.due_at == due_at
+    return or_(
+        column.score < score,
+        and_(column.score == score, due_after),
+        and_(column.score == score, due_same, column.id < row_id),
+    )
+
+
+def _encode_row_cursor(row: WorkQueueIndexItem) -> str:
+    due_at = _as_aware(row.due_at)
+    return encode_cursor({"s": row.score, "d": due_at.isoformat() if due_at else None, "i": str(row.id)})
+
+
+def list_indexed_work_queue_items(
+    db: Session,
+    *,
+    current_user: User,
+    state: StateFilter = "do_now",
+    shift: ShiftFilter = "my_shift",
+    assignee: AssigneeFilter = "all",
+    domain: DomainFilter = "all",
+    source: SourceFilter = "all",
+    page: int = 1,
+    page_size: int = 25,
+    cursor: str | None = None,
+) -> CursorPaginatedResponse[WorkQueueItemOut]:
+    filters = _list_filters(
+        current_user,
+        state=state,
+        shift=shift,
+        assignee=assignee,
+        domain=domain,
+        source=source,
+        now=_now(),
+    )
+    total = int(db.scalar(select(func.count(WorkQueueIndexItem.id)).where(*filters)) or 0)
+    stmt = (
+        select(WorkQueueIndexItem)
+        .where(*filters)
+        .order_by(
+            WorkQueueIndexItem.score.desc(),
+            WorkQueueIndexItem.due_at.desc().nulls_first(),
+            WorkQueueIndexItem.id.desc(),
+        )
+        .limit(page_size + 1)
+    )
+    if cursor:
+        stmt = stmt.where(_keyset_condition(cursor))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+    rows = list(db.scalars(stmt).all())
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return CursorPaginatedResponse(
+        items=[WorkQueueItemOut.model_validate(row.payload) for row in rows],
+        total=total,
+        page=page,
+        page_size=page_size,
+        next_cursor=_encode_row_cursor(rows[-1]) if has_more and rows else None,
+    )
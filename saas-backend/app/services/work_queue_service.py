@@ -22,7 +22,8 @@ from app.models import (
     TaskStatus,
     User,
 )
-from app.schemas import PaginatedResponse
+from app.core.config import settings
+from app.schemas import CursorPaginatedResponse
 from app.schemas.ai_triage import AITriageSafeActionPrepareInput
 from app.schemas.work_queue import (
     WorkQueueActionResultOut,
@@ -783,7 +784,8 @@ def _list_task_items(db: Session, current_user: User) -> list[WorkQueueItemOut]:
 def _list_ai_items(db: Session, current_user: User) -> list[WorkQueueItemOut]:
     if current_user.role not in {RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST}:
         return []
-    sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
+    if not settings.ai_triage_background_sync_enabled:
+        sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
     recommendations = list(
         db.scalars(
             select(AITriageRecommendation)
@@ -871,7 +873,22 @@ def list_work_queue_items(
     source: SourceFilter = "all",
     page: int = 1,
     page_size: int = 25,
-) -> PaginatedResponse[WorkQueueItemOut]:
+    cursor: str | None = None,
+) -> CursorPaginatedResponse[WorkQueueItemOut]:
+    if settings.work_queue_index_enabled:
+        return _list_indexed_items(
+            db,
+            current_user=current_user,
+            state=state,
+            shift=shift,
+            assignee=assignee,
+            domain=domain,
+            source=source,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+        )
+
     items: list[WorkQueueItemOut] = []
     if source in {"all", "task"}:
         items.extend(_list_task_items(db, current_user))
@@ -890,7 +907,43 @@ def list_work_queue_items(
     filtered = _filter_items(items, current_user=current_user, state=state, shift=shift, assignee=assignee, domain=domain)
     total = len(filtered)
     start = (page - 1) * page_size
-    return PaginatedResponse(items=filtered[start : start + page_size], total=total, page=page, page_size=page_size)
+    return CursorPaginatedResponse(items=filtered[start : start + page_size], total=total, page=page, page_size=page_size)
+
+
+def _list_indexed_items(
+    db: Session,
+    *,
+    current_user: User,
+    state: StateFilter,
+    shift: ShiftFilter,
+    assignee: AssigneeFilter,
+    domain: DomainFilter,
+    source: SourceFilter,
+    page: int,
+    page_size: int,
+    cursor: str | None,
+) -> CursorPaginatedResponse[WorkQueueItemOut]:
+    from app.services.work_queue_index_service import flush_work_queue_index, list_indexed_work_queue_items
+
+    if (
+        not settings.ai_triage_background_sync_enabled
+        and source in {"all", "ai_triage"}
+        and current_user.role in {RoleEnum.OWNER, RoleEnum.MANAGER, RoleEnum.RECEPTIONIST}
+    ):
+        sync_ai_triage_recommendations(db, gym_id=current_user.gym_id)
+    flush_work_queue_index(db)
+    return list_indexed_work_queue_items(
+        db,
+        current_user=current_user,
+        state=state,
+        shift=shift,
+        assignee=assignee,
+        domain=domain,
+        source=source,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    )
 
 
 def get_work_queue_item(db: Session, *, current_user: User, source_type: SourceType, source_id: UUID) -> WorkQueueItemOut:
@@ -0,0 +1,105 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class BatchScanStats:
+    """Per-batch fetch latency of a scan; first and last staying close means the scan is not degrading."""
+
+    batches: int = 0
+    rows: int = 0
+    first_batch_ms: int = 0
+    last_batch_ms: int = 0
+    max_batch_ms: int = 0
+
+    def record(self, rows: int, elapsed_ms: int) -> None:
+        if self.batches == 0:
+            self.first_batch_ms = elapsed_ms
+        self.batches += 1
+        self.rows += rows
+        self.last_batch_ms = elapsed_ms
+        self.max_batch_ms = max(self.max_batch_ms, elapsed_ms)
+
+    def as_metrics(self) -> dict[str, int]:
+        return {
+            "batches": self.batches,
+            "batch_fetch_ms_first": self.first_batch_ms,
+            "batch_fetch_ms_last": self.last_batch_ms,
+            "batch_fetch_ms_max": self.max_batch_ms,
+        }
+
+
+def _selects_single_column(stmt) -> bool:
+    return len(stmt.column_descriptions) == 1
+
+
+def _keyset_value_getter(stmt, key_name: str):
+    descriptions = stmt.column_descriptions
+    if len(descriptions) == 1 and not isinstance(descriptions[0]["type"], type):
+        # A single plain column is scalar-fetched, so each item is the key itself.
+        return lambda item: item
+    return lambda item: getattr(item, key_name)
+
+
+def iter_keyset_batches(
+    db: Session,
+    stmt,
+    id_column,
+    *,
+    batch_size: int,
+    stats: BatchScanStats | None = None,
+) -> Iterator[list[Any]]:
+    """Yields ``stmt`` in ``id_column`` order, one ``WHERE id > last_id LIMIT n`` query per batch.
+
+    Every batch is an index seek, so a full pass stays linear and rows updated between batches cannot shift
+    pages; it is safe to commit between batches. ``stmt`` may select an entity, a single column (the key
+    itself) or a column projection that includes ``id_column``; joined eager loads must stay many-to-one.
+    """
+    batch_size = max(int(batch_size), 1)
+    single = _selects_single_column(stmt)
+    key_of = _keyset_value_getter(stmt, id_column.key)
+    last_key = None
+    while True:
+        batch_stmt = stmt.order_by(id_column.asc()).limit(batch_size)
+        if last_key is not None:
+            batch_stmt = batch_stmt.where(id_column > last_key)
+        started = perf_counter()
+        batch = list((db.scalars(batch_stmt) if single else db.execute(batch_stmt)).all())
+        if stats is not None:
+            stats.record(len(batch), int((perf_counter() - started) * 1000))
+        if not batch:
+            return
+        yield batch
+        last_key = key_of(batch[-1])
+        if len(batch) < batch_size:
+            return
+
+
+def iter_streamed_batches(
+    db: Session,
+    stmt,
+    *,
+    batch_size: int,
+    stats: BatchScanStats | None = None,
+) -> Iterator[list[Any]]:
+    """Yields ``stmt`` from one server-side cursor (``yield_per``), ``batch_size`` rows at a time.
+
+    Cheaper than keyset paging for read-mostly passes, but the cursor lives in the current transaction:
+    callers must not commit until the iteration is exhausted.
+    """
+    batch_size = max(int(batch_size), 1)
+    streamed = stmt.execution_options(yield_per=batch_size)
+    result = db.scalars(streamed) if _selects_single_column(stmt) else db.execute(streamed)
+    partitions = result.partitions(batch_size)
+    while True:
+        started = perf_counter()
+        batch = next(partitions, None)
+        if stats is not None:
+            stats.record(len(batch or ()), int((perf_counter() - started) * 1000))
+        if not batch:
+            return
+        yield list(batch)
@@ -1,9 +1,11 @@
 import json
 import logging
 import re
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
 
-import anthropic
-
+from app.core.ai_gateway import PROVIDER_CLAUDE, call_model
 from app.core.config import settings
 from app.models.enums import NPSSentiment
 
@@ -23,7 +25,8 @@ def analyze_sentiment(score: int, comment: str | None) -> tuple[NPSSentiment, st
     if not settings.claude_api_key or not comment:
         return _fallback_sentiment(score, comment)
 
-    client = anthropic.Anthropic(api_key=settings.claude_api_key)
+    # Whitespace-only differences do not change the answer, so they must not miss the gateway cache.
+    comment = " ".join(comment.split())
     prompt = (
         "Analise o sentimento de feedback NPS para academia.\n"
         "Retorne JSON com campos: sentiment (positive|neutral|negative), summary.\n"
@@ -31,11 +34,16 @@ def analyze_sentiment(score: int, comment: str | None) -> tuple[NPSSentiment, st
         f"Comentario: {comment}\n"
     )
     try:
-        response = client.messages.create(
+        response = call_model(
+            PROVIDER_CLAUDE,
+            "messages.create",
             model=settings.claude_model,
-            max_tokens=settings.claude_max_tokens,
-            temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            prompt_key="nps_sentiment",
+            params={
+                "max_tokens": settings.claude_max_tokens,
+                "temperature": 0,
+                "messages": [{"role": "user", "content": prompt}],
+            },
         )
         text = response.content[0].text.strip()
         parsed = _parse_claude_json(text)
@@ -47,6 +55,76 @@ def analyze_sentiment(score: int, comment: str | None) -> tuple[NPSSentiment, st
         return _fallback_sentiment(score, comment)
 
 
+# Output budget per item of a batched prompt, and the ceiling for the whole answer.
+_BATCH_TOKENS_PER_ITEM = 120
+_BATCH_MAX_TOKENS = 4096
+
+
+def analyze_sentiment_batch(
+    items: Sequence[tuple[int, str]],
+    *,
+    gym_id: UUID | str | None = None,
+) -> tuple[list[tuple[NPSSentiment, str] | None], dict[str, int]]:
+    """Classifies several ``(score, comment)`` pairs with one Claude request.
+
+    Returns one entry per item, in order: ``(sentiment, summary)`` or ``None`` when the answer skipped or garbled that
+    item (callers apply ``_fallback_sentiment`` to those), plus the token usage of the call. Provider errors are raised
+    so the caller can retry the batch later.
+    """
+    if not items:
+        return [], {"input_tokens": 0, "output_tokens": 0}
+    entries = [
+        {"id": str(index), "score": score, "comment": " ".join((comment or "").split())}
+        for index, (score, comment) in enumerate(items, start=1)
+    ]
+    prompt = (
+        "Analise o sentimento de cada feedback NPS para academia.\n"
+        "Retorne JSON com o campo items: lista com um objeto por feedback, com campos id (o mesmo recebido), "
+        "sentiment (positive|neutral|negative) e summary.\n"
+        f"Feedbacks: {json.dumps(entries, ensure_ascii=False)}\n"
+    )
+    response = call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
+        model=settings.claude_model,
+        prompt_key="nps_sentiment_batch",
+        params={
+            "max_tokens": min(_BATCH_TOKENS_PER_ITEM * len(entries), _BATCH_MAX_TOKENS),
+            "temperature": 0,
+            "messages": [{"role": "user", "content": prompt}],
+        },
+        timeout_seconds=settings.nps_sentiment_batch_timeout_seconds,
+        gym_id=gym_id,
+    )
+    usage = getattr(response, "usage", None)
+    tokens = {
+        "input_tokens": int(getattr(usage, "input_tokens", 0) or 0),
+        "output_tokens": int(getattr(usage, "output_tokens", 0) or 0),
+    }
+    try:
+        parsed = _parse_claude_json(response.content[0].text.strip())
+    except Exception:
+        logger.warning("Resposta Claude em lote sem JSON valido; %s feedbacks usarao fallback", len(entries))
+        return [None] * len(entries), tokens
+    answers = {str(item.get("id")): item for item in _batch_items(parsed) if isinstance(item, dict)}
+    return [_batch_answer(answers.get(entry["id"])) for entry in entries], tokens
+
+
+def _batch_items(parsed: Any) -> list:
+    if isinstance(parsed, dict):
+        parsed = parsed.get("items")
+    return parsed if isinstance(parsed, list) else []
+
+
+def _batch_answer(answer: dict | None) -> tuple[NPSSentiment, str] | None:
+    if answer is None:
+        return None
+    try:
+        return NPSSentiment(answer["sentiment"]), str(answer["summary"])[:500]
+    except (KeyError, ValueError):
+        return None
+
+
 def _parse_claude_json(text: str) -> dict:
     try:
         return json.loads(text)
@@ -0,0 +1,39 @@
+"""Accent- and case-folded text for member search.
+
+The folding runs in Postgres (``fold_sql`` backs the ``members.search_text`` generated column) and in Python
+(``fold_search_text`` for user input), so both sides always agree. ``translate`` is used instead of ``unaccent``
+because it is IMMUTABLE and may back a generated column and its trigram index.
+"""
+
+from sqlalchemy import func, literal_column
+
+_ACCENTED = "áàâãäåéèêëíìîïóòôõöúùûüçñýÿÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝ"
+_PLAIN = "aaaaaaeeeeiiiiooooouuuucnyyaaaaaaeeeeiiiiooooouuuucny"
+_FOLD_TABLE = str.maketrans(_ACCENTED, _PLAIN)
+_LIKE_ESCAPE = "\\"
+
+
+def fold_search_text(value: str | None) -> str:
+    return (value or "").strip().translate(_FOLD_TABLE).lower()
+
+
+def fold_sql(expression: str) -> str:
+    return f"lower(translate({expression}, '{_ACCENTED}', '{_PLAIN}'))"
+
+
+def fold_expression(column):
+    # Inline literals (not bind params) keep the expression identical to the one in the generated column.
+    return func.lower(func.translate(column, literal_column(f"'{_ACCENTED}'"), literal_column(f"'{_PLAIN}'")))
+
+
+def escape_like(value: str) -> str:
+    return value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2).replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_condition(expression, folded_term: str):
+    return expression.like(f"%{escape_like(folded_term)}%", escape=_LIKE_ESCAPE)
+
+
+def prefix_condition(expression, folded_term: str, *, word_start: bool = False):
+    pattern = f"{escape_like(folded_term)}%"
+    return expression.like(f"% {pattern}" if word_start else pattern, escape=_LIKE_ESCAPE)
@@ -0,0 +1,101 @@
+"""Benchmark for NPS sentiment calls: a new SDK client per call against the AI gateway.
+
+Sends ``--requests`` sentiment analyses from ``--workers`` threads to ``FakeLLMClient`` (``--latency-ms`` per call, no
+API key or network). Only ``--unique`` distinct comments exist, as when many members leave the same short answer
+("Otimo", "Muito cheio"):
+
+- ``direct``: what the services did before the gateway: a client per call and every request reaches the provider;
+- ``gateway``: ``analyze_sentiment`` through the gateway (pooled client, coalescing and, with ``--cache``, the
+  response cache).
+
+Reports throughput, p50/p95 per call and how many calls reached the provider.
+
+Usage:
+    python scripts/benchmark_ai_gateway.py --strategy direct --requests 400
+    python scripts/benchmark_ai_gateway.py --strategy gateway --requests 400 --cache
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core import ai_gateway  # noqa: E402
+from app.core.ai_gateway import PROVIDER_CLAUDE, FakeLLMClient  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.utils.claude import analyze_sentiment  # noqa: E402
+
+_REPLY = json.dumps({"sentiment": "neutral", "summary": "Comentario sintetico."})
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategy", choices=("direct", "gateway"), default="gateway")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--unique", type=int, default=40, help="distinct comments among the requests")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated provider response time")
+    parser.add_argument("--cache", action="store_true", help="enable the gateway response cache")
+    args = parser.parse_args()
+
+    latency_seconds = max(args.latency_ms, 0.0) / 1000
+    comments = [f"Comentario sintetico {index % max(args.unique, 1)}" for index in range(max(args.requests, 1))]
+    provider_calls = [0]
+    calls_lock = Lock()
+
+    if args.strategy == "direct":
+
+        def _analyze(comment: str) -> None:
+            client = FakeLLMClient(_REPLY, latency_seconds=latency_seconds)
+            client.messages.create(model=settings.claude_model, messages=[{"role": "user", "content": comment}])
+            with calls_lock:
+                provider_calls[0] += 1
+
+    else:
+        settings.claude_api_key = "benchmark-key"
+        settings.ai_gateway_cache_enabled = args.cache
+        settings.ai_gateway_tenant_concurrency = max(args.workers, 1)
+        fake = FakeLLMClient(_REPLY, latency_seconds=latency_seconds)
+        ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+
+        def _analyze(comment: str) -> None:
+            analyze_sentiment(7, comment)
+
+    durations: list[float] = []
+
+    def _timed(comment: str) -> None:
+        started = perf_counter()
+        _analyze(comment)
+        durations.append(perf_counter() - started)
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+        list(executor.map(_timed, comments))
+    elapsed = perf_counter() - started
+    if args.strategy == "gateway":
+        provider_calls[0] = fake.calls
+
+    print(f"strategy={args.strategy} requests={len(comments)} unique={args.unique} cache={args.cache}")
+    print(f"elapsed={elapsed:.2f}s throughput={len(comments) / elapsed:.1f} req/s provider_calls={provider_calls[0]}")
+    print(f"p50={_percentile(durations, 0.50) * 1000:.1f}ms p95={_percentile(durations, 0.95) * 1000:.1f}ms")
+    if args.strategy == "gateway":
+        print(json.dumps(ai_gateway.ai_gateway_stats()["calls"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
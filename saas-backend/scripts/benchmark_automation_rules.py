@@ -0,0 +1,161 @@
+"""Benchmark for ``run_automation_rules``: per-member SAVEPOINTs against chunked batch execution.
+
+Runs ``--rules`` synthetic rules (alternating CREATE_TASK and NOTIFY) that each match ``--members`` synthetic members.
+The session is simulated, so no database is needed. Every statement, savepoint command and batched INSERT (one per
+table per flush) costs one round trip of ``--latency-ms``. The ORM objects, template rendering and result building
+are the real ones.
+
+Usage:
+    python scripts/benchmark_automation_rules.py --strategy row --members 2000 --rules 4
+    python scripts/benchmark_automation_rules.py --strategy batch --members 2000 --rules 4 --chunk-size 500
+"""
+
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core.config import settings  # noqa: E402
+from app.models import MemberStatus  # noqa: E402
+from app.models.automation_rule import AutomationAction, AutomationTrigger  # noqa: E402
+from app.services import automation_engine  # noqa: E402
+
+
+class _RoundTripSession:
+    """Stands in for a Session and charges one simulated round trip per database interaction."""
+
+    def __init__(self, latency_seconds: float) -> None:
+        self.latency_seconds = latency_seconds
+        self.round_trips = 0
+        self._pending: list = []
+
+    def _round_trip(self, count: int = 1) -> None:
+        self.round_trips += count
+        time.sleep(self.latency_seconds * count)
+
+    def scalar(self, _statement):
+        self._round_trip()
+        return None
+
+    def execute(self, _statement):
+        self._round_trip()
+        return SimpleNamespace(all=lambda: [])
+
+    def get(self, *_args, **_kwargs):
+        return None
+
+    def add(self, obj) -> None:
+        self._pending.append(obj)
+
+    def add_all(self, objs) -> None:
+        self._pending.extend(objs)
+
+    def flush(self) -> None:
+        if self._pending:
+            # The unit of work writes each table with one batched INSERT.
+            self._round_trip(len({type(obj) for obj in self._pending}))
+            self._pending = []
+
+    def commit(self) -> None:
+        self.flush()
+        self._round_trip()
+
+    @contextmanager
+    def begin_nested(self):
+        self._round_trip()
+        yield
+        self.flush()
+        self._round_trip()
+
+
+def _synthetic_members(count: int, gym_id) -> list[SimpleNamespace]:
+    now = datetime.now(tz=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            gym_id=gym_id,
+            full_name=f"Aluno Sintetico {index}",
+            phone=f"11999{index:06d}",
+            email=f"aluno{index}@teste.com",
+            plan_name="Plano Gold",
+            risk_level="red",
+            risk_score=80,
+            nps_last_score=5,
+            assigned_user_id=None,
+            last_checkin_at=now - timedelta(days=index % 30),
+            status=MemberStatus.ACTIVE,
+            deleted_at=None,
+            extra_data={},
+        )
+        for index in range(count)
+    ]
+
+
+def _synthetic_rules(count: int, gym_id) -> list[SimpleNamespace]:
+    rules = []
+    for index in range(count):
+        creates_task = index % 2 == 0
+        rules.append(
+            SimpleNamespace(
+                id=uuid4(),
+                gym_id=gym_id,
+                name=f"Regra {index}",
+                trigger_type=AutomationTrigger.RISK_LEVEL_CHANGE,
+                trigger_config={"level": "red"},
+                action_type=AutomationAction.CREATE_TASK if creates_task else AutomationAction.NOTIFY,
+                action_config=(
+                    {"title": f"Regra {index}: ligar para {{nome}}", "priority": "high", "source": "benchmark"}
+                    if creates_task
+                    else {"title": f"Regra {index}: {{nome}}", "message": "{nome} sem treinar ha {dias} dias."}
+                ),
+                is_active=True,
+                executions_count=0,
+                last_executed_at=None,
+            )
+        )
+    return rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategy", choices=("row", "batch"), default="batch")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--rules", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="simulated database round trip")
+    args = parser.parse_args()
+
+    gym_id = uuid4()
+    members = _synthetic_members(max(args.members, 1), gym_id)
+    rules = _synthetic_rules(max(args.rules, 1), gym_id)
+    settings.automation_batch_execution_enabled = args.strategy == "batch"
+    settings.automation_batch_chunk_size = args.chunk_size
+    automation_engine.list_automation_rules = lambda *_args, **_kwargs: rules
+    automation_engine._find_matching_members = lambda *_args, **_kwargs: members
+    db = _RoundTripSession(max(args.latency_ms, 0.0) / 1000)
+
+    started = perf_counter()
+    results = automation_engine.run_automation_rules(db)
+    elapsed = perf_counter() - started
+
+    statuses: dict[str, int] = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    print(f"strategy={args.strategy} rules={len(rules)} members={len(members)} executions={len(results)}")
+    print(f"elapsed={elapsed:.2f}s round_trips={db.round_trips} statuses={statuses}")
+
+
+if __name__ == "__main__":
+    main()
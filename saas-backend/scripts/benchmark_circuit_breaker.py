@@ -0,0 +1,115 @@
+"""Benchmark for a provider outage with and without the circuit breaker.
+
+Starts an HTTP server on localhost that hangs ``--hang-ms`` and then answers 503, as a provider in trouble does, and
+sends ``--requests`` calls from ``--workers`` threads with a client timeout of ``--timeout-ms``:
+
+- ``none``: every call waits for the timeout (what the WhatsApp/Kommo clients did);
+- ``breaker``: calls go through ``CircuitBreaker.guard`` and fail fast once the breaker opens.
+
+Reports elapsed time, thread-seconds spent waiting on the provider and how many calls reached it. No Redis is used
+(local breaker state).
+
+Usage:
+    python scripts/benchmark_circuit_breaker.py --strategy none --requests 400
+    python scripts/benchmark_circuit_breaker.py --strategy breaker --requests 400
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core import circuit_breaker  # noqa: E402
+from app.core.circuit_breaker import CircuitBreaker, ProviderUnavailableError  # noqa: E402
+
+
+class _FailingProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hang_seconds = 0.0
+    hits = 0
+    hits_lock = threading.Lock()
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        with self.hits_lock:
+            type(self).hits += 1
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.hang_seconds)
+        body = b'{"error": "unavailable"}'
+        try:
+            self.send_response(503)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            return
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategy", choices=("none", "breaker"), default="breaker")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--hang-ms", type=float, default=2000.0, help="provider time before answering 503")
+    parser.add_argument("--timeout-ms", type=float, default=500.0, help="client timeout per call")
+    args = parser.parse_args()
+
+    _FailingProviderHandler.hang_seconds = max(args.hang_ms, 0.0) / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FailingProviderHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/message"
+
+    circuit_breaker._get_redis = lambda: None
+    breaker = CircuitBreaker("benchmark", minimum_calls=10, window_seconds=60, recovery_timeout_seconds=60)
+    client = httpx.Client(timeout=max(args.timeout_ms, 1.0) / 1000)
+    outcomes = {"failed": 0, "refused": 0}
+    outcomes_lock = threading.Lock()
+    waited: list[float] = []
+
+    def _send(_index: int) -> None:
+        started = perf_counter()
+        try:
+            if args.strategy == "breaker":
+                with breaker.guard():
+                    client.post(url, json={"text": "oi"}).raise_for_status()
+            else:
+                client.post(url, json={"text": "oi"}).raise_for_status()
+            outcome = "sent"
+        except ProviderUnavailableError:
+            outcome = "refused"
+        except httpx.HTTPError:
+            outcome = "failed"
+        with outcomes_lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            waited.append(perf_counter() - started)
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+        list(executor.map(_send, range(max(args.requests, 1))))
+    elapsed = perf_counter() - started
+    client.close()
+    server.shutdown()
+
+    print(f"strategy={args.strategy} requests={args.requests} workers={args.workers} outcomes={outcomes}")
+    hits = _FailingProviderHandler.hits
+    print(f"elapsed={elapsed:.2f}s thread_seconds_waiting={sum(waited):.1f}s provider_hits={hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark for the dashboard cache wire format.
+
+Encodes synthetic dashboard payloads (sized by ``--members``) with the legacy
+plain-JSON format and with every available codec, with and without
+compression, and reports encode/decode time and stored bytes per namespace.
+With ``--redis-url`` it also reports the bytes currently stored in Redis per
+namespace, split between legacy and framed payloads.
+
+Usage:
+    python scripts/benchmark_dashboard_cache_codec.py --members 200 --iterations 500
+    python scripts/benchmark_dashboard_cache_codec.py --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core.cache_codec import (  # noqa: E402
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+    available_codecs,
+    decode_payload,
+    default_compression,
+    encode_payload,
+    is_framed,
+)
+
+NOW = datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc)
+
+
+def _member_snapshot(rng: random.Random) -> dict:
+    return {
+        "id": str(uuid4()),
+        "full_name": f"Aluno {rng.randint(1, 99999)}",
+        "email": f"aluno{rng.randint(1, 99999)}@example.com",
+        "phone": f"+55119{rng.randint(10000000, 99999999)}",
+        "status": "active",
+        "plan_name": rng.choice(["Mensal", "Trimestral", "Anual"]),
+        "monthly_fee": f"{rng.randint(89, 299)}.90",
+        "join_date": (NOW - timedelta(days=rng.randint(10, 900))).date().isoformat(),
+        "risk_level": rng.choice(["yellow", "red"]),
+        "risk_score": rng.randint(40, 100),
+        "last_checkin_at": (NOW - timedelta(days=rng.randint(0, 60))).isoformat(),
+        "extra_data": {"retention_stage": rng.choice(["monitoring", "attention", "recovery"])},
+    }
+
+
+def _synthetic_payloads(members: int, seed: int) -> dict[str, object]:
+    rng = random.Random(seed)
+    red = [_member_snapshot(rng) for _ in range(members)]
+    yellow = [_member_snapshot(rng) for _ in range(members)]
+    return {
+        "dashboard_executive": {
+            "total_members": 1830,
+            "active_members": 1544,
+            "mrr": 187345.5,
+            "churn_rate": 3.2,
+            "nps_avg": 8.1,
+            "risk_distribution": {"green": 1200, "yellow": 230, "red": 114},
+        },
+        "dashboard_mrr": [{"month": f"2026-{month:02d}", "value": 180000.0 + month * 731} for month in range(1, 13)],
+        "dashboard_operational": {
+            "realtime_checkins": 42,
+            "heatmap": [
+                {"weekday": weekday, "hour_bucket": hour, "total_checkins": rng.randint(0, 90)}
+                for weekday in range(7)
+                for hour in range(5, 23)
+            ],
+            "inactive_7d_total": members,
+            "inactive_7d_items": red[:20],
+            "birthday_today_total": 3,
+            "birthday_today_items": yellow[:3],
+        },
+        "dashboard_retention": {
+            "red": {"total": len(red), "items": red},
+            "yellow": {"total": len(yellow), "items": yellow},
+            "nps_trend": [{"month": f"2026-{month:02d}", "average_score": 8.0} for month in range(1, 13)],
+            "mrr_at_risk": 21456.3,
+            "avg_red_score": 78.2,
+            "avg_yellow_score": 52.7,
+            "churn_distribution": {"voluntary": 12, "involuntary": 4, "unknown": 9},
+            "last_contact_map": {item["id"]: NOW.isoformat() for item in red + yellow},
+        },
+    }
+
+
+def _legacy_encode(value: object) -> bytes:
+    return json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _time_ms(fn, iterations: int) -> float:
+    started = perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (perf_counter() - started) * 1000 / iterations
+
+
+def _benchmark_formats(payloads: dict[str, object], iterations: int, compress_min_bytes: int) -> None:
+    print(f"{'namespace':24} {'format':22} {'bytes':>9} {'encode ms':>10} {'decode ms':>10}")
+    for namespace, value in payloads.items():
+        legacy = _legacy_encode(value)
+        rows = [
+            (
+                "legacy-json",
+                len(legacy),
+                _time_ms(lambda: _legacy_encode(value), iterations),
+                _time_ms(lambda: json.loads(legacy), iterations),
+            )
+        ]
+        for codec in available_codecs().values():
+            for threshold in (0, compress_min_bytes):
+                payload = encode_payload(value, codec=codec, compress_min_bytes=threshold)
+                if threshold and payload[3] == COMPRESSION_NONE:
+                    continue
+                label = codec.name if payload[3] == COMPRESSION_NONE else f"{codec.name}+{_compression_name()}"
+                rows.append(
+                    (
+                        label,
+                        len(payload),
+                        _time_ms(
+                            lambda: encode_payload(value, codec=codec, compress_min_bytes=threshold),
+                            iterations,
+                        ),
+                        _time_ms(lambda: decode_payload(payload), iterations),
+                    )
+                )
+        for label, size, encode_ms, decode_ms in rows:
+            print(f"{namespace:24} {label:22} {size:9d} {encode_ms:10.3f} {decode_ms:10.3f}")
+
+
+def _compression_name() -> str:
+    return "zstd" if default_compression() == COMPRESSION_ZSTD else "zlib"
+
+
+def _report_redis_bytes(redis_url: str, key_prefix: str) -> None:
+    from redis import Redis
+
+    client = Redis.from_url(redis_url, decode_responses=False)
+    totals: dict[str, dict[str, int]] = defaultdict(lambda: {"keys": 0, "legacy": 0, "framed": 0})
+    data_prefix = f"{key_prefix}:data:"
+    for key in client.scan_iter(match=f"{data_prefix}*", count=1000):
+        payload = client.get(key)
+        if payload is None:
+            continue
+        _, _, namespace_and_args = key.decode()[len(data_prefix):].partition(":")
+        namespace = namespace_and_args.split(":", 1)[0]
+        totals[namespace]["keys"] += 1
+        totals[namespace]["framed" if is_framed(payload) else "legacy"] += len(payload)
+
+    print(f"\n{'namespace':32} {'keys':>6} {'legacy bytes':>13} {'framed bytes':>13}")
+    for namespace, row in sorted(totals.items()):
+        print(f"{namespace:32} {row['keys']:6d} {row['legacy']:13d} {row['framed']:13d}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--compress-min-bytes", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--redis-url", default="")
+    parser.add_argument("--key-prefix", default="aigymos:dashboard-cache")
+    args = parser.parse_args()
+
+    _benchmark_formats(_synthetic_payloads(args.members, args.seed), args.iterations, args.compress_min_bytes)
+    if args.redis_url:
+        _report_redis_bytes(args.redis_url, args.key_prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark for batched NPS sentiment: throughput and token cost per batch size.
+
+Runs ``process_pending_nps_sentiment`` over ``--responses`` synthetic pending responses spread across ``--gyms`` gyms,
+once per value of ``--batch-sizes``. Claude is replaced by ``FakeLLMClient`` (no API key or network): every request
+costs ``--latency-ms`` plus ``--per-item-ms`` for each comment in it, roughly how answer length drives model latency.
+The session is simulated; the claim, grouping, parsing and per-item fallback are the real ones. Batch size 1 is the
+old one-request-per-response behaviour.
+
+Token counts are the fake client's word estimates; the cost column applies ``--input-price``/``--output-price``
+(USD per million tokens) to them.
+
+Usage:
+    python scripts/benchmark_nps_sentiment_batch.py --responses 400 --batch-sizes 1,5,10,20,40
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core import ai_gateway  # noqa: E402
+from app.core.ai_gateway import PROVIDER_CLAUDE, FakeLLMClient  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.models import NPSResponse, NPSSentiment, NPSTrigger  # noqa: E402
+from app.services import nps_sentiment_batch_service as batch_service  # noqa: E402
+
+_COMMENTS = (
+    "Gosto muito das aulas de spinning, mas o vestiario precisa de manutencao.",
+    "Academia sempre cheia no horario da noite, dificil usar os aparelhos.",
+    "Professores atenciosos e ambiente limpo.",
+    "O ar condicionado vive quebrado e ninguem resolve.",
+    "Bom custo beneficio, recomendo para amigos.",
+)
+
+
+class _ClaimSession:
+    """Stands in for a Session: the claim returns the synthetic rows, writes are no-ops."""
+
+    def __init__(self, rows: list[NPSResponse]) -> None:
+        self._rows = rows
+
+    def scalars(self, _statement):
+        return SimpleNamespace(all=lambda: self._rows)
+
+    def flush(self) -> None:
+        return None
+
+
+def _reply_factory(per_item_seconds: float):
+    def _reply(kwargs):
+        entries = json.loads(kwargs["messages"][0]["content"].split("Feedbacks: ", 1)[1])
+        time.sleep(per_item_seconds * len(entries))
+        items = [
+            {
+                "id": entry["id"],
+                "sentiment": "negative" if entry["score"] <= 6 else "positive" if entry["score"] >= 9 else "neutral",
+                "summary": "Aluno comenta estrutura e atendimento da academia.",
+            }
+            for entry in entries
+        ]
+        return json.dumps({"items": items})
+
+    return _reply
+
+
+def _rows(count: int, gyms: int) -> list[NPSResponse]:
+    gym_ids = [uuid4() for _ in range(max(gyms, 1))]
+    return [
+        NPSResponse(
+            id=uuid4(),
+            gym_id=gym_ids[index % len(gym_ids)],
+            member_id=None,
+            score=index % 11,
+            comment=_COMMENTS[index % len(_COMMENTS)],
+            sentiment=NPSSentiment.NEUTRAL,
+            trigger=NPSTrigger.MONTHLY,
+            extra_data={"sentiment_status": "pending"},
+        )
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=400)
+    parser.add_argument("--gyms", type=int, default=4)
+    parser.add_argument("--batch-sizes", default="1,5,10,20,40")
+    parser.add_argument("--concurrency", type=int, default=4, help="prompts in flight at a time")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fixed provider time per request")
+    parser.add_argument("--per-item-ms", type=float, default=20.0, help="extra provider time per comment")
+    parser.add_argument("--input-price", type=float, default=3.0)
+    parser.add_argument("--output-price", type=float, default=15.0)
+    args = parser.parse_args()
+
+    settings.claude_api_key = "benchmark-key"
+    settings.ai_gateway_cache_enabled = False
+    settings.ai_gateway_tenant_concurrency = max(args.concurrency, 1)
+    batch_service.log_audit_event = lambda *_args, **_kwargs: None
+    batch_service.invalidate_dashboard_cache = lambda *_args, **_kwargs: None
+
+    print(f"responses={args.responses} gyms={args.gyms} concurrency={args.concurrency}")
+    print("batch_size  elapsed_s  items/s  requests  input_tok  output_tok  tok/item  cost_usd  fallback")
+    for batch_size in [int(value) for value in args.batch_sizes.split(",") if value.strip()]:
+        ai_gateway.reset_ai_gateway()
+        fake = FakeLLMClient(
+            _reply_factory(max(args.per_item_ms, 0.0) / 1000),
+            latency_seconds=max(args.latency_ms, 0.0) / 1000,
+        )
+        ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+        rows = _rows(max(args.responses, 1), args.gyms)
+
+        started = perf_counter()
+        result = batch_service.process_pending_nps_sentiment(
+            _ClaimSession(rows),
+            claim_size=len(rows),
+            batch_size=batch_size,
+            concurrency=args.concurrency,
+        )
+        elapsed = perf_counter() - started
+
+        cost = (result["input_tokens"] * args.input_price + result["output_tokens"] * args.output_price) / 1_000_000
+        print(
+            f"{batch_size:>10}  {elapsed:>9.2f}  {len(rows) / elapsed:>7.1f}  {fake.calls:>8}  "
+            f"{result['input_tokens']:>9}  {result['output_tokens']:>10}  {result['tokens_per_item']:>8}  "
+            f"{cost:>8.4f}  {result['fallback']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
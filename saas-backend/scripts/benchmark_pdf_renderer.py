@@ -0,0 +1,291 @@
+"""Benchmark for the PDF renderer backends.
+
+Renders the premium report fixtures (an executive dashboard and a body-composition report, as in
+``tests/test_report_service.py``) through one backend and reports throughput and p50/p95 render time:
+
+- ``once``: a fresh browser per render (the behaviour without a pool);
+- ``pool``: the in-process warm browser pool;
+- ``remote``: the dedicated renderer process at ``--url`` (``PROCESS_TYPE=pdf_renderer``).
+
+Usage:
+    python scripts/benchmark_pdf_renderer.py --backend once --renders 20
+    python scripts/benchmark_pdf_renderer.py --backend pool --pool-size 2 --concurrency 4 --renders 200
+    python scripts/benchmark_pdf_renderer.py --backend remote --url http://localhost:8100 --concurrency 4
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core.config import settings  # noqa: E402
+from app.services.pdf_renderer_service import (  # noqa: E402
+    PdfRendererPool,
+    PdfRenderRequest,
+    render_pdf,
+    render_pdf_once,
+)
+from app.services.premium_report_service import (  # noqa: E402
+    PremiumReportBranding,
+    PremiumReportChart,
+    PremiumReportChartPoint,
+    PremiumReportMetric,
+    PremiumReportNarrative,
+    PremiumReportPayload,
+    PremiumReportSection,
+    PremiumReportTable,
+    build_premium_report_pdf_request,
+)
+
+GENERATED_AT = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _dashboard_payload() -> PremiumReportPayload:
+    months = [f"2026-{month:02d}" for month in range(1, 13)]
+    return PremiumReportPayload(
+        report_kind="dashboard",
+        report_scope="executive",
+        title="Relatorio Executivo",
+        subtitle="Leitura premium",
+        generated_at=GENERATED_AT,
+        generated_by="Owner",
+        version="premium-v1",
+        branding=PremiumReportBranding(gym_name="Academia Piloto"),
+        parameters={"dashboard": "executive"},
+        cover_summary="Resumo da academia no periodo.",
+        sections=[
+            PremiumReportSection(
+                title="Resumo executivo",
+                metrics=[
+                    PremiumReportMetric("MRR", "R$ 187.345,50"),
+                    PremiumReportMetric("Alunos ativos", "1544"),
+                    PremiumReportMetric("Churn", "3,2%", tone="warning"),
+                    PremiumReportMetric("NPS", "8,1", tone="positive"),
+                ],
+                narratives=[PremiumReportNarrative("Leitura", "Base estavel com leve alta de risco vermelho.")],
+                charts=[
+                    PremiumReportChart(
+                        "MRR recente",
+                        [PremiumReportChartPoint(month, 180000.0 + index * 731) for index, month in enumerate(months)],
+                        unit="R$",
+                    )
+                ],
+                tables=[
+                    PremiumReportTable(
+                        "Risco por faixa",
+                        ["Faixa", "Alunos", "MRR em risco"],
+                        [
+                            ["Verde", "1200", "R$ 0,00"],
+                            ["Amarelo", "230", "R$ 9.120,00"],
+                            ["Vermelho", "114", "R$ 12.336,30"],
+                        ],
+                    )
+                ],
+            )
+        ],
+        footer_note="Rodape de benchmark",
+    )
+
+
+def _body_composition_payload() -> PremiumReportPayload:
+    return PremiumReportPayload(
+        report_kind="body_composition",
+        report_scope="technical",
+        title="Relatorio premium de bioimpedancia",
+        subtitle="Aluno Piloto",
+        generated_at=GENERATED_AT,
+        generated_by="Sistema",
+        version="premium-v3",
+        branding=PremiumReportBranding(gym_name="Academia Piloto"),
+        parameters={
+            "technical": True,
+            "report": {
+                "header": {
+                    "member_name": "Aluno Piloto",
+                    "gym_name": "Academia Piloto",
+                    "trainer_name": "Professor Piloto",
+                    "measured_at": "2026-10-14T10:00:00+00:00",
+                    "age_years": 31,
+                    "sex": "male",
+                    "height_cm": 178,
+                    "weight_kg": 84.5,
+                },
+                "primary_cards": [
+                    {
+                        "key": "weight_kg",
+                        "label": "Peso",
+                        "formatted_value": "84,5 kg",
+                        "delta_absolute": -1.2,
+                        "unit": "kg",
+                    },
+                    {
+                        "key": "body_fat_percent",
+                        "label": "% gordura corporal",
+                        "formatted_value": "23,0%",
+                        "delta_absolute": -1.8,
+                        "unit": "%",
+                    },
+                ],
+                "composition_metrics": [
+                    {
+                        "key": "body_water_kg",
+                        "label": "Agua corporal",
+                        "formatted_value": "43,3 kg",
+                        "reference_min": 39,
+                        "reference_max": 48,
+                        "unit": "kg",
+                    },
+                ],
+                "muscle_fat_metrics": [
+                    {
+                        "key": "weight_kg",
+                        "label": "Peso",
+                        "formatted_value": "84,5 kg",
+                        "value": 84.5,
+                        "reference_min": 65,
+                        "reference_max": 80,
+                        "status": "high",
+                    },
+                ],
+                "risk_metrics": [
+                    {
+                        "key": "health_score",
+                        "label": "Health score",
+                        "formatted_value": "60",
+                        "value": 60,
+                        "status": "adequate",
+                    },
+                    {
+                        "key": "visceral_fat_level",
+                        "label": "Gordura visceral",
+                        "formatted_value": "9",
+                        "value": 9,
+                        "reference_min": 1,
+                        "reference_max": 12,
+                        "status": "adequate",
+                    },
+                ],
+                "goal_metrics": [
+                    {"key": "target_weight_kg", "label": "Peso-alvo", "formatted_value": "78 kg", "status": "unknown"},
+                ],
+                "comparison_rows": [
+                    {
+                        "key": "weight_kg",
+                        "label": "Peso",
+                        "previous_formatted": "85,7 kg",
+                        "current_formatted": "84,5 kg",
+                        "difference_absolute": -1.2,
+                        "unit": "kg",
+                        "trend": "down",
+                    }
+                ],
+                "history_series": [
+                    {
+                        "key": "weight_kg",
+                        "label": "Peso",
+                        "unit": "kg",
+                        "points": [
+                            {"evaluation_date": "2026-08-10", "value": 86.1},
+                            {"evaluation_date": "2026-09-10", "value": 85.7},
+                            {"evaluation_date": "2026-10-14", "value": 84.5},
+                        ],
+                    }
+                ],
+                "insights": [
+                    {
+                        "key": "positive",
+                        "title": "Reducao de gordura com preservacao muscular",
+                        "message": "Houve reducao de gordura corporal sem perda relevante de massa muscular.",
+                        "tone": "positive",
+                        "reasons": ["% gordura caiu", "massa muscular preservada"],
+                    }
+                ],
+                "teacher_notes": "Manter progressao de treino.",
+                "methodological_note": "Comparacoes historicas sao mais confiaveis em condicoes semelhantes.",
+                "data_quality_flags": [],
+                "parsing_confidence": 0.92,
+            },
+        },
+        sections=[],
+        footer_note="Rodape de benchmark",
+    )
+
+
+def _fixture_requests() -> dict[str, PdfRenderRequest]:
+    return {
+        "dashboard": build_premium_report_pdf_request(_dashboard_payload()),
+        "body_composition": build_premium_report_pdf_request(_body_composition_payload()),
+    }
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _benchmark(render, request: PdfRenderRequest, *, renders: int, concurrency: int) -> tuple[float, list[float], int]:
+    def _timed(_index: int) -> float:
+        started = perf_counter()
+        render(request)
+        return (perf_counter() - started) * 1000
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(_timed, range(renders)))
+    return perf_counter() - started, latencies, len(render(request))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("once", "pool", "remote"), default="pool")
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=settings.pdf_renderer_pool_size)
+    parser.add_argument("--max-renders", type=int, default=settings.pdf_renderer_max_renders_per_browser)
+    parser.add_argument("--url", default=settings.pdf_renderer_url)
+    args = parser.parse_args()
+
+    pool = None
+    if args.backend == "once":
+        render = render_pdf_once
+    elif args.backend == "pool":
+        pool = PdfRendererPool(size=args.pool_size, max_renders=args.max_renders)
+        render = pool.render
+    else:
+        if not args.url:
+            parser.error("--url (ou PDF_RENDERER_URL) e obrigatorio para --backend remote")
+        settings.pdf_renderer_url = args.url
+        render = render_pdf
+
+    print(f"backend={args.backend} renders={args.renders} concurrency={args.concurrency}")
+    print(f"{'fixture':18} {'pdf bytes':>10} {'renders/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    try:
+        for name, request in _fixture_requests().items():
+            for _ in range(args.warmup):
+                render(request)
+            elapsed, latencies, size = _benchmark(
+                render, request, renders=args.renders, concurrency=args.concurrency
+            )
+            print(
+                f"{name:18} {size:10d} {len(latencies) / elapsed:10.2f} {_percentile(latencies, 0.50):9.1f} "
+                f"{_percentile(latencies, 0.95):9.1f} {latencies[-1]:9.1f}"
+            )
+        if pool is not None:
+            print(f"pool: {pool.health()}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
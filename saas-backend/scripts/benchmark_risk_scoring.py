@@ -0,0 +1,102 @@
+"""Benchmark for the vectorized risk scorer against the per-member scalar path.
+
+Builds synthetic risk inputs for ``--members`` members, scores them with
+``score_risk_batch`` and times ``calculate_risk_score`` over a sample of the
+same members (extrapolated to the full population), after checking that both
+paths agree on the sample.
+
+Usage:
+    python scripts/benchmark_risk_scoring.py --members 1000000 --scalar-sample 50000
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+import numpy as np  # noqa: E402
+
+from app.services.risk import PrefetchedCheckinMetrics, calculate_risk_score, score_risk_batch  # noqa: E402
+
+NOW = datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc)
+
+
+def _synthetic_columns(members: int, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    days_since_join = rng.integers(0, 900, size=members)
+    days_since_join[rng.random(members) < 0.05] = -1
+    recent_mode_hour = rng.integers(5, 23, size=members)
+    recent_mode_hour[rng.random(members) < 0.3] = -1
+    previous_mode_hour = rng.integers(5, 23, size=members)
+    previous_mode_hour[rng.random(members) < 0.3] = -1
+    return {
+        "days_without_checkin": rng.integers(0, 120, size=members),
+        "days_since_join": days_since_join,
+        "current_week_count": rng.integers(0, 7, size=members),
+        "baseline_total": rng.integers(0, 45, size=members),
+        "recent_mode_hour": recent_mode_hour,
+        "previous_mode_hour": previous_mode_hour,
+        "nps_last_score": rng.integers(0, 11, size=members),
+        "loyalty_months": rng.integers(0, 60, size=members),
+    }
+
+
+def _scalar_inputs(columns: dict[str, np.ndarray], index: int) -> tuple[SimpleNamespace, PrefetchedCheckinMetrics]:
+    join_days = int(columns["days_since_join"][index])
+    join_date = (NOW - timedelta(days=join_days)).date() if join_days >= 0 else None
+    member = SimpleNamespace(
+        id=index,
+        join_date=join_date,
+        last_checkin_at=datetime.combine(NOW.date(), datetime.min.time(), tzinfo=timezone.utc)
+        - timedelta(days=int(columns["days_without_checkin"][index])),
+        nps_last_score=int(columns["nps_last_score"][index]),
+        loyalty_months=int(columns["loyalty_months"][index]),
+    )
+    recent, previous = int(columns["recent_mode_hour"][index]), int(columns["previous_mode_hour"][index])
+    metrics = PrefetchedCheckinMetrics(
+        current_week_count=int(columns["current_week_count"][index]),
+        baseline_total=int(columns["baseline_total"][index]),
+        recent_mode_hour=recent if recent >= 0 else None,
+        previous_mode_hour=previous if previous >= 0 else None,
+    )
+    return member, metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    columns = _synthetic_columns(args.members, args.seed)
+
+    started = perf_counter()
+    batch = score_risk_batch(**columns)
+    vectorized_seconds = perf_counter() - started
+
+    sample = min(args.scalar_sample, args.members)
+    scalar_inputs = [_scalar_inputs(columns, index) for index in range(sample)]
+    started = perf_counter()
+    scalar_scores = [calculate_risk_score(None, member, NOW, metrics).score for member, metrics in scalar_inputs]
+    scalar_seconds = perf_counter() - started
+
+    mismatches = int(np.count_nonzero(np.asarray(scalar_scores) != batch.score[:sample]))
+    scalar_full_seconds = scalar_seconds / sample * args.members
+    print(f"members={args.members} scalar_sample={sample} mismatches={mismatches}")
+    print(f"vectorized: {vectorized_seconds * 1000:9.1f} ms total")
+    print(f"scalar:     {scalar_full_seconds * 1000:9.1f} ms total (extrapolated from the sample)")
+    print(f"speedup:    {scalar_full_seconds / vectorized_seconds:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark for outbound WhatsApp delivery against a local stub of the Evolution API.
+
+Starts an HTTP server on localhost that answers ``POST /message/sendText/<instance>`` after ``--latency-ms`` and
+sends ``--messages`` texts spread over ``--instances`` instances with one of two strategies:
+
+- ``inline``: a new ``httpx.Client`` per message, one after the other (what ``send_whatsapp_sync`` does per member);
+- ``queue``: the outbound sender (pooled keep-alive client per instance, ``--concurrency`` requests per instance).
+
+Reports throughput, p50/p95 per message and how many TCP connections the stub accepted. No database is needed.
+
+Usage:
+    python scripts/benchmark_whatsapp_outbound.py --strategy inline --messages 200
+    python scripts/benchmark_whatsapp_outbound.py --strategy queue --messages 2000 --instances 4 --concurrency 4
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("CPF_ENCRYPTION_KEY", "00" * 32)
+
+from app.core.config import settings  # noqa: E402
+from app.services import whatsapp_outbound_service as outbound  # noqa: E402
+
+
+class _StubEvolutionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency_seconds = 0.0
+    connections = 0
+    connections_lock = threading.Lock()
+
+    def setup(self) -> None:
+        super().setup()
+        with self.connections_lock:
+            type(self).connections += 1
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.latency_seconds)
+        body = b'{"key": {"id": "stub"}, "status": "PENDING"}'
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _run_inline(sends: list, durations: list[float]) -> int:
+    sent = 0
+    for send in sends:
+        started = perf_counter()
+        with httpx.Client(timeout=15.0) as client:
+            response = client.post(
+                f"{settings.whatsapp_api_url}/message/sendText/{send.instance}",
+                headers={"apikey": settings.whatsapp_api_token},
+                json={"number": send.phone, "text": send.text},
+            )
+        durations.append(perf_counter() - started)
+        sent += int(response.is_success)
+    return sent
+
+
+def _run_queue(sends: list, durations: list[float], concurrency: int) -> int:
+    post_text = outbound._post_text
+
+    def _timed(send, *, pool_size):
+        started = perf_counter()
+        outcome = post_text(send, pool_size=pool_size)
+        durations.append(perf_counter() - started)
+        return outcome
+
+    outbound._post_text = _timed
+    try:
+        outcomes = outbound._deliver(sends, concurrency_per_instance=concurrency)
+    finally:
+        outbound._post_text = post_text
+        outbound.close_instance_clients()
+    return sum(1 for outcome in outcomes.values() if outcome.sent)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategy", choices=("inline", "queue"), default="queue")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--instances", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight per instance (queue only)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub response time per request")
+    args = parser.parse_args()
+
+    _StubEvolutionHandler.latency_seconds = max(args.latency_ms, 0.0) / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEvolutionHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.whatsapp_api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.whatsapp_api_token = "benchmark-token"
+
+    sends = [
+        outbound._OutboundSend(uuid4(), f"gym_{index % max(args.instances, 1)}", f"55119{index:08d}", "Oi, benchmark!")
+        for index in range(max(args.messages, 1))
+    ]
+    durations: list[float] = []
+    started = perf_counter()
+    try:
+        if args.strategy == "inline":
+            sent = _run_inline(sends, durations)
+        else:
+            sent = _run_queue(sends, durations, args.concurrency)
+    finally:
+        elapsed = perf_counter() - started
+        server.shutdown()
+
+    print(f"strategy={args.strategy} messages={len(sends)} sent={sent} instances={args.instances}")
+    print(f"elapsed={elapsed:.2f}s throughput={len(sends) / elapsed:.1f} msg/s")
+    print(f"p50={_percentile(durations, 0.50) * 1000:.1f}ms p95={_percentile(durations, 0.95) * 1000:.1f}ms")
+    print(f"tcp_connections={_StubEvolutionHandler.connections}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import select
+
+from app.database import SessionLocal, clear_current_gym_id, set_current_gym_id
+from app.models import Gym
+from app.services.work_queue_index_service import rebuild_work_queue_index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Reconstroi a projecao work_queue_items a partir de tasks, triagem IA, acoes do Autopilot e fila de avaliacoes."
+    )
+    parser.add_argument("--gym-slug", dest="gym_slug", default=None, help="Reconstroi apenas uma academia especifica.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = select(Gym).where(Gym.is_active.is_(True))
+        if args.gym_slug:
+            query = query.where(Gym.slug == args.gym_slug)
+        gyms = list(db.scalars(query).all())
+        total_indexed = 0
+        for gym in gyms:
+            set_current_gym_id(gym.id)
+            result = rebuild_work_queue_index(db, gym_id=gym.id)
+            db.commit()
+            total_indexed += result["indexed_count"]
+            print(f"{gym.slug}: {result['indexed_count']} item(ns) indexado(s), {result['removed_count']} removido(s)")
+        print(f"TOTAL_INDEXED={total_indexed}")
+        return 0
+    finally:
+        clear_current_gym_id()
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
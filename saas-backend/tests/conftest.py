@@ -42,6 +42,26 @@ def client(app):
         yield c
 
 
+@pytest.fixture(autouse=True)
+def _reset_circuit_breakers():
+    """Provider failures simulated by one test must not leave a breaker open for the next."""
+    from app.core.circuit_breaker import reset_circuit_breakers
+
+    reset_circuit_breakers()
+    yield
+    reset_circuit_breakers()
+
+
+@pytest.fixture(autouse=True)
+def _reset_ai_gateway():
+    """Pooled SDK clients are keyed by API key; a client cached by one test must not serve another's fake SDK."""
+    from app.core.ai_gateway import reset_ai_gateway
+
+    reset_ai_gateway()
+    yield
+    reset_ai_gateway()
+
+
 # ---------------------------------------------------------------------------
 # Shared domain objects
 # ---------------------------------------------------------------------------
@@ -0,0 +1,180 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import pytest
+
+from app.core import ai_gateway
+from app.core.ai_gateway import PROVIDER_CLAUDE, PROVIDER_OPENAI, AIGatewayBusyError, FakeLLMClient
+from app.core.config import settings
+from app.models.enums import NPSSentiment
+from app.services.ai_prompt_registry_service import generate_specialist_text
+from app.utils.claude import analyze_sentiment
+
+
+@pytest.fixture(autouse=True)
+def _reset_gateway(monkeypatch):
+    monkeypatch.setattr(settings, "ai_gateway_cache_enabled", True)
+    monkeypatch.setattr(settings, "ai_gateway_cache_ttl_seconds", 3600)
+    monkeypatch.setattr(settings, "ai_gateway_cache_maxsize", 16)
+    ai_gateway.reset_ai_gateway()
+    yield
+    ai_gateway.reset_ai_gateway()
+
+
+def _call(prompt, *, client, gym_id=None, cache=True):
+    return ai_gateway.call_model(
+        PROVIDER_CLAUDE,
+        "messages.create",
+        model="claude-test",
+        prompt_key="test_prompt",
+        params={"max_tokens": 10, "messages": [{"role": "user", "content": prompt}]},
+        gym_id=gym_id,
+        cache=cache,
+        client=client,
+    )
+
+
+def test_identical_requests_hit_the_cache_and_record_token_metrics():
+    fake = FakeLLMClient("resposta curta")
+
+    first = _call("Ola", client=fake)
+    second = _call("Ola", client=fake)
+    _call("Outro prompt", client=fake)
+
+    assert second is first
+    assert fake.calls == 2
+    stats = ai_gateway.ai_gateway_stats()
+    metrics = stats["calls"]["claude:claude-test:test_prompt"]
+    assert (metrics["calls"], metrics["cache_hits"], metrics["errors"]) == (2, 1, 0)
+    assert metrics["output_tokens"] == 4
+    assert metrics["input_tokens"] > 0
+    assert metrics["p50_ms"] is not None
+    assert stats["cache"]["size"] == 2
+
+
+def test_cache_is_bypassed_when_disabled_or_opted_out(monkeypatch):
+    fake = FakeLLMClient("ok")
+
+    _call("Ola", client=fake, cache=False)
+    _call("Ola", client=fake, cache=False)
+    monkeypatch.setattr(settings, "ai_gateway_cache_enabled", False)
+    _call("Ola", client=fake)
+
+    assert fake.calls == 3
+
+
+def test_concurrent_identical_requests_are_coalesced_into_one_provider_call():
+    fake = FakeLLMClient("ok", latency_seconds=0.1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: _call("Ola", client=fake, cache=False), range(8)))
+
+    assert fake.calls == 1
+    assert all(response is responses[0] for response in responses)
+    assert ai_gateway.ai_gateway_stats()["calls"]["claude:claude-test:test_prompt"]["coalesced"] == 7
+
+
+def test_provider_errors_reach_every_coalesced_caller_and_are_not_cached():
+    def _fail(_kwargs):
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    fake = FakeLLMClient(_fail)
+
+    def _attempt(_):
+        try:
+            _call("Ola", client=fake)
+        except RuntimeError as exc:
+            return str(exc)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        outcomes = list(executor.map(_attempt, range(4)))
+
+    assert outcomes == ["provider down"] * 4
+    assert ai_gateway.ai_gateway_stats()["cache"]["size"] == 0
+    assert ai_gateway.ai_gateway_stats()["in_flight"] == 0
+
+
+def test_tenant_concurrency_is_capped_per_gym(monkeypatch):
+    monkeypatch.setattr(settings, "ai_gateway_tenant_concurrency", 1)
+    monkeypatch.setattr(settings, "ai_gateway_tenant_wait_seconds", 0.05)
+    gym_a, gym_b = uuid4(), uuid4()
+    release = threading.Event()
+    fake = FakeLLMClient(lambda _kwargs: release.wait(1) and "ok")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        holder = executor.submit(_call, "primeiro", client=fake, gym_id=gym_a)
+        while fake.calls == 0:
+            time.sleep(0.005)
+        with pytest.raises(AIGatewayBusyError):
+            _call("segundo", client=fake, gym_id=gym_a)
+        other_gym = ai_gateway.call_model(
+            PROVIDER_OPENAI,
+            "responses.create",
+            model="gpt-test",
+            prompt_key="test_prompt",
+            params={"input": "terceiro"},
+            gym_id=gym_b,
+            client=FakeLLMClient("livre"),
+        )
+        release.set()
+        holder.result()
+
+    assert other_gym.output_text == "livre"
+
+
+def test_pooled_clients_are_reused_and_overridable(monkeypatch):
+    built = []
+    monkeypatch.setattr(ai_gateway, "_build_client", lambda provider, timeout: built.append(provider) or object())
+
+    first = ai_gateway.get_client(PROVIDER_OPENAI, timeout_seconds=20)
+    assert ai_gateway.get_client(PROVIDER_OPENAI, timeout_seconds=20) is first
+    assert ai_gateway.get_client(PROVIDER_OPENAI, timeout_seconds=60) is not first
+    fake = FakeLLMClient()
+    ai_gateway.install_provider_client(PROVIDER_OPENAI, fake)
+    assert ai_gateway.get_client(PROVIDER_OPENAI, timeout_seconds=20) is fake
+    assert built == [PROVIDER_OPENAI, PROVIDER_OPENAI]
+
+
+def test_nps_sentiment_reuses_the_cached_answer_for_whitespace_variants(monkeypatch):
+    monkeypatch.setattr(settings, "claude_api_key", "test-key")
+    fake = FakeLLMClient('{"sentiment": "negative", "summary": "Reclama da lotacao."}')
+    ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+
+    first = analyze_sentiment(3, "Academia  muito cheia\n")
+    second = analyze_sentiment(3, "Academia muito cheia")
+
+    assert first == second == (NPSSentiment.NEGATIVE, "Reclama da lotacao.")
+    assert fake.calls == 1
+
+
+def test_specialist_text_runs_through_the_gateway(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    fake = FakeLLMClient("Texto do especialista")
+    ai_gateway.install_provider_client(PROVIDER_OPENAI, fake)
+
+    result = generate_specialist_text("assessment_coach_v1", user_prompt="Resumo", fallback_text="fallback")
+
+    assert (result.text, result.used_fallback) == ("Texto do especialista", False)
+    assert fake.calls == 1
+
+
+def test_service_prompts_share_the_claude_breaker(monkeypatch):
+    from app.core import circuit_breaker
+    from app.services.objection_service import _personalize_with_claude
+
+    monkeypatch.setattr(circuit_breaker, "_get_redis", lambda: None)
+    monkeypatch.setattr(settings, "claude_api_key", "test-key")
+    fake = FakeLLMClient("Resposta personalizada")
+    ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+
+    assert _personalize_with_claude("Base", "Esta caro", {"plano": "pro"}) == "Resposta personalizada"
+
+    breaker = circuit_breaker.get_breaker(PROVIDER_CLAUDE)
+    for _ in range(breaker.minimum_calls):
+        breaker.record_failure()
+    assert _personalize_with_claude("Base", "Sem tempo", {"plano": "pro"}) == "Base"
+    assert fake.calls == 1
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import AITriageSyncState, Checkin, RoleEnum, Task
+from app.services import ai_triage_sync_service
+from app.services.ai_triage_sync_service import (
+    collect_ai_triage_dirty_members,
+    mark_ai_triage_members_dirty,
+    process_ai_triage_sync_for_gym,
+)
+from app.services.work_queue_service import _list_ai_items
+
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _db_with_state(state, markers):
+    db = MagicMock()
+    db.scalar.return_value = state
+    db.execute.return_value.all.return_value = [SimpleNamespace(id=marker_id, marked_at=marked_at) for marker_id, marked_at in markers]
+    return db
+
+
+def test_collect_dirty_members_from_checkins_and_tasks():
+    gym_id = uuid4()
+    member_id = uuid4()
+    other_member_id = uuid4()
+    checkin = Checkin(gym_id=gym_id, member_id=member_id)
+    task = Task(gym_id=gym_id, member_id=other_member_id, title="Ligar")
+    lead_task = Task(gym_id=gym_id, member_id=None, title="Lead")
+    session = SimpleNamespace(new=[checkin, task, lead_task], dirty=[], deleted=[])
+
+    markers = collect_ai_triage_dirty_members(session)
+
+    assert markers == {(gym_id, member_id): "checkin", (gym_id, other_member_id): "task"}
+
+
+def test_mark_dirty_members_upserts_and_refreshes_marked_at():
+    connection = MagicMock()
+    gym_id, member_id = uuid4(), uuid4()
+
+    mark_ai_triage_members_dirty(connection, {(gym_id, member_id): "risk"})
+
+    statement = connection.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_ai_triage_dirty_members_gym_member DO UPDATE" in sql
+    assert "marked_at = now()" in sql
+
+
+def test_process_skips_clean_gym_with_recent_sync(monkeypatch):
+    state = AITriageSyncState(gym_id=uuid4(), last_synced_at=NOW - timedelta(minutes=5), last_dirty_member_count=0)
+    db = _db_with_state(state, [])
+    sync_calls = []
+    monkeypatch.setattr(ai_triage_sync_service, "sync_ai_triage_recommendations", lambda *args, **kwargs: sync_calls.append(kwargs))
+
+    result = process_ai_triage_sync_for_gym(db, gym_id=state.gym_id, now=NOW)
+
+    assert result == {"synced": False, "dirty_member_count": 0, "staleness_seconds": 0.0}
+    assert sync_calls == []
+
+
+def test_process_syncs_dirty_gym_and_advances_watermark(monkeypatch):
+    gym_id = uuid4()
+    state = AITriageSyncState(gym_id=gym_id, last_synced_at=NOW - timedelta(minutes=5), last_dirty_member_count=0)
+    markers = [(uuid4(), NOW - timedelta(minutes=3)), (uuid4(), NOW - timedelta(minutes=1))]
+    db = _db_with_state(state, markers)
+    sync_calls = []
+    monkeypatch.setattr(ai_triage_sync_service, "sync_ai_triage_recommendations", lambda *args, **kwargs: sync_calls.append(kwargs))
+
+    result = process_ai_triage_sync_for_gym(db, gym_id=gym_id, now=NOW)
+
+    assert sync_calls == [{"gym_id": gym_id}]
+    assert result["synced"] is True
+    assert result["dirty_member_count"] == 2
+    assert result["staleness_seconds"] == 180.0
+    assert state.synced_through == NOW - timedelta(minutes=1)
+    assert state.last_synced_at == NOW
+    assert state.last_dirty_member_count == 2
+
+
+def test_process_resyncs_when_last_sync_is_older_than_max_age(monkeypatch):
+    state = AITriageSyncState(gym_id=uuid4(), last_synced_at=NOW - timedelta(hours=7), last_dirty_member_count=0)
+    db = _db_with_state(state, [])
+    monkeypatch.setattr(ai_triage_sync_service.settings, "ai_triage_sync_max_age_minutes", 360)
+    sync_calls = []
+    monkeypatch.setattr(ai_triage_sync_service, "sync_ai_triage_recommendations", lambda *args, **kwargs: sync_calls.append(kwargs))
+
+    result = process_ai_triage_sync_for_gym(db, gym_id=state.gym_id, now=NOW)
+
+    assert result["synced"] is True
+    assert len(sync_calls) == 1
+
+
+def test_work_queue_read_path_skips_sync_when_background_sync_enabled(monkeypatch):
+    monkeypatch.setattr("app.services.work_queue_service.settings.ai_triage_background_sync_enabled", True)
+    monkeypatch.setattr(
+        "app.services.work_queue_service.sync_ai_triage_recommendations",
+        lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError("sync must not run on the read path")),
+    )
+    db = MagicMock()
+    db.scalars.return_value.all.return_value = []
+    user = SimpleNamespace(id=uuid4(), gym_id=uuid4(), role=RoleEnum.MANAGER)
+
+    assert _list_ai_items(db, user) == []
+    db.flush.assert_not_called()
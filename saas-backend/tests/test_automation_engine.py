@@ -1,10 +1,13 @@
 from datetime import date, datetime, timedelta, timezone
 from types import SimpleNamespace
+from unittest.mock import MagicMock
 import uuid
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
-from app.models import MemberStatus, RiskLevel, TaskStatus
+from app.models import MemberStatus, RiskLevel, Task, TaskStatus
+from app.models.automation_execution_log import AutomationExecutionLog
 from app.models.automation_rule import AutomationAction, AutomationTrigger
 from app.services import automation_engine
 
@@ -470,6 +473,128 @@ def test_execute_rule_get_gym_instance_receives_member_gym_id(monkeypatch):
     assert received == [expected_gym_id]
 
 
+def test_execute_rule_send_whatsapp_enqueues_and_reuses_gym_instance_when_queue_enabled(monkeypatch):
+    db = DummyDB()
+    members = [_make_member(), _make_member()]
+    members[1].gym_id = members[0].gym_id
+    rule = _make_rule(action_type=AutomationAction.SEND_WHATSAPP, action_config={"template": "reengagement_7d"})
+    lookups: list = []
+    enqueued: list[dict] = []
+
+    monkeypatch.setattr(automation_engine.settings, "whatsapp_outbound_queue_enabled", True)
+    monkeypatch.setattr(
+        automation_engine,
+        "get_gym_instance",
+        lambda _db, gym_id: (lookups.append(gym_id), "gym_abc")[1],
+    )
+    monkeypatch.setattr(
+        automation_engine,
+        "send_whatsapp_sync",
+        lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError("sent inline")),
+    )
+    monkeypatch.setattr(
+        automation_engine,
+        "enqueue_whatsapp_message",
+        lambda _db, **kwargs: (enqueued.append(kwargs), SimpleNamespace(id="log-1", status="queued"))[1],
+    )
+
+    gym_instances: dict = {}
+    results = [
+        automation_engine.execute_rule_for_member(db, rule, member, gym_instances=gym_instances) for member in members
+    ]
+
+    assert [result["status"] for result in results] == ["queued", "queued"]
+    assert lookups == [members[0].gym_id]
+    assert [item["instance"] for item in enqueued] == ["gym_abc", "gym_abc"]
+    assert enqueued[0]["gym_id"] == members[0].gym_id
+
+
+def test_execute_rule_for_members_checks_open_tasks_once_and_adds_the_chunk_together():
+    gym_id = uuid.uuid4()
+    members = [_make_member(gym_id=gym_id) for _ in range(3)]
+    for member in members:
+        member.id = uuid.uuid4()
+        member.full_name = f"Aluno {member.id.hex[:6]}"
+    rule = _make_rule(action_config={"title": "Contatar {nome}", "priority": "high", "source": "retention_automation"})
+    rule.gym_id = gym_id
+    db = MagicMock()
+    db.execute.return_value.all.return_value = [
+        SimpleNamespace(member_id=members[1].id, title=f"Contatar {members[1].full_name}")
+    ]
+
+    results = automation_engine.execute_rule_for_members(db, rule, members)
+
+    prefetch_sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert db.execute.call_count == 1
+    assert "tasks.member_id IN" in prefetch_sql
+    assert [result["status"] for result in results] == ["created", "skipped", "created"]
+    assert results[1]["reason"] == "task_already_exists"
+    added = db.add_all.call_args.args[0]
+    tasks = [row for row in added if isinstance(row, Task)]
+    logs = [row for row in added if isinstance(row, AutomationExecutionLog)]
+    assert [task.member_id for task in tasks] == [members[0].id, members[2].id]
+    assert all(task.gym_id == gym_id and task.extra_data["source"] == "retention_automation" for task in tasks)
+    assert [log.status for log in logs] == ["created", "skipped", "created"]
+    assert str(tasks[0].id) == results[0]["task_id"]
+    db.flush.assert_called_once()
+    assert rule.executions_count == 2
+
+
+def test_run_automation_rules_batch_mode_isolates_failures_per_chunk(monkeypatch):
+    members = [_make_member() for _ in range(3)]
+    for member in members:
+        member.id = uuid.uuid4()
+    rule = _make_rule()
+    rule.gym_id = uuid.uuid4()
+    chunks: list[list] = []
+
+    def _execute(_db, _rule, chunk, **_kwargs):
+        chunks.append(chunk)
+        if len(chunks) == 1:
+            raise RuntimeError("insert failed")
+        return [{"rule_id": "rule-1", "member_id": str(member.id), "status": "created"} for member in chunk]
+
+    monkeypatch.setattr(automation_engine.settings, "automation_batch_execution_enabled", True)
+    monkeypatch.setattr(automation_engine.settings, "automation_batch_chunk_size", 2)
+    monkeypatch.setattr(automation_engine, "list_automation_rules", lambda *_args, **_kwargs: [rule])
+    monkeypatch.setattr(automation_engine, "_find_matching_members", lambda *_args, **_kwargs: members)
+    monkeypatch.setattr(automation_engine, "execute_rule_for_members", _execute)
+    monkeypatch.setattr(
+        automation_engine,
+        "execute_rule_for_member",
+        lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError("per-row path")),
+    )
+    db = MagicMock()
+
+    results = automation_engine.run_automation_rules(db)
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert db.begin_nested.call_count == 2
+    assert [result["status"] for result in results] == ["error", "error", "created"]
+    error_logs = db.add_all.call_args.args[0]
+    assert [log.member_id for log in error_logs] == [members[0].id, members[1].id]
+    db.commit.assert_called_once()
+
+
+def test_run_rule_in_chunks_logs_when_the_error_log_cannot_be_written(monkeypatch, caplog):
+    members = [_make_member() for _ in range(2)]
+    rule = _make_rule()
+    monkeypatch.setattr(automation_engine.settings, "automation_batch_chunk_size", 5)
+    monkeypatch.setattr(
+        automation_engine,
+        "execute_rule_for_members",
+        lambda *_args, **_kwargs: (_ for _ in ()).throw(RuntimeError("insert failed")),
+    )
+    db = MagicMock()
+    db.flush.side_effect = RuntimeError("session broken")
+
+    with caplog.at_level("ERROR", logger=automation_engine.logger.name):
+        results = automation_engine._run_rule_in_chunks(db, rule, members, gym_instances={})
+
+    assert [result["status"] for result in results] == ["error", "error"]
+    assert any("Erro ao registrar falha" in record.getMessage() for record in caplog.records)
+
+
 def test_birthday_label_helper_accepts_imported_portuguese_months():
     member = _make_member()
     member.extra_data = {"birthday_label": "24 de Março"}
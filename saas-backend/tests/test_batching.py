@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import Member
+from app.utils.batching import BatchScanStats, iter_keyset_batches, iter_streamed_batches
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _result(items):
+    result = MagicMock()
+    result.all.return_value = items
+    return result
+
+
+def test_keyset_batches_seek_past_the_last_entity_without_offset():
+    first, second = [SimpleNamespace(id=uuid4()) for _ in range(2)], [SimpleNamespace(id=uuid4())]
+    db = MagicMock()
+    db.scalars.side_effect = [_result(first), _result(second)]
+    stats = BatchScanStats()
+
+    batches = list(iter_keyset_batches(db, select(Member), Member.id, batch_size=2, stats=stats))
+
+    assert batches == [first, second]
+    first_sql, second_sql = (_sql(call.args[0]) for call in db.scalars.call_args_list)
+    assert "OFFSET" not in second_sql
+    assert "members.id >" not in first_sql
+    assert "WHERE members.id > %(id_1)s::UUID ORDER BY members.id ASC" in second_sql
+    assert db.scalars.call_args_list[1].args[0].compile().params["id_1"] == first[-1].id
+    assert stats.batches == 2
+    assert set(stats.as_metrics()) == {"batches", "batch_fetch_ms_first", "batch_fetch_ms_last", "batch_fetch_ms_max"}
+
+
+def test_keyset_batches_read_the_key_from_column_projections():
+    rows = [SimpleNamespace(id=uuid4(), join_date=None) for _ in range(2)]
+    db = MagicMock()
+    db.execute.side_effect = [_result(rows), _result([])]
+
+    batches = list(iter_keyset_batches(db, select(Member.id, Member.join_date), Member.id, batch_size=2))
+
+    assert batches == [rows]
+    assert db.execute.call_args_list[1].args[0].compile().params["id_1"] == rows[-1].id
+    db.scalars.assert_not_called()
+
+
+def test_keyset_batches_use_scalar_keys_for_single_column_selects():
+    ids = [uuid4(), uuid4()]
+    db = MagicMock()
+    db.scalars.side_effect = [_result(ids), _result([])]
+
+    list(iter_keyset_batches(db, select(Member.id), Member.id, batch_size=2))
+
+    assert db.scalars.call_args_list[1].args[0].compile().params["id_1"] == ids[-1]
+
+
+def test_streamed_batches_use_one_server_side_cursor():
+    db = MagicMock()
+    db.execute.return_value.partitions.return_value = iter([[1, 2], [3]])
+
+    batches = list(iter_streamed_batches(db, select(Member.id, Member.join_date), batch_size=2))
+
+    assert batches == [[1, 2], [3]]
+    db.execute.assert_called_once()
+    assert db.execute.call_args.args[0].get_execution_options()["yield_per"] == 2
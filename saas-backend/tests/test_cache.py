@@ -1,3 +1,5 @@
+import json
+import time
 from uuid import uuid4
 
 from app.core.cache import DashboardCache, make_cache_key
@@ -50,3 +52,119 @@ def test_healthcheck_reports_memory_backend_when_redis_not_configured():
     health = cache.healthcheck()
     assert health["configured"] is False
     assert health["backend"] == "memory"
+
+
+def test_stale_entries_survive_invalidation_until_refreshed():
+    cache = DashboardCache(maxsize=16, default_ttl=300, redis_url="", stale_ttl=600)
+    gym_id = uuid4()
+    key = f"{gym_id}:dashboard_executive"
+
+    cache.set(key, {"value": 1})
+    cache.invalidate_namespace("dashboard_executive", gym_id=gym_id)
+
+    assert cache.get(key) is None
+    assert cache.get_stale(key) == {"value": 1}
+
+    cache.set(key, {"value": 2})
+    assert cache.get(key) == {"value": 2}
+
+
+def test_invalidation_markers_are_not_evicted_by_other_tenants():
+    cache = DashboardCache(maxsize=2, default_ttl=300, redis_url="", stale_ttl=600)
+    gym_id = uuid4()
+    key = f"{gym_id}:dashboard_executive"
+    cache.set(key, {"value": 1})
+
+    cache.invalidate_namespace("dashboard_executive", gym_id=gym_id)
+    for _ in range(10):
+        cache.invalidate_namespace("dashboard_executive", gym_id=uuid4())
+
+    assert cache.get(key) is None
+    assert cache.get_stale(key) == {"value": 1}
+    assert len(cache._local_invalidated_at) == 1
+
+    cache.delete(key)
+    assert cache._local_invalidated_at == {}
+
+
+def test_expired_entries_are_served_only_as_stale(monkeypatch):
+    cache = DashboardCache(maxsize=16, default_ttl=300, redis_url="", stale_ttl=600)
+    key = f"{uuid4()}:dashboard_operational"
+    cache.set(key, {"value": 1}, ttl=60)
+    real_time = time.time
+
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+
+    assert cache.get(key) is None
+    assert cache.get_stale(key) == {"value": 1}
+
+
+def test_refresh_lock_admits_one_holder_until_released():
+    cache = DashboardCache(maxsize=16, default_ttl=300, redis_url="")
+    key = f"{uuid4()}:dashboard_executive"
+
+    token = cache.acquire_refresh_lock(key, ttl_seconds=30)
+
+    assert token is not None
+    assert cache.acquire_refresh_lock(key, ttl_seconds=30) is None
+    cache.release_refresh_lock(key, token)
+    assert cache.acquire_refresh_lock(key, ttl_seconds=30) is not None
+
+
+def test_payloads_written_before_the_entry_envelope_are_read_as_fresh():
+    entry = DashboardCache._decode_entry(json.dumps({"total_members": 3}))
+
+    assert entry.value == {"total_members": 3}
+    assert entry.fresh_until == float("inf")
+
+
+def test_lru_eviction_drops_the_key_from_the_namespace_index():
+    cache = DashboardCache(maxsize=2, default_ttl=300, redis_url="")
+    gym_id = uuid4()
+
+    for page in range(3):
+        cache.set(f"{gym_id}:dashboard_operational:{page}", {"page": page})
+
+    stats = cache.local_stats()
+    assert stats["size"] == 2
+    assert stats["indexed_keys"] == 2
+    assert stats["evictions"] == {"evicted": 1}
+    assert f"{gym_id}:dashboard_operational:0" not in cache._local_index_by_key
+
+
+def test_expired_keys_leave_the_index_when_the_store_expires_them():
+    cache = DashboardCache(maxsize=16, default_ttl=60, redis_url="")
+    first_gym, second_gym = uuid4(), uuid4()
+    cache.set(f"{first_gym}:dashboard_executive", {"value": 1})
+
+    cache._local_cache.expire(time.monotonic() + 120)
+    cache.set(f"{second_gym}:dashboard_executive", {"value": 2})
+
+    assert list(cache._local_index_by_key) == [f"{second_gym}:dashboard_executive"]
+    assert cache.local_stats()["indexed_namespaces"] == 1
+    assert cache.local_stats()["evictions"] == {"expired": 1}
+
+
+def test_delete_and_invalidation_keep_both_index_directions_in_sync():
+    cache = DashboardCache(maxsize=16, default_ttl=300, redis_url="")
+    gym_id = uuid4()
+    cache.set(f"{gym_id}:dashboard_churn:6", [1])
+    cache.set(f"{gym_id}:dashboard_churn:12", [2])
+    cache.set(f"{gym_id}:dashboard_mrr:6", [3])
+
+    cache.delete(f"{gym_id}:dashboard_mrr:6")
+    cache.invalidate_namespace("dashboard_churn", gym_id=gym_id)
+
+    assert cache._local_index_by_key == {}
+    assert cache.local_stats()["indexed_namespaces"] == 0
+
+
+def test_lookups_are_counted_per_namespace():
+    cache = DashboardCache(maxsize=16, default_ttl=300, redis_url="")
+    key = f"{uuid4()}:dashboard_retention:1:1:20"
+
+    cache.get(key)
+    cache.set(key, {"red": {}})
+    cache.get(key)
+
+    assert cache.local_stats()["lookups"] == {"dashboard_retention": {"miss": 1, "hit": 1}}
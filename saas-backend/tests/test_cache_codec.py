@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.core.cache import DashboardCache, _CacheEntry
+from app.core.cache_codec import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    FORMAT_VERSION,
+    CacheCodecError,
+    available_codecs,
+    decode_payload,
+    encode_payload,
+    resolve_codec,
+)
+
+
+PAYLOAD = {
+    "red": {"total": 2, "items": [{"id": str(uuid4()), "full_name": "Ana", "risk_score": 81}] * 50},
+    "nps_trend": [{"month": "2026-09", "average_score": 8.4}],
+    "last_contact_map": {"a": "2026-10-16T12:00:00+00:00"},
+}
+
+
+@pytest.mark.parametrize("codec_name", sorted(available_codecs()))
+def test_round_trip_with_and_without_compression(codec_name):
+    codec = available_codecs()[codec_name]
+
+    small = encode_payload(PAYLOAD, codec=codec, compress_min_bytes=0)
+    large = encode_payload(PAYLOAD, codec=codec, compress_min_bytes=256, compression=COMPRESSION_ZLIB)
+
+    assert small[1:4] == bytes((FORMAT_VERSION, codec.codec_id, COMPRESSION_NONE))
+    assert large[3] == COMPRESSION_ZLIB
+    assert len(large) < len(small)
+    assert decode_payload(small) == decode_payload(large) == PAYLOAD
+
+
+def test_codecs_agree_on_values_json_cannot_represent_natively():
+    value = {"at": datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc), "fee": Decimal("99.90"), 7: "week"}
+    decoded = [
+        decode_payload(encode_payload(value, codec=codec, compress_min_bytes=0))
+        for codec in available_codecs().values()
+    ]
+
+    assert all(item == json.loads(json.dumps(value, default=str)) for item in decoded)
+
+
+def test_unknown_format_version_is_rejected():
+    payload = bytearray(encode_payload(PAYLOAD, codec=available_codecs()["json"], compress_min_bytes=0))
+    payload[1] = FORMAT_VERSION + 1
+
+    with pytest.raises(CacheCodecError):
+        decode_payload(bytes(payload))
+
+
+def test_corrupted_compressed_body_raises_codec_error():
+    payload = encode_payload(PAYLOAD, codec=available_codecs()["json"], compress_min_bytes=1)
+
+    with pytest.raises(CacheCodecError):
+        decode_payload(payload[:4] + b"not-zlib")
+
+
+def test_cache_entries_round_trip_through_the_configured_codec():
+    cache = DashboardCache(maxsize=4, default_ttl=300, codec="orjson", compress_min_bytes=512)
+    entry = _CacheEntry(PAYLOAD, 1_760_000_000.5, 1_760_000_300.5)
+
+    assert cache._decode_entry(cache._encode_entry(entry)) == entry
+
+
+def test_unknown_codec_name_falls_back_to_an_available_codec():
+    assert resolve_codec("msgpack").name in available_codecs()
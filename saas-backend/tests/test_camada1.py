@@ -178,7 +178,9 @@ class TestRiskHistory:
         )
         new_result = risk_service.RiskResult(score=65, level=RiskLevel.YELLOW, reasons={"test": True}, days_without_checkin=10)
 
-        monkeypatch.setattr(risk_service, "calculate_risk_score", lambda *_: new_result)
+        monkeypatch.setattr(
+            risk_service, "calculate_risk_scores", lambda members, *_: {m.id: new_result for m in members}
+        )
         monkeypatch.setattr(risk_service, "_run_inactivity_automations", lambda *_a, **_kw: [])
         monkeypatch.setattr(risk_service, "_create_or_update_alert", lambda *_a, **_kw: None)
         monkeypatch.setattr(risk_service, "invalidate_dashboard_cache", lambda *_: None)
@@ -210,7 +212,9 @@ class TestRiskHistory:
         )
         new_result = risk_service.RiskResult(score=65, level=RiskLevel.YELLOW, reasons={}, days_without_checkin=10)
 
-        monkeypatch.setattr(risk_service, "calculate_risk_score", lambda *_: new_result)
+        monkeypatch.setattr(
+            risk_service, "calculate_risk_scores", lambda members, *_: {m.id: new_result for m in members}
+        )
         monkeypatch.setattr(risk_service, "_run_inactivity_automations", lambda *_a, **_kw: [])
         monkeypatch.setattr(risk_service, "_create_or_update_alert", lambda *_a, **_kw: None)
         monkeypatch.setattr(risk_service, "invalidate_dashboard_cache", lambda *_: None)
@@ -242,7 +246,9 @@ class TestRiskHistory:
         )
         new_result = risk_service.RiskResult(score=20, level=RiskLevel.GREEN, reasons={}, days_without_checkin=3)
 
-        monkeypatch.setattr(risk_service, "calculate_risk_score", lambda *_: new_result)
+        monkeypatch.setattr(
+            risk_service, "calculate_risk_scores", lambda members, *_: {m.id: new_result for m in members}
+        )
         monkeypatch.setattr(risk_service, "_run_inactivity_automations", lambda *_a, **_kw: [])
         monkeypatch.setattr(risk_service, "_create_or_update_alert", lambda *_a, **_kw: None)
         monkeypatch.setattr(risk_service, "invalidate_dashboard_cache", lambda *_: None)
@@ -292,7 +298,9 @@ class TestRiskHistory:
         )
         create_or_update_alert = MagicMock()
 
-        monkeypatch.setattr(risk_service, "calculate_risk_score", lambda *_: new_result)
+        monkeypatch.setattr(
+            risk_service, "calculate_risk_scores", lambda members, *_: {m.id: new_result for m in members}
+        )
         monkeypatch.setattr(risk_service, "_run_inactivity_automations", lambda *_a, **_kw: [])
         monkeypatch.setattr(risk_service, "_create_or_update_alert", create_or_update_alert)
         monkeypatch.setattr(risk_service, "invalidate_dashboard_cache", lambda *_: None)
@@ -347,7 +355,9 @@ class TestRiskHistory:
         )
         create_or_update_alert = MagicMock()
 
-        monkeypatch.setattr(risk_service, "calculate_risk_score", lambda *_: new_result)
+        monkeypatch.setattr(
+            risk_service, "calculate_risk_scores", lambda members, *_: {m.id: new_result for m in members}
+        )
         monkeypatch.setattr(risk_service, "_create_or_update_alert", create_or_update_alert)
         monkeypatch.setattr(risk_service, "_prefetch_member_checkin_metrics", lambda *_a, **_kw: {})
         monkeypatch.setattr(risk_service, "_prefetch_member_ids_with_assessments", lambda *_a, **_kw: set())
@@ -1,50 +1,224 @@
 """
 Test circuit breaker behavior.
 """
-import time
-from unittest.mock import patch
+import asyncio
+import threading
+from unittest.mock import MagicMock
 
-from app.core.circuit_breaker import CircuitBreaker
+import httpx
+import pytest
+from redis.exceptions import RedisError
 
+from app.core import circuit_breaker
+from app.core.circuit_breaker import BulkheadFullError, CircuitBreaker, CircuitOpenError
 
-def test_circuit_breaker_starts_closed():
-    cb = CircuitBreaker(name="test", failure_threshold=3, recovery_timeout_seconds=60)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(circuit_breaker, "_get_redis", lambda: None)
+    monkeypatch.setattr(circuit_breaker, "_now", lambda: now[0])
+    return now
+
+
+def _breaker(**kwargs):
+    options = {"failure_rate_threshold": 0.5, "minimum_calls": 3, "window_seconds": 60, "recovery_timeout_seconds": 60}
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+def test_circuit_breaker_starts_closed(clock):
+    cb = _breaker()
     assert not cb.is_open()
+    assert cb.state() == "closed"
 
 
-def test_circuit_breaker_opens_after_threshold():
-    cb = CircuitBreaker(name="test", failure_threshold=3, recovery_timeout_seconds=60)
+def test_circuit_breaker_opens_after_threshold(clock):
+    cb = _breaker()
     for _ in range(3):
         cb.record_failure()
     assert cb.is_open()
+    assert not cb.allow_request()
+
+
+def test_circuit_breaker_opens_on_failure_rate_not_consecutive_failures(clock):
+    cb = _breaker(minimum_calls=4)
+    for outcome in (False, True, False, True):
+        cb.record_failure() if outcome else cb.record_success()
+    assert cb.is_open()
 
 
-def test_circuit_breaker_resets_on_success():
-    cb = CircuitBreaker(name="test", failure_threshold=3, recovery_timeout_seconds=60)
-    for _ in range(2):
+def test_circuit_breaker_below_threshold_stays_closed(clock):
+    cb = _breaker(minimum_calls=5)
+    for _ in range(4):
         cb.record_failure()
-    cb.record_success()
     assert not cb.is_open()
-    assert cb._failure_count == 0
-    assert cb._state == "closed"
+    for _ in range(6):
+        cb.record_success()
+    cb.record_failure()
+    assert cb.state() == "closed"
 
 
-def test_circuit_breaker_recovers_after_timeout():
-    cb = CircuitBreaker(name="test", failure_threshold=2, recovery_timeout_seconds=1)
+def test_failures_slide_out_of_the_window(clock):
+    cb = _breaker()
     cb.record_failure()
     cb.record_failure()
-    assert cb.is_open()
+    clock[0] += 61
+    cb.record_failure()
+    assert cb.state() == "closed"
+    assert cb.snapshot()["window_failures"] == 1
+
+
+def test_circuit_breaker_recovers_after_timeout_with_one_shared_probe(clock):
+    cb = _breaker()
+    for _ in range(3):
+        cb.record_failure()
+    clock[0] += 61
 
-    # Simulate timeout passing
-    cb._last_failure_time = time.time() - 2  # 2 seconds ago
-    # After timeout, should be half_open (not open)
     assert not cb.is_open()
-    assert cb._state == "half_open"
+    assert cb.allow_request()
+    assert cb.state() == "half_open"
+    assert not cb.allow_request()
+    cb.record_success()
+    assert cb.state() == "closed"
+    assert cb.allow_request()
 
 
-def test_circuit_breaker_below_threshold_stays_closed():
-    cb = CircuitBreaker(name="test", failure_threshold=5, recovery_timeout_seconds=60)
-    for _ in range(4):
+def test_failed_probe_reopens_and_lost_probe_frees_its_token(clock):
+    cb = _breaker()
+    for _ in range(3):
         cb.record_failure()
-    assert not cb.is_open()
-    assert cb._state == "closed"
+    clock[0] += 61
+    assert cb.allow_request()
+    cb.record_failure()
+    assert cb.state() == "open"
+
+    clock[0] += 61
+    assert cb.allow_request()
+    clock[0] += 61
+    assert cb.allow_request()
+
+
+def test_guard_fails_fast_while_open_and_ignores_client_errors(clock):
+    cb = _breaker()
+    request = httpx.Request("POST", "http://provider.local")
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError), cb.guard():
+            raise httpx.HTTPStatusError("bad", request=request, response=httpx.Response(400, request=request))
+    assert cb.state() == "closed"
+
+    for _ in range(3):
+        with cb.guard() as call:
+            call.fail()
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        with cb.guard():
+            calls.append(1)
+    assert calls == []
+    assert cb.snapshot()["rejected"] == 1
+
+
+def test_bulkhead_caps_calls_in_flight(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker.settings, "circuit_breaker_bulkhead_wait_seconds", 0.01)
+    cb = _breaker(max_concurrent_calls=1)
+    entered, release = threading.Event(), threading.Event()
+
+    def _slow_call():
+        with cb.guard():
+            entered.set()
+            release.wait(1)
+
+    worker = threading.Thread(target=_slow_call)
+    worker.start()
+    entered.wait(1)
+    try:
+        with pytest.raises(BulkheadFullError):
+            with cb.guard():
+                pass
+
+        async def _async_call():
+            async with cb.guard_async():
+                pass
+
+        with pytest.raises(BulkheadFullError):
+            asyncio.run(_async_call())
+        assert cb.snapshot()["in_flight"] == 1
+    finally:
+        release.set()
+        worker.join()
+    with cb.guard():
+        pass
+    assert cb.snapshot()["in_flight"] == 0
+
+
+def test_guard_async_keeps_the_breaker_round_trips_off_the_event_loop(clock):
+    threads = []
+
+    def _eval(script, *_args):
+        threads.append(threading.get_ident())
+        return ["closed", 1] if script == circuit_breaker._ALLOW_SCRIPT else ["closed", 0, 1, 0]
+
+    redis_client = MagicMock()
+    redis_client.eval.side_effect = _eval
+    cb = _breaker(redis_client=redis_client, max_concurrent_calls=1)
+
+    async def _call():
+        async with cb.guard_async():
+            return threading.get_ident()
+
+    loop_thread = asyncio.run(_call())
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+    assert cb._in_flight == 0
+
+
+def test_guard_async_hands_back_the_slot_when_cancelled_while_entering(clock):
+    entered, release = threading.Event(), threading.Event()
+    cb = _breaker(max_concurrent_calls=1)
+    allow = cb.allow_request
+
+    def _slow_allow():
+        entered.set()
+        release.wait(1)
+        return allow()
+
+    cb.allow_request = _slow_allow
+
+    async def _cancelled():
+        task = asyncio.ensure_future(cb.guard_async().__aenter__())
+        await asyncio.to_thread(entered.wait, 1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(_cancelled())
+
+    assert cb.snapshot()["in_flight"] == 0
+    cb.allow_request = allow
+    with cb.guard():
+        pass
+
+
+def test_redis_errors_fall_back_to_local_state(clock):
+    redis_client = MagicMock()
+    redis_client.eval.side_effect = RedisError("down")
+    redis_client.time.side_effect = RedisError("down")
+    cb = _breaker(redis_client=redis_client)
+
+    for _ in range(3):
+        cb.record_failure()
+
+    assert cb.is_open()
+    assert cb.snapshot()["backend"] == "local"
+
+
+def test_registry_applies_bulkhead_limits_per_provider(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.settings, "circuit_breaker_bulkhead_limits", "kommo=3, actuar=1,invalid")
+    monkeypatch.setattr(circuit_breaker, "_registry", {})
+
+    assert circuit_breaker.get_breaker("kommo").max_concurrent_calls == 3
+    assert circuit_breaker.get_breaker("kommo") is circuit_breaker.get_breaker("kommo")
+    assert circuit_breaker.get_breaker("openai").max_concurrent_calls == 0
+    assert set(circuit_breaker.circuit_breaker_states()) >= {"claude", "openai", "whatsapp", "kommo", "actuar"}
@@ -494,3 +494,82 @@ class TestGetBIFoundationDashboard:
         assert "missing_ai_first_ops_base" in result.data_quality_flags
         assert "execution_backlog_attention" in result.data_quality_flags
         assert "revenue_at_risk_without_fee_base" in result.data_quality_flags
+
+
+class TestDashboardStaleWhileRevalidate:
+    @patch("app.services.dashboard_service._schedule_dashboard_refresh")
+    @patch("app.services.dashboard_service.dashboard_cache")
+    @patch("app.services.dashboard_service._revenue_series")
+    def test_serves_stale_payload_and_refreshes_in_background(self, mock_rev, mock_cache, mock_schedule):
+        from app.services.dashboard_service import get_mrr_dashboard, settings
+
+        mock_cache.get.return_value = None
+        mock_cache.get_stale.return_value = [{"month": "2026-09", "value": 10.0}]
+        with patch.object(settings, "dashboard_cache_swr_enabled", True):
+            result = get_mrr_dashboard(MagicMock(), months=6)
+
+        assert result == [{"month": "2026-09", "value": 10.0}]
+        mock_rev.assert_not_called()
+        mock_schedule.assert_called_once()
+
+    @patch("app.services.dashboard_service.dashboard_cache")
+    @patch("app.services.dashboard_service._revenue_series")
+    def test_cold_miss_waits_for_the_single_flight_holder(self, mock_rev, mock_cache):
+        from app.services.dashboard_service import get_mrr_dashboard, settings
+
+        mock_cache.get.side_effect = [None, [{"month": "2026-09", "value": 10.0}]]
+        mock_cache.get_stale.return_value = None
+        mock_cache.acquire_refresh_lock.return_value = None
+        with patch.object(settings, "dashboard_cache_swr_enabled", True):
+            result = get_mrr_dashboard(MagicMock(), months=6)
+
+        assert result == [{"month": "2026-09", "value": 10.0}]
+        mock_rev.assert_not_called()
+
+    @patch("app.services.dashboard_service.dashboard_cache")
+    @patch("app.services.dashboard_service._revenue_series", return_value=[])
+    def test_cold_miss_holder_computes_and_releases_the_lock(self, mock_rev, mock_cache):
+        from app.services.dashboard_service import get_mrr_dashboard, settings
+
+        mock_cache.get.return_value = None
+        mock_cache.get_stale.return_value = None
+        mock_cache.acquire_refresh_lock.return_value = "token"
+        with patch.object(settings, "dashboard_cache_swr_enabled", True):
+            get_mrr_dashboard(MagicMock(), months=6)
+
+        mock_rev.assert_called_once()
+        mock_cache.set.assert_called_once()
+        mock_cache.release_refresh_lock.assert_called_once_with(mock_cache.get.call_args.args[0], "token")
+
+    @patch("app.services.dashboard_service.dashboard_cache")
+    def test_prewarm_recomputes_instead_of_serving_stale(self, mock_cache):
+        from app.services import dashboard_service
+
+        mock_cache.get.return_value = None
+        mock_cache.get_stale.return_value = {"stale": True}
+        warmed = []
+        getters = (
+            "get_executive_dashboard",
+            "get_operational_dashboard",
+            "get_retention_dashboard",
+            "get_commercial_dashboard",
+            "get_financial_dashboard",
+            "get_weekly_summary",
+            "get_bi_foundation_dashboard",
+        )
+        with patch.object(dashboard_service.settings, "dashboard_cache_swr_enabled", True):
+            with patch.multiple(
+                dashboard_service,
+                **{
+                    name: MagicMock(
+                        __name__=name,
+                        side_effect=lambda _db: warmed.append(dashboard_service._PREWARMING.get()),
+                    )
+                    for name in getters
+                },
+            ):
+                result = dashboard_service.prewarm_dashboard_cache(MagicMock())
+
+        assert result == {"dashboards_warmed": 7, "dashboards_failed": 0}
+        assert warmed == [True] * 7
+        assert dashboard_service._PREWARMING.get() is False
@@ -1,7 +1,22 @@
-from sqlalchemy import select, update
+from types import SimpleNamespace
+from uuid import UUID, uuid4
 
-from app.database import clear_current_gym_id, include_all_tenants, set_unscoped_access, unscoped_tenant_access
-from app.models import User
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import joinedload
+
+from app.database import (
+    _apply_tenant_filter,
+    _referenced_tenant_tables,
+    clear_current_gym_id,
+    get_tenant_filter_stats,
+    include_all_tenants,
+    reset_tenant_filter_stats,
+    set_current_gym_id,
+    set_unscoped_access,
+    unscoped_tenant_access,
+)
+from app.models import Checkin, Member, Task, User
 
 
 def test_include_all_tenants_requires_reason():
@@ -102,3 +117,61 @@ def test_unscoped_tenant_access_emits_allowlisted_telemetry(caplog):
     assert len(matching) == 1
     assert matching[0].extra_fields["status"] == "allowed"
     assert matching[0].extra_fields["tenant_bypass_reason"] == "jobs.nurturing_followup_job"
+
+
+
+def _run_tenant_filter(statement, **execution_options):
+    state = SimpleNamespace(is_select=True, execution_options=execution_options, statement=statement)
+    _apply_tenant_filter(state)
+    return state.statement
+
+
+def test_tenant_filter_only_scopes_referenced_models():
+    assert _referenced_tenant_tables(select(Member.id)) == frozenset({"members"})
+    assert _referenced_tenant_tables(select(Member).join(Member.tasks)) == frozenset({"members", "tasks"})
+    assert _referenced_tenant_tables(
+        select(Task).options(joinedload(Task.member).selectinload(Member.checkins))
+    ) == frozenset({"tasks", "members", "checkins"})
+
+    clear_current_gym_id()
+    statement = _run_tenant_filter(select(Task).where(Task.member_id.in_(select(Checkin.member_id))))
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "tasks.gym_id = %(tenant_scope_gym_id)s" in sql
+    assert "checkins.gym_id = %(tenant_scope_gym_id)s" in sql
+    assert "members.gym_id" not in sql
+
+
+def test_tenant_filter_binds_current_gym_at_execution_time():
+    compiled = _run_tenant_filter(select(Member)).compile(dialect=postgresql.dialect())
+
+    gym_id = uuid4()
+    set_current_gym_id(gym_id)
+    try:
+        assert compiled.construct_params()["tenant_scope_gym_id"] == gym_id
+    finally:
+        clear_current_gym_id()
+    assert compiled.construct_params()["tenant_scope_gym_id"] == UUID(int=0)
+
+
+def test_tenant_filter_cache_key_is_stable_across_gyms_and_counts_hits():
+    reset_tenant_filter_stats()
+    set_current_gym_id(uuid4())
+    first = _run_tenant_filter(select(Member).where(Member.deleted_at.is_(None)))
+    set_current_gym_id(uuid4())
+    second = _run_tenant_filter(select(Member).where(Member.deleted_at.is_(None)))
+    clear_current_gym_id()
+
+    assert first._generate_cache_key().key == second._generate_cache_key().key
+    stats = get_tenant_filter_stats()
+    assert stats["hits"] + stats["misses"] == 2
+    assert stats["hits"] >= 1
+
+
+def test_tenant_filter_skips_unscoped_and_bypassed_statements():
+    with unscoped_tenant_access("jobs.nurturing_followup_job"):
+        statement = select(Member)
+        assert _run_tenant_filter(statement) is statement
+
+    bypassed = include_all_tenants(select(Member), reason="member_service.explicit_gym_scope")
+    assert _run_tenant_filter(bypassed, **bypassed.get_execution_options()) is bypassed
@@ -224,3 +224,32 @@ class TestWithDistributedLock:
         assert result is None
         session_local.assert_not_called()
         run_automation_rules.assert_not_called()
+
+
+class TestSchedulerSharding:
+    def test_single_shard_keeps_lock_name_and_owns_every_gym(self):
+        from app.core.distributed_lock import gym_belongs_to_shard, scheduler_shard_lock_name
+
+        with patch("app.core.distributed_lock.settings") as mock_settings:
+            mock_settings.scheduler_shard_count = 1
+            mock_settings.scheduler_shard_index = 0
+            assert scheduler_shard_lock_name("daily_risk") == "daily_risk"
+            assert gym_belongs_to_shard("gym-a") is True
+
+    def test_shards_partition_gyms_and_lock_independently(self):
+        from app.core.distributed_lock import gym_belongs_to_shard, scheduler_shard_lock_name
+
+        gym_ids = [f"gym-{index}" for index in range(50)]
+        owners: dict[str, list[int]] = {gym_id: [] for gym_id in gym_ids}
+        lock_names = set()
+        with patch("app.core.distributed_lock.settings") as mock_settings:
+            mock_settings.scheduler_shard_count = 3
+            for shard_index in range(3):
+                mock_settings.scheduler_shard_index = shard_index
+                lock_names.add(scheduler_shard_lock_name("daily_risk"))
+                for gym_id in gym_ids:
+                    if gym_belongs_to_shard(gym_id):
+                        owners[gym_id].append(shard_index)
+
+        assert all(len(shards) == 1 for shards in owners.values())
+        assert lock_names == {"daily_risk:shard-0-of-3", "daily_risk:shard-1-of-3", "daily_risk:shard-2-of-3"}
@@ -1,23 +1,30 @@
 """Tests for export_service covering CSV generation."""
 
 import csv
+import gzip
 import uuid
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from io import StringIO
+from io import BytesIO, StringIO
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
+from app.database import clear_current_gym_id, get_current_gym_id
 from app.models.enums import CheckinSource, MemberStatus, RiskLevel
+from app.services import export_service
 from app.services.export_service import (
-    export_checkins_csv,
+    checkins_export_filename,
     export_checkins_template_csv,
-    export_members_csv,
     export_members_template_csv,
+    iter_checkins_csv,
+    iter_members_csv,
+    members_export_filename,
+    resolve_member_export_resume_key,
 )
 
 
 MEMBER_ID = uuid.UUID("33333333-3333-3333-3333-333333333333")
+GYM_ID = uuid.UUID("11111111-1111-1111-1111-111111111111")
 
 
 def _mock_member(**overrides):
@@ -36,8 +43,7 @@ def _mock_member(**overrides):
         risk_score=15,
         risk_level=RiskLevel.YELLOW,
         last_checkin_at=datetime(2026, 3, 10, 18, 30, tzinfo=timezone.utc),
-        extra_data={"external_id": "A12345"},
-        deleted_at=None,
+        external_id="A12345",
     )
     defaults.update(overrides)
     return SimpleNamespace(**defaults)
@@ -49,74 +55,162 @@ def _parse_csv_bytes(buffer) -> list[dict]:
     return list(reader)
 
 
+def _streaming_db(rows) -> MagicMock:
+    db = MagicMock()
+    db.execute.return_value.partitions.return_value = iter([rows] if rows else [])
+    return db
+
+
+def _parse_chunks(chunks) -> list[dict]:
+    return _parse_csv_bytes(BytesIO(b"".join(chunks)))
+
+
+def _mock_checkin_row(**overrides):
+    defaults = dict(
+        id=uuid.uuid4(),
+        checkin_at=datetime(2026, 3, 10, 18, 30, tzinfo=timezone.utc),
+        source=SimpleNamespace(value="turnstile"),
+        hour_bucket=18,
+        weekday=1,
+        member_id=MEMBER_ID,
+        full_name="Joao Silva",
+        email="joao@test.com",
+        external_id="A12345",
+    )
+    defaults.update(overrides)
+    return SimpleNamespace(**defaults)
+
+
 class TestExportMembersCsv:
     def test_generates_csv_with_headers(self):
-        member = _mock_member()
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = [member]
-        db = MagicMock()
-        db.scalars.return_value = mock_scalars
+        db = _streaming_db([_mock_member()])
 
-        buffer, filename = export_members_csv(db)
+        filename = members_export_filename()
         assert "members_export_" in filename
         assert filename.endswith(".csv")
 
-        rows = _parse_csv_bytes(buffer)
+        rows = _parse_chunks(iter_members_csv(db, gym_id=GYM_ID))
         assert len(rows) == 1
         assert rows[0]["full_name"] == "Joao Silva"
         assert rows[0]["phone"] == "11999998888"
         assert rows[0]["risk_level"] == "yellow"
+        assert rows[0]["external_id"] == "A12345"
 
     def test_empty_member_list(self):
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = []
-        db = MagicMock()
-        db.scalars.return_value = mock_scalars
-
-        buffer, filename = export_members_csv(db)
-        rows = _parse_csv_bytes(buffer)
+        rows = _parse_chunks(iter_members_csv(_streaming_db([]), gym_id=GYM_ID))
         assert len(rows) == 0
 
     def test_neutralizes_formula_injection_in_text_cells(self):
-        member = _mock_member(full_name="=CMD()", email="+danger@test.com", phone="@evil")
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = [member]
-        db = MagicMock()
-        db.scalars.return_value = mock_scalars
+        db = _streaming_db([_mock_member(full_name="=CMD()", email="+danger@test.com", phone="@evil")])
 
-        buffer, _filename = export_members_csv(db)
-        rows = _parse_csv_bytes(buffer)
+        rows = _parse_chunks(iter_members_csv(db, gym_id=GYM_ID))
 
         assert rows[0]["full_name"] == "'=CMD()"
         assert rows[0]["email"] == "'+danger@test.com"
         assert rows[0]["phone"] == "'@evil"
 
+    def test_yields_the_header_before_querying_and_streams_from_one_cursor(self):
+        db = _streaming_db([_mock_member()])
 
-class TestExportCheckinsCsv:
-    def test_generates_csv_with_dates(self):
-        member = _mock_member()
-        checkin = SimpleNamespace(
-            id=uuid.uuid4(),
-            member_id=MEMBER_ID,
-            checkin_at=datetime(2026, 3, 10, 18, 30, tzinfo=timezone.utc),
-            source=SimpleNamespace(value="turnstile"),
-            hour_bucket=18,
-            weekday=1,
+        chunks = iter_members_csv(db, gym_id=GYM_ID)
+        first_chunk = next(chunks)
+
+        assert first_chunk.startswith("\ufeffid,full_name".encode("utf-8"))
+        db.execute.assert_not_called()
+        list(chunks)
+        db.execute.assert_called_once()
+        statement = db.execute.call_args.args[0]
+        assert statement.get_execution_options()["yield_per"] == 1000
+        assert "members.extra_data" in str(statement)
+        assert "SELECT members.id, members.full_name" in str(statement)
+
+    def test_encodes_one_chunk_per_batch(self, monkeypatch):
+        monkeypatch.setattr(export_service, "_EXPORT_BATCH_SIZE", 2)
+        db = MagicMock()
+        db.execute.return_value.partitions.return_value = iter(
+            [[_mock_member(full_name=f"Aluno {index}") for index in range(2)], [_mock_member(full_name="Aluno 2")]]
         )
+
+        chunks = list(iter_members_csv(db, gym_id=GYM_ID))
+
+        assert len(chunks) == 3
+        assert chunks[2].decode("utf-8").startswith(f"{MEMBER_ID},Aluno 2,")
+
+    def test_filters_on_the_gym_without_the_tenant_context_across_chunks(self, monkeypatch):
+        monkeypatch.setattr(export_service, "_EXPORT_BATCH_SIZE", 1)
+        clear_current_gym_id()
         db = MagicMock()
-        db.execute.return_value.all.return_value = [(checkin, member)]
+        db.execute.return_value.partitions.return_value = iter(
+            [[_mock_member(full_name="Aluno 0")], [_mock_member(full_name="Aluno 1")]]
+        )
 
-        buffer, filename = export_checkins_csv(db, date_from=date(2026, 3, 1), date_to=date(2026, 3, 31))
-        rows = _parse_csv_bytes(buffer)
+        chunks = list(iter_members_csv(db, gym_id=GYM_ID))
+
+        assert get_current_gym_id() is None
+        assert len(chunks) == 3
+        statement = db.execute.call_args.args[0]
+        assert "members.gym_id = :gym_id_1" in str(statement)
+        assert statement.compile().params["gym_id_1"] == GYM_ID
+        assert statement.get_execution_options()["tenant_bypass_reason"] == "exports.members_csv"
+
+    def test_resumed_export_skips_the_header_and_seeks_past_the_last_row(self):
+        db = _streaming_db([_mock_member()])
+
+        chunks = list(iter_members_csv(db, gym_id=GYM_ID, resume_after=("Joao Silva", MEMBER_ID)))
+
+        assert not chunks[0].startswith("\ufeff".encode("utf-8"))
+        assert chunks[0].decode("utf-8").startswith(str(MEMBER_ID))
+        where_sql = str(db.execute.call_args.args[0])
+        assert "(members.full_name, members.id) > (:param_1, :param_2)" in where_sql
+
+    def test_resume_key_is_the_sort_position_of_the_last_exported_member(self):
+        db = MagicMock()
+        db.scalar.return_value = "Joao Silva"
+
+        assert resolve_member_export_resume_key(db, MEMBER_ID) == ("Joao Silva", MEMBER_ID)
+        db.scalar.return_value = None
+        assert resolve_member_export_resume_key(db, MEMBER_ID) is None
+
+    def test_gzip_output_is_a_single_valid_stream(self):
+        db = _streaming_db([_mock_member()])
+
+        chunks = list(iter_members_csv(db, gym_id=GYM_ID, compress=True))
+
+        assert all(chunks[:-1])
+        rows = _parse_csv_bytes(BytesIO(gzip.decompress(b"".join(chunks))))
+        assert rows[0]["full_name"] == "Joao Silva"
+        assert members_export_filename(compress=True).endswith(".csv.gz")
+
+
+class TestExportCheckinsCsv:
+    def test_generates_csv_with_dates(self):
+        db = _streaming_db([_mock_checkin_row()])
+
+        rows = _parse_chunks(iter_checkins_csv(db, gym_id=GYM_ID, date_from=date(2026, 3, 1), date_to=date(2026, 3, 31)))
+        filename = checkins_export_filename(date_from=date(2026, 3, 1), date_to=date(2026, 3, 31))
         assert len(rows) == 1
         assert rows[0]["origem"] == "catraca"
+        assert rows[0]["matricula"] == "A12345"
+        assert rows[0]["hora"] == "18:30:00"
         assert "2026-03-01" in filename
 
     def test_no_date_filter(self):
-        db = MagicMock()
-        db.execute.return_value.all.return_value = []
-        buffer, filename = export_checkins_csv(db)
-        assert date.today().isoformat() in filename
+        db = _streaming_db([])
+        assert _parse_chunks(iter_checkins_csv(db, gym_id=GYM_ID)) == []
+        assert date.today().isoformat() in checkins_export_filename()
+
+    def test_resumed_export_continues_below_the_last_checkin(self):
+        db = _streaming_db([])
+        last_at = datetime(2026, 3, 10, 18, 30, tzinfo=timezone.utc)
+        last_id = uuid.uuid4()
+
+        list(iter_checkins_csv(db, gym_id=GYM_ID, date_from=date(2026, 3, 1), resume_after=(last_at, last_id)))
+
+        sql = str(db.execute.call_args.args[0])
+        assert "(checkins.checkin_at, checkins.id) < (:param_1, :param_2)" in sql
+        assert "ORDER BY checkins.checkin_at DESC, checkins.id DESC" in sql
+        assert "checkins.checkin_at >= :checkin_at_1" in sql
+        assert "checkins.gym_id = :gym_id_1 AND members.gym_id = :gym_id_2" in sql
 
 
 class TestExportTemplates:
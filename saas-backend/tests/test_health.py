@@ -73,6 +73,17 @@ def test_health_ready_returns_503_when_required_redis_is_down(client):
     assert data["checks"]["cache"]["status"] == "error"
 
 
+def test_health_ready_reports_provider_circuit_breakers(client):
+    mock_session = MagicMock()
+    with patch("app.main.SessionLocal", return_value=mock_session):
+        response = client.get("/health/ready")
+
+    breakers = response.json()["checks"]["circuit_breakers"]
+    assert {"claude", "openai", "whatsapp", "kommo", "actuar"} <= set(breakers)
+    assert breakers["whatsapp"]["state"] == "closed"
+    assert response.json()["circuit_breakers"]["whatsapp"] == "closed"
+
+
 def test_health_ready_hides_dependency_details_in_production(client):
     mock_session = MagicMock()
     with (
@@ -84,5 +95,7 @@ def test_health_ready_hides_dependency_details_in_production(client):
 
     assert response.status_code == 200
     data = response.json()
-    assert data == {"status": "ok"}
+    assert set(data) == {"status", "circuit_breakers"}
+    assert data["status"] == "ok"
+    assert data["circuit_breakers"]["claude"] == "closed"
     assert response.headers["Strict-Transport-Security"] == "max-age=63072000; includeSubDomains; preload"
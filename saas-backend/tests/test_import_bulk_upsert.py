@@ -0,0 +1,171 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models import Checkin, Member, MemberStatus
+from app.services import import_service
+from app.utils.encryption import encrypt_cpf
+
+
+@pytest.fixture(autouse=True)
+def _bulk_upsert_enabled(monkeypatch):
+    monkeypatch.setattr(import_service.settings, "import_bulk_upsert_enabled", True)
+    monkeypatch.setattr(import_service.settings, "risk_incremental_enabled", False)
+    monkeypatch.setattr(import_service.settings, "ai_triage_background_sync_enabled", False)
+    monkeypatch.setattr(import_service, "refresh_member_risk_snapshot", lambda *_args, **_kwargs: {})
+    monkeypatch.setattr(import_service, "sync_preferred_shifts_from_checkins", MagicMock(return_value=0))
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _index_row(**overrides):
+    values = {
+        "id": uuid4(),
+        "full_name": "Aluno Existente",
+        "email": None,
+        "has_phone": False,
+        "cpf_encrypted": None,
+        "status": MemberStatus.ACTIVE,
+        "plan_name": "Mensal",
+        "join_date": date(2026, 1, 1),
+        "last_checkin_at": None,
+        "updated_at": None,
+        "external_id": None,
+        "raw_plan_name": None,
+        "raw_plan_conditions": None,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _result(items):
+    result = MagicMock()
+    result.all.return_value = items
+    return result
+
+
+def _bulk_db(index_rows, *, conflicts: int = 0) -> MagicMock:
+    """Session double that answers the member index projection and the check-in insert; keeps every statement."""
+    db = MagicMock()
+    db.statements, db.staged = [], []
+
+    def _execute(statement, *args, **_kwargs):
+        db.statements.append(statement)
+        sql = "" if isinstance(statement, CreateTable) else _sql(statement)
+        if sql.startswith("SELECT members.id"):
+            return _result(index_rows if len(db.statements) == 1 else [])
+        if sql.startswith("INSERT INTO import_checkin_stage"):
+            db.staged = args[0]
+        if sql.startswith("INSERT INTO checkins"):
+            return _result([(uuid4(), row["member_id"]) for row in db.staged[conflicts:]])
+        return _result([])
+
+    db.execute.side_effect = _execute
+    return db
+
+
+def _statements_sql(db) -> list[str]:
+    return [_sql(statement) for statement in db.statements]
+
+
+def test_member_index_reads_a_projection_without_loading_member_objects():
+    cpf_member = _index_row(full_name="Carla Dias", cpf_encrypted=encrypt_cpf("12345678901"), external_id="0042")
+    db = _bulk_db([cpf_member])
+
+    lookup = import_service._load_member_index(db)
+
+    index_sql = _statements_sql(db)[0]
+    assert "members.phone IS NOT NULL AS has_phone" in index_sql
+    assert "members.extra_data ->> %(extra_data_1)s AS external_id" in index_sql
+    db.scalars.assert_not_called()
+    assert import_service._resolve_member_from_row({"cpf": "123.456.789-01"}, lookup).id == cpf_member.id
+    assert import_service._resolve_member_from_row({"matricula": "42"}, lookup).id == cpf_member.id
+
+
+def test_bulk_checkin_import_stages_rows_and_upserts_them_with_set_based_statements():
+    member = _index_row(external_id="mat-001")
+    db = _bulk_db([member])
+    csv_content = (
+        "matricula,data,hora\n"
+        "MAT-001,2026-03-01,08:00\n"
+        "MAT-001,2026-03-02,18:30\n"
+        "MAT-001,2026-03-02,18:30\n"
+    ).encode("utf-8")
+
+    summary = import_service.import_checkins_csv(db, csv_content, filename="checkins.csv")
+
+    assert summary.imported == 2
+    assert summary.skipped_duplicates == 1
+    assert not any(isinstance(call.args[0], Checkin) for call in db.add.call_args_list)
+    assert [row["checkin_at"] for row in db.staged] == [
+        datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc),
+        datetime(2026, 3, 2, 18, 30, tzinfo=timezone.utc),
+    ]
+    statements = _statements_sql(db)
+    assert statements[1].startswith("\nCREATE TEMPORARY TABLE IF NOT EXISTS import_checkin_stage")
+    assert "ON COMMIT DELETE ROWS" in statements[1]
+    insert_sql = next(sql for sql in statements if sql.startswith("INSERT INTO checkins"))
+    assert "SELECT import_checkin_stage.id, members.gym_id" in insert_sql
+    assert "ON CONFLICT ON CONSTRAINT uq_checkin_member_datetime DO NOTHING" in insert_sql
+    update_sql = next(sql for sql in statements if sql.startswith("UPDATE members"))
+    assert "max(import_checkin_stage.checkin_at)" in update_sql
+    assert statements[-1] == "DELETE FROM import_checkin_stage"
+    import_service.sync_preferred_shifts_from_checkins.assert_called_once()
+
+
+def test_bulk_checkin_import_counts_existing_rows_as_duplicates_and_marks_inserted_members(monkeypatch):
+    monkeypatch.setattr(import_service.settings, "risk_incremental_enabled", True)
+    member = _index_row(email="aluno@example.com")
+    db = _bulk_db([member], conflicts=1)
+    csv_content = (
+        "email,data,hora\n"
+        "aluno@example.com,2026-03-01,08:00\n"
+        "aluno@example.com,2026-03-03,09:00\n"
+    ).encode("utf-8")
+
+    with patch.object(import_service, "mark_risk_inputs_changed") as mark_risk:
+        summary = import_service.import_checkins_csv(db, csv_content)
+
+    assert summary.imported == 1
+    assert summary.skipped_duplicates == 1
+    (markers,) = mark_risk.call_args.args[1:]
+    assert list(markers.values()) == [import_service.RISK_REASON_CHECKIN]
+    assert [member_id for _, member_id in markers] == [member.id]
+
+
+def test_bulk_member_import_loads_only_the_chunk_matches():
+    indexed = _index_row(full_name="Aluno Existente", email="aluno.existente@example.com")
+    orm_member = Member(
+        id=indexed.id,
+        gym_id=uuid4(),
+        full_name="Aluno Existente",
+        email="aluno.existente@example.com",
+        status=MemberStatus.ACTIVE,
+        plan_name="Mensal",
+        monthly_fee=0,
+        join_date=date(2026, 1, 1),
+        extra_data={},
+    )
+    db = _bulk_db([indexed])
+    db.scalars.return_value.all.return_value = [orm_member]
+    csv_content = (
+        "nome,email,telefones\n"
+        "Aluno Existente,aluno.existente@example.com,54999990000\n"
+        "Aluno Novo,novo@example.com,\n"
+    ).encode("utf-8")
+
+    summary = import_service.import_members_csv(db, csv_content, filename="clientes.csv")
+
+    assert summary.updated_existing == 1
+    assert summary.imported == 1
+    assert orm_member.phone == "54999990000"
+    db.scalars.assert_called_once()
+    assert "WHERE members.id IN" in _sql(db.scalars.call_args.args[0])
+    db.get.assert_not_called()
@@ -0,0 +1,175 @@
+import base64
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.schemas import ImportErrorEntry, ImportSummary, MissingMemberEntry
+from app.services import core_async_job_service, import_job_service, import_service
+
+
+@pytest.fixture(autouse=True)
+def _stub_risk_snapshot_refresh(monkeypatch):
+    monkeypatch.setattr(import_service, "refresh_member_risk_snapshot", lambda *_args, **_kwargs: {})
+
+
+def _members_db() -> MagicMock:
+    db = MagicMock()
+    db.scalars.return_value.all.return_value = []
+    return db
+
+
+_MEMBERS_CSV = (
+    "nome,email\n"
+    "Ana Souza,ana@example.com\n"
+    "Bruno Lima,bruno@example.com\n"
+    "Carla Dias,carla@example.com\n"
+    ",sem-nome@example.com\n"
+    "Diego Alves,diego@example.com\n"
+).encode("utf-8")
+
+
+def test_members_import_commits_one_transaction_per_chunk_with_its_checkpoint():
+    db = _members_db()
+    checkpoints = []
+
+    import_service.import_members_in_chunks(
+        db,
+        _MEMBERS_CSV,
+        filename="alunos.csv",
+        chunk_size=2,
+        checkpoint=lambda row, rows, summary: checkpoints.append((row, rows, summary.imported, len(summary.errors))),
+    )
+
+    assert checkpoints == [(3, 2, 2, 0), (5, 2, 1, 1), (6, 1, 1, 0)]
+    assert db.commit.call_count == 3
+
+
+def test_members_import_resumes_after_the_last_committed_row():
+    db = _members_db()
+    checkpoints = []
+
+    import_service.import_members_in_chunks(
+        db,
+        _MEMBERS_CSV,
+        filename="alunos.csv",
+        chunk_size=2,
+        resume_after_row=5,
+        checkpoint=lambda row, rows, summary: checkpoints.append((row, rows, summary.imported)),
+    )
+
+    assert checkpoints == [(6, 1, 1)]
+    added_names = [call.args[0].full_name for call in db.add.call_args_list]
+    assert added_names == ["Diego Alves"]
+
+
+def test_merge_import_summary_accumulates_counts_and_caps_stored_errors(monkeypatch):
+    monkeypatch.setattr(import_job_service, "_MAX_STORED_ERRORS", 2)
+    chunk = ImportSummary(
+        imported=3,
+        skipped_duplicates=1,
+        errors=[ImportErrorEntry(row_number=n, reason="Nome ausente", payload={}) for n in (2, 3)],
+        missing_members=[MissingMemberEntry(name="Ana", occurrences=2)],
+    )
+
+    total = import_job_service.merge_import_summary({}, chunk)
+    total = import_job_service.merge_import_summary(total, chunk)
+
+    assert total["imported"] == 6
+    assert total["skipped_duplicates"] == 2
+    assert [entry["row_number"] for entry in total["errors"]] == [2, 3]
+    assert total["missing_members"] == [{"name": "Ana", "occurrences": 4, "sample_plan": None}]
+
+
+def test_execute_import_job_keeps_progress_on_the_job_and_drops_the_upload():
+    job = SimpleNamespace(
+        id=uuid4(),
+        gym_id=uuid4(),
+        requested_by_user_id=None,
+        job_type=core_async_job_service.CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT,
+        payload_json={"filename": "alunos.csv"},
+        payload_blob="...",
+        result_json={"checkpoint_row": 3, "rows_processed": 2, "chunks_committed": 1, "errors_total": 0,
+                     "total_rows": 5, "summary": {"imported": 2, "skipped_duplicates": 0}},
+        locked_at=None,
+    )
+
+    def _fake_import(_db, _content, *, resume_after_row, checkpoint, **_kwargs):
+        assert resume_after_row == 3
+        checkpoint(6, 3, ImportSummary(imported=2, skipped_duplicates=0))
+
+    with (
+        patch.object(import_job_service, "import_members_in_chunks", side_effect=_fake_import),
+        patch.object(import_job_service, "count_import_rows") as count_rows,
+        patch.object(import_job_service, "log_audit_event") as audit,
+    ):
+        result = import_job_service.execute_import_job(MagicMock(), job, _MEMBERS_CSV)
+
+    count_rows.assert_not_called()
+    assert result["checkpoint_row"] == 6
+    assert result["rows_processed"] == 5
+    assert result["chunks_committed"] == 2
+    assert result["summary"]["imported"] == 4
+    assert job.result_json["checkpoint_row"] == 6
+    assert job.locked_at is not None
+    assert job.payload_blob is None
+    assert audit.call_args.kwargs["details"]["imported"] == 4
+
+
+def test_invalid_import_file_fails_without_retry():
+    job = SimpleNamespace(
+        job_type=core_async_job_service.CORE_ASYNC_JOB_TYPE_CHECKIN_IMPORT,
+        payload_blob=base64.b64encode(b"nome,data\n").decode("ascii"),
+    )
+
+    with patch("app.services.import_job_service.execute_import_job", side_effect=ValueError("colunas demais")):
+        with pytest.raises(core_async_job_service.CoreAsyncJobNonRetryableError) as exc_info:
+            core_async_job_service._dispatch_core_async_job(MagicMock(), job)
+
+    assert exc_info.value.code == "invalid_import_file"
+
+
+def test_enqueue_import_job_reuses_an_active_job_for_the_same_file():
+    existing = SimpleNamespace(id=uuid4())
+    db = MagicMock()
+    db.scalar.return_value = existing
+
+    job, created = core_async_job_service.enqueue_import_job(
+        db,
+        gym_id=uuid4(),
+        requested_by_user_id=None,
+        job_type=core_async_job_service.CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT,
+        content=_MEMBERS_CSV,
+        filename="alunos.csv",
+        options={},
+    )
+
+    assert (job, created) == (existing, False)
+    db.add.assert_not_called()
+
+
+def test_enqueue_import_job_keys_the_same_file_with_other_options_apart():
+    db = MagicMock()
+    db.scalar.return_value = None
+    gym_id = uuid4()
+
+    def _enqueue(options):
+        job, created = core_async_job_service.enqueue_import_job(
+            db,
+            gym_id=gym_id,
+            requested_by_user_id=None,
+            job_type=core_async_job_service.CORE_ASYNC_JOB_TYPE_MEMBER_IMPORT,
+            content=_MEMBERS_CSV,
+            filename="alunos.csv",
+            options=options,
+        )
+        assert created is True
+        return job.idempotency_key
+
+    first = _enqueue({"column_mappings": {"Nome": "full_name"}, "auto_create_missing_members": False})
+    reordered = _enqueue({"auto_create_missing_members": False, "column_mappings": {"Nome": "full_name"}})
+    corrected = _enqueue({"column_mappings": {"Nome": "full_name"}, "auto_create_missing_members": True})
+
+    assert first == reordered
+    assert corrected != first
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import UUID
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.dependencies import get_current_user
+from app.database import get_db
+from app.models import MemberStatus, RiskLevel
+from app.schemas import MemberRosterPage
+from app.services.member_service import get_member_roster_version, list_member_roster
+from tests.conftest import GYM_ID
+
+UPDATED_AT = datetime(2026, 10, 17, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def _row(index: int, *, deleted: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=UUID(f"00000000-0000-0000-0000-{index:012d}"),
+        full_name=f"Aluno {index}",
+        status=MemberStatus.ACTIVE,
+        risk_level=RiskLevel.GREEN,
+        risk_score=10,
+        preferred_shift="morning",
+        updated_at=UPDATED_AT + timedelta(seconds=index),
+        deleted_at=UPDATED_AT if deleted else None,
+    )
+
+
+def _db(rows: list) -> MagicMock:
+    db = MagicMock()
+    db.execute.return_value.all.return_value = rows
+    return db
+
+
+def _sql(db: MagicMock) -> tuple[str, dict]:
+    compiled = db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_roster_projects_only_light_columns_and_pages_by_keyset():
+    db = _db([_row(1), _row(2), _row(3)])
+
+    page = list_member_roster(db, gym_id=GYM_ID, limit=2)
+
+    sql, params = _sql(db)
+    select_list = sql.split(" FROM ")[0]
+    assert "members.phone" not in select_list
+    assert "members.extra_data" not in select_list
+    assert "members.deleted_at IS NULL" in sql
+    assert "ORDER BY members.updated_at ASC, members.id ASC" in sql
+    assert params["param_1"] == 3
+    assert [item.full_name for item in page.items] == ["Aluno 1", "Aluno 2"]
+    assert page.next_cursor is not None
+
+    list_member_roster(db, gym_id=GYM_ID, limit=2, cursor=page.next_cursor)
+
+    sql, params = _sql(db)
+    assert "members.updated_at > %(updated_at_1)s OR members.updated_at = %(updated_at_2)s" in sql
+    assert params["updated_at_1"] == UPDATED_AT + timedelta(seconds=2)
+    assert params["id_1"] == _row(2).id
+
+
+def test_delta_sync_returns_changes_with_tombstones_and_an_overlap_window():
+    db = _db([_row(1), _row(2, deleted=True)])
+    since = datetime(2026, 10, 17, 11, 0, tzinfo=timezone.utc)
+
+    page = list_member_roster(db, gym_id=GYM_ID, updated_since=since, watermark=UPDATED_AT)
+
+    sql, params = _sql(db)
+    assert "deleted_at IS NULL" not in sql
+    assert params["updated_at_1"] == since - timedelta(minutes=2)
+    assert [item.deleted for item in page.items] == [False, True]
+    assert page.next_cursor is None
+    assert page.watermark == UPDATED_AT
+
+
+def test_roster_rejects_malformed_cursors():
+    with pytest.raises(ValueError, match="Cursor invalido"):
+        list_member_roster(_db([]), gym_id=GYM_ID, cursor="bm90LWpzb24")
+
+
+def test_roster_version_reads_max_updated_at_and_count_per_gym():
+    db = MagicMock()
+    db.execute.return_value.one.return_value = SimpleNamespace(watermark=UPDATED_AT, total=42)
+
+    assert get_member_roster_version(db, gym_id=GYM_ID) == (UPDATED_AT, 42)
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "max(members.updated_at)" in sql
+    assert "members.gym_id =" in sql
+
+
+def test_roster_endpoint_answers_304_when_the_etag_still_matches(app, client, mock_owner):
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    app.dependency_overrides[get_current_user] = lambda: mock_owner
+    try:
+        with (
+            patch("app.routers.members.get_member_roster_version", return_value=(UPDATED_AT, 3)),
+            patch(
+                "app.routers.members.list_member_roster",
+                return_value=MemberRosterPage(items=[], watermark=UPDATED_AT),
+            ) as mock_list,
+        ):
+            first = client.get("/api/v1/members/roster?limit=100")
+            etag = first.headers["etag"]
+            cached = client.get("/api/v1/members/roster?limit=100", headers={"If-None-Match": etag})
+            other_page = client.get("/api/v1/members/roster?limit=50", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert first.json()["watermark"].startswith("2026-10-17T12:00:00.123456")
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert other_page.status_code == 200
+        assert other_page.headers["etag"] != etag
+        assert mock_list.call_count == 2
+        assert mock_list.call_args.kwargs["watermark"] == UPDATED_AT
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,129 @@
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.core.dependencies import get_current_user
+from app.database import get_db
+from app.models import Member
+from app.models.member import MEMBER_EXTERNAL_ID_SQL, MEMBER_PLAN_NAME_FOLD_SQL, MEMBER_SEARCH_TEXT_SQL
+from app.services.member_search_service import (
+    member_plan_search_condition,
+    member_search_condition,
+    search_member_typeahead,
+)
+from app.utils.search_text import escape_like, fold_search_text
+from tests.conftest import GYM_ID
+
+
+def _migration_module(filename: str = "20261017_0050_add_member_search_columns.py"):
+    migration_path = Path(__file__).resolve().parents[1] / "alembic" / "versions" / filename
+    spec = spec_from_file_location("member_search_columns_migration", migration_path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError("Could not load member search migration module.")
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _compile(stmt) -> tuple[str, dict]:
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_fold_search_text_matches_the_generated_column_folding():
+    assert fold_search_text("  João MÁRCIO ") == "joao marcio"
+    assert fold_search_text("Conceição") == "conceicao"
+    assert fold_search_text(None) == ""
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+
+
+def test_migration_generated_columns_match_the_model():
+    migration = _migration_module()
+
+    assert migration.SEARCH_TEXT_SQL == MEMBER_SEARCH_TEXT_SQL
+    assert migration.EXTERNAL_ID_SQL == MEMBER_EXTERNAL_ID_SQL
+
+
+def test_search_condition_uses_the_folded_search_column():
+    condition = member_search_condition(" José_1 ")
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+
+    assert "members.search_text LIKE" in sql
+    assert "ESCAPE" in sql
+    assert condition.compile().params == {"search_text_1": "%jose\\_1%"}
+    assert member_search_condition("   ") is None
+
+
+def test_plan_search_condition_folds_the_plan_name_too():
+    sql, params = _compile(member_plan_search_condition("Básico"))
+
+    assert "lower(translate(members.plan_name, 'áà" in sql
+    assert set(params.values()) == {"%basico%"}
+
+
+def test_plan_name_trigram_index_matches_the_search_expression():
+    migration = _migration_module("20261017_0056_add_member_plan_name_trigram_index.py")
+    index = next(index for index in Member.__table__.indexes if index.name == "ix_members_plan_name_fold_trgm")
+    index_sql = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    search_sql, _params = _compile(member_plan_search_condition("basico"))
+
+    assert migration.PLAN_NAME_FOLD_SQL == MEMBER_PLAN_NAME_FOLD_SQL
+    assert f"USING gin ({MEMBER_PLAN_NAME_FOLD_SQL} gin_trgm_ops)" in index_sql
+    assert MEMBER_PLAN_NAME_FOLD_SQL.replace("plan_name", "members.plan_name") in search_sql
+
+
+def test_typeahead_ranks_exact_external_id_then_prefixes_within_the_gym():
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+
+    search_member_typeahead(db, query="Ana Pau", gym_id=GYM_ID, limit=500)
+
+    stmt = db.execute.call_args.args[0]
+    sql, params = _compile(stmt)
+    assert "ORDER BY CASE WHEN (members.external_id =" in sql
+    assert "similarity(members.search_text" in sql
+    assert "members.gym_id =" in sql
+    assert {"Ana Pau", "ana pau%", "% ana pau%", "%ana pau%"} <= set(params.values())
+    assert stmt._limit_clause.value == 50
+    assert stmt.get_execution_options()["tenant_bypass_reason"] == "member_search.explicit_gym_scope"
+
+
+def test_typeahead_short_terms_only_match_word_prefixes():
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+
+    search_member_typeahead(db, query="jo", gym_id=GYM_ID)
+
+    _sql, params = _compile(db.execute.call_args.args[0])
+    assert "%jo%" not in params.values()
+    assert {"jo%", "% jo%"} <= set(params.values())
+
+
+def test_typeahead_skips_the_query_for_blank_terms():
+    db = MagicMock()
+
+    assert search_member_typeahead(db, query=" ", gym_id=GYM_ID) == []
+    db.execute.assert_not_called()
+
+
+def test_typeahead_endpoint_returns_ranked_ids(app, client, mock_owner):
+    member_id = uuid4()
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    app.dependency_overrides[get_current_user] = lambda: mock_owner
+    try:
+        with patch(
+            "app.routers.members.search_member_typeahead",
+            return_value=[SimpleNamespace(id=member_id, full_name="Ana Paula", external_id="MAT-9")],
+        ) as mock_search:
+            response = client.get("/api/v1/members/typeahead?q=ana&limit=5")
+
+        assert response.status_code == 200
+        assert response.json() == [{"id": str(member_id), "full_name": "Ana Paula", "external_id": "MAT-9"}]
+        assert mock_search.call_args.kwargs == {"query": "ana", "gym_id": GYM_ID, "limit": 5}
+    finally:
+        app.dependency_overrides.clear()
@@ -83,6 +83,7 @@ class TestListMembers:
         assert "plan_name" in compiled
 
     def test_search_matches_external_id(self):
+        from app.models import Member
         from app.services.member_service import list_members
 
         db = MagicMock()
@@ -95,7 +96,9 @@ class TestListMembers:
 
         stmt = db.scalars.call_args.args[0]
         compiled = stmt.compile()
-        assert "external_id" in compiled.params.values()
+        assert "members.search_text LIKE" in str(compiled)
+        assert "%mat-001%" in compiled.params.values()
+        assert "external_id" in Member.__table__.c.search_text.computed.sqltext.text
 
     def test_list_member_index_returns_unpaginated_members(self, mock_member):
         from app.services.member_service import list_member_index
@@ -0,0 +1,201 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models import MonthlyReportArtifact, MonthlyReportDelivery
+from app.services import monthly_report_dispatch_service as dispatch
+from app.services import report_service
+from app.utils.email import EmailSendResult
+
+NOW = datetime(2026, 11, 1, 6, 0, tzinfo=timezone.utc)
+
+
+def _scalars(*batches):
+    results = []
+    for batch in batches:
+        result = MagicMock()
+        result.all.return_value = batch
+        results.append(result)
+    return results
+
+
+def _delivery(artifact_id, email, *, attempt_count=0, status="pending"):
+    return MonthlyReportDelivery(
+        id=uuid4(),
+        gym_id=uuid4(),
+        artifact_id=artifact_id,
+        user_id=uuid4(),
+        email=email,
+        status=status,
+        attempt_count=attempt_count,
+        max_attempts=5,
+        next_attempt_at=NOW,
+    )
+
+
+def test_prepare_renders_the_period_artifact_once_and_queues_a_delivery_per_leader(monkeypatch):
+    gym_id = uuid4()
+    renders = []
+    leaders = [SimpleNamespace(id=uuid4(), email="owner@teste.com"), SimpleNamespace(id=uuid4(), email="gm@teste.com")]
+    monkeypatch.setattr(dispatch, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(
+        dispatch,
+        "generate_dashboard_pdf",
+        lambda *_args, **_kwargs: renders.append(1) or (BytesIO(b"%PDF-1.4 monthly"), "report_consolidated.pdf"),
+    )
+    monkeypatch.setattr(dispatch, "list_monthly_report_recipients", lambda _db: leaders)
+    db = MagicMock()
+    db.scalar.return_value = None
+    db.scalars.side_effect = _scalars([])
+
+    result = dispatch.prepare_monthly_report_dispatch(db, gym_id=gym_id)
+
+    artifact = db.add.call_args_list[0].args[0]
+    deliveries = [call.args[0] for call in db.add.call_args_list[1:]]
+    assert renders == [1]
+    assert isinstance(artifact, MonthlyReportArtifact)
+    assert artifact.period == date(2026, 11, 1)
+    assert artifact.size_bytes == len(b"%PDF-1.4 monthly")
+    assert [delivery.email for delivery in deliveries] == ["owner@teste.com", "gm@teste.com"]
+    assert all(delivery.artifact_id == artifact.id and delivery.next_attempt_at == NOW for delivery in deliveries)
+    assert result["rendered"] is True
+    assert result["deliveries_queued"] == 2
+    assert result["total_recipients"] == 2
+
+
+def test_prepare_reuses_the_artifact_and_only_requeues_failed_recipients(monkeypatch):
+    artifact = MonthlyReportArtifact(id=uuid4(), gym_id=uuid4(), period=date(2026, 11, 1), size_bytes=16)
+    sent = _delivery(artifact.id, "owner@teste.com", attempt_count=1, status="sent")
+    failed = _delivery(artifact.id, "gm@teste.com", attempt_count=5, status="failed")
+    leaders = [SimpleNamespace(id=row.user_id, email=row.email) for row in (sent, failed)]
+    monkeypatch.setattr(dispatch, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(dispatch, "generate_dashboard_pdf", MagicMock(side_effect=AssertionError("re-rendered")))
+    monkeypatch.setattr(dispatch, "list_monthly_report_recipients", lambda _db: leaders)
+    db = MagicMock()
+    db.scalar.return_value = artifact
+    db.scalars.side_effect = _scalars([sent, failed])
+
+    result = dispatch.prepare_monthly_report_dispatch(db, gym_id=artifact.gym_id)
+
+    db.add.assert_not_called()
+    assert sent.status == "sent"
+    assert (failed.status, failed.attempt_count, failed.next_attempt_at) == ("pending", 0, NOW)
+    assert result["rendered"] is False
+    assert (result["deliveries_queued"], result["deliveries_requeued"]) == (0, 1)
+
+
+def test_manual_dispatch_renders_its_own_artifact_and_queues_every_leader(monkeypatch):
+    gym_id, job_id = uuid4(), uuid4()
+    leaders = [SimpleNamespace(id=uuid4(), email="owner@teste.com"), SimpleNamespace(id=uuid4(), email="gm@teste.com")]
+    monkeypatch.setattr(dispatch, "_utcnow", lambda: NOW + timedelta(days=14))
+    monkeypatch.setattr(
+        dispatch,
+        "generate_dashboard_pdf",
+        lambda *_args, **_kwargs: (BytesIO(b"%PDF-1.4 fresh"), "report_consolidated.pdf"),
+    )
+    monkeypatch.setattr(dispatch, "list_monthly_report_recipients", lambda _db: leaders)
+    db = MagicMock()
+    db.scalar.return_value = None
+    db.scalars.side_effect = _scalars([])
+
+    result = dispatch.prepare_monthly_report_dispatch(db, gym_id=gym_id, dispatch_job_id=job_id)
+
+    lookup = str(db.scalar.call_args.args[0].compile(dialect=postgresql.dialect()))
+    artifact = db.add.call_args_list[0].args[0]
+    assert "monthly_report_artifacts.dispatch_job_id = " in lookup
+    assert "monthly_report_artifacts.period" not in lookup.split("WHERE", 1)[1]
+    assert artifact.dispatch_job_id == job_id
+    assert artifact.period == date(2026, 11, 1)
+    assert result["rendered"] is True
+    assert result["deliveries_queued"] == 2
+
+
+def test_process_due_deliveries_sends_concurrently_and_keeps_retry_state_per_recipient(monkeypatch):
+    artifact = MonthlyReportArtifact(id=uuid4(), filename="report_consolidated.pdf", content=b"%PDF monthly")
+    ok = _delivery(artifact.id, "ok@teste.com")
+    flaky = _delivery(artifact.id, "flaky@teste.com")
+    exhausted = _delivery(artifact.id, "exhausted@teste.com", attempt_count=4)
+    blocked = _delivery(artifact.id, "blocked@teste.com")
+    outcomes = {
+        "ok@teste.com": EmailSendResult(sent=True),
+        "flaky@teste.com": EmailSendResult(sent=False, reason="sendgrid_http_error"),
+        "exhausted@teste.com": EmailSendResult(sent=False, reason="sendgrid_http_error"),
+        "blocked@teste.com": EmailSendResult(sent=False, blocked=True, reason="sendgrid_api_key_missing"),
+    }
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def _send(email, _subject, _body, *, filename, attachment_bytes):
+        assert (filename, attachment_bytes) == ("report_consolidated.pdf", b"%PDF monthly")
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return outcomes[email]
+
+    monkeypatch.setattr(dispatch, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(dispatch, "send_email_with_attachment_result", _send)
+    db = MagicMock()
+    db.scalars.side_effect = _scalars([ok, flaky, exhausted, blocked], [artifact])
+
+    result = dispatch.process_due_monthly_report_deliveries(db, batch_size=50, concurrency=2)
+
+    claim_sql = str(db.scalars.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in claim_sql
+    assert result == {"claimed": 4, "sent": 1, "retry_scheduled": 1, "failed": 2}
+    assert (ok.status, ok.sent_at, ok.attempt_count) == ("sent", NOW, 1)
+    assert (flaky.status, flaky.next_attempt_at, flaky.last_error_code) == (
+        "retry_scheduled",
+        NOW + timedelta(minutes=1),
+        "sendgrid_http_error",
+    )
+    assert (exhausted.status, exhausted.attempt_count) == ("failed", 5)
+    assert (blocked.status, blocked.last_error_code) == ("failed", "sendgrid_api_key_missing")
+    assert peak[0] == 2
+
+
+def test_process_due_deliveries_is_a_no_op_without_due_rows():
+    db = MagicMock()
+    db.scalars.side_effect = _scalars([])
+
+    assert dispatch.process_due_monthly_report_deliveries(db, batch_size=10, concurrency=4)["claimed"] == 0
+    assert db.scalars.call_count == 1
+
+
+def test_dispatch_job_only_renders_and_queues_when_the_pipeline_is_enabled(monkeypatch):
+    audit_calls = []
+    monkeypatch.setattr(settings, "monthly_reports_pipeline_enabled", True)
+    monkeypatch.setattr(
+        dispatch,
+        "prepare_monthly_report_dispatch",
+        lambda _db, gym_id, dispatch_job_id: {
+            "rendered": True,
+            "deliveries_queued": 2,
+            "total_recipients": 2,
+            "dispatch_job_id": dispatch_job_id,
+        },
+    )
+    monkeypatch.setattr(report_service, "send_monthly_reports", lambda _db: (_ for _ in ()).throw(AssertionError))
+    monkeypatch.setattr(report_service, "log_audit_event", lambda *_args, **kwargs: audit_calls.append(kwargs))
+    db = SimpleNamespace(get=lambda *_args, **_kwargs: None, flush=lambda: None)
+
+    result = report_service.execute_monthly_reports_dispatch_job(db, gym_id="gym-1", job_id="job-1")
+    manual = report_service.execute_monthly_reports_dispatch_job(
+        db,
+        gym_id="gym-1",
+        job_id="job-2",
+        requested_by_user_id="user-1",
+    )
+
+    assert result["deliveries_queued"] == 2
+    assert audit_calls[0]["details"]["rendered"] is True
+    assert result["dispatch_job_id"] is None
+    assert manual["dispatch_job_id"] == "job-2"
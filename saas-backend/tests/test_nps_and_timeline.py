@@ -145,73 +145,110 @@ class TestNpsEvolution:
 # ---------------------------------------------------------------------------
 
 class TestMemberTimeline:
+    @staticmethod
+    def _row(event_type, occurred_at, payload, event_id=None):
+        return SimpleNamespace(
+            event_type=event_type,
+            event_id=event_id or uuid.uuid4(),
+            occurred_at=occurred_at,
+            payload=payload,
+        )
+
     def test_builds_timeline(self):
-        assessments = [
-            SimpleNamespace(
-                assessment_date=datetime(2026, 3, 5, tzinfo=timezone.utc),
-                assessment_number=1,
-                weight_kg=75.0, body_fat_pct=18.0, strength_score=70,
-                flexibility_score=None, cardio_score=None,
+        rows = [
+            self._row(
+                "body_composition",
+                datetime(2026, 3, 6, tzinfo=timezone.utc),
+                {
+                    "evaluation_date": "2026-03-06",
+                    "source": "ocr_receipt",
+                    "ai_risk_flags_json": ["percentual de gordura acima da faixa", "gordura visceral acima da faixa"],
+                    "health_score": 62,
+                    "actuar_sync_status": "sync_pending",
+                },
             ),
-        ]
-        checkins = [
-            SimpleNamespace(checkin_at=datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc), source=SimpleNamespace(value="manual")),
-        ]
-        risk_alerts = [
-            SimpleNamespace(created_at=datetime(2026, 3, 4, tzinfo=timezone.utc), level=SimpleNamespace(value="yellow"), score=45, resolved=False),
-        ]
-        nps_items = [
-            SimpleNamespace(created_at=datetime(2026, 3, 2, tzinfo=timezone.utc), score=9, sentiment=SimpleNamespace(value="positive"), comment="Otimo"),
-        ]
-        tasks = [
-            SimpleNamespace(
-                created_at=datetime(2026, 3, 3, tzinfo=timezone.utc), title="Follow-up",
-                status=SimpleNamespace(value="todo"), priority=SimpleNamespace(value="medium"),
-                completed_at=None, due_date=None, extra_data={}, deleted_at=None,
-                member_id=MEMBER_ID,
+            self._row(
+                "assessment",
+                datetime(2026, 3, 5, tzinfo=timezone.utc),
+                {"assessment_number": 1, "weight_kg": "75.00", "body_fat_pct": "18.00", "strength_score": 70},
             ),
-        ]
-        audit_events = []
-        bce_list = [
-            SimpleNamespace(
-                evaluation_date=date(2026, 3, 6),
-                source="ocr_receipt",
-                ai_risk_flags_json=["percentual de gordura acima da faixa", "gordura visceral acima da faixa"],
-                health_score=62,
-                actuar_sync_status="sync_pending",
+            self._row(
+                "risk_alert",
+                datetime(2026, 3, 4, tzinfo=timezone.utc),
+                {"level": "YELLOW", "score": 45, "resolved": False},
+            ),
+            self._row(
+                "task",
+                datetime(2026, 3, 3, tzinfo=timezone.utc),
+                {
+                    "title": "Follow-up",
+                    "status": "todo",
+                    "priority": "MEDIUM",
+                    "due_date": "2026-03-10T12:00:00+00:00",
+                    "source": "plan_followup",
+                    "plan_type": "anual",
+                },
             ),
+            self._row("nps", datetime(2026, 3, 2, tzinfo=timezone.utc), {"score": 9, "sentiment": "positive"}),
+            self._row("checkin", datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc), {"source": "MANUAL"}),
         ]
-
         db = MagicMock()
-        # Order matches member_timeline_service: assessments, goals, training_plans,
-        # checkins, risk_alerts, nps_responses, tasks, audit_events, body_composition
-        scalars_results = [
-            MagicMock(all=MagicMock(return_value=assessments)),
-            MagicMock(all=MagicMock(return_value=[])),   # goals
-            MagicMock(all=MagicMock(return_value=[])),   # training_plans
-            MagicMock(all=MagicMock(return_value=checkins)),
-            MagicMock(all=MagicMock(return_value=risk_alerts)),
-            MagicMock(all=MagicMock(return_value=nps_items)),
-            MagicMock(all=MagicMock(return_value=tasks)),
-            MagicMock(all=MagicMock(return_value=audit_events)),
-            MagicMock(all=MagicMock(return_value=bce_list)),
-        ]
-        db.scalars.side_effect = scalars_results
-        db.scalar.return_value = None  # constraints
+        db.execute.return_value.all.return_value = rows
 
         from app.services.member_timeline_service import get_member_timeline
-        result = get_member_timeline(db, MEMBER_ID)
-        assert len(result) == 6  # 1 assessment + 1 checkin + 1 risk + 1 nps + 1 task + 1 bioimpedancia
+        result = get_member_timeline(db, MEMBER_ID, gym_id=GYM_ID)
+
+        db.execute.assert_called_once()
+        assert len(result) == 6
         assert result[0]["title"] == "Bioimpedancia registrada"
+        assert result[0]["timestamp"] == "2026-03-06"
         assert "health score 62" in result[0]["detail"]
         assert "sync pendente" in result[0]["detail"]
+        assert result[1]["detail"] == "Peso: 75.00 kg | Gordura: 18.00% | Forca: 70"
+        assert result[2]["title"] == "Alerta de risco - YELLOW"
+        assert result[2]["level"] == "yellow"
+        assert result[3]["title"] == "[Plano Anual] Follow-up"
+        assert result[3]["detail"] == "Status: todo | Prioridade: medium | Vencimento: 10/03/2026"
+        assert result[4]["detail"] == "Sentimento: positive"
+        assert result[5]["timestamp"] == "2026-03-01T10:00:00+00:00"
+        assert result[5]["detail"] == "Fonte: manual"
+        assert result[5]["id"] == str(rows[5].event_id)
+        assert all(event["cursor"] for event in result)
 
     def test_empty_timeline(self):
         db = MagicMock()
-        empty = MagicMock(all=MagicMock(return_value=[]))
-        db.scalars.side_effect = [empty, empty, empty, empty, empty, empty, empty, empty, empty]
-        db.scalar.return_value = None  # constraints
+        db.execute.return_value.all.return_value = []
 
         from app.services.member_timeline_service import get_member_timeline
         result = get_member_timeline(db, MEMBER_ID)
         assert result == []
+
+    def test_pages_with_one_union_query_filtered_by_type(self):
+        from sqlalchemy.dialects import postgresql
+
+        from app.services.member_timeline_service import get_member_timeline
+        from app.utils.cursor import encode_cursor
+
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        cursor = encode_cursor({"t": "2026-03-01T10:00:00+00:00", "i": str(MEMBER_ID)})
+
+        get_member_timeline(db, MEMBER_ID, limit=20, types=["checkin", "nps"], cursor=cursor, gym_id=GYM_ID)
+
+        compiled = db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert sql.count("UNION ALL") == 1
+        assert "FROM checkins" in sql and "FROM nps_responses" in sql
+        assert "FROM tasks" not in sql
+        assert "checkins.checkin_at < %(checkin_at_1)s OR checkins.checkin_at = %(checkin_at_2)s" in sql
+        assert "checkins.gym_id = %(gym_id_1)s" in sql
+        assert "ORDER BY timeline_events.occurred_at DESC, timeline_events.event_id DESC" in sql
+        assert compiled.params["checkin_at_1"] == datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+    def test_unknown_types_skip_the_query(self):
+        from app.services.member_timeline_service import get_member_timeline
+
+        db = MagicMock()
+
+        assert get_member_timeline(db, MEMBER_ID, types=["unknown"]) == []
+        db.execute.assert_not_called()
@@ -0,0 +1,219 @@
+import json
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import anthropic
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core import ai_gateway
+from app.core.ai_gateway import PROVIDER_CLAUDE, FakeLLMClient
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.models import NPSResponse, NPSSentiment, NPSTrigger
+from app.schemas import NPSResponseCreate
+from app.services import nps_sentiment_batch_service as batch_service
+from app.services import nps_service
+from app.utils import claude
+from app.utils.claude import analyze_sentiment_batch
+
+
+@pytest.fixture(autouse=True)
+def _gateway(monkeypatch):
+    monkeypatch.setattr(settings, "claude_api_key", "test-key")
+    monkeypatch.setattr(settings, "ai_gateway_cache_enabled", False)
+    ai_gateway.reset_ai_gateway()
+    yield
+    ai_gateway.reset_ai_gateway()
+
+
+def _echo_reply(overrides=None):
+    """Answers each item: negative up to score 6, positive above; ``overrides`` patches an item by id or drops it."""
+
+    def _reply(kwargs):
+        content = kwargs["messages"][0]["content"]
+        entries = json.loads(content.split("Feedbacks: ", 1)[1])
+        items = []
+        for entry in entries:
+            if entry["id"] in (overrides or {}) and overrides[entry["id"]] is None:
+                continue
+            item = {
+                "id": entry["id"],
+                "sentiment": "negative" if entry["score"] <= 6 else "positive",
+                "summary": f"Resumo {entry['comment']}",
+            }
+            item.update((overrides or {}).get(entry["id"]) or {})
+            items.append(item)
+        return json.dumps({"items": items})
+
+    return _reply
+
+
+def _pending(gym_id, score, comment, *, sentiment=NPSSentiment.POSITIVE, member_id=None):
+    return NPSResponse(
+        id=uuid4(),
+        gym_id=gym_id,
+        member_id=member_id,
+        score=score,
+        comment=comment,
+        sentiment=sentiment,
+        sentiment_summary="provisorio",
+        trigger=NPSTrigger.MONTHLY,
+        extra_data={"sentiment_status": "pending"},
+    )
+
+
+def _status_error(status_code):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    return anthropic.APIStatusError("erro", response=httpx.Response(status_code, request=request), body=None)
+
+
+def _claim(db, rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    db.scalars.return_value = result
+
+
+def test_analyze_sentiment_batch_sends_one_prompt_and_parses_each_item():
+    fake = FakeLLMClient(_echo_reply({"2": {"sentiment": "furious"}, "3": None}))
+    ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+
+    results, tokens = analyze_sentiment_batch([(9, "Otimo  espaco"), (3, "Sujo"), (8, "Ok")])
+
+    assert fake.calls == 1
+    assert results[0] == (NPSSentiment.POSITIVE, "Resumo Otimo espaco")
+    assert results[1] is None
+    assert results[2] is None
+    assert tokens["input_tokens"] > 0 and tokens["output_tokens"] > 0
+
+
+def test_analyze_sentiment_batch_returns_none_per_item_when_answer_has_no_json():
+    ai_gateway.install_provider_client(PROVIDER_CLAUDE, FakeLLMClient("nao sei"))
+
+    results, _tokens = analyze_sentiment_batch([(9, "Otimo"), (2, "Ruim")])
+
+    assert results == [None, None]
+
+
+def test_process_pending_batches_per_gym_and_falls_back_per_item(monkeypatch):
+    fake = FakeLLMClient(_echo_reply({"2": {"summary": None, "sentiment": None}}))
+    ai_gateway.install_provider_client(PROVIDER_CLAUDE, fake)
+    gym_a, gym_b = uuid4(), uuid4()
+    member_id = uuid4()
+    rows = [
+        _pending(gym_a, 9, "Adoro as aulas"),
+        _pending(gym_a, 7, "Mais ou menos"),
+        _pending(gym_a, 5, "Pessimo", sentiment=NPSSentiment.NEUTRAL, member_id=member_id),
+        _pending(gym_b, 10, "Excelente"),
+        _pending(gym_b, 5, None, sentiment=NPSSentiment.NEGATIVE),
+    ]
+    db = MagicMock()
+    _claim(db, rows)
+    alerts = []
+    monkeypatch.setattr(batch_service, "log_audit_event", lambda *_args, **kwargs: alerts.append(kwargs))
+
+    with patch.object(batch_service, "invalidate_dashboard_cache") as invalidate:
+        result = batch_service.process_pending_nps_sentiment(db, claim_size=50, batch_size=2, concurrency=2)
+
+    assert fake.calls == 3
+    assert result["claimed"] == 5
+    assert result["batches"] == 3
+    assert (result["analyzed"], result["fallback"], result["deferred"]) == (3, 2, 0)
+    assert result["tokens_per_item"] > 0
+    assert [row.extra_data["sentiment_status"] for row in rows] == [
+        "analyzed",
+        "fallback",
+        "analyzed",
+        "analyzed",
+        "fallback",
+    ]
+    assert rows[1].sentiment == NPSSentiment.NEUTRAL
+    assert rows[1].sentiment_summary == "Aluno neutro, oportunidade de melhoria."
+    assert rows[2].sentiment == NPSSentiment.NEGATIVE
+    assert [alert["member_id"] for alert in alerts] == [member_id]
+    assert invalidate.call_count == 2
+    db.flush.assert_called_once()
+
+
+def test_process_pending_defers_batches_refused_by_the_provider(monkeypatch):
+    monkeypatch.setattr(
+        batch_service,
+        "analyze_sentiment_batch",
+        MagicMock(side_effect=CircuitOpenError("claude")),
+    )
+    gym_id = uuid4()
+    fresh = _pending(gym_id, 9, "Otimo")
+    exhausted = _pending(gym_id, 4, "Ruim", sentiment=NPSSentiment.NEGATIVE)
+    exhausted.extra_data = {"sentiment_status": "pending", "sentiment_deferrals": 4}
+    db = MagicMock()
+    _claim(db, [fresh, exhausted])
+
+    with patch.object(batch_service, "invalidate_dashboard_cache"):
+        result = batch_service.process_pending_nps_sentiment(db, claim_size=50, batch_size=10, concurrency=1)
+
+    assert (result["analyzed"], result["fallback"], result["deferred"]) == (0, 1, 1)
+    assert fresh.extra_data == {"sentiment_status": "pending", "sentiment_deferrals": 1}
+    assert exhausted.extra_data == {"sentiment_status": "fallback", "sentiment_deferrals": 5}
+    assert fresh.sentiment_summary == "provisorio"
+
+
+@pytest.mark.parametrize(
+    ("error", "deferred"),
+    [
+        (_status_error(529), True),
+        (anthropic.APITimeoutError(httpx.Request("POST", "https://api.anthropic.com/v1/messages")), True),
+        (_status_error(400), False),
+        (KeyError("content"), False),
+    ],
+)
+def test_analyze_batch_defers_only_provider_failures(monkeypatch, caplog, error, deferred):
+    monkeypatch.setattr(batch_service, "analyze_sentiment_batch", MagicMock(side_effect=error))
+    items = [batch_service._SentimentItem(uuid4(), 9, "Otimo"), batch_service._SentimentItem(uuid4(), 2, "Ruim")]
+
+    with caplog.at_level("WARNING"):
+        outcome = batch_service._analyze_batch(uuid4(), items)
+
+    assert outcome.deferred is deferred
+    assert outcome.results == ([] if deferred else [None, None])
+    assert any(record.exc_info for record in caplog.records) is not deferred
+
+
+def test_analyze_sentiment_batch_bounds_the_claude_call(monkeypatch):
+    monkeypatch.setattr(settings, "nps_sentiment_batch_timeout_seconds", 12)
+    call_model = MagicMock(side_effect=CircuitOpenError("claude"))
+    monkeypatch.setattr(claude, "call_model", call_model)
+
+    with pytest.raises(CircuitOpenError):
+        analyze_sentiment_batch([(9, "Otimo")])
+
+    assert call_model.call_args.kwargs["timeout_seconds"] == 12
+
+
+def test_process_pending_claims_pending_rows_with_skip_locked():
+    db = MagicMock()
+    _claim(db, [])
+
+    result = batch_service.process_pending_nps_sentiment(db, claim_size=10, batch_size=5, concurrency=1)
+
+    sql = str(db.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "nps_responses.extra_data ->> " in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert result["claimed"] == 0
+
+
+def test_create_response_queues_commented_answers_without_calling_claude(monkeypatch):
+    monkeypatch.setattr(settings, "nps_sentiment_batch_enabled", True)
+    monkeypatch.setattr(nps_service, "analyze_sentiment", MagicMock(side_effect=AssertionError("inline call")))
+    monkeypatch.setattr(nps_service, "invalidate_dashboard_cache", lambda *_args, **_kwargs: None)
+    db = MagicMock()
+
+    response = nps_service.create_response(
+        db,
+        NPSResponseCreate(score=3, comment="Muito cheio", trigger=NPSTrigger.MONTHLY),
+        commit=False,
+    )
+
+    assert response.extra_data == {"sentiment_status": "pending"}
+    assert response.sentiment == NPSSentiment.NEGATIVE
+    db.flush.assert_called_once()
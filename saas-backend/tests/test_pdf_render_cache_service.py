@@ -0,0 +1,123 @@
+import os
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.services import pdf_render_cache_service, premium_report_service
+from app.services.pdf_render_cache_service import PdfRenderCache
+from app.services.premium_report_service import (
+    PremiumReportBranding,
+    PremiumReportMetric,
+    PremiumReportPayload,
+    PremiumReportSection,
+    premium_report_cache_key,
+    render_premium_report_pdf,
+)
+
+
+def _payload(**overrides) -> PremiumReportPayload:
+    payload = PremiumReportPayload(
+        report_kind="body_composition",
+        report_scope="member_summary",
+        title="Relatorio premium de bioimpedancia",
+        subtitle="Aluno Piloto",
+        generated_at=datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc),
+        generated_by="Sistema",
+        version="premium-v3",
+        branding=PremiumReportBranding(gym_name="Academia Piloto"),
+        parameters={"evaluation_id": "evaluation-1", "technical": False},
+        sections=[PremiumReportSection(title="Resumo do exame", metrics=[PremiumReportMetric("Peso", "84,5 kg")])],
+    )
+    return replace(payload, **overrides)
+
+
+def test_cache_evicts_least_recently_used_entries_past_the_size_bound(tmp_path):
+    cache = PdfRenderCache(tmp_path, max_bytes=25)
+    cache.put("aa01", b"0123456789")
+    cache.put("bb02", b"0123456789")
+    assert cache.get("aa01") == b"0123456789"
+
+    cache.put("cc03", b"0123456789")
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") == b"0123456789"
+    assert cache.get("cc03") == b"0123456789"
+    assert cache.total_bytes == 20
+    assert sorted(path.name for path in tmp_path.glob("*/*")) == ["aa01.pdf", "cc03.pdf"]
+
+
+def test_cache_rebuilds_its_lru_order_from_disk(tmp_path):
+    writer = PdfRenderCache(tmp_path, max_bytes=100)
+    writer.put("aa01", b"x" * 10)
+    writer.put("bb02", b"y" * 10)
+    old = (datetime.now() - timedelta(hours=1)).timestamp()
+    os.utime(tmp_path / "bb" / "bb02.pdf", (old, old))
+
+    reader = PdfRenderCache(tmp_path, max_bytes=15)
+    reader.put("cc03", b"z" * 5)
+
+    assert reader.get("bb02") is None
+    assert reader.get("aa01") == b"x" * 10
+    assert reader.total_bytes == 15
+
+
+def test_cache_bound_covers_every_process_sharing_the_directory(tmp_path):
+    workers = [PdfRenderCache(tmp_path, max_bytes=25) for _ in range(3)]
+
+    for index, worker in enumerate(workers * 2):
+        worker.put(f"{index:02d}aa", b"x" * 10)
+
+    assert workers[0].total_bytes == 20
+    assert sum(path.stat().st_size for path in tmp_path.glob("*/*.pdf")) <= 25
+    assert workers[1].get("05aa") == b"x" * 10
+    assert workers[2].get("00aa") is None
+
+
+def test_cache_skips_documents_larger_than_the_whole_cache(tmp_path):
+    cache = PdfRenderCache(tmp_path, max_bytes=4)
+
+    cache.put("aa01", b"too large")
+
+    assert cache.get("aa01") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_key_follows_build_date_content_and_version():
+    key = premium_report_cache_key(_payload())
+
+    assert premium_report_cache_key(_payload(generated_at=datetime(2026, 10, 17, 23, 59, tzinfo=timezone.utc))) == key
+    assert premium_report_cache_key(_payload(generated_at=datetime(2026, 10, 18, tzinfo=timezone.utc))) != key
+    assert premium_report_cache_key(_payload(version="premium-v4")) != key
+    assert premium_report_cache_key(_payload(parameters={"evaluation_id": "evaluation-2", "technical": False})) != key
+    assert premium_report_cache_key(_payload(report_scope="technical")) != key
+
+
+def test_render_premium_report_pdf_serves_repeat_renders_from_cache(tmp_path, monkeypatch):
+    renders = []
+    monkeypatch.setattr(settings, "pdf_render_cache_enabled", True)
+    monkeypatch.setattr(settings, "pdf_render_cache_dir", str(tmp_path))
+    monkeypatch.setattr(pdf_render_cache_service, "_cache", None)
+    monkeypatch.setattr(
+        premium_report_service,
+        "render_pdf",
+        lambda request: renders.append(request) or f"%PDF {len(renders)}".encode(),
+    )
+
+    first = render_premium_report_pdf(_payload())
+    repeat = render_premium_report_pdf(_payload(generated_at=datetime(2026, 10, 17, 18, 30, tzinfo=timezone.utc)))
+    changed = render_premium_report_pdf(_payload(parameters={"evaluation_id": "evaluation-2", "technical": False}))
+    next_day = render_premium_report_pdf(_payload(generated_at=datetime(2026, 10, 18, 9, 0, tzinfo=timezone.utc)))
+
+    assert first == repeat == b"%PDF 1"
+    assert changed == b"%PDF 2"
+    assert next_day == b"%PDF 3"
+    assert len(renders) == 3
+    assert renders[0].media == "print"
+
+
+def test_render_premium_report_pdf_bypasses_the_cache_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "pdf_render_cache_enabled", False)
+    monkeypatch.setattr(premium_report_service, "render_pdf", lambda request: b"%PDF fresh")
+
+    assert render_premium_report_pdf(_payload()) == b"%PDF fresh"
+    assert pdf_render_cache_service.get_pdf_render_cache() is None
@@ -0,0 +1,204 @@
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services import pdf_renderer_service
+from app.services.pdf_renderer_service import PdfRendererPool, PdfRenderRequest, render_pdf
+
+
+class _FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.contents: list[str] = []
+
+    def set_viewport_size(self, viewport):
+        self.viewport = viewport
+
+    def set_content(self, html, wait_until):
+        if html == "boom":
+            raise RuntimeError("render crashed")
+        self.contents.append(html)
+
+    def emulate_media(self, media):
+        self.media = media
+
+    def pdf(self, **kwargs):
+        return f"%PDF {self.contents[-1]}".encode()
+
+    def goto(self, url):
+        self.contents.append(url)
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.pages: list[_FakePage] = []
+
+    def is_connected(self):
+        return self.connected
+
+    def new_page(self, viewport):
+        page = _FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def close(self):
+        self.connected = False
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.browsers: list[_FakeBrowser] = []
+        self.chromium = self
+        self.threads: set[str] = set()
+
+    def launch(self, headless):
+        self.threads.add(threading.current_thread().name)
+        browser = _FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    driver = _FakePlaywright()
+    monkeypatch.setattr(pdf_renderer_service, "_start_playwright", lambda: driver)
+    return driver
+
+
+def test_pool_reuses_one_warm_browser_and_recycles_its_page(fake_playwright):
+    pool = PdfRendererPool(size=1, max_renders=10)
+    try:
+        results = [pool.render(PdfRenderRequest(html=f"<p>{index}</p>"), timeout=5) for index in range(3)]
+    finally:
+        pool.shutdown()
+
+    assert results == [b"%PDF <p>0</p>", b"%PDF <p>1</p>", b"%PDF <p>2</p>"]
+    assert len(fake_playwright.browsers) == 1
+    assert len(fake_playwright.browsers[0].pages) == 1
+    assert fake_playwright.browsers[0].pages[0].contents[-1] == "about:blank"
+    assert fake_playwright.threads == {"pdf-renderer-0"}
+    assert fake_playwright.browsers[0].connected is False
+
+
+def test_pool_restarts_the_browser_after_max_renders_and_after_failures(fake_playwright):
+    pool = PdfRendererPool(size=1, max_renders=2)
+    try:
+        pool.render(PdfRenderRequest(html="a"), timeout=5)
+        pool.render(PdfRenderRequest(html="b"), timeout=5)
+        pool.render(PdfRenderRequest(html="c"), timeout=5)
+        with pytest.raises(RuntimeError, match="render crashed"):
+            pool.render(PdfRenderRequest(html="boom"), timeout=5)
+        assert pool.render(PdfRenderRequest(html="d"), timeout=5) == b"%PDF d"
+        fake_playwright.browsers[-1].connected = False
+        pool.render(PdfRenderRequest(html="e"), timeout=5)
+        health = pool.health()
+    finally:
+        pool.shutdown()
+
+    assert len(fake_playwright.browsers) == 4
+    assert health["renders"] == 5
+    assert health["failures"] == 1
+    assert health["restarts"] == 3
+    assert health["browsers_alive"] == 1
+    assert health["slots"] == 1
+    assert health["p95_ms"] >= health["p50_ms"] >= 0
+
+
+def test_pool_render_times_out_while_every_slot_is_busy(fake_playwright, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    original = pdf_renderer_service._print_page
+
+    def _slow_print(page, request):
+        started.set()
+        release.wait(5)
+        return original(page, request)
+
+    monkeypatch.setattr(pdf_renderer_service, "_print_page", _slow_print)
+    pool = PdfRendererPool(size=1, max_renders=10)
+    try:
+        blocking = threading.Thread(target=pool.render, args=(PdfRenderRequest(html="slow"),), kwargs={"timeout": 5})
+        blocking.start()
+        assert started.wait(5)
+        with pytest.raises(RuntimeError, match="pdf_render_timeout"):
+            pool.render(PdfRenderRequest(html="queued"), timeout=0.05)
+        release.set()
+        blocking.join(5)
+    finally:
+        pool.shutdown()
+
+    assert pool.health()["renders"] == 1
+
+
+def test_render_pdf_posts_to_the_renderer_process(monkeypatch):
+    captured = {}
+
+    def _post(url, json, headers, timeout):
+        captured.update(url=url, json=json, headers=headers)
+        return httpx.Response(200, content=b"%PDF remote", request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(settings, "pdf_renderer_url", "http://renderer:8100/")
+    monkeypatch.setattr(settings, "pdf_renderer_token", "secret")
+    monkeypatch.setattr(pdf_renderer_service.httpx, "post", _post)
+    monkeypatch.setattr(pdf_renderer_service, "_render_local", lambda request: pytest.fail("rendered locally"))
+
+    assert render_pdf(PdfRenderRequest(html="<p>x</p>", media="print")) == b"%PDF remote"
+    assert captured["url"] == "http://renderer:8100/render"
+    assert captured["headers"] == {"X-Renderer-Token": "secret"}
+    assert captured["json"]["media"] == "print"
+
+
+def test_render_pdf_falls_back_locally_only_when_the_renderer_is_down(monkeypatch):
+    def _unreachable(url, **_kwargs):
+        raise httpx.ConnectError("connection refused", request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(settings, "pdf_renderer_url", "http://renderer:8100")
+    monkeypatch.setattr(pdf_renderer_service.httpx, "post", _unreachable)
+    monkeypatch.setattr(pdf_renderer_service, "_render_local", lambda request: b"%PDF local")
+
+    assert render_pdf(PdfRenderRequest(html="x")) == b"%PDF local"
+
+    def _rejected(url, **_kwargs):
+        return httpx.Response(401, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(pdf_renderer_service.httpx, "post", _rejected)
+    with pytest.raises(RuntimeError, match="pdf_renderer_rejected:401"):
+        render_pdf(PdfRenderRequest(html="x"))
+
+
+def test_renderer_process_checks_the_token_and_reports_pool_health(fake_playwright, monkeypatch):
+    from app import pdf_renderer
+
+    pool = PdfRendererPool(size=1, max_renders=10)
+    monkeypatch.setattr(pdf_renderer, "get_renderer_pool", lambda: pool)
+    monkeypatch.setattr(settings, "pdf_renderer_token", "secret")
+
+    with TestClient(pdf_renderer.app) as client:
+        denied = client.post("/render", json={"html": "<p>x</p>"})
+        rendered = client.post("/render", json={"html": "<p>x</p>"}, headers={"X-Renderer-Token": "secret"})
+        health = client.get("/health").json()
+
+    assert denied.status_code == 401
+    assert rendered.status_code == 200
+    assert rendered.headers["content-type"] == "application/pdf"
+    assert rendered.content == b"%PDF <p>x</p>"
+    assert health["renders"] == 1
+
+
+def test_renderer_refuses_every_request_and_startup_without_a_token(fake_playwright, monkeypatch):
+    from app import pdf_renderer
+
+    monkeypatch.setattr(settings, "pdf_renderer_token", "")
+    monkeypatch.setattr(pdf_renderer, "get_renderer_pool", lambda: pytest.fail("pool started without a token"))
+
+    assert not pdf_renderer_service.renderer_token_matches(None)
+    assert not pdf_renderer_service.renderer_token_matches("")
+    with pytest.raises(RuntimeError, match="PDF_RENDERER_TOKEN"):
+        with TestClient(pdf_renderer.app):
+            pass
@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+from redis.exceptions import RedisError
+
+from app.core import circuit_breaker, redis_client, token_bucket
+from app.core.redis_client import LazyRedis
+
+
+def test_lazy_redis_retries_a_failed_connect_after_the_retry_interval(monkeypatch):
+    now = [100.0]
+    connected = MagicMock()
+    redis_cls = MagicMock()
+    redis_cls.from_url.side_effect = [RedisError("down"), connected]
+    monkeypatch.setattr(redis_client, "Redis", redis_cls)
+    monkeypatch.setattr(redis_client.settings, "redis_url", "redis://localhost:6379/0")
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: now[0])
+    lazy = LazyRedis("falha", retry_seconds=30)
+
+    assert lazy.get() is None
+    assert lazy.get() is None
+    now[0] += 30
+
+    assert lazy.get() is connected
+    assert lazy.get() is connected
+    assert redis_cls.from_url.call_count == 2
+    assert redis_cls.from_url.call_args.kwargs["socket_timeout"] == redis_client.REDIS_SOCKET_TIMEOUT_SECONDS
+    assert redis_cls.from_url.call_args.kwargs["socket_connect_timeout"] == redis_client.REDIS_SOCKET_TIMEOUT_SECONDS
+
+
+def test_lazy_redis_stays_local_without_redis_url(monkeypatch):
+    redis_cls = MagicMock()
+    monkeypatch.setattr(redis_client, "Redis", redis_cls)
+    monkeypatch.setattr(redis_client.settings, "redis_url", "")
+    lazy = LazyRedis("falha")
+
+    assert lazy.get() is None
+    assert lazy.get() is None
+    redis_cls.from_url.assert_not_called()
+
+
+def test_breaker_and_token_bucket_share_the_lazy_connection_helper():
+    assert isinstance(circuit_breaker._lazy_redis, LazyRedis)
+    assert isinstance(token_bucket._lazy_redis, LazyRedis)
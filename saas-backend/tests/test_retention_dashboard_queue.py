@@ -3,6 +3,9 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 from uuid import UUID
 
+import pytest
+from sqlalchemy.exc import OperationalError
+
 from app.core.dependencies import get_current_user
 from app.database import get_db
 from app.models import Member, RiskLevel
@@ -10,6 +13,12 @@ from app.schemas import PaginatedResponse
 from app.schemas.dashboard import RetentionPlaybookStep, RetentionQueueItem
 
 
+def _stage_histogram(total: int, stage: str = "cold_base"):
+    result = MagicMock()
+    result.all.return_value = [SimpleNamespace(retention_stage=stage, stage_total=total, selected_total=total)]
+    return result
+
+
 class TestRetentionQueueService:
     def test_plan_cycle_filter_prioritizes_visible_plan_name_over_stale_extra_data(self):
         from app.services.dashboard_service import _retention_plan_cycle_filter
@@ -90,7 +99,7 @@ class TestRetentionQueueService:
 
         contact_rows = MagicMock()
         contact_rows.all.return_value = []
-        db.execute.side_effect = [queue_rows, contact_rows]
+        db.execute.side_effect = [_stage_histogram(1), queue_rows, contact_rows]
 
         result = get_retention_queue(db, page=1, page_size=50)
 
@@ -100,6 +109,59 @@ class TestRetentionQueueService:
         assert result.items[0].churn_type == "voluntary_dissatisfaction"
         assert result.items[0].forecast_60d == 41
 
+    @patch("app.services.dashboard_service.classify_churn_type", return_value="involuntary_inactivity")
+    @patch("app.services.dashboard_service.classify_churn_types", side_effect=OperationalError("SELECT", {}, None))
+    @patch("app.services.dashboard_service.build_retention_playbook", return_value=[])
+    @patch("app.services.dashboard_service.get_current_gym_id")
+    def test_logs_a_failed_bulk_churn_classification_and_classifies_each_member(
+        self,
+        mock_get_current_gym_id,
+        _mock_build_playbook,
+        _mock_classify_churn_types,
+        mock_classify_churn_type,
+        gym_id,
+    ):
+        from app.services.dashboard_service import get_retention_queue
+
+        mock_get_current_gym_id.return_value = gym_id
+        member = SimpleNamespace(
+            id=UUID("33333333-3333-3333-3333-333333333340"),
+            full_name="Membro Sem Churn",
+            email=None,
+            phone=None,
+            plan_name="Plano Mensal",
+            risk_score=60,
+            risk_level=RiskLevel.YELLOW,
+            nps_last_score=None,
+            last_checkin_at=datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc),
+            churn_type=None,
+            extra_data={},
+            join_date=date(2025, 9, 1),
+        )
+        alert = SimpleNamespace(
+            id=UUID("44444444-4444-4444-4444-444444444450"),
+            score=60,
+            level=RiskLevel.YELLOW,
+            reasons={},
+            action_history=[],
+            automation_stage=None,
+            created_at=datetime(2026, 3, 20, 12, 0, tzinfo=timezone.utc),
+        )
+        queue_rows = MagicMock()
+        queue_rows.all.return_value = [(alert, member)]
+        contact_rows = MagicMock()
+        contact_rows.all.return_value = []
+        db = MagicMock()
+        db.scalars.return_value.all.return_value = []
+        db.execute.side_effect = [_stage_histogram(1), queue_rows, contact_rows]
+
+        with patch("app.services.dashboard_service.logger.exception") as log_exception:
+            result = get_retention_queue(db, page=1, page_size=50)
+
+        log_exception.assert_called_once()
+        mock_classify_churn_type.assert_called_once_with(db, member)
+        assert result.items[0].churn_type == "involuntary_inactivity"
+
     @patch("app.services.dashboard_service.build_retention_playbook")
     @patch("app.services.dashboard_service.get_current_gym_id")
     def test_returns_paginated_alert_queue_with_member_snapshot(self, mock_get_current_gym_id, mock_build_playbook, gym_id):
@@ -182,7 +244,7 @@ class TestRetentionQueueService:
             SimpleNamespace(member_id=member_red_id, last_at=datetime(2026, 3, 15, 18, 0, tzinfo=timezone.utc))
         ]
 
-        db.execute.side_effect = [queue_rows, contact_rows]
+        db.execute.side_effect = [_stage_histogram(2), queue_rows, contact_rows]
 
         result = get_retention_queue(db, page=1, page_size=50)
 
@@ -261,7 +323,7 @@ class TestRetentionQueueService:
 
         contact_rows = MagicMock()
         contact_rows.all.return_value = []
-        db.execute.side_effect = [queue_rows, contact_rows]
+        db.execute.side_effect = [_stage_histogram(1), queue_rows, contact_rows]
 
         result = get_retention_queue(db, page=1, page_size=50)
 
@@ -353,7 +415,7 @@ class TestRetentionQueueService:
 
         contact_rows = MagicMock()
         contact_rows.all.return_value = []
-        db.execute.side_effect = [queue_rows, contact_rows]
+        db.execute.side_effect = [_stage_histogram(1), queue_rows, contact_rows]
 
         result = get_retention_queue(db, page=1, page_size=50)
 
@@ -362,6 +424,107 @@ class TestRetentionQueueService:
         assert result.items[0].risk_score >= 90
 
 
+    @patch("app.services.dashboard_service.get_current_gym_id")
+    def test_total_and_stage_counts_come_from_one_grouped_query(self, mock_get_current_gym_id, gym_id):
+        from sqlalchemy.dialects import postgresql
+
+        from app.services.dashboard_service import get_retention_queue
+
+        mock_get_current_gym_id.return_value = gym_id
+        histogram = MagicMock()
+        histogram.all.return_value = [
+            SimpleNamespace(retention_stage="attention", stage_total=4, selected_total=1),
+            SimpleNamespace(retention_stage="cold_base", stage_total=9, selected_total=2),
+        ]
+        page_rows = MagicMock()
+        page_rows.all.return_value = []
+        db = MagicMock()
+        db.execute.side_effect = [histogram, page_rows]
+
+        result = get_retention_queue(db, page=1, page_size=50, search="ana")
+
+        assert result.total == 3
+        assert result.stage_counts["attention"] == 4
+        assert result.stage_counts["cold_base"] == 9
+        assert result.stage_counts["monitoring"] == 0
+        assert result.next_cursor is None
+        db.scalar.assert_not_called()
+        sql = str(db.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "count(*) FILTER (WHERE anon_1.selected)" in sql
+        assert "GROUP BY anon_1.retention_stage" in sql
+
+    @patch("app.services.dashboard_service.build_retention_playbook")
+    @patch("app.services.dashboard_service.get_current_gym_id")
+    def test_cursor_pages_by_keyset_and_builds_each_playbook_once(self, mock_get_current_gym_id, mock_build_playbook, gym_id):
+        from app.services.dashboard_service import get_retention_queue
+        from app.utils.cursor import decode_cursor, encode_cursor
+
+        mock_get_current_gym_id.return_value = gym_id
+        mock_build_playbook.return_value = []
+
+        def _row(index: int):
+            return (
+                SimpleNamespace(
+                    id=UUID(f"44444444-4444-4444-4444-44444444445{index}"),
+                    score=80,
+                    level=RiskLevel.RED,
+                    reasons={},
+                    action_history=[],
+                    automation_stage="d30",
+                    created_at=datetime(2026, 3, 20, 12, 0, tzinfo=timezone.utc),
+                ),
+                SimpleNamespace(
+                    id=UUID(f"33333333-3333-3333-3333-33333333335{index}"),
+                    full_name=f"Aluno {index}",
+                    email=None,
+                    phone=None,
+                    plan_name="Plano Mensal",
+                    risk_score=80,
+                    risk_level=RiskLevel.RED,
+                    nps_last_score=7,
+                    last_checkin_at=datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc),
+                    churn_type="involuntary_inactivity",
+                    extra_data={},
+                    join_date=date(2025, 1, 10),
+                ),
+            )
+
+        page_rows = MagicMock()
+        page_rows.all.return_value = [_row(1), _row(2), _row(3)]
+        contact_rows = MagicMock()
+        contact_rows.all.return_value = []
+        db = MagicMock()
+        db.scalars.return_value.all.return_value = []
+        db.execute.side_effect = [_stage_histogram(10), page_rows, contact_rows]
+        cursor = encode_cursor({"p": 5, "s": 90, "n": "aluno 0", "i": "44444444-4444-4444-4444-444444444450"})
+
+        result = get_retention_queue(db, page=1, page_size=2, cursor=cursor)
+
+        stmt = db.execute.call_args_list[1].args[0]
+        compiled = str(stmt)
+        assert stmt._offset_clause is None
+        assert stmt._limit_clause.value == 3
+        assert "greatest" in compiled
+        assert "lower(members.full_name) >" in compiled
+        assert [item.full_name for item in result.items] == ["Aluno 1", "Aluno 2"]
+        assert decode_cursor(result.next_cursor) == {
+            "i": "44444444-4444-4444-4444-444444444452",
+            "n": "aluno 2",
+            "p": 5,
+            "s": 90,
+        }
+        assert mock_build_playbook.call_count == 1
+
+    def test_rejects_tampered_cursor(self):
+        from app.services.dashboard_service import get_retention_queue
+        from app.utils.cursor import encode_cursor
+
+        db = MagicMock()
+        db.execute.return_value.all.return_value = []
+        with pytest.raises(ValueError):
+            get_retention_queue(db, cursor=encode_cursor({"p": "x"}), gym_id=UUID("11111111-1111-1111-1111-111111111111"))
+
+
 class TestRetentionQueueRoute:
     def test_requires_authentication(self, client):
         response = client.get("/api/v1/dashboards/retention/queue")
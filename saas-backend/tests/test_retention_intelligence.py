@@ -4,12 +4,15 @@ Test retention intelligence: churn classification and playbook materialization.
 import uuid
 from datetime import date, timedelta
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from app.models.enums import ChurnType
+from app.services import retention_intelligence_service
 from app.services.retention_intelligence_service import (
     classify_churn_type,
+    classify_churn_types,
     build_retention_playbook,
+    run_daily_retention_intelligence,
 )
 
 MEMBER_ID = uuid.UUID("33333333-3333-3333-3333-333333333333")
@@ -86,6 +89,46 @@ def test_inactivity_classification():
     assert churn_type == ChurnType.INVOLUNTARY_INACTIVITY.value
 
 
+def test_bulk_classification_runs_one_seasonal_query_for_pending_members():
+    """Only members that need check-in history are counted, in a single grouped query."""
+    seasonal_member = SimpleNamespace(**{**vars(_make_member(nps=7, risk_score=50)), "id": uuid.uuid4()})
+    active_member = SimpleNamespace(**{**vars(_make_member(nps=7, risk_score=65)), "id": uuid.uuid4()})
+    unhappy_member = SimpleNamespace(**{**vars(_make_member(nps=3, risk_score=50)), "id": uuid.uuid4()})
+    db = MagicMock()
+    db.execute.return_value.all.return_value = [SimpleNamespace(member_id=active_member.id, total=8)]
+
+    churn_types = classify_churn_types(db, [seasonal_member, active_member, unhappy_member])
+
+    assert churn_types == {
+        seasonal_member.id: ChurnType.INVOLUNTARY_SEASONAL.value,
+        active_member.id: ChurnType.INVOLUNTARY_INACTIVITY.value,
+        unhappy_member.id: ChurnType.VOLUNTARY_DISSATISFACTION.value,
+    }
+    assert db.execute.call_count == 1
+    db.scalar.assert_not_called()
+
+
+def test_daily_job_falls_back_to_per_member_classification_when_the_batch_fails():
+    """A failing bulk classification is logged and each member is classified on its own."""
+    members = [SimpleNamespace(**{**vars(_make_member(nps=3)), "id": uuid.uuid4()}) for _ in range(2)]
+    db = MagicMock()
+
+    with (
+        patch.object(retention_intelligence_service, "iter_keyset_batches", return_value=iter([members])),
+        patch.object(retention_intelligence_service, "classify_churn_types", side_effect=RuntimeError("boom")),
+        patch.object(retention_intelligence_service, "calculate_member_retention_stage", return_value=("monitor", 3)),
+        patch.object(retention_intelligence_service, "build_retention_playbook", return_value=[]),
+        patch.object(retention_intelligence_service, "materialize_playbook", return_value=[]),
+        patch.object(retention_intelligence_service.logger, "exception") as log_exception,
+    ):
+        result = run_daily_retention_intelligence(db)
+
+    assert result["members_classified"] == 2
+    assert [member.churn_type for member in members] == [ChurnType.VOLUNTARY_DISSATISFACTION.value] * 2
+    log_exception.assert_called_once()
+    db.commit.assert_called_once()
+
+
 def test_build_retention_playbook_returns_list():
     """build_retention_playbook should return a non-empty list for known churn types."""
     db = MagicMock()
@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import numpy as np
+
+from app.services.risk import PrefetchedCheckinMetrics, calculate_risk_score, calculate_risk_scores, score_risk_batch
+
+
+NOW = datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc)
+
+
+def _random_member(rng: random.Random) -> SimpleNamespace:
+    join_date = None if rng.random() < 0.1 else (NOW - timedelta(days=rng.randint(-3, 900))).date()
+    last_checkin_at = None if rng.random() < 0.2 else NOW - timedelta(minutes=rng.randint(0, 120 * 24 * 60))
+    return SimpleNamespace(
+        id=uuid4(),
+        join_date=join_date,
+        last_checkin_at=last_checkin_at,
+        nps_last_score=rng.randint(0, 10),
+        loyalty_months=rng.randint(0, 60),
+    )
+
+
+def _random_metrics(rng: random.Random) -> PrefetchedCheckinMetrics | None:
+    if rng.random() < 0.15:
+        return None
+    return PrefetchedCheckinMetrics(
+        current_week_count=rng.randint(0, 8),
+        baseline_total=rng.choice([0, rng.randint(0, 9), rng.randint(9, 60)]),
+        recent_mode_hour=rng.choice([None, rng.randint(0, 23)]),
+        previous_mode_hour=rng.choice([None, rng.randint(0, 23)]),
+    )
+
+
+def test_batch_scores_match_scalar_scoring_for_random_members():
+    rng = random.Random(20261017)
+    members = [_random_member(rng) for _ in range(3000)]
+    metrics_by_member = {member.id: _random_metrics(rng) for member in members}
+    metrics_by_member = {member_id: metrics for member_id, metrics in metrics_by_member.items() if metrics}
+    db = MagicMock()
+
+    batch_results = calculate_risk_scores(members, NOW, metrics_by_member)
+
+    for member in members:
+        expected = calculate_risk_score(
+            db, member, NOW, metrics_by_member.get(member.id, PrefetchedCheckinMetrics())
+        )
+        assert batch_results[member.id] == expected
+    db.scalar.assert_not_called()
+
+
+def test_score_risk_batch_treats_missing_join_and_modes_as_unknown():
+    batch = score_risk_batch(
+        days_without_checkin=np.array([5, 5]),
+        days_since_join=np.array([-1, 3]),
+        current_week_count=np.array([0, 0]),
+        baseline_total=np.array([4, 27]),
+        recent_mode_hour=np.array([-1, 18]),
+        previous_mode_hour=np.array([7, 7]),
+        nps_last_score=np.array([9, 9]),
+        loyalty_months=np.array([0, 0]),
+    )
+
+    assert batch.score.tolist() == [10, 30]
+    assert batch.result(0).reasons["frequency_drop_pct"] is None
+    assert batch.result(1).reasons["onboarding_discount"] == 10
+    assert batch.result(1).reasons["shift_change_hours"] == 11
+
+
+def test_calculate_risk_scores_handles_empty_batch():
+    assert calculate_risk_scores([], NOW, {}) == {}
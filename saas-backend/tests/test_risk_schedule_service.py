@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Checkin, Member, NPSResponse, RiskLevel
+from app.services import risk as risk_service
+from app.services.risk import PrefetchedCheckinMetrics, next_risk_evaluation_at
+from app.services.risk_schedule_service import (
+    collect_risk_input_changes,
+    mark_risk_inputs_changed,
+    schedule_next_risk_evaluations,
+)
+
+
+NOW = datetime(2026, 10, 17, 3, 0, tzinfo=timezone.utc)
+
+
+def _member(**kwargs):
+    defaults = dict(
+        id=uuid4(),
+        gym_id=uuid4(),
+        join_date=date(2025, 1, 10),
+        last_checkin_at=NOW - timedelta(days=5, hours=2),
+        nps_last_score=8,
+        loyalty_months=12,
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_collect_changes_from_checkins_nps_and_member_inputs():
+    gym_id = uuid4()
+    checkin = Checkin(gym_id=gym_id, member_id=uuid4())
+    nps = NPSResponse(gym_id=gym_id, member_id=uuid4(), score=4)
+    anonymous_nps = NPSResponse(gym_id=gym_id, member_id=None, score=9)
+    member = Member(id=uuid4(), gym_id=gym_id, full_name="Ana")
+    scored_only = Member(id=uuid4(), gym_id=gym_id, full_name="Bia")
+    for obj in (member, scored_only):
+        set_committed_value(obj, "nps_last_score", 8)
+        set_committed_value(obj, "risk_score", 10)
+    member.nps_last_score = 3
+    scored_only.risk_score = 55
+    session = SimpleNamespace(new=[checkin, nps, anonymous_nps], dirty=[member, scored_only], deleted=[])
+
+    markers = collect_risk_input_changes(session)
+
+    assert markers == {
+        (gym_id, checkin.member_id): "checkin",
+        (gym_id, nps.member_id): "nps",
+        (gym_id, member.id): "member",
+    }
+
+
+def test_mark_inputs_changed_makes_member_due_now():
+    connection = MagicMock()
+
+    mark_risk_inputs_changed(connection, {(uuid4(), uuid4()): "checkin"})
+
+    sql = _sql(connection.execute.call_args.args[0])
+    assert "ON CONFLICT (member_id) DO UPDATE" in sql
+    assert "due_at = now()" in sql
+    assert "changed_at = now()" in sql
+
+
+def test_schedule_keeps_rows_changed_during_the_run_due():
+    db = MagicMock()
+
+    schedule_next_risk_evaluations(db, {(uuid4(), uuid4()): NOW + timedelta(days=2)}, processed_at=NOW)
+
+    sql = _sql(db.execute.call_args.args[0])
+    assert "member_risk_schedules.changed_at IS NULL OR member_risk_schedules.changed_at <" in sql
+
+
+def test_next_evaluation_is_next_inactivity_step():
+    member = _member()
+
+    assert next_risk_evaluation_at(member, NOW) == member.last_checkin_at + timedelta(days=7)
+
+
+def test_next_evaluation_tracks_onboarding_and_window_boundaries():
+    new_member = _member(join_date=date(2026, 10, 12), last_checkin_at=None)
+    join_dt = datetime(2026, 10, 12, tzinfo=timezone.utc)
+    window_change = NOW + timedelta(hours=6)
+
+    assert next_risk_evaluation_at(new_member, NOW) == join_dt + timedelta(days=7)
+    metrics = PrefetchedCheckinMetrics(next_window_change_at=window_change)
+    assert next_risk_evaluation_at(_member(), NOW, metrics) == window_change
+
+
+def test_next_evaluation_is_capped_for_long_inactive_members():
+    member = _member(last_checkin_at=NOW - timedelta(days=120))
+
+    assert next_risk_evaluation_at(member, NOW) == NOW + timedelta(days=7)
+
+
+def test_incremental_run_processes_only_due_members(monkeypatch):
+    due_member = _member(risk_score=10, risk_level=RiskLevel.GREEN, extra_data={}, deleted_at=None, status="active")
+    result = risk_service.RiskResult(score=12, level=RiskLevel.GREEN, reasons={}, days_without_checkin=5)
+    scheduled = []
+
+    monkeypatch.setattr(risk_service.settings, "risk_incremental_enabled", True)
+    tomorrow_weekday = (datetime.now(tz=timezone.utc).weekday() + 1) % 7
+    monkeypatch.setattr(risk_service.settings, "risk_full_sweep_weekday", tomorrow_weekday)
+    monkeypatch.setattr(risk_service, "_due_member_ids_for_risk_processing", lambda *_a: [due_member.id])
+    monkeypatch.setattr(risk_service, "_iter_due_members_for_risk_processing", lambda *_a, **_kw: [[due_member]])
+    monkeypatch.setattr(
+        risk_service,
+        "_iter_active_members_for_risk_processing",
+        lambda *_a, **_kw: (_ for _ in ()).throw(AssertionError("full sweep must not run")),
+    )
+    monkeypatch.setattr(
+        risk_service, "calculate_risk_scores", lambda members, *_: {m.id: result for m in members}
+    )
+    monkeypatch.setattr(risk_service, "invalidate_dashboard_cache", lambda *_: None)
+    monkeypatch.setattr(risk_service, "_prefetch_open_risk_alerts", lambda *_a, **_kw: {})
+    monkeypatch.setattr(risk_service, "_prefetch_open_call_tasks", lambda *_a, **_kw: set())
+    monkeypatch.setattr(risk_service, "_find_manager", lambda *_a, **_kw: None)
+    monkeypatch.setattr(risk_service, "_prefetch_member_checkin_metrics", lambda *_a, **_kw: {})
+    monkeypatch.setattr(risk_service, "_prefetch_member_ids_with_assessments", lambda *_a, **_kw: set())
+    monkeypatch.setattr(
+        risk_service,
+        "schedule_next_risk_evaluations",
+        lambda _db, due_by_member, **_kw: scheduled.append(due_by_member),
+    )
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+
+    stats = risk_service.run_daily_risk_processing(db)
+
+    assert stats["members_analyzed"] == 1
+    assert due_member.risk_score == 12
+    assert list(scheduled[0]) == [(due_member.gym_id, due_member.id)]
+
+
+def test_full_sweep_weekday_and_manual_requests_ignore_the_schedule(monkeypatch):
+    monkeypatch.setattr(risk_service.settings, "risk_incremental_enabled", True)
+    monkeypatch.setattr(risk_service.settings, "risk_full_sweep_weekday", NOW.weekday())
+
+    assert risk_service._use_incremental_risk_processing(NOW, full_sweep=False) is False
+    assert risk_service._use_incremental_risk_processing(NOW + timedelta(days=1), full_sweep=False) is True
+    assert risk_service._use_incremental_risk_processing(NOW + timedelta(days=1), full_sweep=True) is False
@@ -28,7 +28,7 @@ def test_multi_tenant_jobs_continue_after_a_gym_failure(job_func, runner_patch,
     gyms = [_gym("gym-a"), _gym("gym-b")]
 
     with (
-        patch("app.background_jobs.jobs.SessionLocal", return_value=db),
+        patch("app.background_jobs.jobs.SessionLocal", return_value=db) as session_local,
         patch("app.background_jobs.jobs._active_gyms", return_value=gyms),
         patch("app.background_jobs.jobs.set_current_gym_id") as mock_set_gym,
         patch("app.background_jobs.jobs.clear_current_gym_id"),
@@ -42,7 +42,7 @@ def test_multi_tenant_jobs_continue_after_a_gym_failure(job_func, runner_patch,
     assert db.rollback.call_count == 1
     assert db.commit.call_count == 1
     mock_set_gym.assert_has_calls([call("gym-a"), call("gym-b")])
-    db.close.assert_called_once()
+    assert db.close.call_count == session_local.call_count
 
 
 def test_daily_nps_dispatch_job_enqueues_durable_job_per_gym():
@@ -68,7 +68,7 @@ def test_daily_nps_dispatch_job_enqueues_durable_job_per_gym():
     assert enqueue_job.call_count == 2
     assert db.commit.call_count == 2
     mock_set_gym.assert_has_calls([call("gym-a"), call("gym-b")])
-    db.close.assert_called_once()
+    assert db.close.call_count == 3  # gym listing + one session per gym
 
 
 def test_monthly_reports_job_enqueues_durable_job_per_gym():
@@ -99,16 +99,14 @@ def test_monthly_reports_job_enqueues_durable_job_per_gym():
 
 
 def test_daily_loyalty_update_job_commits_per_successful_gym():
-    first_scalars = RuntimeError("boom")
-    second_batch = MagicMock()
-    second_batch.all.return_value = [
-        SimpleNamespace(join_date=date(2025, 1, 15), loyalty_months=0),
-        SimpleNamespace(join_date=date(2024, 12, 1), loyalty_months=0),
+    first_rows = RuntimeError("boom")
+    second_rows = MagicMock()
+    second_rows.all.return_value = [
+        SimpleNamespace(id="member-1", join_date=date(2025, 1, 15), loyalty_months=0),
+        SimpleNamespace(id="member-2", join_date=date.today(), loyalty_months=0),
     ]
-    empty_batch = MagicMock()
-    empty_batch.all.return_value = []
     db = MagicMock()
-    db.scalars.side_effect = [first_scalars, second_batch, empty_batch]
+    db.execute.side_effect = [first_rows, second_rows, MagicMock()]
     gyms = [_gym("gym-a"), _gym("gym-b")]
 
     with (
@@ -118,14 +116,18 @@ def test_daily_loyalty_update_job_commits_per_successful_gym():
         patch("app.background_jobs.jobs.clear_current_gym_id"),
         patch.object(settings, "scheduler_critical_lock_fail_open", True),
         patch.object(settings, "loyalty_update_batch_size", 500),
+        patch.object(settings, "risk_incremental_enabled", False),
     ):
         jobs.daily_loyalty_update_job()
 
     assert db.rollback.call_count == 1
     assert db.commit.call_count == 1
-    assert db.flush.call_count == 1
+    update_params = db.execute.call_args_list[2].args[1]
+    assert [params["id"] for params in update_params] == ["member-1"]
+    assert "LIMIT" in str(db.execute.call_args_list[1].args[0])
+    assert "OFFSET" not in str(db.execute.call_args_list[1].args[0])
     mock_set_gym.assert_has_calls([call("gym-a"), call("gym-b")])
-    db.close.assert_called_once()
+    assert db.close.call_count == 3  # gym listing + one session per gym
 
 
 def test_monthly_reports_job_skips_when_dispatch_disabled():
@@ -182,3 +184,97 @@ def test_booking_reminder_job_uses_allowlisted_unscoped_reason():
 
     assert seen_reasons == ["jobs.booking_reminder_job"]
     db.close.assert_called_once()
+
+
+def test_nightly_retention_pipeline_runs_steps_in_dependency_order_per_gym():
+    db = MagicMock()
+    gyms = [_gym("gym-a"), _gym("gym-b")]
+    calls: list[tuple[str, str]] = []
+    current_gym = {"id": None}
+
+    def _set_gym(gym_id):
+        current_gym["id"] = gym_id
+
+    def _step(name, result):
+        def _run(*_args, **_kwargs):
+            if name == "risk" and current_gym["id"] == "gym-a":
+                raise RuntimeError("boom")
+            calls.append((current_gym["id"], name))
+            return result
+
+        return _run
+
+    with (
+        patch("app.background_jobs.jobs.SessionLocal", return_value=db),
+        patch("app.background_jobs.jobs._active_gyms", return_value=gyms),
+        patch("app.background_jobs.jobs.set_current_gym_id", side_effect=_set_gym),
+        patch("app.background_jobs.jobs.clear_current_gym_id"),
+        patch("app.background_jobs.jobs.run_daily_risk_processing", side_effect=_step("risk", {"processed": 1})),
+        patch(
+            "app.background_jobs.jobs.run_daily_retention_intelligence",
+            side_effect=_step("retention", {"classified": 1}),
+        ),
+        patch("app.background_jobs.jobs.run_automation_rules", side_effect=_step("automations", [])),
+        patch.object(settings, "scheduler_critical_lock_fail_open", True),
+        patch.object(settings, "scheduler_gym_concurrency", 1),
+    ):
+        jobs.nightly_retention_pipeline_job()
+
+    assert calls == [
+        ("gym-a", "retention"),
+        ("gym-a", "automations"),
+        ("gym-b", "risk"),
+        ("gym-b", "retention"),
+        ("gym-b", "automations"),
+    ]
+    assert db.rollback.call_count == 1
+
+
+def test_fanout_uses_one_session_per_gym_in_a_bounded_pool():
+    sessions = [MagicMock() for _ in range(4)]
+    gyms = [_gym("gym-a"), _gym("gym-b"), _gym("gym-c")]
+    handled: list[tuple[str, object]] = []
+
+    def _handler(db, gym_id):
+        handled.append((gym_id, db))
+        return {"processed_count": 1}
+
+    with (
+        patch("app.background_jobs.jobs.SessionLocal", side_effect=sessions),
+        patch("app.background_jobs.jobs._active_gyms", return_value=gyms),
+        patch("app.background_jobs.jobs.ThreadPoolExecutor", wraps=jobs.ThreadPoolExecutor) as pool,
+        patch.object(settings, "scheduler_critical_lock_fail_open", True),
+        patch.object(settings, "scheduler_gym_concurrency", 8),
+    ):
+        jobs._run_for_each_gym("test_fanout", _handler, lease_ttl_seconds=60)
+
+    assert pool.call_args.kwargs["max_workers"] == 3
+    assert sorted(gym_id for gym_id, _ in handled) == ["gym-a", "gym-b", "gym-c"]
+    assert len({id(db) for _, db in handled}) == 3
+    for session in sessions:
+        session.close.assert_called_once()
+
+
+def test_fanout_only_runs_gyms_of_this_shard_and_skips_leased_gyms():
+    db = MagicMock()
+    gyms = [_gym(f"gym-{index}") for index in range(12)]
+    handled: list[str] = []
+
+    @contextmanager
+    def _lease(lock_name, *_args):
+        yield not lock_name.endswith("gym-3")
+
+    with (
+        patch("app.background_jobs.jobs.SessionLocal", return_value=db),
+        patch("app.background_jobs.jobs._active_gyms", return_value=gyms),
+        patch("app.background_jobs.jobs.hold_distributed_lock", side_effect=_lease),
+        patch.object(settings, "scheduler_gym_concurrency", 1),
+        patch.object(settings, "scheduler_shard_count", 2),
+        patch.object(settings, "scheduler_shard_index", 1),
+    ):
+        jobs._run_for_each_gym("test_fanout", lambda _db, gym_id: handled.append(gym_id), lease_ttl_seconds=60)
+
+    with patch.object(settings, "scheduler_shard_count", 2), patch.object(settings, "scheduler_shard_index", 1):
+        expected = [gym.id for gym in gyms if jobs.gym_belongs_to_shard(gym.id) and gym.id != "gym-3"]
+    assert handled == expected
+    assert 0 < len(handled) < len(gyms)
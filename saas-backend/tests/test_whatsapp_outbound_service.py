@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.core import token_bucket
+from app.core.config import settings
+from app.core.token_bucket import TokenBucket
+from app.models.message_log import MessageLog
+from app.services import whatsapp_outbound_service as outbound
+
+NOW = datetime(2026, 10, 17, 21, 0, tzinfo=timezone.utc)
+
+
+def _queued(recipient, *, instance="gym_a", attempt_count=0):
+    return MessageLog(
+        id=uuid4(),
+        gym_id=uuid4(),
+        channel="whatsapp",
+        recipient=recipient,
+        content=f"Oi {recipient}",
+        status="queued",
+        direction="outbound",
+        attempt_count=attempt_count,
+        next_attempt_at=NOW,
+        extra_data={"instance_used": instance, "instance_source": "gym"},
+    )
+
+
+def _claim(db, rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    db.scalars.return_value = result
+
+
+def _configure(monkeypatch, *, limit_per_hour=6):
+    monkeypatch.setattr(outbound, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(settings, "whatsapp_api_url", "http://evolution.local")
+    monkeypatch.setattr(settings, "whatsapp_api_token", "token")
+    monkeypatch.setattr(settings, "whatsapp_rate_limit_per_hour", limit_per_hour)
+    monkeypatch.setattr(token_bucket, "_get_redis", lambda: None)
+    monkeypatch.setattr(outbound, "_recipient_bucket", None)
+
+
+def test_enqueue_stores_a_queued_row_with_the_resolved_instance_and_skips_without_one(monkeypatch):
+    monkeypatch.setattr(outbound, "_utcnow", lambda: NOW)
+    monkeypatch.setattr(settings, "whatsapp_allow_global_fallback", False)
+    db = MagicMock()
+    gym_id = uuid4()
+
+    queued = outbound.enqueue_whatsapp_message(
+        db, phone="(11) 99999-0000", message="Oi", instance="gym_a", gym_id=gym_id
+    )
+    skipped = outbound.enqueue_whatsapp_message(db, phone="11999990000", message="Oi", instance=None)
+
+    assert (queued.status, queued.recipient, queued.gym_id, queued.next_attempt_at) == (
+        "queued",
+        "5511999990000",
+        gym_id,
+        NOW,
+    )
+    assert queued.extra_data == {"instance_used": "gym_a", "instance_source": "gym"}
+    assert (skipped.status, skipped.next_attempt_at) == ("skipped", None)
+    assert db.add.call_count == 2
+    db.flush.assert_not_called()
+
+
+def test_process_due_messages_records_send_retry_failure_and_rate_limit_per_message(monkeypatch):
+    _configure(monkeypatch, limit_per_hour=1)
+    ok = _queued("5511900000001")
+    throttled = _queued("5511900000002")
+    rejected = _queued("5511900000003")
+    flooding = _queued("5511900000001")
+    retried = _queued("5511900000004", attempt_count=4)
+    outcomes = {
+        ok.id: outbound._SendOutcome(sent=True, status_code=201),
+        throttled.id: outbound._SendOutcome(sent=False, retryable=True, status_code=429, error="HTTP 429"),
+        rejected.id: outbound._SendOutcome(sent=False, status_code=400, error="HTTP 400: numero invalido"),
+        retried.id: outbound._SendOutcome(sent=False, retryable=True, status_code=503, error="HTTP 503"),
+    }
+    monkeypatch.setattr(outbound, "_post_text", lambda send, *, pool_size: outcomes[send.log_id])
+    db = MagicMock()
+    _claim(db, [ok, throttled, rejected, flooding, retried])
+
+    result = outbound.process_due_whatsapp_messages(db, batch_size=50, concurrency_per_instance=2, max_attempts=5)
+
+    claim_sql = str(db.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in claim_sql
+    assert result == {"claimed": 5, "sent": 1, "retry_scheduled": 1, "failed": 2, "blocked": 1, "skipped": 0}
+    assert (ok.status, ok.attempt_count, ok.extra_data["response_status"]) == ("sent", 1, 201)
+    assert (throttled.status, throttled.next_attempt_at) == ("queued", NOW + timedelta(minutes=1))
+    assert (rejected.status, rejected.error_detail) == ("failed", "HTTP 400: numero invalido")
+    assert (flooding.status, flooding.attempt_count) == ("blocked", 0)
+    assert (retried.status, retried.attempt_count) == ("failed", 5)
+
+
+def test_process_due_messages_skips_everything_without_api_credentials(monkeypatch):
+    _configure(monkeypatch)
+    monkeypatch.setattr(settings, "whatsapp_api_token", "")
+    monkeypatch.setattr(outbound, "_post_text", MagicMock(side_effect=AssertionError("sent")))
+    message = _queued("5511900000001")
+    db = MagicMock()
+    _claim(db, [message])
+
+    result = outbound.process_due_whatsapp_messages(db, batch_size=10, concurrency_per_instance=2)
+
+    assert result["skipped"] == 1
+    assert (message.status, message.error_detail) == ("skipped", "WhatsApp API URL/token not configured")
+
+
+def test_deliver_bounds_requests_in_flight_per_instance(monkeypatch):
+    in_flight, peak, lock = defaultdict(int), defaultdict(int), threading.Lock()
+    sends = [
+        outbound._OutboundSend(uuid4(), instance, f"55119{index:08d}", "Oi")
+        for index in range(6)
+        for instance in ("gym_a", "gym_b")
+    ]
+
+    def _post(send, *, pool_size):
+        assert pool_size == 2
+        with lock:
+            in_flight[send.instance] += 1
+            peak[send.instance] = max(peak[send.instance], in_flight[send.instance])
+        time.sleep(0.02)
+        with lock:
+            in_flight[send.instance] -= 1
+        return outbound._SendOutcome(sent=True, status_code=201)
+
+    monkeypatch.setattr(outbound, "_post_text", _post)
+    outcomes = outbound._deliver(sends, concurrency_per_instance=2)
+
+    assert len(outcomes) == 12
+    assert dict(peak) == {"gym_a": 2, "gym_b": 2}
+
+
+def test_instance_clients_are_pooled_per_instance(monkeypatch):
+    monkeypatch.setattr(settings, "whatsapp_api_url", "http://evolution.local/")
+    monkeypatch.setattr(settings, "whatsapp_api_token", "token")
+    try:
+        client = outbound.get_instance_client("gym_a", pool_size=4)
+
+        assert outbound.get_instance_client("gym_a", pool_size=4) is client
+        assert outbound.get_instance_client("gym_b", pool_size=4) is not client
+        assert str(client.base_url) == "http://evolution.local"
+        assert client.headers["apikey"] == "token"
+    finally:
+        outbound.close_instance_clients()
+    assert client.is_closed
+
+
+def test_local_token_bucket_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(token_bucket, "_get_redis", lambda: None)
+    monkeypatch.setattr(token_bucket.time, "monotonic", lambda: clock[0])
+    bucket = TokenBucket("test", capacity=2, period_seconds=3600)
+
+    assert [bucket.try_acquire("5511900000001") for _ in range(3)] == [True, True, False]
+    assert bucket.try_acquire("5511900000002") is True
+    clock[0] += 1800
+    assert bucket.try_acquire("5511900000001") is True
+    assert bucket.try_acquire("5511900000001") is False
+
+
+def test_sends_refused_by_the_open_breaker_are_requeued_without_spending_an_attempt(monkeypatch):
+    _configure(monkeypatch, limit_per_hour=1)
+    breaker = outbound.get_breaker(outbound.WHATSAPP_PROVIDER)
+    monkeypatch.setattr(breaker, "allow_request", lambda: False)
+    monkeypatch.setattr(outbound, "get_instance_client", MagicMock(side_effect=AssertionError("called Evolution")))
+    message = _queued("5511900000001")
+    db = MagicMock()
+    _claim(db, [message])
+
+    first = outbound.process_due_whatsapp_messages(db, batch_size=10, concurrency_per_instance=2)
+    second = outbound.process_due_whatsapp_messages(db, batch_size=10, concurrency_per_instance=2)
+
+    assert first["retry_scheduled"] == second["retry_scheduled"] == 1
+    assert (message.status, message.attempt_count) == ("queued", 0)
+    assert message.next_attempt_at == NOW + timedelta(minutes=1)
+    assert "aberto" in message.error_detail
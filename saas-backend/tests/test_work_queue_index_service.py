@@ -0,0 +1,203 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import AITriageRecommendation, AutopilotAction, RoleEnum, Task, TaskPriority, TaskStatus
+from app.schemas.work_queue import WorkQueueItemOut
+from app.services import work_queue_index_service
+from app.services.ai_service_agent_service import AI_SERVICE_AGENT_ACTION_TYPE
+from app.services.work_queue_index_service import (
+    _collect_work_queue_changes,
+    _keyset_condition,
+    _list_filters,
+    _task_row,
+    build_work_queue_index_row,
+    list_indexed_work_queue_items,
+    next_score_refresh_at,
+)
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+GYM_ID = uuid.UUID("11111111-1111-1111-1111-111111111111")
+USER_ID = uuid.UUID("22222222-2222-2222-2222-222222222222")
+TASK_ID = uuid.UUID("33333333-3333-3333-3333-333333333333")
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def _user(role=RoleEnum.RECEPTIONIST, work_shift="morning"):
+    return SimpleNamespace(id=USER_ID, gym_id=GYM_ID, role=role, work_shift=work_shift, work_shift_scope=None)
+
+
+def _item(**kwargs):
+    defaults = dict(
+        source_type="task",
+        source_id=TASK_ID,
+        subject_name="Ana",
+        domain="retention",
+        severity="high",
+        reason="Sem treino ha 10 dias",
+        primary_action_label="Iniciar tarefa",
+        primary_action_type="open_context",
+        state="do_now",
+        context_path="/tasks",
+        outcome_state="pending",
+    )
+    defaults.update(kwargs)
+    return WorkQueueItemOut(**defaults)
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_build_row_stores_score_shift_and_payload():
+    item = _item(preferred_shift="Manha", due_at=NOW + timedelta(days=3), retention_stage="cold_base")
+
+    row = build_work_queue_index_row(item, gym_id=GYM_ID, is_finance=False, trainer_visible=False, now=NOW)
+
+    assert row["preferred_shift"] == "morning"
+    assert row["is_cold_base"] is True
+    assert row["score"] == 350 + 200 + 60 - 260 + 70
+    assert row["score_refresh_at"] == NOW + timedelta(days=2)
+    assert WorkQueueItemOut.model_validate(row["payload"]) == item
+
+
+def test_build_row_keeps_unrecognized_shift_distinct_from_missing():
+    assert build_work_queue_index_row(_item(preferred_shift=None), gym_id=GYM_ID, now=NOW)["preferred_shift"] is None
+    assert build_work_queue_index_row(_item(preferred_shift="integral"), gym_id=GYM_ID, now=NOW)["preferred_shift"] == "other"
+
+
+@pytest.mark.parametrize(
+    ("due_in", "expected_in"),
+    [
+        (timedelta(days=10), timedelta(days=3)),
+        (timedelta(hours=30), timedelta(hours=6)),
+        (timedelta(hours=5), timedelta(hours=5)),
+        (timedelta(hours=-1), None),
+    ],
+)
+def test_next_score_refresh_at_tracks_due_buckets(due_in, expected_in):
+    item = _item(due_at=NOW + due_in)
+
+    expected = NOW + expected_in if expected_in is not None else None
+    assert next_score_refresh_at(item, NOW) == expected
+    assert next_score_refresh_at(_item(due_at=NOW + due_in, state="done"), NOW) is None
+
+
+def test_task_row_skips_archived_and_deleted_tasks():
+    base = dict(
+        id=TASK_ID,
+        gym_id=GYM_ID,
+        member_id=None,
+        lead_id=None,
+        assigned_to_user_id=None,
+        title="Cobrar mensalidade",
+        description=None,
+        priority=TaskPriority.URGENT,
+        status=TaskStatus.TODO,
+        due_date=None,
+        suggested_message=None,
+        extra_data={"source": "delinquency"},
+        deleted_at=None,
+        member=None,
+        lead=None,
+    )
+
+    row = _task_row(SimpleNamespace(**base), NOW)
+    assert row["is_finance"] is True
+    assert row["domain"] == "finance"
+    assert _task_row(SimpleNamespace(**{**base, "deleted_at": NOW}), NOW) is None
+    archived = {**base, "extra_data": {"operational_archive": {"archived_at": NOW.isoformat()}}}
+    assert _task_row(SimpleNamespace(**archived), NOW) is None
+
+
+def test_trainer_filters_restrict_sources_and_dedupe_assessment_rows():
+    filters = _list_filters(
+        _user(RoleEnum.TRAINER),
+        state="do_now",
+        shift="all",
+        assignee="all",
+        domain="all",
+        source="all",
+        now=NOW,
+    )
+    sql = " ".join(_sql(condition) for condition in filters)
+
+    assert "work_queue_items.trainer_visible IS true" in sql
+    assert "'ai_triage'" not in sql
+    assert "NOT (EXISTS" in sql
+    assert "work_queue_items.is_cold_base IS true" in sql
+    assert "work_queue_items.preferred_shift IS NULL OR work_queue_items.preferred_shift IN ('morning')" in sql
+
+
+def test_salesperson_without_visible_sources_hides_everything():
+    filters = _list_filters(
+        _user(RoleEnum.SALESPERSON),
+        state="all",
+        shift="all",
+        assignee="all",
+        domain="all",
+        source="student_personal_ai",
+        now=NOW,
+    )
+
+    assert "false" in _sql(filters[1])
+
+
+def test_keyset_condition_orders_null_due_dates_first():
+    row_id = uuid.uuid4()
+    with_due = _sql(_keyset_condition(encode_cursor({"s": 420, "d": NOW.isoformat(), "i": str(row_id)})))
+    without_due = _sql(_keyset_condition(encode_cursor({"s": 420, "d": None, "i": str(row_id)})))
+
+    assert "work_queue_items.score < 420" in with_due
+    assert "work_queue_items.due_at <" in with_due
+    assert "work_queue_items.due_at IS NOT NULL" in without_due
+    assert f"work_queue_items.id < '{row_id}'" in without_due
+
+
+def test_keyset_condition_rejects_tampered_cursor():
+    with pytest.raises(ValueError):
+        _keyset_condition("not-a-cursor")
+    with pytest.raises(ValueError):
+        _keyset_condition(encode_cursor({"s": "x"}))
+
+
+def test_list_indexed_items_returns_payloads_and_next_cursor():
+    rows = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            score=500 - index,
+            due_at=None,
+            payload=_item(source_id=uuid.uuid4()).model_dump(mode="json"),
+        )
+        for index in range(3)
+    ]
+    db = MagicMock()
+    db.scalar.return_value = 7
+    db.scalars.return_value.all.return_value = rows
+
+    result = list_indexed_work_queue_items(db, current_user=_user(RoleEnum.OWNER), page_size=2)
+
+    assert result.total == 7
+    assert [str(item.source_id) for item in result.items] == [row.payload["source_id"] for row in rows[:2]]
+    assert decode_cursor(result.next_cursor) == {"s": 499, "d": None, "i": str(rows[1].id)}
+
+
+def test_collect_changes_groups_sources_by_gym(monkeypatch):
+    monkeypatch.setattr(work_queue_index_service.settings, "work_queue_index_enabled", True)
+    task = Task(id=TASK_ID, gym_id=GYM_ID, title="x")
+    recommendation = AITriageRecommendation(id=uuid.uuid4(), gym_id=GYM_ID)
+    agent_action = AutopilotAction(id=uuid.uuid4(), gym_id=GYM_ID, action_type=AI_SERVICE_AGENT_ACTION_TYPE)
+    other_action = AutopilotAction(id=uuid.uuid4(), gym_id=GYM_ID, action_type="send_whatsapp")
+    session = SimpleNamespace(info={}, new=[task], dirty=[recommendation, agent_action, other_action], deleted=[])
+
+    _collect_work_queue_changes(session, None)
+
+    changes = session.info["work_queue_index_pending"][GYM_ID]
+    assert changes["task_ids"] == {TASK_ID}
+    assert changes["ai_triage_ids"] == {recommendation.id}
+    assert changes["action_ids"] == {agent_action.id}